@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRUEBA DE CARGA LOCAL - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Reproduce peticiones de /calcular y /generar-reporte-pdf contra un gunicorn
+local (o una URL dada) con la concurrencia y la tasa de llegada indicadas,
+y reporta p50/p95/p99, throughput y tasa de error por endpoint. Sirve para
+elegir workers y threads antes de desplegar.
+
+Las formas de las peticiones salen de los logs exportados de Railway en
+logs/ (JSON o CSV, con LOG_FORMAT json o texto): los payloads que la app
+registra en 'webapp.payloads' cuando LOG_SAMPLE_RATE > 0. Se anonimizan
+antes de usarse: solo se conservan los campos del cálculo, los montos se
+redondean y los datos personales del PDF se reemplazan. Si los logs no
+traen payloads (los exportados hasta ahora solo tienen el arranque de
+gunicorn) se usa una muestra sintética con la misma distribución que los
+benchmarks, y el reporte lo indica.
+
+Uso:
+    python benchmarks/carga_local.py --workers 2 --threads 4 --concurrencia 16 --tasa 20
+    python benchmarks/carga_local.py --url http://127.0.0.1:5000 --peticiones 500
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for carpeta in ('webapp', 'calculadoras-python', 'benchmarks'):
+    ruta = os.path.join(RAIZ, carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+CARPETA_LOGS = os.path.join(RAIZ, 'logs')
+
+ENDPOINT_CALCULAR = '/calcular'
+ENDPOINT_PDF = '/generar-reporte-pdf'
+
+# Campos del formulario que se reproducen; cualquier otro se descarta
+CAMPOS_CALCULO = (
+    'semanas_cotizadas', 'sdp_actual', 'sbc_modalidad40', 'edad_actual', 'edad_pension',
+    'tiene_esposa', 'num_hijos_dependientes', 'tiene_padres_dependientes', 'mes_nacimiento',
+    'mes_inicio_modalidad40', 'mes_inicio_cotizacion', 'año_inicio_cotizacion', 'monte_carlo',
+)
+# Datos personales del PDF: se conserva solo su longitud
+CAMPOS_PERSONALES = ('nombre', 'apellido_paterno', 'apellido_materno', 'rfc', 'curp', 'nss')
+
+# Registro de payload en formato texto: "... [webapp.payloads] calcular.peticion {...}"
+_PAYLOAD_TEXTO = re.compile(r'\[webapp\.payloads\] (\S+) (\{.*\})\s*$')
+
+
+# ==================== EXTRACCIÓN DE LOS LOGS ====================
+
+def _mensajes(ruta: str) -> Iterator[str]:
+    """Mensajes de un export de Railway (JSON o CSV) o de un log de la app (una línea por registro)"""
+    with open(ruta, encoding='utf-8-sig', errors='replace', newline='') as f:
+        if ruta.endswith('.csv'):
+            for fila in csv.DictReader(f):
+                yield fila.get('message') or ''
+            return
+        contenido = f.read()
+    if ruta.endswith('.json'):
+        try:
+            registros = json.loads(contenido)
+        except ValueError:
+            registros = None
+        if isinstance(registros, list):
+            for registro in registros:
+                if isinstance(registro, dict):
+                    yield str(registro.get('message', ''))
+            return
+    yield from contenido.splitlines()
+
+
+def _payload(mensaje: str) -> Optional[Tuple[str, dict]]:
+    """(etiqueta, datos) si el mensaje es un volcado de 'webapp.payloads'"""
+    mensaje = mensaje.strip()
+    if mensaje.startswith('{'):
+        try:
+            registro = json.loads(mensaje)
+        except ValueError:
+            return None
+        if isinstance(registro, dict) and registro.get('logger') == 'webapp.payloads':
+            datos = registro.get('datos')
+            return (registro.get('mensaje'), datos) if isinstance(datos, dict) else None
+        return None
+    coincidencia = _PAYLOAD_TEXTO.search(mensaje)
+    if coincidencia:
+        try:
+            datos = json.loads(coincidencia.group(2))
+        except ValueError:
+            return None
+        return (coincidencia.group(1), datos) if isinstance(datos, dict) else None
+    return None
+
+
+def anonimizar_calculo(datos: dict) -> dict:
+    """
+    Forma anónima de una petición de /calcular
+
+    Solo quedan los campos del cálculo; semanas a múltiplos de 25 y
+    salarios a múltiplos de 10 pesos hacia abajo (no rebasan el tope).
+    """
+    forma = {campo: datos[campo] for campo in CAMPOS_CALCULO if campo in datos}
+    try:
+        if 'semanas_cotizadas' in forma:
+            forma['semanas_cotizadas'] = int(float(forma['semanas_cotizadas']) // 25 * 25)
+        for campo in ('sdp_actual', 'sbc_modalidad40'):
+            if campo in forma:
+                forma[campo] = float(float(forma[campo]) // 10 * 10)
+    except (TypeError, ValueError):
+        pass  # Valor inválido: se reproduce tal cual (el servidor responde 400)
+    return forma
+
+
+def anonimizar_reporte(datos: dict) -> dict:
+    """Forma anónima de una petición de PDF (los resultados se recalculan al reproducir)"""
+    forma = {campo: 'X' * len(str(datos[campo] or '')) for campo in CAMPOS_PERSONALES if campo in datos}
+    if 'incluir_recomendaciones' in datos:
+        forma['incluir_recomendaciones'] = bool(datos['incluir_recomendaciones'])
+    return forma
+
+
+def extraer_formas(carpeta: str = CARPETA_LOGS) -> Tuple[List[dict], List[dict]]:
+    """
+    Formas anónimas de las peticiones registradas en los logs
+
+    Args:
+        carpeta: Carpeta con los exports de Railway o logs de la app
+
+    Returns:
+        (peticiones de /calcular, peticiones de PDF), en el orden de los logs
+    """
+    calculos, reportes = [], []
+    for nombre in sorted(os.listdir(carpeta)):
+        ruta = os.path.join(carpeta, nombre)
+        if not os.path.isfile(ruta) or not nombre.endswith(('.json', '.csv', '.log', '.jsonl', '.txt')):
+            continue
+        for mensaje in _mensajes(ruta):
+            payload = _payload(mensaje)
+            if payload is None:
+                continue
+            etiqueta, datos = payload
+            if etiqueta == 'calcular.peticion':
+                calculos.append(anonimizar_calculo(datos))
+            elif etiqueta == 'reporte.peticion':
+                reportes.append(anonimizar_reporte(datos))
+    return calculos, reportes
+
+
+def formas_sinteticas(n: int = 100, semilla: int = 17) -> Tuple[List[dict], List[dict]]:
+    """Muestra sintética con la distribución de los benchmarks (cuando los logs no traen payloads)"""
+    from entradas import generar_personas
+    calculos = generar_personas(n, datetime.now(), semilla)
+    rng = random.Random(semilla)
+    reportes = [
+        {'nombre': 'X' * rng.randint(3, 10), 'apellido_paterno': 'X' * rng.randint(4, 10),
+         'apellido_materno': 'X' * rng.randint(4, 10), 'incluir_recomendaciones': rng.random() < 0.7}
+        for _ in range(max(n // 10, 1))
+    ]
+    return calculos, reportes
+
+
+# ==================== SERVIDOR LOCAL ====================
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def servidor_gunicorn(workers: int, threads: int, timeout_arranque: float = 60) -> Iterator[str]:
+    """
+    Levantar gunicorn con main:app en un puerto libre y esperar a que responda
+
+    Yields:
+        URL base del servidor
+    """
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, LOG_LEVEL=os.environ.get('LOG_LEVEL', 'WARNING'))
+    salida = tempfile.TemporaryFile()
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'main:app', '--bind', f'127.0.0.1:{puerto}',
+         '--workers', str(workers), '--threads', str(threads), '--timeout', '120'],
+        cwd=RAIZ, env=entorno, stdout=salida, stderr=subprocess.STDOUT,
+    )
+    url = f'http://127.0.0.1:{puerto}'
+    try:
+        limite = time.monotonic() + timeout_arranque
+        while True:
+            if proceso.poll() is not None:
+                salida.seek(0)
+                raise RuntimeError(f'gunicorn terminó al arrancar:\n{salida.read().decode(errors="replace")[-2000:]}')
+            try:
+                conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=2)
+                conexion.request('GET', '/info')
+                if conexion.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > limite:
+                raise RuntimeError(f'gunicorn no respondió en {timeout_arranque:g} s')
+            time.sleep(0.2)
+        yield url
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+            proceso.wait()
+        salida.close()
+
+
+# ==================== CARGA ====================
+
+class _Cliente:
+    """Conexión HTTP keep-alive por hilo; se reabre si el servidor la cierra"""
+
+    def __init__(self, url: str, timeout: float):
+        partes = urllib.parse.urlsplit(url)
+        self.host, self.puerto = partes.hostname, partes.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def post(self, ruta: str, cuerpo: bytes) -> Tuple[int, bytes]:
+        for intento in (1, 2):
+            conexion = getattr(self._local, 'conexion', None)
+            if conexion is None:
+                conexion = self._local.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=self.timeout)
+            try:
+                conexion.request('POST', ruta, body=cuerpo, headers={'Content-Type': 'application/json'})
+                respuesta = conexion.getresponse()
+                contenido = respuesta.read()
+                if respuesta.will_close:
+                    conexion.close()
+                    self._local.conexion = None
+                return respuesta.status, contenido
+            except (http.client.HTTPException, ConnectionError):
+                conexion.close()
+                self._local.conexion = None
+                if intento == 2:
+                    raise
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ordenados)"""
+    if not valores:
+        return 0.0
+    return valores[min(max(math.ceil(p / 100 * len(valores)) - 1, 0), len(valores) - 1)]
+
+
+def preparar_peticiones(cliente: _Cliente, calculos: List[dict], reportes: List[dict], peticiones: int,
+                        proporcion_pdf: float, semilla: int) -> List[Tuple[str, bytes]]:
+    """
+    Secuencia de peticiones a reproducir
+
+    Los PDF necesitan los resultados de /calcular: se piden antes de medir,
+    uno por forma de reporte, con una forma de cálculo tomada en orden.
+    """
+    rng = random.Random(semilla)
+    cuerpos_pdf = []
+    if reportes and proporcion_pdf > 0:
+        pendientes = iter(calculos)
+        for forma in reportes:
+            for calculo in pendientes:
+                estado, contenido = cliente.post(ENDPOINT_CALCULAR, json.dumps(calculo).encode())
+                if estado == 200:
+                    cuerpos_pdf.append(json.dumps(dict(forma, resultados=json.loads(contenido))).encode())
+                    break
+    cuerpos_calculo = [json.dumps(calculo).encode() for calculo in calculos]
+
+    secuencia = []
+    for _ in range(peticiones):
+        if cuerpos_pdf and rng.random() < proporcion_pdf:
+            secuencia.append((ENDPOINT_PDF, rng.choice(cuerpos_pdf)))
+        else:
+            secuencia.append((ENDPOINT_CALCULAR, rng.choice(cuerpos_calculo)))
+    return secuencia
+
+
+def ejecutar_carga(url: str, secuencia: List[Tuple[str, bytes]], concurrencia: int, tasa: float = 0,
+                   semilla: int = 17, timeout: float = 60, cliente: _Cliente = None) -> Dict:
+    """
+    Reproducir la secuencia y medir latencias por endpoint
+
+    Con tasa > 0 las llegadas son de Poisson (carga abierta) y la latencia
+    se mide desde la llegada programada, así que incluye la espera cuando
+    todos los hilos están ocupados. Con tasa 0 cada hilo manda la siguiente
+    petición en cuanto recibe la respuesta (carga cerrada).
+
+    Args:
+        url: URL base del servidor
+        secuencia: (endpoint, cuerpo JSON) de cada petición
+        concurrencia: Peticiones simultáneas como máximo
+        tasa: Llegadas por segundo (0 = sin pausa)
+        semilla: Semilla de los intervalos entre llegadas
+        timeout: Timeout por petición en segundos
+
+    Returns:
+        Dictionary por endpoint con peticiones, errores, tasa_error_pct,
+        throughput_rps y latencias p50/p95/p99/max en ms, más la duración total
+    """
+    cliente = cliente or _Cliente(url, timeout)
+    rng = random.Random(semilla)
+    mediciones = {ENDPOINT_CALCULAR: [], ENDPOINT_PDF: []}
+    errores = {ENDPOINT_CALCULAR: {}, ENDPOINT_PDF: {}}
+    candado = threading.Lock()
+
+    def enviar(endpoint, cuerpo, llegada):
+        inicio = llegada if llegada is not None else time.perf_counter()
+        try:
+            estado, _ = cliente.post(endpoint, cuerpo)
+            codigo = None if 200 <= estado < 300 or estado == 304 else str(estado)
+        except (OSError, http.client.HTTPException) as e:
+            codigo = type(e).__name__
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        with candado:
+            mediciones[endpoint].append(latencia_ms)
+            if codigo:
+                errores[endpoint][codigo] = errores[endpoint].get(codigo, 0) + 1
+
+    inicio_total = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        llegada = inicio_total
+        for endpoint, cuerpo in secuencia:
+            if tasa > 0:
+                llegada += rng.expovariate(tasa)
+                pausa = llegada - time.perf_counter()
+                if pausa > 0:
+                    time.sleep(pausa)
+                ejecutor.submit(enviar, endpoint, cuerpo, llegada)
+            else:
+                ejecutor.submit(enviar, endpoint, cuerpo, None)
+    duracion = time.perf_counter() - inicio_total
+
+    reporte = {'duracion_s': round(duracion, 3), 'endpoints': {}}
+    for endpoint, latencias in mediciones.items():
+        if not latencias:
+            continue
+        latencias.sort()
+        fallidas = sum(errores[endpoint].values())
+        reporte['endpoints'][endpoint] = {
+            'peticiones': len(latencias),
+            'errores': fallidas,
+            'errores_por_codigo': errores[endpoint],
+            'tasa_error_pct': round(fallidas / len(latencias) * 100, 2),
+            'throughput_rps': round(len(latencias) / duracion, 2),
+            'p50_ms': round(_percentil(latencias, 50), 1),
+            'p95_ms': round(_percentil(latencias, 95), 1),
+            'p99_ms': round(_percentil(latencias, 99), 1),
+            'max_ms': round(latencias[-1], 1),
+        }
+    return reporte
+
+
+def imprimir_reporte(reporte: Dict) -> None:
+    print(f"\n{'Endpoint':<22}{'Pet.':>7}{'Err %':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print('-' * 86)
+    for endpoint, datos in reporte['endpoints'].items():
+        print(f"{endpoint:<22}{datos['peticiones']:>7}{datos['tasa_error_pct']:>8.1f}{datos['throughput_rps']:>9.1f}"
+              f"{datos['p50_ms']:>10.1f}{datos['p95_ms']:>10.1f}{datos['p99_ms']:>10.1f}{datos['max_ms']:>10.1f}")
+        if datos['errores_por_codigo']:
+            print(f"{'':<22}errores: {datos['errores_por_codigo']}")
+    print(f"\n⏱️  Duración: {reporte['duracion_s']} s")
+
+
+def main(argumentos: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='Prueba de carga local de /calcular y /generar-reporte-pdf')
+    parser.add_argument('--logs', default=CARPETA_LOGS, help='Carpeta con los logs exportados (default: logs/)')
+    parser.add_argument('--url', help='Servidor ya levantado; si no se da, se arranca gunicorn local')
+    parser.add_argument('--workers', type=int, default=2, help='Workers de gunicorn')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker de gunicorn')
+    parser.add_argument('--concurrencia', type=int, default=8, help='Peticiones simultáneas como máximo')
+    parser.add_argument('--tasa', type=float, default=0, help='Llegadas por segundo (0 = sin pausa)')
+    parser.add_argument('--peticiones', type=int, default=200, help='Total de peticiones')
+    parser.add_argument('--proporcion-pdf', type=float, default=None,
+                        help='Fracción de peticiones de PDF (default: la de los logs, o 0.1)')
+    parser.add_argument('--semilla', type=int, default=17)
+    parser.add_argument('--timeout', type=float, default=60, help='Timeout por petición en segundos')
+    parser.add_argument('--json', help='Guardar el reporte en este archivo')
+    opciones = parser.parse_args(argumentos)
+
+    calculos, reportes = extraer_formas(opciones.logs)
+    if calculos:
+        origen = f'logs ({len(calculos)} cálculos, {len(reportes)} reportes)'
+        proporcion_pdf = len(reportes) / (len(calculos) + len(reportes))
+    else:
+        calculos, reportes = formas_sinteticas(semilla=opciones.semilla)
+        origen = 'sintético (los logs no tienen payloads; exportar con LOG_SAMPLE_RATE > 0)'
+        proporcion_pdf = 0.1
+    if opciones.proporcion_pdf is not None:
+        proporcion_pdf = opciones.proporcion_pdf
+    print(f"📋 Peticiones: {origen}")
+
+    def correr(url):
+        print(f"🚀 {opciones.peticiones} peticiones a {url}, concurrencia {opciones.concurrencia}, "
+              f"tasa {opciones.tasa or 'sin pausa'}, {proporcion_pdf:.0%} PDF")
+        cliente = _Cliente(url, opciones.timeout)
+        secuencia = preparar_peticiones(cliente, calculos, reportes, opciones.peticiones, proporcion_pdf,
+                                        opciones.semilla)
+        return ejecutar_carga(url, secuencia, opciones.concurrencia, opciones.tasa, opciones.semilla,
+                              opciones.timeout, cliente)
+
+    if opciones.url:
+        reporte = correr(opciones.url)
+    else:
+        print(f"🔧 gunicorn: {opciones.workers} workers × {opciones.threads} threads")
+        with servidor_gunicorn(opciones.workers, opciones.threads) as url:
+            reporte = correr(url)
+
+    reporte['origen'] = origen
+    reporte['configuracion'] = {
+        'workers': None if opciones.url else opciones.workers,
+        'threads': None if opciones.url else opciones.threads,
+        'concurrencia': opciones.concurrencia, 'tasa': opciones.tasa,
+        'peticiones': opciones.peticiones, 'proporcion_pdf': round(proporcion_pdf, 3),
+    }
+    imprimir_reporte(reporte)
+    if opciones.json:
+        with open(opciones.json, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+    return reporte
+
+
+if __name__ == "__main__":
+    main()
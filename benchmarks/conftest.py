@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Configuración de los benchmarks (pytest-benchmark)
+
+Cada benchmark compara su mejor tiempo (el mínimo de las rondas, el menos
+afectado por otros procesos) contra benchmarks/linea_base.json y falla si
+es más lento que la línea base por más del umbral:
+
+    python -m pytest benchmarks                          # comparar (umbral 25%)
+    python -m pytest benchmarks --umbral-regresion=10    # umbral en %
+    python -m pytest benchmarks --guardar-linea-base     # actualizar la línea base
+
+El umbral también se puede fijar con BENCHMARK_UMBRAL_PCT. Los tiempos
+dependen de la máquina, así que linea_base.json no se versiona: la primera
+corrida con --guardar-linea-base lo crea en la máquina donde se comparan
+los resultados y, mientras no exista, los benchmarks solo miden. No se usa
+red ni servidor: los endpoints se miden con el cliente de pruebas de Flask.
+"""
+
+import json
+import os
+import platform
+import sys
+
+import pytest
+
+# Add the webapp, calculadoras-python and benchmarks directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python', 'benchmarks'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+# Sin calentamiento en segundo plano ni logs por petición durante las mediciones
+os.environ.setdefault('WARMUP_DELAY', '-1')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(__file__), 'linea_base.json')
+UMBRAL_REGRESION_PCT = 25.0
+
+_resultados = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    grupo = parser.getgroup('linea base')
+    grupo.addoption('--guardar-linea-base', action='store_true', default=False,
+                    help='Guardar los tiempos de esta corrida como nueva línea base')
+    grupo.addoption('--umbral-regresion', type=float, default=None,
+                    help=f'Regresión máxima permitida en %% (default {UMBRAL_REGRESION_PCT:g} '
+                         'o BENCHMARK_UMBRAL_PCT)')
+
+
+def pytest_configure(config):
+    config.stash[_resultados] = {}
+
+
+def pytest_report_header(config):
+    if config.getoption('--guardar-linea-base'):
+        return f'línea base: se guarda en {RUTA_LINEA_BASE}'
+    if not os.path.exists(RUTA_LINEA_BASE):
+        return 'línea base: no existe, solo se mide (créala con --guardar-linea-base)'
+    return f'línea base: {RUTA_LINEA_BASE}'
+
+
+def _leer_linea_base():
+    try:
+        with open(RUTA_LINEA_BASE, encoding='utf-8') as f:
+            return json.load(f)['benchmarks']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+@pytest.fixture(scope='session')
+def linea_base():
+    """Tiempos guardados por nombre de benchmark (vacío si no hay línea base)"""
+    return _leer_linea_base()
+
+
+@pytest.fixture
+def medir(benchmark, request, linea_base):
+    """
+    Medir una función con pytest-benchmark y compararla contra la línea base
+
+    medir(funcion) usa la calibración automática; medir(funcion, rondas=5)
+    usa un número fijo de rondas para operaciones lentas (PDF).
+    """
+    config = request.config
+    umbral = config.getoption('--umbral-regresion')
+    if umbral is None:
+        umbral = float(os.environ.get('BENCHMARK_UMBRAL_PCT', UMBRAL_REGRESION_PCT))
+
+    def _medir(funcion, rondas=None):
+        if rondas:
+            resultado = benchmark.pedantic(funcion, rounds=rondas, warmup_rounds=1)
+        else:
+            resultado = benchmark(funcion)
+        if benchmark.stats is None:  # --benchmark-disable
+            return resultado
+
+        nombre = request.node.name
+        minimo_ms = benchmark.stats.stats.min * 1000
+        config.stash[_resultados][nombre] = {
+            'minimo_ms': round(minimo_ms, 4),
+            'mediana_ms': round(benchmark.stats.stats.median * 1000, 4),
+            'rondas': benchmark.stats.stats.rounds,
+        }
+
+        base = linea_base.get(nombre)
+        if base and not config.getoption('--guardar-linea-base'):
+            cambio_pct = (minimo_ms / base['minimo_ms'] - 1) * 100
+            print(f"   ⏱️  {nombre}: {minimo_ms:.3f} ms vs {base['minimo_ms']:.3f} ms ({cambio_pct:+.1f}%)")
+            if cambio_pct > umbral:
+                pytest.fail(f"{nombre}: {minimo_ms:.3f} ms es {cambio_pct:.1f}% más lento que la "
+                            f"línea base ({base['minimo_ms']:.3f} ms, umbral {umbral:g}%)")
+        return resultado
+
+    return _medir
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    resultados = config.stash.get(_resultados, {})
+    if not config.getoption('--guardar-linea-base') or not resultados:
+        return
+
+    # Conservar los benchmarks que no corrieron en esta sesión (-k)
+    benchmarks = _leer_linea_base()
+    benchmarks.update(resultados)
+    contenido = {
+        'maquina': {
+            'python': platform.python_version(),
+            'sistema': platform.platform(terse=True),
+            'procesador': platform.processor() or platform.machine(),
+        },
+        'benchmarks': dict(sorted(benchmarks.items())),
+    }
+    with open(RUTA_LINEA_BASE, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print(f"\n📝 Línea base actualizada: {RUTA_LINEA_BASE} ({len(resultados)} benchmarks)")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Entradas realistas para los benchmarks: personas con la distribución típica
+de quien busca Modalidad 40 (edad 55-64, 800-1,600 semanas, SDP bajo con
+SBC cerca del tope), generadas con semilla fija para que cada corrida mida
+exactamente las mismas peticiones
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, List
+
+from validacion import ErrorValidacion, validar_datos_calculo
+
+UMA_DIARIA_2025 = 113.14
+TOPE_DIARIO_2025 = UMA_DIARIA_2025 * 25
+
+
+def generar_personas(n: int, hoy: datetime, semilla: int = 17) -> List[Dict]:
+    """
+    Payloads de /calcular que pasan la validación
+
+    Args:
+        n: Número de personas
+        hoy: Fecha para la validación del deadline
+        semilla: Semilla del generador
+
+    Returns:
+        Lista de diccionarios con el formato del formulario
+    """
+    rng = random.Random(semilla)
+    personas = []
+    while len(personas) < n:
+        edad_actual = round(rng.triangular(55, 64, 60))
+        sbc = (TOPE_DIARIO_2025 if rng.random() < 0.4
+               else round(rng.uniform(UMA_DIARIA_2025 * 5, TOPE_DIARIO_2025), 2))
+        persona = {
+            'semanas_cotizadas': round(rng.triangular(500, 2400, 1150)),
+            'sdp_actual': round(min(rng.lognormvariate(6.2, 0.6), TOPE_DIARIO_2025), 2),
+            'sbc_modalidad40': sbc,
+            'edad_actual': edad_actual,
+            'edad_pension': max(edad_actual + 1, rng.choice([60, 62, 65, 65, 65])),
+            'tiene_esposa': rng.random() < 0.65,
+            'num_hijos_dependientes': rng.choice([0, 0, 0, 1, 2]),
+            'tiene_padres_dependientes': rng.random() < 0.1,
+            'mes_nacimiento': rng.randint(1, 12),
+            'mes_inicio_cotizacion': rng.randint(1, 12),
+            'año_inicio_cotizacion': rng.randint(1978, 1996),
+        }
+        try:
+            validar_datos_calculo(persona, hoy)
+        except ErrorValidacion:
+            continue
+        personas.append(persona)
+    return personas
+
+
+def argumentos_calculadora(personas: List[Dict], hoy: datetime) -> List[Dict]:
+    """Argumentos de calcular_escenario_completo de cada persona (ya normalizados)"""
+    return [validar_datos_calculo(persona, hoy).argumentos() for persona in personas]
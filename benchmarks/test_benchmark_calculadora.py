@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de la calculadora: búsqueda de porcentajes Ley 73, pensión Ley 73
+y escenario completo, sobre una muestra fija de personas realistas
+"""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pytest_benchmark', reason='pip install -r requirements-dev.txt')
+
+from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+from entradas import argumentos_calculadora, generar_personas
+
+HOY = datetime(2025, 11, 20)
+PERSONAS = 200
+
+
+@pytest.fixture(scope='module')
+def calc():
+    return obtener_calculadora()
+
+
+@pytest.fixture(scope='module')
+def argumentos():
+    return argumentos_calculadora(generar_personas(PERSONAS, HOY), HOY)
+
+
+def test_buscar_porcentajes_por_sdp(medir, calc, argumentos):
+    """SDP actuales y SBC Modalidad 40 de la muestra (400 búsquedas por ronda)"""
+    salarios = [a['sdp_actual_diario'] for a in argumentos] + [a['sbc_modalidad40_diario'] for a in argumentos]
+
+    def buscar():
+        for sdp in salarios:
+            calc.buscar_porcentajes_por_sdp(sdp)
+
+    medir(buscar)
+
+
+def test_calcular_pension_ley73_corregida(medir, calc, argumentos):
+    """Pensión Ley 73 de cada persona con su SBC de Modalidad 40"""
+    def calcular():
+        for a in argumentos:
+            calc.calcular_pension_ley73_corregida(
+                a['semanas_cotizadas_actuales'] + 260, a['sbc_modalidad40_diario'], a['edad_pension'],
+                a['tiene_esposa'], a['num_hijos_dependientes'], a['tiene_padres_dependientes'],
+            )
+
+    medir(calcular)
+
+
+def test_calcular_escenario_completo(medir, calc, argumentos):
+    """Escenario completo (con calendario mensual) de cada persona"""
+    def calcular():
+        for a in argumentos:
+            calc.calcular_escenario_completo(**a)
+
+    medir(calcular)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de /calcular y /generar-reporte-pdf con el cliente de pruebas de
+Flask (sin servidor ni red). Las cachés se vacían en cada ronda para medir
+el cálculo y el armado del PDF, no las respuestas repetidas.
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark', reason='pip install -r requirements-dev.txt')
+
+from entradas import generar_personas
+
+PERSONAS_CALCULAR = 50
+PERSONAS_PDF = 3
+
+
+@pytest.fixture(scope='module')
+def webapp():
+    import app as webapp
+    return webapp
+
+
+@pytest.fixture(scope='module')
+def cliente(webapp):
+    return webapp.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def personas(webapp):
+    return generar_personas(PERSONAS_CALCULAR, webapp.now_mexico().replace(tzinfo=None))
+
+
+def test_endpoint_calcular(medir, webapp, cliente, personas):
+    """POST /calcular de 50 personas distintas, sin caché de resultados"""
+    def calcular():
+        webapp.cache_resultados.limpiar()
+        for persona in personas:
+            respuesta = cliente.post('/calcular', json=persona)
+            assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+
+    medir(calcular)
+
+
+def test_endpoint_generar_reporte_pdf(medir, webapp, cliente, personas):
+    """POST /generar-reporte-pdf de 3 reportes distintos, sin caché de PDF"""
+    peticiones = [
+        {'nombre': 'Persona', 'apellido_paterno': f'Prueba{i}', 'apellido_materno': 'Benchmark',
+         'email': f'persona{i}@ejemplo.com', 'resultados': cliente.post('/calcular', json=persona).get_json()}
+        for i, persona in enumerate(personas[:PERSONAS_PDF])
+    ]
+
+    def generar():
+        webapp.cache_pdf.limpiar()
+        for peticion in peticiones:
+            respuesta = cliente.post('/generar-reporte-pdf', json=peticion)
+            assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+
+    medir(generar, rondas=10)
@@ -10,8 +10,313 @@ según el nivel del Salario Diario Promedio expresado en UMAs.
 """
 
 import math
+from bisect import bisect_left
+from calendar import monthrange
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Tuple, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Tuple, List, Mapping
+
+from Datos_Referencia_Modalidad40 import DatosReferencia, datos_referencia, version_vigente, versiones_disponibles
+
+# Versión de los datos de referencia en vigor (año fiscal.mes de publicación)
+VERSION_PARAMETROS = version_vigente()
+
+
+@dataclass(frozen=True, eq=False)
+class ParametrosModalidad40:
+    """
+    Datos de referencia oficiales (UMA, tasas Modalidad 40, tablas Ley 73)
+    
+    Objeto de solo lectura: los diccionarios se congelan como MappingProxyType
+    y las listas como tuplas, así que una sola instancia se comparte entre
+    todas las calculadoras e hilos del proceso sin copiarse.
+    """
+    version: str
+    uma_diaria_2025: float
+    uma_mensual_2025: float
+    tope_maximo_umas: int
+    uma_proyecciones: Mapping[int, float]
+    inflacion_proyectada: Mapping[int, float]
+    tasas_modalidad40: Mapping[int, float]
+    tabla_porcentajes_ley73: Tuple[Mapping[str, float], ...]
+    ayuda_esposa_pct: float
+    ayuda_hijo_pct: float
+    ayuda_padres_pct: float
+    ayuda_soledad_pct: float
+    incremento_vejez_pct: float
+    tabla_edad: Mapping[int, float]
+    minimo_garantizado_diario: float
+    
+    # Derivados (se calculan en __post_init__)
+    tope_diario_2025: float = field(init=False)
+    minimo_garantizado_mensual: float = field(init=False)
+    limite_inferior_ley73: float = field(init=False)
+    limites_superiores_ley73: Tuple[float, ...] = field(init=False)
+    porcentajes_ley73: Tuple[Tuple[float, float], ...] = field(init=False)
+    tabla_mensual: Mapping[str, Tuple] = field(init=False)
+    
+    def __post_init__(self):
+        """Congelar las tablas, precompilar el índice de rangos Ley 73 y la tabla mensual"""
+        congelar = lambda nombre, valor: object.__setattr__(self, nombre, valor)
+        congelar('uma_proyecciones', MappingProxyType(dict(self.uma_proyecciones)))
+        congelar('inflacion_proyectada', MappingProxyType(dict(self.inflacion_proyectada)))
+        congelar('tasas_modalidad40', MappingProxyType(dict(self.tasas_modalidad40)))
+        congelar('tabla_edad', MappingProxyType(dict(self.tabla_edad)))
+        congelar('tabla_porcentajes_ley73', tuple(
+            MappingProxyType(dict(rango)) for rango in self.tabla_porcentajes_ley73
+        ))
+        
+        congelar('tope_diario_2025', self.uma_diaria_2025 * self.tope_maximo_umas)
+        congelar('minimo_garantizado_mensual', self.minimo_garantizado_diario * 30.4)
+        
+        # Índice de búsqueda binaria: los rangos se toman contiguos, solo
+        # cuentan los máximos (ordenados) y el mínimo del primer rango.
+        # Los porcentajes se guardan ya divididos entre 100
+        tabla = sorted(self.tabla_porcentajes_ley73, key=lambda rango: rango["rango_max"])
+        congelar('limite_inferior_ley73', tabla[0]["rango_min"])
+        congelar('limites_superiores_ley73', tuple(rango["rango_max"] for rango in tabla))
+        congelar('porcentajes_ley73', tuple(
+            (rango["cuantia_basica"] / 100, rango["incremento_anual"] / 100) for rango in tabla
+        ))
+        
+        # Meses de los años con tasa Modalidad 40 (días reales) con el costo por
+        # múltiplo de UMA (UMA del año × días × tasa) y los días acumulados.
+        # Depende solo de los parámetros: una tabla por versión, no por calculadora
+        mensual = {'años': [], 'meses': [], 'dias': [], 'costo_unitario_acumulado': [0.0], 'dias_acumulados': [0]}
+        for año in range(min(self.tasas_modalidad40), max(self.tasas_modalidad40) + 1):
+            for mes in range(1, 13):
+                dias = monthrange(año, mes)[1]
+                mensual['años'].append(año)
+                mensual['meses'].append(mes)
+                mensual['dias'].append(dias)
+                mensual['costo_unitario_acumulado'].append(
+                    mensual['costo_unitario_acumulado'][-1]
+                    + self.uma_para_año(año) * dias * (self.tasas_modalidad40[año] / 100)
+                )
+                mensual['dias_acumulados'].append(mensual['dias_acumulados'][-1] + dias)
+        congelar('tabla_mensual', MappingProxyType({clave: tuple(valores) for clave, valores in mensual.items()}))
+    
+    def uma_para_año(self, año: int) -> float:
+        """
+        UMA diaria proyectada de un año (histórico INEGI y proyecciones Banxico/analistas)
+        
+        Antes de 2025, sin dato, se usa la de 2025; después de la última
+        proyección se extrapola al 3.4% anual.
+        """
+        if año in self.uma_proyecciones:
+            return self.uma_proyecciones[año]
+        elif año < 2025:
+            return self.uma_diaria_2025
+        else:
+            base_year = max([y for y in self.uma_proyecciones.keys() if y <= año])
+            return self.uma_proyecciones[base_year] * (1.034 ** (año - base_year))
+
+
+def parametros_desde_referencia(datos: DatosReferencia) -> ParametrosModalidad40:
+    """
+    Armar los parámetros de la calculadora con las tablas del registro de datos de referencia
+    
+    UMA, tasas y tablas Ley 73 vienen de los CSV oficiales (ver
+    Datos_Referencia_Modalidad40); las asignaciones familiares y el mínimo
+    garantizado son fijos de la Ley 73.
+    
+    Args:
+        datos: Tablas de una versión del registro
+        
+    Returns:
+        ParametrosModalidad40 de esa versión
+    """
+    return ParametrosModalidad40(
+        version=datos.version,
+        uma_diaria_2025=datos.uma_diaria_2025,
+        uma_mensual_2025=datos.uma_mensual_2025,
+        tope_maximo_umas=25,
+        uma_proyecciones=datos.uma_proyecciones(),
+        inflacion_proyectada=datos.inflacion_proyectada(),
+        tasas_modalidad40=datos.tasas_modalidad40(),
+        tabla_porcentajes_ley73=datos.tabla_porcentajes_ley73(),
+        
+        # Porcentajes de asignaciones familiares (estos sí son fijos)
+        ayuda_esposa_pct=0.15,        # 15% si existe esposa
+        ayuda_hijo_pct=0.10,          # 10% por hijo menor/estudiando
+        ayuda_padres_pct=0.20,        # 20% si no hay viuda/huérfanos (CORREGIDO: era 10%)
+        ayuda_soledad_pct=0.15,       # 15% si no tiene esposa (ayuda por soledad)
+        incremento_vejez_pct=0.11,    # 11% a partir de 65 años
+        tabla_edad=datos.tabla_edad(),
+        
+        # Mínimo garantizado (salario mínimo regional)
+        minimo_garantizado_diario=248.93,
+    )
+
+
+# Parámetros publicados, por versión (una instancia compartida por versión)
+PARAMETROS_POR_VERSION = MappingProxyType({
+    version: parametros_desde_referencia(datos_referencia(version)) for version in versiones_disponibles()
+})
+PARAMETROS_2025 = PARAMETROS_POR_VERSION["2025.11"]
+
+
+class CalendarioModalidad40:
+    """
+    Calendario de Modalidad 40 mes por mes, con los días reales de cada mes
+    
+    Los costos salen de la tabla mensual de la calculadora (UMA × días × tasa
+    acumulados desde enero del primer año con tasa), así que el costo, los
+    días o las semanas de cualquier rango de meses del calendario (empezar
+    después, terminar antes) se obtienen en O(1) con dos restas.
+    """
+    
+    def __init__(self, calculadora: 'CalculadoraModalidad40Corregida', sbc_diario: float,
+                 año_inicio: int, mes_inicio: int, año_fin: int, mes_fin: int):
+        """
+        Args:
+            calculadora: Calculadora con las tasas y UMAs del año
+            sbc_diario: SBC diario (en pesos 2025; se ajusta por UMA cada año)
+            año_inicio: Año del primer pago
+            mes_inicio: Mes del primer pago (1-12)
+            año_fin: Año del último pago
+            mes_fin: Mes del último pago (1-12); se recorta a diciembre del
+                último año con tasa publicada
+            
+        Raises:
+            ValueError: si el inicio no tiene tasa o el fin es anterior al inicio
+        """
+        tabla = calculadora._tabla_mensual
+        if año_inicio not in calculadora.tasas_modalidad40:
+            raise ValueError(f"Año {año_inicio} no válido. Use años {tabla['años'][0]}-{tabla['años'][-1]}")
+        
+        self.calculadora = calculadora
+        self.sbc_diario = sbc_diario
+        self.multiple_uma = sbc_diario / calculadora.uma_proyecciones[2025]
+        self._tabla = tabla
+        self._inicio = (año_inicio - tabla['años'][0]) * 12 + mes_inicio - 1
+        self._fin = min((año_fin - tabla['años'][0]) * 12 + mes_fin, len(tabla['años']))
+        if self._fin <= self._inicio:
+            raise ValueError('No hay meses de Modalidad 40 entre el inicio y la edad de pensión')
+    
+    @classmethod
+    def hasta_edad_pension(cls, calculadora: 'CalculadoraModalidad40Corregida', sbc_diario: float,
+                           año_inicio: int, mes_inicio: int, edad_actual: int, edad_pension: int,
+                           mes_nacimiento: int = None) -> 'CalendarioModalidad40':
+        """
+        Calendario desde el mes de inicio hasta el mes en que se cumple la edad de pensión
+        
+        Igual que calcular_escenario_completo, edad_actual es la edad al
+        iniciar: el siguiente cumpleaños (en o después del mes de inicio) da
+        edad_actual + 1. Sin mes de nacimiento se paga hasta diciembre.
+        
+        Args:
+            calculadora: Calculadora con las tasas y UMAs del año
+            sbc_diario: SBC diario deseado
+            año_inicio: Año de inicio de Modalidad 40
+            mes_inicio: Mes de inicio de Modalidad 40 (1-12)
+            edad_actual: Edad al iniciar
+            edad_pension: Edad al pensionarse
+            mes_nacimiento: Mes de nacimiento (1-12)
+            
+        Returns:
+            CalendarioModalidad40 recortado al último año con tasa
+        """
+        año_fin = cls.año_edad_pension(año_inicio, mes_inicio, edad_actual, edad_pension, mes_nacimiento)
+        return cls(calculadora, sbc_diario, año_inicio, mes_inicio, año_fin, mes_nacimiento if mes_nacimiento else 12)
+    
+    @staticmethod
+    def año_edad_pension(año_inicio: int, mes_inicio: int, edad_actual: int, edad_pension: int,
+                         mes_nacimiento: int = None) -> int:
+        """
+        Año en que se cumple la edad de pensión (mismas reglas que hasta_edad_pension)
+        
+        Es el año del último pago salvo que el plan se recorte antes (última
+        tasa publicada o máximo de 6 años).
+        """
+        mes_fin = mes_nacimiento if mes_nacimiento else 12
+        año_siguiente_cumpleaños = año_inicio + (1 if mes_fin < mes_inicio else 0)
+        return año_siguiente_cumpleaños + edad_pension - edad_actual - 1
+    
+    def __len__(self) -> int:
+        return self._fin - self._inicio
+    
+    def _rango(self, desde: int, hasta: int) -> Tuple[int, int]:
+        """Índices en la tabla mensual de los meses [desde, hasta) del calendario"""
+        if hasta is None:
+            hasta = len(self)
+        return self._inicio + desde, self._inicio + hasta
+    
+    def costo_rango(self, desde: int = 0, hasta: int = None) -> float:
+        """Costo total de los meses [desde, hasta) del calendario (0 = primer mes)"""
+        i, j = self._rango(desde, hasta)
+        acumulado = self._tabla['costo_unitario_acumulado']
+        return self.multiple_uma * (acumulado[j] - acumulado[i])
+    
+    def dias_rango(self, desde: int = 0, hasta: int = None) -> int:
+        """Días naturales de los meses [desde, hasta) del calendario"""
+        i, j = self._rango(desde, hasta)
+        acumulado = self._tabla['dias_acumulados']
+        return acumulado[j] - acumulado[i]
+    
+    def semanas_rango(self, desde: int = 0, hasta: int = None) -> int:
+        """Semanas completas cotizadas en los meses [desde, hasta) del calendario"""
+        return self.dias_rango(desde, hasta) // 7
+    
+    def meses(self) -> List[Dict]:
+        """Cada mes del calendario con sus días, tasa y costo"""
+        t = self._tabla
+        return [
+            {
+                'año': t['años'][k],
+                'mes': t['meses'][k],
+                'dias': t['dias'][k],
+                'tasa_pct': self.calculadora.tasas_modalidad40[t['años'][k]],
+                'costo': self.calculadora.calcular_costo_mensual(self.sbc_diario, t['años'][k], t['dias'][k]),
+            }
+            for k in range(self._inicio, self._fin)
+        ]
+    
+    def desglose_anual(self) -> Dict[int, Dict]:
+        """Meses, días y costo por año (mismo formato que calcular_inversion_total_años)"""
+        años = self._tabla['años']
+        desglose = {}
+        desde = 0
+        while desde < len(self):
+            año = años[self._inicio + desde]
+            hasta = min(len(self), (año - años[0] + 1) * 12 - self._inicio)
+            meses_pagados = hasta - desde
+            costo_anual = self.costo_rango(desde, hasta)
+            desglose[año] = {
+                'tasa_pct': self.calculadora.tasas_modalidad40[año],
+                'costo_mensual': costo_anual / meses_pagados,  # Promedio: los meses varían en días
+                'meses_pagados': meses_pagados,
+                'dias_pagados': self.dias_rango(desde, hasta),
+                'costo_anual': costo_anual,
+            }
+            desde = hasta
+        return desglose
+    
+    def resumen_inversion(self) -> Dict:
+        """Inversión total con las mismas claves que calcular_inversion_total_años, más el período"""
+        t = self._tabla
+        desglose = self.desglose_anual()
+        total = self.costo_rango()
+        ultimo = self._fin - 1
+        return {
+            'desglose_anual': desglose,
+            'total_años': total,
+            'promedio_mensual': total / len(self),
+            'años_cotizados': len(desglose),
+            'meses_año_final': desglose[t['años'][ultimo]]['meses_pagados'],
+            'meses_totales': len(self),
+            'periodo': {
+                'año_inicio': t['años'][self._inicio],
+                'mes_inicio': t['meses'][self._inicio],
+                'año_fin': t['años'][ultimo],
+                'mes_fin': t['meses'][ultimo],
+                'dias': self.dias_rango(),
+                'semanas': self.semanas_rango(),
+            },
+        }
+
 
 class CalculadoraModalidad40Corregida:
     """
@@ -19,106 +324,46 @@ class CalculadoraModalidad40Corregida:
     Usa tablas variables de porcentajes según SDP/UMA
     """
     
-    def __init__(self):
-        """Inicializar con valores oficiales 2025 y tablas variables"""
-        # Valores oficiales 2025
-        self.uma_diaria_2025 = 113.14
-        self.uma_mensual_2025 = 3439.46
-        self.tope_maximo_umas = 25
-        self.tope_diario_2025 = self.uma_diaria_2025 * self.tope_maximo_umas
-        
-        # Proyecciones UMA oficiales basadas en análisis INEGI/Banxico (inflación proyectada)
-        self.uma_proyecciones = {
-            # Valores históricos oficiales (INEGI)
-            2016: 73.04,
-            2017: 80.60,
-            2018: 84.39,
-            2019: 86.88,
-            2020: 89.62,
-            2021: 92.97,
-            2022: 96.22,
-            2023: 103.74,
-            2024: 108.57,
-            2025: 113.14,
-            # Proyecciones profesionales (Encuesta Banxico/Citi)
-            2026: 117.47,  # +3.8% inflación proyectada
-            2027: 121.82,  # +3.7% inflación proyectada
-            2028: 126.20,  # +3.6% inflación proyectada
-            2029: 130.62,  # +3.5% inflación proyectada
-            2030: 135.08   # +3.4% inflación proyectada
-        }
+    def __init__(self, parametros: ParametrosModalidad40 = None):
+        """
+        Inicializar con valores oficiales 2025 y tablas variables
         
-        # Tasas de inflación proyectadas para referencia
-        self.inflacion_proyectada = {
-            2026: 3.80,
-            2027: 3.70,
-            2028: 3.60,
-            2029: 3.50,
-            2030: 3.40
-        }
+        Args:
+            parametros: Datos de referencia (default: PARAMETROS_2025). Se
+                comparten por referencia, sin copiar ninguna tabla
+        """
+        p = parametros if parametros is not None else PARAMETROS_2025
+        self.parametros = p
         
-        # Tablas oficiales de tasas Modalidad 40 (publicadas por IMSS)
-        # Fuente: Ley del Seguro Social - Incremento gradual hasta 2030
-        self.tasas_modalidad40 = {
-            2021: 10.08,
-            2022: 10.08,
-            2023: 11.17,
-            2024: 12.26,
-            2025: 13.347,
-            2026: 14.438,
-            2027: 15.528,
-            2028: 16.619,
-            2029: 17.709,
-            2030: 18.800
-        }
+        # Valores oficiales 2025
+        self.uma_diaria_2025 = p.uma_diaria_2025
+        self.uma_mensual_2025 = p.uma_mensual_2025
+        self.tope_maximo_umas = p.tope_maximo_umas
+        self.tope_diario_2025 = p.tope_diario_2025
         
-        # TABLAS REALES DE PORCENTAJES VARIABLES LEY 73
-        # Basadas en múltiplos de UMA (VSM)
-        self.tabla_porcentajes_ley73 = [
-            {"rango_min": 0.00, "rango_max": 1.00, "cuantia_basica": 80.00, "incremento_anual": 0.56},
-            {"rango_min": 1.01, "rango_max": 1.25, "cuantia_basica": 77.11, "incremento_anual": 0.81},
-            {"rango_min": 1.26, "rango_max": 1.50, "cuantia_basica": 55.18, "incremento_anual": 1.18},
-            {"rango_min": 1.51, "rango_max": 1.75, "cuantia_basica": 49.23, "incremento_anual": 1.43},
-            {"rango_min": 1.76, "rango_max": 2.00, "cuantia_basica": 42.67, "incremento_anual": 1.62},
-            {"rango_min": 2.01, "rango_max": 2.25, "cuantia_basica": 37.65, "incremento_anual": 1.76},
-            {"rango_min": 2.26, "rango_max": 2.50, "cuantia_basica": 33.68, "incremento_anual": 1.87},
-            {"rango_min": 2.51, "rango_max": 2.75, "cuantia_basica": 30.48, "incremento_anual": 1.96},
-            {"rango_min": 2.76, "rango_max": 3.00, "cuantia_basica": 27.83, "incremento_anual": 2.03},
-            {"rango_min": 3.01, "rango_max": 3.25, "cuantia_basica": 25.60, "incremento_anual": 2.10},
-            {"rango_min": 3.26, "rango_max": 3.50, "cuantia_basica": 23.70, "incremento_anual": 2.15},
-            {"rango_min": 3.51, "rango_max": 3.75, "cuantia_basica": 22.07, "incremento_anual": 2.20},
-            {"rango_min": 3.76, "rango_max": 4.00, "cuantia_basica": 20.65, "incremento_anual": 2.24},
-            {"rango_min": 4.01, "rango_max": 4.25, "cuantia_basica": 19.39, "incremento_anual": 2.27},
-            {"rango_min": 4.26, "rango_max": 4.50, "cuantia_basica": 18.29, "incremento_anual": 2.30},
-            {"rango_min": 4.51, "rango_max": 4.75, "cuantia_basica": 17.30, "incremento_anual": 2.33},
-            {"rango_min": 4.76, "rango_max": 5.00, "cuantia_basica": 16.41, "incremento_anual": 2.36},
-            {"rango_min": 5.01, "rango_max": 5.25, "cuantia_basica": 15.61, "incremento_anual": 2.38},
-            {"rango_min": 5.26, "rango_max": 5.50, "cuantia_basica": 14.88, "incremento_anual": 2.40},
-            {"rango_min": 5.51, "rango_max": 5.75, "cuantia_basica": 14.22, "incremento_anual": 2.42},
-            {"rango_min": 5.76, "rango_max": 6.00, "cuantia_basica": 13.62, "incremento_anual": 2.43},
-            {"rango_min": 6.01, "rango_max": float('inf'), "cuantia_basica": 13.00, "incremento_anual": 2.45}
-        ]
+        # Proyecciones UMA, tasas Modalidad 40 y tablas Ley 73 (solo lectura)
+        self.uma_proyecciones = p.uma_proyecciones
+        self.inflacion_proyectada = p.inflacion_proyectada
+        self.tasas_modalidad40 = p.tasas_modalidad40
+        self.tabla_porcentajes_ley73 = p.tabla_porcentajes_ley73
+        self._limite_inferior_ley73 = p.limite_inferior_ley73
+        self._limites_superiores_ley73 = p.limites_superiores_ley73
+        self._porcentajes_ley73 = p.porcentajes_ley73
         
-        # Porcentajes de asignaciones familiares (estos sí son fijos)
-        self.ayuda_esposa_pct = 0.15        # 15% si existe esposa
-        self.ayuda_hijo_pct = 0.10          # 10% por hijo menor/estudiando
-        self.ayuda_padres_pct = 0.20        # 20% si no hay viuda/huérfanos (CORREGIDO: era 10%)
-        self.ayuda_soledad_pct = 0.15       # 15% si no tiene esposa (ayuda por soledad)
-        self.incremento_vejez_pct = 0.11    # 11% a partir de 65 años
-        
-        # Tabla de porcentajes por edad (cesantía en edad avanzada)
-        self.tabla_edad = {
-            60: 0.75,  # 75%
-            61: 0.80,  # 80%
-            62: 0.85,  # 85%
-            63: 0.90,  # 90%
-            64: 0.95,  # 95%
-            65: 1.00   # 100%
-        }
+        # Porcentajes de asignaciones familiares
+        self.ayuda_esposa_pct = p.ayuda_esposa_pct
+        self.ayuda_hijo_pct = p.ayuda_hijo_pct
+        self.ayuda_padres_pct = p.ayuda_padres_pct
+        self.ayuda_soledad_pct = p.ayuda_soledad_pct
+        self.incremento_vejez_pct = p.incremento_vejez_pct
         
-        # Mínimo garantizado (salario mínimo regional)
-        self.minimo_garantizado_diario = 248.93
-        self.minimo_garantizado_mensual = self.minimo_garantizado_diario * 30.4
+        # Tabla de porcentajes por edad y mínimo garantizado
+        self.tabla_edad = p.tabla_edad
+        self.minimo_garantizado_diario = p.minimo_garantizado_diario
+        self.minimo_garantizado_mensual = p.minimo_garantizado_mensual
+        
+        # Tabla mensual de costos acumulados (compartida, ver ParametrosModalidad40)
+        self._tabla_mensual = p.tabla_mensual
     
     def get_uma_para_año(self, año: int) -> float:
         """
@@ -131,16 +376,9 @@ class CalculadoraModalidad40Corregida:
         Returns:
             Valor UMA diario proyectado
         """
-        if año in self.uma_proyecciones:
-            return self.uma_proyecciones[año]
-        elif año < 2025:
-            # Para años históricos no incluidos, usar 2025 como base
-            return self.uma_diaria_2025  
-        else:
-            # Extrapolar para años posteriores a 2030 usando última tasa proyectada (3.4%)
-            base_year = max([y for y in self.uma_proyecciones.keys() if y <= año])
-            years_ahead = año - base_year
-            return self.uma_proyecciones[base_year] * (1.034 ** years_ahead)
+        # Años históricos sin dato: 2025 como base; después de la última
+        # proyección se extrapola con la última tasa proyectada (3.4%)
+        return self.parametros.uma_para_año(año)
     
     def buscar_porcentajes_por_sdp(self, sdp_diario: float, uma_diaria: float = None) -> Tuple[float, float]:
         """
@@ -159,10 +397,12 @@ class CalculadoraModalidad40Corregida:
         # Calcular múltiple de UMA (VSM)
         multiple_uma = sdp_diario / uma_diaria
         
-        # Buscar en la tabla
-        for rango in self.tabla_porcentajes_ley73:
-            if rango["rango_min"] <= multiple_uma <= rango["rango_max"]:
-                return (rango["cuantia_basica"] / 100, rango["incremento_anual"] / 100)
+        # Primer rango cuyo máximo alcanza al múltiplo: cada rango cubre
+        # (máximo anterior, máximo], sin huecos entre 1.00 y 1.01, etc.
+        if multiple_uma >= self._limite_inferior_ley73:
+            i = bisect_left(self._limites_superiores_ley73, multiple_uma)
+            if i < len(self._limites_superiores_ley73):
+                return self._porcentajes_ley73[i]
         
         # Si no encuentra (no debería pasar), usar los más altos
         return (0.13, 0.0245)  # 13% y 2.45%
@@ -436,7 +676,8 @@ class CalculadoraModalidad40Corregida:
                                   año_inicio: int = 2025,
                                   edad_actual: int = None,
                                   mes_nacimiento: int = None,
-                                  mes_inicio_modalidad40: int = 1) -> Dict:
+                                  mes_inicio_modalidad40: int = 1,
+                                  calendario_mensual: bool = False) -> Dict:
         """
         Calcular escenario completo con TABLAS VARIABLES: situación actual vs con Modalidad 40
         ⚠️ CALCULA EXACTAMENTE HASTA CUMPLIR 65 AÑOS, NO AÑOS COMPLETOS
@@ -453,6 +694,9 @@ class CalculadoraModalidad40Corregida:
             edad_actual: Edad actual del usuario
             mes_nacimiento: Mes de nacimiento (1-12) para calcular meses exactos
             mes_inicio_modalidad40: Mes de inicio de Modalidad 40 (default enero)
+            calendario_mensual: Con edad_actual, pagar mes por mes con los días
+                reales de cada mes (CalendarioModalidad40) en lugar de 30 días
+                por mes y semanas = meses × 4.33
             
         Returns:
             Dictionary completo con ambos escenarios y análisis ROI
@@ -513,6 +757,15 @@ class CalculadoraModalidad40Corregida:
         # Calcular semanas exactas (semanas = meses * 4.33)
         meses_totales = años_completos * 12 + meses_año_final
         semanas_modalidad40 = int(meses_totales * 4.33)  # Aproximación estándar
+        
+        calendario = None
+        if calendario_mensual and edad_actual is not None:
+            # Mes por mes hasta el cumpleaños: semanas completas de días reales
+            calendario = CalendarioModalidad40.hasta_edad_pension(
+                self, sbc_modalidad40_diario, año_inicio, mes_inicio_modalidad40,
+                edad_actual, edad_pension, mes_nacimiento
+            )
+            semanas_modalidad40 = calendario.semanas_rango()
         semanas_finales_con_mod40 = semanas_cotizadas_actuales + semanas_modalidad40
         
         # Calcular nuevo SDP (promedio últimas 250 semanas)
@@ -536,12 +789,15 @@ class CalculadoraModalidad40Corregida:
         )
         
         # ANÁLISIS DE INVERSIÓN (usar meses exactos)
-        inversion_mod40 = self.calcular_inversion_total_años(
-            sbc_modalidad40_diario, 
-            año_inicio, 
-            años_para_modalidad40,
-            meses_año_final if años_para_modalidad40 == años_totales else 12
-        )
+        if calendario is not None:
+            inversion_mod40 = calendario.resumen_inversion()
+        else:
+            inversion_mod40 = self.calcular_inversion_total_años(
+                sbc_modalidad40_diario, 
+                año_inicio, 
+                años_para_modalidad40,
+                meses_año_final if años_para_modalidad40 == años_totales else 12
+            )
         
         # ANÁLISIS ROI
         diferencia_mensual = pension_con_mod40['pension_final_mensual'] - pension_sin_mod40['pension_final_mensual']
@@ -562,7 +818,11 @@ class CalculadoraModalidad40Corregida:
                 'tiene_esposa': tiene_esposa,
                 'num_hijos_dependientes': num_hijos_dependientes,
                 'tiene_padres_dependientes': tiene_padres_dependientes,
-                'año_inicio': año_inicio
+                'año_inicio': año_inicio,
+                'edad_actual': edad_actual,
+                'mes_nacimiento': mes_nacimiento,
+                'mes_inicio_modalidad40': mes_inicio_modalidad40,
+                'calendario_mensual': calendario is not None
             },
             
             'sin_modalidad40': pension_sin_mod40,
@@ -580,6 +840,269 @@ class CalculadoraModalidad40Corregida:
                 'nivel_umas': sbc_modalidad40_diario / self.uma_diaria_2025
             }
         }
+    
+    def calcular_escenarios_por_duracion(self, **argumentos) -> Dict:
+        """
+        Escenario completo más el resultado exacto de pagar solo los primeros
+        1, 2, ... N años del plan de Modalidad 40
+        
+        Cada duración paga los mismos meses y tasas por año que el plan
+        completo, así que la inversión de cada una es la suma acumulada del
+        costo anual del desglose y la última duración coincide con el
+        escenario completo. La pensión sin Modalidad 40 y el nuevo SDP se
+        calculan una sola vez. Con calendario_mensual, la inversión y las
+        semanas de cada duración salen de las sumas acumuladas del calendario.
+        
+        Args:
+            **argumentos: Los mismos argumentos de calcular_escenario_completo
+            
+        Returns:
+            Dictionary con el 'escenario' completo y 'duraciones': una fila por
+            año con años, meses_pagados, semanas_modalidad40, inversion_total,
+            pension_final_mensual, diferencia_mensual, roi_anual_pct y
+            años_recuperacion (None si no hay ganancia); o con 'error'
+        """
+        escenario = self.calcular_escenario_completo(**argumentos)
+        if 'error' in escenario:
+            return escenario
+        
+        entradas = escenario['inputs']
+        con_mod40 = escenario['con_modalidad40']
+        pension_sin = escenario['sin_modalidad40']['pension_final_mensual']
+        
+        desglose_anual = escenario['inversion']['desglose_anual']
+        calendario = None
+        if entradas['calendario_mensual']:
+            calendario = CalendarioModalidad40.hasta_edad_pension(
+                self, entradas['sbc_modalidad40_diario'], entradas['año_inicio'],
+                entradas['mes_inicio_modalidad40'], entradas['edad_actual'],
+                entradas['edad_pension'], entradas['mes_nacimiento']
+            )
+        duraciones = []
+        inversion_acumulada = 0
+        meses_acumulados = 0
+        for años, año in enumerate(sorted(desglose_anual), start=1):
+            inversion_acumulada += desglose_anual[año]['costo_anual']
+            meses_acumulados += desglose_anual[año]['meses_pagados']
+            
+            if calendario is not None:
+                inversion_acumulada = calendario.costo_rango(0, meses_acumulados)
+            
+            if años < len(desglose_anual):
+                if calendario is not None:
+                    semanas_modalidad40 = calendario.semanas_rango(0, meses_acumulados)
+                else:
+                    semanas_modalidad40 = int(meses_acumulados * 4.33)
+                pension = self.calcular_pension_ley73_corregida(
+                    entradas['semanas_cotizadas_actuales'] + semanas_modalidad40,
+                    escenario['nuevo_sdp_diario'], entradas['edad_pension'],
+                    entradas['tiene_esposa'], entradas['num_hijos_dependientes'],
+                    entradas['tiene_padres_dependientes']
+                )
+            else:
+                # El plan completo es el escenario ya calculado
+                pension = con_mod40
+                semanas_modalidad40 = con_mod40['semanas_cotizadas'] - entradas['semanas_cotizadas_actuales']
+            
+            diferencia_mensual = pension['pension_final_mensual'] - pension_sin
+            diferencia_anual = diferencia_mensual * 12
+            duraciones.append({
+                'años': años,
+                'meses_pagados': meses_acumulados,
+                'semanas_modalidad40': semanas_modalidad40,
+                'inversion_total': inversion_acumulada,
+                'pension_final_mensual': pension['pension_final_mensual'],
+                'diferencia_mensual': diferencia_mensual,
+                'roi_anual_pct': (diferencia_anual / inversion_acumulada) * 100,
+                'años_recuperacion': inversion_acumulada / diferencia_anual if diferencia_anual > 0 else None,
+            })
+        
+        return {'escenario': escenario, 'duraciones': duraciones}
+    
+    def _evaluar_escenario(self, argumentos: Dict, sbc_diario: float):
+        """Escenario completo para un SBC; None si el ROI queda indefinido (sin diferencia)"""
+        try:
+            return self.calcular_escenario_completo(sbc_modalidad40_diario=sbc_diario, **argumentos)
+        except ZeroDivisionError:
+            return None
+    
+    def calcular_sbc_optimo(self,
+                            pension_objetivo_mensual: float = None,
+                            inversion_maxima: float = None,
+                            roi_minimo_pct: float = None,
+                            **argumentos) -> Dict:
+        """
+        Buscar el SBC mínimo (entre 1 y 25 UMAs) que cumple los criterios dados
+        
+        Con los demás datos fijos, el nuevo SDP y la inversión son lineales en
+        el SBC, y la pensión es lineal dentro de cada rango de la tabla Ley 73
+        (salvo donde aplica el mínimo garantizado, que es constante). Los
+        criterios se vuelven desigualdades lineales por tramo: el primer tramo
+        (en SBC ascendente) con solución da el mínimo, sin barrer el rango. La
+        pensión NO es monótona entre rangos (baja al cambiar de porcentajes),
+        por eso se revisan los tramos en orden y no con una sola bisección.
+        
+        Si solo se da inversion_maxima, se busca la mejor pensión que cabe en
+        ese presupuesto y se regresa el SBC mínimo que la alcanza.
+        
+        Args:
+            pension_objetivo_mensual: Pensión mensual mínima deseada
+            inversion_maxima: Inversión total máxima en Modalidad 40
+            roi_minimo_pct: ROI anual mínimo en porcentaje
+            **argumentos: Los demás argumentos de calcular_escenario_completo
+                (sin sbc_modalidad40_diario)
+            
+        Returns:
+            Dictionary con 'sbc_optimo_diario', 'nivel_umas', 'criterios',
+            'evaluaciones' y el 'escenario' completo en ese SBC, o con 'error'
+            si ningún SBC hasta el tope cumple los criterios
+        """
+        if pension_objetivo_mensual is None and inversion_maxima is None and roi_minimo_pct is None:
+            return {'error': 'Indica pensión objetivo, inversión máxima o ROI mínimo'}
+        
+        sbc_minimo = self.uma_diaria_2025
+        sbc_maximo = self.tope_diario_2025
+        
+        # Dos evaluaciones fijan las partes lineales: SDP = alfa + beta·SBC,
+        # inversión = costo_unitario·SBC; la pensión sin Modalidad 40 es fija
+        extremo = self._evaluar_escenario(argumentos, sbc_maximo)
+        medio = self._evaluar_escenario(argumentos, sbc_maximo / 2)
+        if extremo is None or medio is None:
+            return {'error': 'No se pudo evaluar el escenario con estos datos'}
+        if 'error' in extremo:
+            return {'error': extremo['error']}
+        evaluaciones = 2
+        
+        beta = (extremo['nuevo_sdp_diario'] - medio['nuevo_sdp_diario']) / (sbc_maximo / 2)
+        alfa = extremo['nuevo_sdp_diario'] - beta * sbc_maximo
+        costo_unitario = extremo['inversion']['total_años'] / sbc_maximo
+        pension_sin = extremo['sin_modalidad40']['pension_final_mensual']
+        con_mod40 = extremo['con_modalidad40']
+        minimo = self.minimo_garantizado_mensual
+        
+        # Tramos (sbc_desde, sbc_hasta, a, b) con pensión = a + b·SBC
+        tramos = []
+        desde_sdp = alfa + beta * sbc_minimo
+        hasta_sdp = alfa + beta * sbc_maximo
+        anterior = self._limite_inferior_ley73 * self.uma_diaria_2025
+        for limite in self._limites_superiores_ley73:
+            inicio = max(anterior, desde_sdp)
+            fin = min(limite * self.uma_diaria_2025, hasta_sdp)
+            anterior = limite * self.uma_diaria_2025
+            if fin < inicio:
+                continue
+            
+            # Pensión por peso de SDP en este rango, antes del mínimo garantizado
+            muestra = self.calcular_pension_ley73_corregida(
+                con_mod40['semanas_cotizadas'], (inicio + fin) / 2, con_mod40['edad_pension'],
+                con_mod40['tiene_esposa'], con_mod40['num_hijos_dependientes'],
+                con_mod40['tiene_padres_dependientes']
+            )
+            por_peso = (muestra['pension_ajustada_edad_mensual'] + muestra['incremento_vejez_mensual']) / muestra['sdp_diario']
+            
+            sbc_inicio = (inicio - alfa) / beta
+            sbc_fin = (fin - alfa) / beta
+            sbc_minimo_garantizado = (minimo / por_peso - alfa) / beta
+            if sbc_minimo_garantizado > sbc_inicio:
+                tramos.append((sbc_inicio, min(sbc_minimo_garantizado, sbc_fin), minimo, 0.0))
+            if sbc_minimo_garantizado < sbc_fin:
+                tramos.append((max(sbc_minimo_garantizado, sbc_inicio), sbc_fin, por_peso * alfa, por_peso * beta))
+            if limite * self.uma_diaria_2025 >= hasta_sdp:
+                break
+        
+        if pension_objetivo_mensual is None and roi_minimo_pct is None:
+            # Solo presupuesto: la mejor pensión alcanzable está en el extremo
+            # derecho (al centavo) de algún tramo dentro del presupuesto
+            mejor = None
+            for desde, hasta, a, b in tramos:
+                alcance = math.floor(round(min(hasta, inversion_maxima / costo_unitario) * 100, 4)) / 100
+                if alcance < desde:
+                    continue
+                escenario = self._evaluar_escenario(argumentos, alcance)
+                evaluaciones += 1
+                if escenario is not None and escenario['inversion']['total_años'] <= inversion_maxima:
+                    pension = escenario['con_modalidad40']['pension_final_mensual']
+                    mejor = pension if mejor is None else max(mejor, pension)
+            if mejor is None:
+                return {'error': f'La inversión máxima de ${inversion_maxima:,.2f} no alcanza para cotizar con 1 UMA'}
+            pension_objetivo_mensual = mejor
+        
+        def cumple(escenario) -> bool:
+            if escenario is None or 'error' in escenario:
+                return False
+            pension = escenario['con_modalidad40']['pension_final_mensual']
+            return (pension > pension_sin
+                    and (pension_objetivo_mensual is None or pension >= pension_objetivo_mensual)
+                    and (inversion_maxima is None or escenario['inversion']['total_años'] <= inversion_maxima)
+                    and (roi_minimo_pct is None or escenario['analisis_roi']['roi_anual_pct'] >= roi_minimo_pct))
+        
+        for desde, hasta, a, b in tramos:
+            # Cada criterio es coeficiente·SBC >= constante dentro del tramo
+            restricciones = [(b, pension_sin - a)]  # Modalidad 40 debe mejorar la pensión
+            if pension_objetivo_mensual is not None:
+                restricciones.append((b, pension_objetivo_mensual - a))
+            if inversion_maxima is not None:
+                restricciones.append((-costo_unitario, -inversion_maxima))
+            if roi_minimo_pct is not None:
+                # 1200·(a + b·SBC - pensión_sin) >= ROI·costo_unitario·SBC
+                restricciones.append((1200 * b - roi_minimo_pct * costo_unitario, 1200 * (pension_sin - a)))
+            
+            inferior, superior = desde, hasta
+            for coeficiente, constante in restricciones:
+                if coeficiente > 0:
+                    inferior = max(inferior, constante / coeficiente)
+                elif coeficiente < 0:
+                    superior = min(superior, constante / coeficiente)
+                elif constante > 0:
+                    superior = -math.inf
+            if inferior > superior + 0.01:
+                continue
+            
+            # Redondear a centavos hacia arriba y confirmar con el cálculo
+            # completo: los extremos de los rangos son abiertos por la izquierda
+            # y las soluciones en una frontera pueden diferir en el redondeo
+            candidato = min(math.ceil(round(inferior * 100, 4)) / 100, sbc_maximo)
+            for _ in range(3):
+                if candidato > sbc_maximo:
+                    break
+                escenario = self._evaluar_escenario(argumentos, candidato)
+                evaluaciones += 1
+                if cumple(escenario):
+                    return {
+                        'sbc_optimo_diario': candidato,
+                        'nivel_umas': candidato / self.uma_diaria_2025,
+                        'criterios': {
+                            'pension_objetivo_mensual': pension_objetivo_mensual,
+                            'inversion_maxima': inversion_maxima,
+                            'roi_minimo_pct': roi_minimo_pct,
+                        },
+                        'evaluaciones': evaluaciones,
+                        'escenario': escenario,
+                    }
+                candidato = round(candidato + 0.01, 2)
+        
+        return {
+            'error': f'Ningún SBC hasta el tope de ${sbc_maximo:,.2f} diarios cumple los criterios indicados'
+        }
+
+def obtener_calculadora(version: str = VERSION_PARAMETROS) -> CalculadoraModalidad40Corregida:
+    """
+    Calculadora compartida del proceso para una versión de parámetros
+    
+    La calculadora no guarda estado entre cálculos, así que la misma
+    instancia se reutiliza en todas las peticiones e hilos.
+    
+    Args:
+        version: Versión de los datos de referencia (ej. "2025.11")
+        
+    Returns:
+        Instancia única de CalculadoraModalidad40Corregida para esa versión
+    """
+    return _calculadora_por_version(version)
+
+@lru_cache(maxsize=None)
+def _calculadora_por_version(version: str) -> CalculadoraModalidad40Corregida:
+    return CalculadoraModalidad40Corregida(PARAMETROS_POR_VERSION[version])
 
 # Función de prueba
 def main():
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTOR VECTORIZADO (LOTE) - CALCULADORA MODALIDAD 40 LEY 73
+Versión: 1.0 - Noviembre 2025
+
+Evalúa miles/millones de escenarios a la vez sobre arreglos NumPy.
+Reproduce fila por fila los resultados de
+CalculadoraModalidad40Corregida.calcular_escenario_completo (mismo orden
+de operaciones en punto flotante), pero sin construir diccionarios por
+persona.
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from Calculadora_Modalidad_40_CORREGIDA import CalculadoraModalidad40Corregida, CalendarioModalidad40, obtener_calculadora
+
+# Códigos de error por fila (columna 'codigo_error')
+ERROR_NINGUNO = 0
+ERROR_EXCEDE_TOPE = 1             # SBC mayor al tope de 25 UMAs
+ERROR_EDAD_MAXIMA = 2             # Edad de pensión mayor a 65 años
+ERROR_SEMANAS_MINIMAS = 3         # Menos de 500 semanas cotizadas
+ERROR_AÑO_SIN_TASA = 4            # Año de cotización fuera de la tabla de tasas
+ERROR_SIN_BENEFICIO = 5           # División entre cero (sin inversión o sin diferencia)
+ERROR_SIN_MESES = 6               # Calendario mensual sin meses antes de la edad de pensión
+ERROR_EDAD_PENSION = 7            # Edad de pensión no mayor a la edad actual
+
+DESCRIPCION_ERRORES = {
+    ERROR_NINGUNO: '',
+    ERROR_EXCEDE_TOPE: 'SBC excede tope máximo de 25 UMAs',
+    ERROR_EDAD_MAXIMA: 'Edad máxima legal para pensión IMSS: 65 años',
+    ERROR_SEMANAS_MINIMAS: 'Requiere mínimo 500 semanas cotizadas',
+    ERROR_AÑO_SIN_TASA: 'Año de cotización fuera de la tabla de tasas Modalidad 40',
+    ERROR_SIN_BENEFICIO: 'Sin inversión o sin diferencia de pensión (ROI indefinido)',
+    ERROR_SIN_MESES: 'No hay meses de Modalidad 40 entre el inicio y la edad de pensión',
+    ERROR_EDAD_PENSION: 'La edad de pensión debe ser mayor a la edad actual',
+}
+
+# Filas por bloque: mantiene los temporales de NumPy dentro de la caché del CPU
+TAMAÑO_BLOQUE = 8192
+
+# Edad máxima cubierta por la tabla directa de factores por edad
+_EDAD_MAXIMA_TABLA = 120
+
+# Años repetidos antes/después de la tabla de tasas (máximo de años de Modalidad 40)
+_MARGEN_AÑOS = 6
+
+_COLUMNAS_FLOTANTES = (
+    'pension_sin_mod40', 'pension_con_mod40', 'diferencia_mensual', 'inversion_total',
+    'promedio_mensual', 'roi_anual_pct', 'años_recuperacion', 'nuevo_sdp_diario',
+    'semanas_finales_con_mod40',
+)
+
+
+class _TablasLote(NamedTuple):
+    """Tablas de referencia de la calculadora convertidas a arreglos (una vez por lote)"""
+    limite_inferior: float           # mínimo del primer rango de la tabla Ley 73
+    maximos: np.ndarray              # máximos ordenados; el rango i cubre (maximos[i-1], maximos[i]]
+    cuantias: np.ndarray             # ya divididas entre 100, más el respaldo al final
+    incrementos: np.ndarray          # ya divididos entre 100, más el respaldo al final
+    celdas_por_uma: float            # resolución de la rejilla exacta (0 si no aplica)
+    cuantias_celda: Optional[np.ndarray]      # cuantías/incrementos indexados por celda
+    incrementos_celda: Optional[np.ndarray]   # de la rejilla exacta
+    factor_por_edad: np.ndarray      # índice = edad de pensión
+    años_tasas: np.ndarray
+    tasas: np.ndarray                # ya divididas entre 100, con margen de _MARGEN_AÑOS
+    umas: np.ndarray                 # UMA de cada año de años_tasas, con margen de _MARGEN_AÑOS
+    costo_unitario_acumulado: np.ndarray  # tabla mensual de la calculadora (calendario_mensual)
+    dias_acumulados: np.ndarray
+
+
+def _compilar_tablas(calc: CalculadoraModalidad40Corregida) -> _TablasLote:
+    """Convertir las tablas de la calculadora a arreglos paralelos"""
+    # Mismo índice de rangos contiguos que usa buscar_porcentajes_por_sdp
+    maximos = np.array(calc._limites_superiores_ley73, dtype=np.float64)
+    cuantias = np.array([c for c, _ in calc._porcentajes_ley73] + [0.13], dtype=np.float64)
+    incrementos = np.array([i for _, i in calc._porcentajes_ley73] + [0.0245], dtype=np.float64)
+
+    # Si todos los máximos son múltiplos de 1/2^k (1.25, 1.50, ...), multiplicar
+    # por 2^k es exacto y ceil() da directamente la celda (c-1, c] que cae
+    # dentro de un solo rango: la búsqueda se vuelve una sola indexación
+    celdas_por_uma, cuantias_celda, incrementos_celda = 0.0, None, None
+    finitos = maximos[np.isfinite(maximos)]
+    for k in range(11):
+        escala = finitos * 2.0 ** k
+        if np.array_equal(escala, np.round(escala)):
+            celdas_por_uma = 2.0 ** k
+            n_celdas = int(escala[-1]) + 2 if len(escala) else 1
+            idx_celda = np.searchsorted(maximos, np.arange(n_celdas) / celdas_por_uma, side='left')
+            cuantias_celda, incrementos_celda = cuantias[idx_celda], incrementos[idx_celda]
+            break
+
+    años_tasas = np.array(sorted(calc.tasas_modalidad40), dtype=np.int64)
+    return _TablasLote(
+        limite_inferior=float(calc._limite_inferior_ley73),
+        maximos=maximos,
+        cuantias=cuantias,
+        incrementos=incrementos,
+        celdas_por_uma=celdas_por_uma,
+        cuantias_celda=cuantias_celda,
+        incrementos_celda=incrementos_celda,
+        factor_por_edad=np.array(
+            [calc.tabla_edad.get(edad, 0.75) if edad < 65 else 1.0 for edad in range(_EDAD_MAXIMA_TABLA + 1)],
+            dtype=np.float64
+        ),
+        años_tasas=años_tasas,
+        tasas=np.pad([calc.tasas_modalidad40[a] / 100 for a in años_tasas], _MARGEN_AÑOS, mode='edge'),
+        umas=np.pad([calc.get_uma_para_año(int(a)) for a in años_tasas], _MARGEN_AÑOS, mode='edge'),
+        costo_unitario_acumulado=np.array(calc._tabla_mensual['costo_unitario_acumulado'], dtype=np.float64),
+        dias_acumulados=np.array(calc._tabla_mensual['dias_acumulados'], dtype=np.int64),
+    )
+
+
+def buscar_porcentajes_lote(calc: CalculadoraModalidad40Corregida,
+                            sdp_diario: np.ndarray,
+                            uma_diaria: float = None,
+                            _tablas: Optional[_TablasLote] = None) -> tuple:
+    """
+    Versión vectorizada de buscar_porcentajes_por_sdp
+
+    Args:
+        calc: Calculadora con las tablas de referencia
+        sdp_diario: Arreglo de Salarios Diarios Promedio
+        uma_diaria: UMA diaria (usa 2025 si no se especifica)
+
+    Returns:
+        Tuple (cuantia_basica_pct, incremento_anual_pct) como arreglos
+    """
+    t = _tablas if _tablas is not None else _compilar_tablas(calc)
+    if uma_diaria is None:
+        uma_diaria = calc.uma_diaria_2025
+    multiple_uma = np.asarray(sdp_diario, dtype=np.float64) / uma_diaria
+
+    # Primer rango cuyo máximo alcanza al múltiplo (rangos contiguos, igual
+    # que la versión escalar); debajo del primer rango o NaN aplica el
+    # respaldo 13%/2.45% (posición extra al final de cuantias/incrementos)
+    fuera = ~(multiple_uma >= t.limite_inferior)
+    if t.cuantias_celda is not None:
+        celda = np.ceil(multiple_uma * t.celdas_por_uma)
+        celda = np.fmax(np.fmin(celda, len(t.cuantias_celda) - 1), 0).astype(np.int64)
+        cuantia = t.cuantias_celda.take(celda)
+        incremento = t.incrementos_celda.take(celda)
+        if fuera.any():
+            cuantia[fuera] = t.cuantias[-1]
+            incremento[fuera] = t.incrementos[-1]
+        return cuantia, incremento
+
+    idx = np.searchsorted(t.maximos, multiple_uma, side='left')
+    idx[fuera] = len(t.maximos)
+    return t.cuantias.take(idx), t.incrementos.take(idx)
+
+
+def _factores_pension(calc: CalculadoraModalidad40Corregida, t: _TablasLote,
+                      edad_pension: np.ndarray,
+                      tiene_esposa: np.ndarray,
+                      num_hijos_dependientes: np.ndarray,
+                      tiene_padres_dependientes: np.ndarray) -> tuple:
+    """
+    Porcentajes por fila que no dependen del SDP (asignaciones y edad)
+
+    En la versión escalar a lo más una de esposa/soledad y una de
+    hijos/padres es distinta de cero, así que cada par se reduce a un solo
+    porcentaje por fila sin cambiar el resultado en punto flotante.
+    """
+    pct_familiar = np.where(tiene_esposa, calc.ayuda_esposa_pct, calc.ayuda_soledad_pct)
+    aplica_padres = tiene_padres_dependientes & ~tiene_esposa & (num_hijos_dependientes == 0)
+    pct_dependientes = np.where(aplica_padres, calc.ayuda_padres_pct, calc.ayuda_hijo_pct)
+    num_dependientes = np.where(aplica_padres, 1.0, np.maximum(num_hijos_dependientes, 0))
+    factor_edad = t.factor_por_edad[np.minimum(np.maximum(edad_pension, 0), _EDAD_MAXIMA_TABLA)]
+    pct_vejez = np.where(edad_pension >= 65, calc.incremento_vejez_pct, 0.0)
+    return pct_familiar, pct_dependientes, num_dependientes, factor_edad, pct_vejez
+
+
+def _pension_con_factores(calc: CalculadoraModalidad40Corregida, t: _TablasLote,
+                          semanas_cotizadas: np.ndarray,
+                          sdp_diario: np.ndarray,
+                          factores: tuple) -> np.ndarray:
+    """Pensión final mensual por fila (sin marcar las filas con < 500 semanas)"""
+    pct_familiar, pct_dependientes, num_dependientes, factor_edad, pct_vejez = factores
+    cuantia_basica_pct, incremento_anual_pct = buscar_porcentajes_lote(
+        calc, sdp_diario, calc.uma_diaria_2025, _tablas=t
+    )
+
+    cuantia_basica_anual = sdp_diario * cuantia_basica_pct * 365
+    años_adicionales = np.floor((semanas_cotizadas - 500) / 52)
+    incremento_anual = sdp_diario * incremento_anual_pct * 365 * años_adicionales
+    pension_base_anual = cuantia_basica_anual + incremento_anual
+
+    # Asignaciones familiares (esposa o soledad) + (hijos o padres)
+    ayuda_familiar_anual = pension_base_anual * pct_familiar
+    ayuda_dependientes_anual = pension_base_anual * pct_dependientes * num_dependientes
+    total_asignaciones = ayuda_familiar_anual + ayuda_dependientes_anual
+    pension_con_asignaciones = pension_base_anual + total_asignaciones
+
+    # Factor por edad (cesantía) e incremento por vejez
+    pension_ajustada_edad = pension_con_asignaciones * factor_edad
+    incremento_vejez_anual = pension_ajustada_edad * pct_vejez
+    pension_final_anual = pension_ajustada_edad + incremento_vejez_anual
+
+    # Mínimo garantizado
+    np.maximum(pension_final_anual, calc.minimo_garantizado_mensual * 12, out=pension_final_anual)
+
+    pension_final_anual /= 12
+    return pension_final_anual
+
+
+def calcular_pension_lote(calc: CalculadoraModalidad40Corregida,
+                          semanas_cotizadas: np.ndarray,
+                          sdp_diario: np.ndarray,
+                          edad_pension: np.ndarray,
+                          tiene_esposa: np.ndarray,
+                          num_hijos_dependientes: np.ndarray,
+                          tiene_padres_dependientes: np.ndarray,
+                          _tablas: Optional[_TablasLote] = None) -> np.ndarray:
+    """
+    Versión vectorizada de calcular_pension_ley73_corregida
+
+    Returns:
+        Arreglo con la pensión final mensual (NaN donde hay menos de 500 semanas)
+    """
+    t = _tablas if _tablas is not None else _compilar_tablas(calc)
+    factores = _factores_pension(
+        calc, t, np.asarray(edad_pension), np.asarray(tiene_esposa, dtype=bool),
+        np.asarray(num_hijos_dependientes), np.asarray(tiene_padres_dependientes, dtype=bool)
+    )
+    semanas_cotizadas = np.asarray(semanas_cotizadas, dtype=np.float64)
+    pension_final_mensual = _pension_con_factores(
+        calc, t, semanas_cotizadas, np.asarray(sdp_diario, dtype=np.float64), factores
+    )
+    pension_final_mensual[semanas_cotizadas < 500] = np.nan
+    return pension_final_mensual
+
+
+def calcular_escenarios_lote(semanas_cotizadas_actuales,
+                             sdp_actual_diario,
+                             sbc_modalidad40_diario,
+                             edad_pension,
+                             edad_actual=None,
+                             tiene_esposa=False,
+                             num_hijos_dependientes=0,
+                             tiene_padres_dependientes=False,
+                             mes_nacimiento=None,
+                             año_inicio=2025,
+                             mes_inicio_modalidad40=1,
+                             calendario_mensual: bool = False,
+                             calculadora: Optional[CalculadoraModalidad40Corregida] = None) -> Dict[str, np.ndarray]:
+    """
+    Calcular escenarios completos en lote (una fila por persona)
+
+    Todos los argumentos aceptan escalares o arreglos y se difunden
+    (broadcast) a una misma longitud. Equivale a llamar
+    calcular_escenario_completo por cada fila.
+
+    Args:
+        semanas_cotizadas_actuales: Semanas ya cotizadas
+        sdp_actual_diario: SDP actual (últimas 250 semanas)
+        sbc_modalidad40_diario: SBC deseado para Modalidad 40
+        edad_pension: Edad al pensionarse
+        edad_actual: Edad actual (None = respaldo de la versión escalar)
+        tiene_esposa: Si tiene esposa/concubina
+        num_hijos_dependientes: Número de hijos menores/estudiando
+        tiene_padres_dependientes: Si tiene padres dependientes
+        mes_nacimiento: Mes de nacimiento 1-12 (None o valores <= 0 = desconocido)
+        año_inicio: Año de inicio Modalidad 40
+        mes_inicio_modalidad40: Mes de inicio de Modalidad 40
+        calendario_mensual: Pagar mes por mes con días reales (igual que la
+            versión escalar; solo aplica con edad_actual)
+        calculadora: Instancia a usar (por defecto la compartida del proceso)
+
+    Returns:
+        Dictionary de columnas: pension_sin_mod40, pension_con_mod40,
+        diferencia_mensual, inversion_total, promedio_mensual,
+        roi_anual_pct, años_recuperacion, nuevo_sdp_diario,
+        semanas_finales_con_mod40, valido y codigo_error.
+        Las filas con error quedan en NaN.
+    """
+    calc = calculadora if calculadora is not None else obtener_calculadora()
+    tablas = _compilar_tablas(calc)
+
+    sin_edad_actual = edad_actual is None
+    calendario = calendario_mensual and not sin_edad_actual
+    sin_mes_nacimiento = mes_nacimiento is None
+
+    columnas = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(semanas_cotizadas_actuales, dtype=np.float64)),
+        np.atleast_1d(np.asarray(sdp_actual_diario, dtype=np.float64)),
+        np.atleast_1d(np.asarray(sbc_modalidad40_diario, dtype=np.float64)),
+        np.atleast_1d(np.asarray(edad_pension, dtype=np.int64)),
+        np.atleast_1d(np.asarray(0 if sin_edad_actual else edad_actual, dtype=np.int64)),
+        np.atleast_1d(np.asarray(tiene_esposa, dtype=bool)),
+        np.atleast_1d(np.asarray(num_hijos_dependientes, dtype=np.int64)),
+        np.atleast_1d(np.asarray(tiene_padres_dependientes, dtype=bool)),
+        np.atleast_1d(np.asarray(0 if sin_mes_nacimiento else mes_nacimiento, dtype=np.int64)),
+        np.atleast_1d(np.asarray(año_inicio, dtype=np.int64)),
+        np.atleast_1d(np.asarray(mes_inicio_modalidad40, dtype=np.int64)),
+    )
+    n = columnas[0].shape[0]
+
+    resultado = {nombre: np.empty(n, dtype=np.float64) for nombre in _COLUMNAS_FLOTANTES}
+    resultado['valido'] = np.empty(n, dtype=bool)
+    resultado['codigo_error'] = np.empty(n, dtype=np.int8)
+
+    for inicio in range(0, n, TAMAÑO_BLOQUE):
+        fin = min(inicio + TAMAÑO_BLOQUE, n)
+        salida = {nombre: valores[inicio:fin] for nombre, valores in resultado.items()}
+        _evaluar_bloque(calc, tablas, sin_edad_actual, calendario, salida, *(c[inicio:fin] for c in columnas))
+
+    return resultado
+
+
+def _evaluar_bloque(calc: CalculadoraModalidad40Corregida, t: _TablasLote, sin_edad_actual: bool,
+                    calendario: bool, salida: Dict[str, np.ndarray],
+                    semanas, sdp, sbc, edad_pen, edad_act, esposa, hijos, padres,
+                    mes_nac, año_ini, mes_ini) -> None:
+    """Evaluar un bloque de filas (mismo recorrido que calcular_escenario_completo) y escribirlo en salida"""
+    # ESCENARIO SIN MODALIDAD 40
+    # Las filas con menos de 500 semanas quedan marcadas por codigo_error
+    factores = _factores_pension(calc, t, edad_pen, esposa, hijos, padres)
+    pension_sin = _pension_con_factores(calc, t, semanas, sdp, factores)
+
+    # MESES EXACTOS HASTA CUMPLIR edad_pension
+    if sin_edad_actual:
+        años_completos = np.where(edad_pen < 65, np.maximum(0, 65 - edad_pen), 0)
+        meses_año_final = np.full(semanas.shape, 12, dtype=np.int64)
+    else:
+        conoce_mes = mes_nac > 0
+        meses_con_mes = np.where(
+            mes_ini <= mes_nac,
+            mes_nac - mes_ini + 1,
+            12 - mes_ini + mes_nac + 1
+        )
+        meses_año_final = np.where(conoce_mes, meses_con_mes, 12)
+        años_completos = np.where(conoce_mes, edad_pen - edad_act - 1, edad_pen - edad_act)
+
+    años_totales = años_completos + (meses_año_final > 0)
+    años_para_modalidad40 = np.clip(años_totales, 1, 6)
+
+    # Modalidad 40 permite máximo 6 años (hasta 2030)
+    excede_6 = años_totales > 6
+    años_completos = np.where(excede_6, 6, años_completos)
+    meses_año_final = np.where(excede_6, 0, meses_año_final)
+
+    meses_totales = años_completos * 12 + meses_año_final
+    semanas_con = semanas + np.trunc(meses_totales * 4.33)
+
+    sin_meses = np.zeros(semanas.shape, dtype=bool)
+    if calendario:
+        # Mismo recorte que CalendarioModalidad40.hasta_edad_pension: índices
+        # de la tabla mensual del primer mes y del mes después del cumpleaños
+        mes_fin = np.where(mes_nac > 0, mes_nac, 12)
+        año_fin = año_ini + (mes_fin < mes_ini) + edad_pen - edad_act - 1
+        n_meses = len(t.dias_acumulados) - 1
+        mes_desde = (año_ini - t.años_tasas[0]) * 12 + mes_ini - 1
+        mes_hasta = np.minimum((año_fin - t.años_tasas[0]) * 12 + mes_fin, n_meses)
+        sin_meses = mes_hasta <= mes_desde
+        mes_desde = np.clip(mes_desde, 0, n_meses)
+        mes_hasta = np.clip(mes_hasta, 0, n_meses)
+        semanas_con = semanas + (t.dias_acumulados[mes_hasta] - t.dias_acumulados[mes_desde]) // 7
+
+    # NUEVO SDP (promedio últimas 250 semanas)
+    semanas_antiguas_en_250 = np.maximum(250 - (260 - (250 - semanas)), 0)
+    peso_antiguo = semanas_antiguas_en_250 / 250
+    peso_nuevo = 1 - peso_antiguo
+    sdp_mezcla = (sdp * peso_antiguo) + (sbc * peso_nuevo)
+    nuevo_sdp = np.where(semanas >= 250, sbc, sdp_mezcla)
+
+    pension_con = _pension_con_factores(calc, t, semanas_con, nuevo_sdp, factores)
+
+    # ANÁLISIS DE INVERSIÓN (mismo recorrido año por año que calcular_inversion_total_años)
+    meses_año_final_inv = np.where(años_para_modalidad40 == años_totales, meses_año_final, 12)
+    multiple_uma = sbc / calc.uma_proyecciones[2025]
+
+    ultimo_año = años_para_modalidad40 - 1
+    ajuste_meses_final = meses_año_final_inv - 12
+    meses_totales_inv = ultimo_año * 12 + meses_año_final_inv
+
+    if calendario:
+        # Sumas acumuladas de la tabla mensual: una resta por fila
+        año_sin_tasa = (año_ini < t.años_tasas[0]) | (año_ini > t.años_tasas[-1])
+        total = multiple_uma * (t.costo_unitario_acumulado[mes_hasta] - t.costo_unitario_acumulado[mes_desde])
+        meses_totales_inv = mes_hasta - mes_desde
+    else:
+        # Años fuera de la tabla de tasas: la versión escalar lanza ValueError
+        año_sin_tasa = (año_ini < t.años_tasas[0]) | (año_ini + ultimo_año > t.años_tasas[-1])
+
+        # Índice del año de inicio en umas/tasas (con margen de años repetidos en
+        # ambos extremos para no recortar dentro del ciclo)
+        if año_ini.min() == año_ini.max():
+            # Caso común: todo el bloque inicia el mismo año y el índice es escalar
+            idx_inicio = min(max(int(año_ini[0]) - int(t.años_tasas[0]), -_MARGEN_AÑOS), len(t.años_tasas)) + _MARGEN_AÑOS
+        else:
+            idx_inicio = np.minimum(np.maximum(año_ini - t.años_tasas[0], -_MARGEN_AÑOS), len(t.años_tasas)) + _MARGEN_AÑOS
+
+        # Meses a pagar del año i: 12, salvo el último año (meses_año_final_inv)
+        # y 0 en los años posteriores. Con meses_año_final_inv entre 1 y 12 eso es
+        # recortar los meses restantes a [0, 12]
+        meses_regulares = meses_año_final_inv.min() >= 1 and meses_año_final_inv.max() <= 12
+        meses_restantes = meses_totales_inv.astype(np.float64)
+
+        total = np.zeros(semanas.shape, dtype=np.float64)
+        for i in range(int(años_para_modalidad40.max())):
+            idx = idx_inicio + i
+            sbc_ajustado = multiple_uma * t.umas[idx]
+            sbc_mensual = sbc_ajustado * 30
+            costo_mensual = sbc_mensual * t.tasas[idx]
+
+            if meses_regulares:
+                meses_a_pagar = np.minimum(np.maximum(meses_restantes, 0.0), 12.0)
+                meses_restantes -= 12
+            else:
+                meses_a_pagar = (12 + (ultimo_año == i) * ajuste_meses_final) * (i < años_para_modalidad40)
+            total += costo_mensual * meses_a_pagar
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        promedio_mensual = total / meses_totales_inv
+
+        # ANÁLISIS ROI
+        diferencia_mensual = pension_con - pension_sin
+        diferencia_anual = diferencia_mensual * 12
+        roi_anual = (diferencia_anual / total) * 100
+        años_recuperacion = total / diferencia_anual
+
+    # Sin años hasta la pensión la versión escalar paga meses negativos: sin
+    # calendario no hay otra señal de error (semanas_con puede quedar bajo 500
+    # o el cálculo sale con una inversión negativa)
+    edad_rebasada = np.zeros(semanas.shape, dtype=bool) if sin_edad_actual else edad_pen <= edad_act
+
+    # Códigos de error: el último que se asigna gana, igual que la precedencia escalar
+    codigo_error = salida['codigo_error']
+    codigo_error.fill(ERROR_NINGUNO)
+    for condicion, codigo in (
+        ((total == 0) | (diferencia_anual == 0), ERROR_SIN_BENEFICIO),
+        ((semanas < 500) | (semanas_con < 500), ERROR_SEMANAS_MINIMAS),
+        (año_sin_tasa, ERROR_AÑO_SIN_TASA),
+        (edad_rebasada, ERROR_EDAD_PENSION),
+        (sin_meses, ERROR_SIN_MESES),
+        (edad_pen > 65, ERROR_EDAD_MAXIMA),
+        (sbc > calc.tope_diario_2025, ERROR_EXCEDE_TOPE),
+    ):
+        np.putmask(codigo_error, condicion, codigo)
+    valido = salida['valido']
+    np.equal(codigo_error, ERROR_NINGUNO, out=valido)
+
+    # Copiar al resultado multiplicando por 1.0 (idéntico) o NaN (fila con error)
+    mascara = np.where(valido, 1.0, np.nan)
+    for nombre, valores in (
+        ('pension_sin_mod40', pension_sin),
+        ('pension_con_mod40', pension_con),
+        ('diferencia_mensual', diferencia_mensual),
+        ('inversion_total', total),
+        ('promedio_mensual', promedio_mensual),
+        ('roi_anual_pct', roi_anual),
+        ('años_recuperacion', años_recuperacion),
+        ('nuevo_sdp_diario', nuevo_sdp),
+        ('semanas_finales_con_mod40', semanas_con),
+    ):
+        np.multiply(valores, mascara, out=salida[nombre])
+
+
+def calcular_rejilla_sensibilidad(semanas_cotizadas_actuales: int,
+                                  sdp_actual_diario: float,
+                                  tiene_esposa: bool = False,
+                                  num_hijos_dependientes: int = 0,
+                                  tiene_padres_dependientes: bool = False,
+                                  año_inicio: int = 2025,
+                                  edad_actual: Optional[int] = None,
+                                  mes_nacimiento: Optional[int] = None,
+                                  mes_inicio_modalidad40: int = 1,
+                                  niveles_uma=range(1, 26),
+                                  duraciones=range(1, 7),
+                                  edades_pension=range(60, 66),
+                                  calculadora: Optional[CalculadoraModalidad40Corregida] = None) -> Dict[str, np.ndarray]:
+    """
+    Rejilla SBC × duración × edad de pensión para un solo cliente
+
+    Cada celda equivale a calcular_escenario_completo con
+    sbc = nivel·UMA 2025, edad_actual = edad_pension - duración y
+    calendario_mensual=True: se paga mes por mes desde el mes de inicio
+    hasta el cumpleaños de la edad de pensión (diciembre sin mes de
+    nacimiento). Las duraciones que terminan después de la última tasa
+    publicada quedan en NaN; la versión escalar recortaría el calendario y
+    la celda ya no tendría esa duración. Con la edad actual del cliente
+    también quedan en NaN las celdas que no caben antes de la pensión
+    (edad_actual + duración > edad_pension) y las edades de pensión que ya
+    cumplió.
+
+    En lugar de evaluar cada celda se calcula una vez lo que comparten: la
+    pensión sin Modalidad 40 depende solo de la edad, los porcentajes Ley 73
+    solo del SBC, las semanas finales solo de la duración y la inversión
+    (SBC × duración) es una resta en la tabla mensual de la calculadora.
+
+    Args:
+        semanas_cotizadas_actuales: Semanas ya cotizadas
+        sdp_actual_diario: SDP actual (últimas 250 semanas)
+        tiene_esposa: Si tiene esposa/concubina
+        num_hijos_dependientes: Número de hijos menores/estudiando
+        tiene_padres_dependientes: Si tiene padres dependientes
+        año_inicio: Año de inicio Modalidad 40
+        edad_actual: Edad actual del cliente (None = no se recorta por edad)
+        mes_nacimiento: Mes de nacimiento 1-12 (None = desconocido)
+        mes_inicio_modalidad40: Mes de inicio de Modalidad 40
+        niveles_uma: Niveles de SBC en UMAs (eje 0)
+        duraciones: Años de Modalidad 40 (eje 1), de 1 a 6
+        edades_pension: Edades de pensión (eje 2), de 60 a 65
+        calculadora: Instancia a usar (por defecto la compartida del proceso)
+
+    Returns:
+        Dictionary con los ejes (niveles_uma, sbc_diario, duraciones,
+        edades_pension), pension_sin_mod40 (por edad), inversion_total y
+        promedio_mensual (SBC × duración), y pension_con_mod40,
+        diferencia_mensual, roi_anual_pct y años_recuperacion
+        (SBC × duración × edad). Las celdas inválidas quedan en NaN.
+
+    Raises:
+        ValueError: si hay menos de 500 semanas o una duración/edad fuera de rango
+    """
+    calc = calculadora if calculadora is not None else obtener_calculadora()
+    t = _compilar_tablas(calc)
+
+    niveles = np.asarray(niveles_uma, dtype=np.float64)
+    duracion = np.asarray(duraciones, dtype=np.int64)
+    edades = np.asarray(edades_pension, dtype=np.int64)
+    if semanas_cotizadas_actuales < 500:
+        raise ValueError('Requiere mínimo 500 semanas cotizadas')
+    if duracion.min() < 1 or duracion.max() > 6:
+        raise ValueError('La duración de Modalidad 40 debe estar entre 1 y 6 años')
+    if edades.min() < 60 or edades.max() > 65:
+        raise ValueError('La edad de pensión debe estar entre 60 y 65 años')
+
+    sbc = niveles * calc.uma_diaria_2025
+    semanas = float(semanas_cotizadas_actuales)
+
+    # Por edad: asignaciones/factores y pensión sin Modalidad 40
+    factores = _factores_pension(
+        calc, t, edades, np.asarray(bool(tiene_esposa)),
+        np.asarray(num_hijos_dependientes), np.asarray(bool(tiene_padres_dependientes))
+    )
+    pension_sin = _pension_con_factores(
+        calc, t, np.full(edades.shape, semanas), np.full(edades.shape, float(sdp_actual_diario)), factores
+    )
+
+    # Por duración: meses [desde, hasta) de la tabla mensual, mismo recorte que
+    # CalendarioModalidad40.hasta_edad_pension con edad_pension - edad_actual = duración
+    mes_fin = mes_nacimiento if mes_nacimiento else 12
+    año_fin = año_inicio + (mes_fin < mes_inicio_modalidad40) + duracion - 1
+    n_meses = len(t.dias_acumulados) - 1
+    mes_desde = (año_inicio - int(t.años_tasas[0])) * 12 + mes_inicio_modalidad40 - 1
+    mes_hasta = (año_fin - t.años_tasas[0]) * 12 + mes_fin
+    # Inicio sin tasa (la versión escalar lanza ValueError) o fin después de la última tasa
+    sin_tasa = (año_inicio < t.años_tasas[0]) | (año_inicio > t.años_tasas[-1]) | (mes_hasta > n_meses)
+    mes_desde = min(max(mes_desde, 0), n_meses)
+    mes_hasta = np.clip(mes_hasta, mes_desde, n_meses)
+    semanas_con = semanas + (t.dias_acumulados[mes_hasta] - t.dias_acumulados[mes_desde]) // 7
+
+    # Por SBC: nuevo SDP (con 500+ semanas las últimas 250 son todas de Modalidad 40)
+    nuevo_sdp = sbc
+
+    # SBC × duración × edad: los porcentajes Ley 73 se buscan una vez por SBC
+    # y se difunden sobre los otros dos ejes
+    pension_con = _pension_con_factores(calc, t, semanas_con[None, :, None], nuevo_sdp[:, None, None], factores)
+
+    # SBC × duración: sumas acumuladas de la tabla mensual, una resta por
+    # duración (igual que CalendarioModalidad40.costo_rango)
+    multiple_uma = sbc / calc.uma_proyecciones[2025]
+    inversion = multiple_uma[:, None] * (t.costo_unitario_acumulado[mes_hasta] - t.costo_unitario_acumulado[mes_desde])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        promedio_mensual = inversion / (mes_hasta - mes_desde)
+
+    inversion[:, sin_tasa] = np.nan
+    promedio_mensual[:, sin_tasa] = np.nan
+    pension_con[:, sin_tasa, :] = np.nan
+
+    # Duración × edad que no caben antes de la pensión con la edad real del cliente
+    if edad_actual is not None:
+        fuera_de_plazo = edad_actual + duracion[:, None] > edades[None, :]
+        pension_con[:, fuera_de_plazo] = np.nan
+        pension_sin[edades <= edad_actual] = np.nan
+        no_cabe = fuera_de_plazo.all(axis=1)
+        inversion[:, no_cabe] = np.nan
+        promedio_mensual[:, no_cabe] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diferencia_mensual = pension_con - pension_sin[None, None, :]
+        diferencia_anual = diferencia_mensual * 12
+        roi_anual = (diferencia_anual / inversion[:, :, None]) * 100
+        años_recuperacion = inversion[:, :, None] / diferencia_anual
+    años_recuperacion[diferencia_anual == 0] = np.nan
+
+    return {
+        'niveles_uma': niveles,
+        'sbc_diario': sbc,
+        'duraciones': duracion,
+        'edades_pension': edades,
+        'pension_sin_mod40': pension_sin,
+        'inversion_total': inversion,
+        'promedio_mensual': promedio_mensual,
+        'pension_con_mod40': pension_con,
+        'diferencia_mensual': diferencia_mensual,
+        'roi_anual_pct': roi_anual,
+        'años_recuperacion': años_recuperacion,
+    }
+
+
+def simular_uma_inflacion(escenario: Dict,
+                          trayectorias: int = 10_000,
+                          semilla: Optional[int] = None,
+                          volatilidad_pp: float = 1.0,
+                          persistencia: float = 0.6,
+                          calculadora: Optional[CalculadoraModalidad40Corregida] = None) -> Dict:
+    """
+    Simulación Monte Carlo de la UMA y la inflación para un escenario ya calculado
+
+    La inflación de cada año es la proyectada (inflacion_proyectada; después
+    del último año, la última) más una desviación AR(1):
+    desviación = persistencia·desviación_anterior + volatilidad·N(0, 1).
+    La UMA de cada trayectoria es la proyectada escalada por la inflación
+    simulada contra la proyectada, así que con volatilidad 0 se reproduce
+    exactamente get_uma_para_año. Todo se evalúa sobre arreglos
+    trayectorias × años, sin ciclos por trayectoria.
+
+    - Inversión: el costo de cada año del desglose escala con la UMA simulada.
+    - Pensión real (pesos de 2025): el SDP nominal es el promedio de los
+      salarios pagados en las últimas 250 semanas (SBC fijo en UMAs, así que
+      sube con la UMA de cada año); la pensión se calcula con ese SDP contra
+      la UMA del año de pensión y se deflacta con la inflación acumulada. El
+      SDP sin Modalidad 40 queda congelado en pesos nominales.
+    - Año de pensión: el del cumpleaños de edad_pension contado desde
+      edad_actual (como la calculadora escalar), aunque el plan termine antes;
+      sin edad_actual, el último año pagado.
+
+    Args:
+        escenario: Resultado de calcular_escenario_completo (sin 'error')
+        trayectorias: Número de trayectorias simuladas
+        semilla: Semilla del generador (None = aleatoria)
+        volatilidad_pp: Desviación estándar anual de la inflación en puntos porcentuales
+        persistencia: Coeficiente AR(1) de la desviación (0 = años independientes)
+        calculadora: Instancia a usar (por defecto la compartida del proceso)
+
+    Returns:
+        Dictionary con los supuestos, 'año_pension' y, para inversion_total,
+        inversion_real, pension_con_mod40_real, pension_sin_mod40_real,
+        diferencia_mensual_real, roi_anual_pct y uma_año_pension, un
+        diccionario {'p10', 'p50', 'p90'}
+
+    Raises:
+        ValueError: si trayectorias < 1 o la volatilidad es negativa
+    """
+    if trayectorias < 1:
+        raise ValueError('Se requiere al menos una trayectoria')
+    if volatilidad_pp < 0:
+        raise ValueError('La volatilidad no puede ser negativa')
+    calc = calculadora if calculadora is not None else obtener_calculadora()
+    t = _compilar_tablas(calc)
+    entradas = escenario['inputs']
+
+    # Años pagados con su costo y días (el desglose clásico paga 30 días por mes)
+    desglose = escenario['inversion']['desglose_anual']
+    años_pagados = sorted(int(año) for año in desglose)
+    filas = [desglose[año] for año in sorted(desglose, key=int)]
+    costo_anual = np.array([fila['costo_anual'] for fila in filas])
+    dias = np.array([fila.get('dias_pagados', fila['meses_pagados'] * 30) for fila in filas], dtype=np.float64)
+    if entradas.get('edad_actual') is None:
+        año_pension = años_pagados[-1]
+    else:
+        año_pension = CalendarioModalidad40.año_edad_pension(
+            entradas['año_inicio'], entradas['mes_inicio_modalidad40'], entradas['edad_actual'],
+            entradas['edad_pension'], entradas['mes_nacimiento']
+        )
+
+    # Inflación simulada contra la proyectada desde 2026 hasta el año de pensión
+    años = np.arange(2026, max(año_pension, 2025) + 1)
+    ultima = calc.inflacion_proyectada[max(calc.inflacion_proyectada)]
+    proyectada = np.array([calc.inflacion_proyectada.get(int(año), ultima) for año in años]) / 100
+    rng = np.random.default_rng(semilla)
+    choques = rng.standard_normal((trayectorias, len(años))) * (volatilidad_pp / 100)
+    desviacion = np.empty_like(choques)
+    anterior = np.zeros(trayectorias)
+    for j in range(len(años)):
+        anterior = persistencia * anterior + choques[:, j]
+        desviacion[:, j] = anterior
+    inflacion = proyectada + desviacion
+
+    # Índices acumulados por año (columna 0 = 2025): precios y UMA simulada / proyectada
+    precios = np.ones((trayectorias, len(años) + 1))
+    np.cumprod(1 + inflacion, axis=1, out=precios[:, 1:])
+    escala_uma = np.ones((trayectorias, len(años) + 1))
+    np.cumprod((1 + inflacion) / (1 + proyectada), axis=1, out=escala_uma[:, 1:])
+    columnas = np.clip(np.array(años_pagados) - 2025, 0, len(años))
+    uma_proyectada = np.array([calc.get_uma_para_año(año) for año in años_pagados])
+    uma_pagos = escala_uma[:, columnas] * uma_proyectada
+    columna_pension = min(max(año_pension - 2025, 0), len(años))
+    uma_pension = escala_uma[:, columna_pension] * calc.get_uma_para_año(año_pension)
+    precio_pension = precios[:, columna_pension]
+
+    # INVERSIÓN nominal y en pesos de 2025
+    costo_simulado = costo_anual * escala_uma[:, columnas]
+    inversion = costo_simulado.sum(axis=1)
+    inversion_real = (costo_simulado / precios[:, columnas]).sum(axis=1)
+
+    # SDP: peso de cada año dentro de las últimas 250 semanas pagadas
+    ventana = np.minimum(dias, np.maximum(250 * 7 - (np.cumsum(dias[::-1])[::-1] - dias), 0))
+    pesos = ventana / ventana.sum()
+    uma_promedio = (uma_pagos * pesos).sum(axis=1)
+
+    # Pensión con la UMA del año de pensión, llevada a pesos de 2025: la tabla
+    # Ley 73 usa múltiplos de UMA, así que se evalúa con el SDP equivalente
+    # en UMAs de 2025 y se escala por la UMA del año de pensión
+    factores = _factores_pension(
+        calc, t, np.asarray(entradas['edad_pension']), np.asarray(bool(entradas['tiene_esposa'])),
+        np.asarray(entradas['num_hijos_dependientes']), np.asarray(bool(entradas['tiene_padres_dependientes']))
+    )
+    a_pesos_2025 = uma_pension / calc.uma_diaria_2025 / precio_pension
+    sdp_con = escenario['nuevo_sdp_diario'] * uma_promedio / uma_pension
+    pension_con = _pension_con_factores(
+        calc, t, np.full(trayectorias, float(escenario['con_modalidad40']['semanas_cotizadas'])),
+        sdp_con, factores
+    ) * a_pesos_2025
+    sdp_sin = entradas['sdp_actual_diario'] * calc.uma_diaria_2025 / uma_pension
+    pension_sin = _pension_con_factores(
+        calc, t, np.full(trayectorias, float(entradas['semanas_cotizadas_actuales'])),
+        sdp_sin, factores
+    ) * a_pesos_2025
+
+    diferencia_mensual = pension_con - pension_sin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi_anual = (diferencia_mensual * 12 / inversion_real) * 100
+
+    def percentiles(valores: np.ndarray) -> Dict[str, float]:
+        p10, p50, p90 = np.percentile(valores, [10, 50, 90])
+        return {'p10': float(p10), 'p50': float(p50), 'p90': float(p90)}
+
+    return {
+        'trayectorias': trayectorias,
+        'semilla': semilla,
+        'volatilidad_pp': volatilidad_pp,
+        'persistencia': persistencia,
+        'año_pension': año_pension,
+        'inversion_total': percentiles(inversion),
+        'inversion_real': percentiles(inversion_real),
+        'pension_con_mod40_real': percentiles(pension_con),
+        'pension_sin_mod40_real': percentiles(pension_sin),
+        'diferencia_mensual_real': percentiles(diferencia_mensual),
+        'roi_anual_pct': percentiles(roi_anual),
+        'uma_año_pension': percentiles(uma_pension),
+    }
@@ -13,32 +13,25 @@ import math
 from datetime import datetime
 from typing import Dict, Tuple, List
 
+from Datos_Referencia_Modalidad40 import datos_referencia, version_vigente
+
 class CalculadoraModalidad40:
     """
     Calculadora completa para análisis de Modalidad 40 IMSS bajo Ley 73
     """
     
     def __init__(self):
-        """Inicializar con valores oficiales 2025"""
+        """Inicializar con valores oficiales 2025 (registro compartido de datos de referencia)"""
+        datos = datos_referencia(version_vigente())
+        
         # Valores oficiales 2025
-        self.uma_diaria_2025 = 113.14
-        self.uma_mensual_2025 = 3439.46
+        self.uma_diaria_2025 = datos.uma_diaria_2025
+        self.uma_mensual_2025 = datos.uma_mensual_2025
         self.tope_maximo_umas = 25
         self.tope_diario_2025 = self.uma_diaria_2025 * self.tope_maximo_umas
         
         # Tablas oficiales de tasas Modalidad 40 (incremento anual)
-        self.tasas_modalidad40 = {
-            2021: 10.075,
-            2022: 10.075,
-            2023: 11.166,
-            2024: 12.256,
-            2025: 13.347,
-            2026: 14.438,
-            2027: 15.528,
-            2028: 16.619,
-            2029: 17.709,
-            2030: 18.000
-        }
+        self.tasas_modalidad40 = datos.tasas_modalidad40()
         
         # Porcentajes fijos fórmula Ley 73
         self.cuantia_basica_pct = 0.13      # 13%
@@ -8,8 +8,11 @@ Incluye: Cuantía Básica, Incrementos, Asignaciones Familiares, Factor Edad
 import pandas as pd
 import numpy as np
 
-# Valores base para 2025
-UMA_2025 = 108.57  # UMA diaria
+from Datos_Referencia_Modalidad40 import datos_referencia, version_vigente
+
+# Valores base para 2025 (registro compartido de datos de referencia)
+DATOS = datos_referencia(version_vigente())
+UMA_2025 = DATOS.uma_diaria_2025  # UMA diaria
 TOPE_MAX_UMAS = 25
 SDP_TOPE = UMA_2025 * TOPE_MAX_UMAS  # Salario Diario Promedio máximo
 
@@ -19,17 +22,10 @@ print("Incorporando TODOS los componentes según normativa IMSS")
 print("="*80)
 
 # TABLA ARTÍCULO 167 - Cuantía Básica y Porcentajes de Incremento
-# Simplificada para niveles principales (necesitaríamos la tabla completa)
 tabla_art_167 = {
-    # Nivel UMAs: (% Cuantía Básica, % Incremento Anual)
-    1.0: (0.35, 0.56),    # Hasta 1 UMA
-    2.0: (0.37, 0.78),    # Hasta 2 UMAs  
-    3.0: (0.39, 0.95),    # Hasta 3 UMAs
-    5.0: (0.42, 1.15),    # Hasta 5 UMAs
-    10.0: (0.48, 1.45),   # Hasta 10 UMAs
-    15.0: (0.52, 1.68),   # Hasta 15 UMAs
-    20.0: (0.55, 1.85),   # Hasta 20 UMAs
-    25.0: (0.58, 2.05),   # Hasta 25 UMAs (TOPE)
+    # Nivel UMAs (máximo del rango): (% Cuantía Básica, % Incremento Anual)
+    rango["rango_max"]: (rango["cuantia_basica"] / 100, rango["incremento_anual"])
+    for rango in DATOS.tabla_porcentajes_ley73()
 }
 
 def obtener_porcentajes_tabla(sdp_diario, uma_diaria):
@@ -41,8 +37,8 @@ def obtener_porcentajes_tabla(sdp_diario, uma_diaria):
         if nivel_umas <= limite_umas:
             return tabla_art_167[limite_umas]
     
-    # Si excede el máximo, usar el tope
-    return tabla_art_167[25.0]
+    # Si excede el máximo, usar el último rango
+    return tabla_art_167[max(tabla_art_167)]
 
 def calcular_pension_completa(salario_mensual_modalidad40, edad_retiro=65, 
                             semanas_adicionales=260, tiene_esposa=True, 
@@ -77,7 +73,7 @@ def calcular_pension_completa(salario_mensual_modalidad40, edad_retiro=65,
     pension_base_anual = cuantia_basica_anual + incremento_total_anual
     
     # 6. FACTOR POR EDAD DE RETIRO
-    factores_edad = {60: 0.75, 61: 0.80, 62: 0.85, 63: 0.90, 64: 0.95, 65: 1.00}
+    factores_edad = DATOS.tabla_edad()
     factor_edad = factores_edad.get(edad_retiro, 1.00)
     
     pension_ajustada_edad = pension_base_anual * factor_edad
@@ -131,13 +127,7 @@ print("="*60)
 escenarios = [8000, 10000, 15000, 20000, 25000, int(SDP_TOPE * 30)]  # Último es el tope
 
 # Tasas progresivas Modalidad 40
-tasas_por_año = {
-    2025: 0.13347,
-    2026: 0.14506, 
-    2027: 0.15665,
-    2028: 0.16824,
-    2029: 0.17709
-}
+tasas_por_año = {año: tasa / 100 for año, tasa in DATOS.tasas_modalidad40().items() if 2025 <= año <= 2029}
 
 resultados_completos = []
 
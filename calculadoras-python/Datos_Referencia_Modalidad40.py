@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DATOS DE REFERENCIA - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Registro único de UMA, tasas Modalidad 40 y tablas Ley 73, compartido por
+todas las calculadoras. Los datos salen de los CSV de "calculadoras excel",
+se validan y se agrupan por versión con su fecha de entrada en vigor.
+
+Los CSV se leen una sola vez: el resultado se guarda en un snapshot binario
+(pickle) junto a este módulo y los procesos siguientes lo cargan directo
+mientras los CSV no cambien (mismo tamaño y fecha de modificación). El
+snapshot se puede generar al construir la imagen con:
+
+    python calculadoras-python/Datos_Referencia_Modalidad40.py --compilar
+
+Fuentes:
+- INCREMENTO DE TASAS MODALIDAD 40.csv: tasa por año
+- tablas referencia. balores UMA ANUALES.csv: UMA mensual 2025 y la tasa de
+  cada año (se cruza contra el archivo de tasas)
+- CCOPIA EN UNA SOLA HOJA Calculadora-de-pension-2023.csv: tabla de cuantía
+  básica / incremento anual por VSM y porcentaje por edad
+- "valor historico de la uma .csv" NO tiene valores de UMA (es un registro
+  patronal): el histórico y las proyecciones de UMA siguen en este módulo
+"""
+
+import csv
+import os
+import pickle
+import re
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+CARPETA_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'calculadoras excel')
+
+ARCHIVO_TASAS = 'INCREMENTO DE TASAS MODALIDAD 40.csv'
+ARCHIVO_UMA_MENSUAL = 'tablas referencia. balores UMA ANUALES.csv'
+ARCHIVO_TABLAS_LEY73 = 'CCOPIA EN UNA SOLA HOJA Calculadora-de-pension-2023.csv'
+FUENTES = (ARCHIVO_TASAS, ARCHIVO_UMA_MENSUAL, ARCHIVO_TABLAS_LEY73)
+
+# Snapshot compilado (se puede cambiar con DATOS_REFERENCIA_SNAPSHOT)
+RUTA_SNAPSHOT = os.environ.get(
+    'DATOS_REFERENCIA_SNAPSHOT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos_referencia.pickle')
+)
+# Cambia cuando cambia la estructura de DatosReferencia
+FORMATO_SNAPSHOT = 1
+
+# Histórico oficial (INEGI) y proyecciones (Encuesta Banxico/Citi) de la UMA diaria
+UMA_DIARIA = {
+    2016: 73.04, 2017: 80.60, 2018: 84.39, 2019: 86.88, 2020: 89.62,
+    2021: 92.97, 2022: 96.22, 2023: 103.74, 2024: 108.57, 2025: 113.14,
+    2026: 117.47,  # +3.8% inflación proyectada
+    2027: 121.82,  # +3.7% inflación proyectada
+    2028: 126.20,  # +3.6% inflación proyectada
+    2029: 130.62,  # +3.5% inflación proyectada
+    2030: 135.08,  # +3.4% inflación proyectada
+}
+
+INFLACION_PROYECTADA = {2026: 3.80, 2027: 3.70, 2028: 3.60, 2029: 3.50, 2030: 3.40}
+
+# Errores conocidos de los CSV: (archivo, año) -> (valor en el CSV, valor correcto, motivo).
+# Solo se corrigen si el CSV todavía trae el valor erróneo
+CORRECCIONES = {
+    (ARCHIVO_TASAS, 2030): (18.000, 18.800, 'Tasa 2030 publicada en la reforma a la LSS de 2020'),
+}
+
+# Versiones de los datos: (versión, fecha de entrada en vigor)
+VERSIONES = (
+    ('2025.11', date(2025, 11, 1)),
+)
+
+
+class ErrorDatosReferencia(ValueError):
+    """Los CSV de referencia no se pudieron leer o no pasan la validación"""
+
+
+@dataclass(frozen=True)
+class DatosReferencia:
+    """
+    Tablas de referencia de una versión, como tuplas paralelas (ordenadas)
+
+    Es el contenido del snapshot: solo tuplas de números, sin diccionarios
+    por fila, así que se guarda y se carga rápido y no se puede modificar.
+    """
+    version: str
+    vigente_desde: date
+    uma_mensual_2025: float
+    uma_años: Tuple[int, ...]
+    uma_diaria: Tuple[float, ...]
+    inflacion_años: Tuple[int, ...]
+    inflacion_pct: Tuple[float, ...]
+    tasas_años: Tuple[int, ...]
+    tasas_pct: Tuple[float, ...]
+    ley73_minimos: Tuple[float, ...]
+    ley73_maximos: Tuple[float, ...]
+    ley73_cuantias: Tuple[float, ...]
+    ley73_incrementos: Tuple[float, ...]
+    edades: Tuple[int, ...]
+    factores_edad: Tuple[float, ...]
+
+    @property
+    def uma_diaria_2025(self) -> float:
+        return self.uma_diaria[self.uma_años.index(2025)]
+
+    def uma_proyecciones(self) -> Dict[int, float]:
+        return dict(zip(self.uma_años, self.uma_diaria))
+
+    def inflacion_proyectada(self) -> Dict[int, float]:
+        return dict(zip(self.inflacion_años, self.inflacion_pct))
+
+    def tasas_modalidad40(self) -> Dict[int, float]:
+        return dict(zip(self.tasas_años, self.tasas_pct))
+
+    def tabla_porcentajes_ley73(self) -> List[Dict[str, float]]:
+        return [
+            {"rango_min": minimo, "rango_max": maximo, "cuantia_basica": cuantia, "incremento_anual": incremento}
+            for minimo, maximo, cuantia, incremento in zip(
+                self.ley73_minimos, self.ley73_maximos, self.ley73_cuantias, self.ley73_incrementos
+            )
+        ]
+
+    def tabla_edad(self) -> Dict[int, float]:
+        return dict(zip(self.edades, self.factores_edad))
+
+
+# ==================== LECTURA DE LOS CSV ====================
+
+def _numero(texto: str, coma_decimal: bool = False) -> float:
+    """
+    Convertir una celda de Excel a número: " $3,439.46 ", "13.3470%", " $-   "
+
+    Con coma_decimal, "14,438" es 14.438 (el archivo de tasas mezcla ambos
+    separadores); si no, la coma es separador de miles.
+    """
+    limpio = texto.strip().strip('"').replace('$', '').replace('%', '').strip()
+    if limpio in ('', '-'):
+        return 0.0
+    if ',' in limpio and '.' not in limpio and coma_decimal:
+        limpio = limpio.replace(',', '.')
+    else:
+        limpio = limpio.replace(',', '')
+    return float(limpio)
+
+
+def _leer_lineas(carpeta: str, archivo: str) -> List[str]:
+    ruta = os.path.join(carpeta, archivo)
+    try:
+        # utf-8-sig quita el BOM de los archivos exportados de Excel
+        with open(ruta, encoding='utf-8-sig', newline='') as f:
+            return f.read().splitlines()
+    except OSError as e:
+        raise ErrorDatosReferencia(f'No se pudo leer {archivo}: {e}')
+
+
+def leer_tasas(carpeta: str = CARPETA_CSV) -> Dict[int, float]:
+    """
+    Tasas Modalidad 40 por año (en porcentaje)
+
+    Cada renglón viene entero entre comillas ("2026,14,438"): el primer
+    campo es el año y el resto la tasa, con punto o coma decimal.
+    """
+    tasas = {}
+    for numero, linea in enumerate(_leer_lineas(carpeta, ARCHIVO_TASAS)[1:], start=2):
+        linea = linea.strip().strip('"')
+        if not linea:
+            continue
+        año, _, tasa = linea.partition(',')
+        try:
+            año = int(año)
+            tasa = _numero(tasa, coma_decimal=True)
+        except ValueError:
+            raise ErrorDatosReferencia(f'{ARCHIVO_TASAS}, renglón {numero}: "{linea}" no es año,tasa')
+        erroneo, correcto, _ = CORRECCIONES.get((ARCHIVO_TASAS, año), (None, None, None))
+        tasas[año] = correcto if tasa == erroneo else tasa
+    return tasas
+
+
+def leer_tablas_uma(carpeta: str = CARPETA_CSV) -> Dict[int, Tuple[float, float]]:
+    """
+    (UMA mensual, tasa %) de cada bloque anual de la tabla de inversión por UMAs
+
+    Solo se usa el renglón de 1 UMA de cada bloque.
+    """
+    tablas = {}
+    año = None
+    for fila in csv.reader(_leer_lineas(carpeta, ARCHIVO_UMA_MENSUAL)):
+        encabezado = re.search(r'MENSUAL (\d{4})', fila[1]) if len(fila) > 1 else None
+        if encabezado:
+            año = int(encabezado.group(1))
+        elif año is not None and fila and fila[0].strip() == '1':
+            tablas[año] = (_numero(fila[1]), _numero(fila[2]))
+    return tablas
+
+
+def leer_tablas_ley73(carpeta: str = CARPETA_CSV) -> Tuple[List[Tuple[float, float, float, float]], Dict[int, float]]:
+    """
+    Rangos Ley 73 (mínimo, máximo, cuantía %, incremento %) y porcentaje por edad
+
+    Ambas tablas están lado a lado debajo del encabezado "De:,A:,Cuantía Básica".
+    El último rango no tiene máximo (sin límite).
+    """
+    filas = list(csv.reader(_leer_lineas(carpeta, ARCHIVO_TABLAS_LEY73)))
+    inicio = next((i for i, fila in enumerate(filas) if fila[:2] == ['De:', 'A:']), None)
+    if inicio is None:
+        raise ErrorDatosReferencia(f'{ARCHIVO_TABLAS_LEY73}: no se encontró la tabla "De:, A:"')
+
+    rangos, edades = [], {}
+    for fila in filas[inicio + 1:]:
+        if len(fila) < 4 or not fila[0].strip():
+            break
+        maximo = _numero(fila[1]) if fila[1].strip() else float('inf')
+        rangos.append((_numero(fila[0]), maximo, _numero(fila[2]), _numero(fila[3])))
+        if len(fila) > 6 and fila[5].strip().isdigit() and fila[6].strip().endswith('%'):
+            edades[int(fila[5])] = _numero(fila[6]) / 100
+    return rangos, edades
+
+
+# ==================== VALIDACIÓN ====================
+
+def validar_datos(datos: DatosReferencia, tasas_tablas_uma: Optional[Dict[int, Tuple[float, float]]] = None) -> None:
+    """
+    Revisar que las tablas sean consistentes
+
+    Args:
+        datos: Tablas de una versión
+        tasas_tablas_uma: (UMA mensual, tasa) por año de la tabla de
+            inversión por UMAs, para cruzar las tasas entre archivos
+
+    Raises:
+        ErrorDatosReferencia: con todos los problemas encontrados
+    """
+    problemas = []
+
+    # Tasas: años consecutivos, crecientes, con el mismo incremento anual
+    # (la reforma de 2020 sube la tasa en partes iguales hasta 2030)
+    años = datos.tasas_años
+    if list(años) != list(range(años[0], años[0] + len(años))):
+        problemas.append(f'Años de tasas no consecutivos: {años}')
+    if any(not 0 < tasa < 100 for tasa in datos.tasas_pct):
+        problemas.append('Tasa Modalidad 40 fuera de 0-100%')
+    incrementos = [b - a for a, b in zip(datos.tasas_pct, datos.tasas_pct[1:])]
+    if any(incremento < 0 for incremento in incrementos):
+        problemas.append('Las tasas Modalidad 40 no pueden bajar')
+    subidas = [incremento for incremento in incrementos if incremento > 0]
+    if subidas and max(subidas) - min(subidas) > 0.01:
+        años_raros = [años[i + 1] for i, incremento in enumerate(incrementos)
+                      if incremento > 0 and abs(incremento - sorted(subidas)[len(subidas) // 2]) > 0.01]
+        problemas.append(f'Incremento anual de tasa distinto al resto en {años_raros}')
+    for año, (_, tasa) in sorted((tasas_tablas_uma or {}).items()):
+        if año in años and abs(tasa - datos.tasas_pct[años.index(año)]) > 0.0005:
+            problemas.append(f'Tasa {año}: {tasa}% en {ARCHIVO_UMA_MENSUAL} vs '
+                             f'{datos.tasas_pct[años.index(año)]}% en {ARCHIVO_TASAS}')
+
+    # UMA: creciente y la diaria 2025 = mensual / 30.4
+    if any(b <= a for a, b in zip(datos.uma_diaria, datos.uma_diaria[1:])):
+        problemas.append('La UMA diaria debe crecer cada año')
+    if 2025 not in datos.uma_años:
+        problemas.append('Falta la UMA 2025')
+    elif round(datos.uma_mensual_2025 / 30.4, 2) != datos.uma_diaria_2025:
+        problemas.append(f'UMA mensual 2025 {datos.uma_mensual_2025} no corresponde a la diaria {datos.uma_diaria_2025}')
+
+    # Ley 73: rangos contiguos al centavo, cuantía decreciente, incremento creciente
+    if not datos.ley73_maximos or datos.ley73_maximos[-1] != float('inf'):
+        problemas.append('El último rango Ley 73 debe quedar abierto')
+    for i in range(1, len(datos.ley73_minimos)):
+        if abs(datos.ley73_minimos[i] - (datos.ley73_maximos[i - 1] + 0.01)) > 1e-9:
+            problemas.append(f'Rango Ley 73 {i + 1} no continúa al anterior')
+        if datos.ley73_cuantias[i] >= datos.ley73_cuantias[i - 1]:
+            problemas.append(f'Cuantía básica del rango {i + 1} no decrece')
+        if datos.ley73_incrementos[i] <= datos.ley73_incrementos[i - 1]:
+            problemas.append(f'Incremento anual del rango {i + 1} no crece')
+
+    # Edad: 60 a 65 con porcentaje creciente hasta 100%
+    if datos.edades != tuple(range(60, 66)):
+        problemas.append(f'Tabla de edad incompleta: {datos.edades}')
+    if any(b <= a for a, b in zip(datos.factores_edad, datos.factores_edad[1:])) or datos.factores_edad[-1] != 1.0:
+        problemas.append('Porcentaje por edad debe crecer hasta 100% a los 65')
+
+    if problemas:
+        raise ErrorDatosReferencia(f'Datos de referencia {datos.version} inválidos: ' + '; '.join(problemas))
+
+
+# ==================== COMPILACIÓN Y SNAPSHOT ====================
+
+def compilar_desde_csv(carpeta: str = CARPETA_CSV) -> Dict[str, DatosReferencia]:
+    """
+    Leer y validar los CSV y armar cada versión
+
+    Returns:
+        Dictionary versión -> DatosReferencia
+
+    Raises:
+        ErrorDatosReferencia: si falta un archivo o los datos no son consistentes
+    """
+    tasas = leer_tasas(carpeta)
+    tablas_uma = leer_tablas_uma(carpeta)
+    rangos, edades = leer_tablas_ley73(carpeta)
+    if 2025 not in tablas_uma:
+        raise ErrorDatosReferencia(f'{ARCHIVO_UMA_MENSUAL}: falta el bloque de 2025')
+
+    versiones = {}
+    for version, vigente_desde in VERSIONES:
+        datos = DatosReferencia(
+            version=version,
+            vigente_desde=vigente_desde,
+            uma_mensual_2025=tablas_uma[2025][0],
+            uma_años=tuple(sorted(UMA_DIARIA)),
+            uma_diaria=tuple(UMA_DIARIA[año] for año in sorted(UMA_DIARIA)),
+            inflacion_años=tuple(sorted(INFLACION_PROYECTADA)),
+            inflacion_pct=tuple(INFLACION_PROYECTADA[año] for año in sorted(INFLACION_PROYECTADA)),
+            tasas_años=tuple(sorted(tasas)),
+            tasas_pct=tuple(tasas[año] for año in sorted(tasas)),
+            ley73_minimos=tuple(rango[0] for rango in rangos),
+            ley73_maximos=tuple(rango[1] for rango in rangos),
+            ley73_cuantias=tuple(rango[2] for rango in rangos),
+            ley73_incrementos=tuple(rango[3] for rango in rangos),
+            edades=tuple(sorted(edades)),
+            factores_edad=tuple(edades[edad] for edad in sorted(edades)),
+        )
+        validar_datos(datos, tablas_uma)
+        versiones[version] = datos
+    return versiones
+
+
+def _firma_fuentes(carpeta: str) -> Optional[Tuple]:
+    """Tamaño y fecha de modificación de cada CSV (None si falta alguno)"""
+    try:
+        return tuple(
+            (archivo, os.stat(os.path.join(carpeta, archivo)).st_size,
+             os.stat(os.path.join(carpeta, archivo)).st_mtime_ns)
+            for archivo in FUENTES
+        )
+    except OSError:
+        return None
+
+
+def guardar_snapshot(versiones: Dict[str, DatosReferencia], carpeta: str = CARPETA_CSV,
+                     ruta: str = RUTA_SNAPSHOT) -> None:
+    """Escribir el snapshot de forma atómica (otro proceso nunca lee uno a medias)"""
+    contenido = {'formato': FORMATO_SNAPSHOT, 'fuentes': _firma_fuentes(carpeta), 'versiones': versiones}
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            pickle.dump(contenido, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(temporal, 0o644)  # mkstemp crea 0600: otro usuario (el de la app) no podría leerlo
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def cargar_versiones(carpeta: str = CARPETA_CSV, ruta: str = RUTA_SNAPSHOT) -> Dict[str, DatosReferencia]:
+    """
+    Versiones de los datos: del snapshot si está al día, si no de los CSV
+
+    Si faltan los CSV (imagen sin la carpeta de Excel) se usa el snapshot
+    tal cual. Si no se puede escribir el snapshot se sigue sin él.
+
+    Raises:
+        ErrorDatosReferencia: si no hay snapshot utilizable ni CSV válidos
+    """
+    firma = _firma_fuentes(carpeta)
+    try:
+        with open(ruta, 'rb') as f:
+            contenido = pickle.load(f)
+        if contenido['formato'] == FORMATO_SNAPSHOT and (firma is None or contenido['fuentes'] == firma):
+            return contenido['versiones']
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, AttributeError, TypeError):
+        pass
+
+    versiones = compilar_desde_csv(carpeta)
+    try:
+        guardar_snapshot(versiones, carpeta, ruta)
+    except OSError:
+        pass  # Sistema de archivos de solo lectura: cada proceso lee los CSV
+    return versiones
+
+
+@lru_cache(maxsize=None)
+def _versiones() -> Dict[str, DatosReferencia]:
+    return cargar_versiones()
+
+
+def datos_referencia(version: str) -> DatosReferencia:
+    """
+    Tablas de una versión (se cargan una vez por proceso)
+
+    Raises:
+        KeyError: si la versión no existe
+    """
+    return _versiones()[version]
+
+
+def versiones_disponibles() -> Tuple[str, ...]:
+    """Versiones registradas, de la más antigua a la más reciente"""
+    return tuple(version for version, _ in VERSIONES)
+
+
+def version_vigente(fecha: Optional[date] = None) -> str:
+    """
+    Versión en vigor en una fecha (la más reciente que ya entró en vigor)
+
+    Antes de la primera versión regresa la primera.
+    """
+    fecha = fecha or date.today()
+    vigentes = [version for version, desde in sorted(VERSIONES, key=lambda v: v[1]) if desde <= fecha]
+    return vigentes[-1] if vigentes else VERSIONES[0][0]
+
+
+if __name__ == "__main__":
+    if '--compilar' in sys.argv:
+        # Como script las clases de este archivo son __main__.DatosReferencia y
+        # la app no podría cargar el pickle: se usa el módulo por su nombre
+        import Datos_Referencia_Modalidad40 as modulo
+        versiones = modulo.compilar_desde_csv()
+        modulo.guardar_snapshot(versiones)
+        print(f"✅ Snapshot {modulo.RUTA_SNAPSHOT}: versiones {', '.join(versiones)}")
+    else:
+        for version, datos in cargar_versiones().items():
+            print(f"📋 Versión {version} (vigente desde {datos.vigente_desde})")
+            print(f"   UMA 2025: ${datos.uma_diaria_2025} diaria, ${datos.uma_mensual_2025} mensual")
+            print(f"   Tasas: {datos.tasas_modalidad40()}")
+            print(f"   Rangos Ley 73: {len(datos.ley73_maximos)}, edades: {datos.tabla_edad()}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test de los endpoints de datos de referencia: /api/topes con la forma de
+siempre, UMA, tasas, tramos Ley 73 y factores de edad precalculados por
+versión, ETag fuerte, Cache-Control y 304
+"""
+
+import sys
+import os
+import json
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from api_referencia import MAX_AGE, respuestas_referencia
+
+RUTAS = ('/api/topes', '/api/uma', '/api/tasas-modalidad40', '/api/tramos-ley73', '/api/factores-edad')
+
+
+def _cliente():
+    import app as webapp
+    return webapp, webapp.app.test_client()
+
+
+def test_topes_misma_forma():
+    """/api/topes trae los mismos bytes que el jsonify de antes"""
+    print("🧪 Testing /api/topes")
+    webapp, cliente = _cliente()
+    calc = webapp.obtener_calculadora()
+    antes = {
+        'uma_diaria_2025': calc.uma_diaria_2025,
+        'uma_mensual_2025': calc.uma_mensual_2025,
+        'tope_diario_maximo': calc.tope_diario_2025,
+        'tope_mensual_maximo': calc.tope_diario_2025 * 30.4,
+        'minimo_garantizado_diario': calc.minimo_garantizado_diario,
+        'minimo_garantizado_mensual': calc.minimo_garantizado_mensual,
+        'tasas_modalidad40': dict(calc.tasas_modalidad40),
+    }
+    respuesta = cliente.get('/api/topes')
+    assert respuesta.status_code == 200 and respuesta.mimetype == 'application/json'
+    assert respuesta.data == (json.dumps(antes, sort_keys=True, separators=(',', ':')) + '\n').encode('ascii')
+    print(f"   ✅ Tope diario {respuesta.get_json()['tope_diario_maximo']}")
+
+
+def test_contenido_de_referencia():
+    """UMA, tasas, tramos y factores de edad de la versión vigente"""
+    webapp, cliente = _cliente()
+    version = webapp.obtener_calculadora().parametros.version
+
+    uma = cliente.get('/api/uma').get_json()
+    assert uma['version'] == version
+    assert uma['uma_diaria']['2025'] == 113.14
+    assert '2030' in uma['inflacion_proyectada_pct']
+
+    tasas = cliente.get('/api/tasas-modalidad40').get_json()
+    assert tasas['tasas_pct']['2030'] == 18.8
+
+    tramos = cliente.get('/api/tramos-ley73').get_json()['tramos']
+    assert tramos[0] == {'rango_min': 0.0, 'rango_max': 1.0, 'cuantia_basica': 80.0, 'incremento_anual': 0.56}
+    assert all(anterior['rango_max'] < siguiente['rango_max'] for anterior, siguiente in zip(tramos, tramos[1:]))
+
+    edad = cliente.get('/api/factores-edad').get_json()
+    assert edad['factores'] == {'60': 0.75, '61': 0.8, '62': 0.85, '63': 0.9, '64': 0.95, '65': 1.0}
+    assert edad['incremento_vejez_pct'] == 11.0
+
+
+def test_etag_y_304():
+    """ETag fuerte y Cache-Control largo; If-None-Match igual -> 304 sin cuerpo"""
+    print("🧪 Testing ETag revalidation")
+    webapp, cliente = _cliente()
+    etags = set()
+    for ruta in RUTAS:
+        respuesta = cliente.get(ruta)
+        etag, debil = respuesta.get_etag()
+        assert etag and not debil, ruta
+        assert respuesta.cache_control.public and respuesta.cache_control.max_age == MAX_AGE
+        etags.add(etag)
+
+        revalidada = cliente.get(ruta, headers={'If-None-Match': f'"{etag}"'})
+        assert revalidada.status_code == 304 and revalidada.data == b'', ruta
+        assert revalidada.headers['ETag'] == f'"{etag}"'
+
+        otra = cliente.get(ruta, headers={'If-None-Match': '"otra-version"'})
+        assert otra.status_code == 200 and otra.data == respuesta.data
+    assert len(etags) == len(RUTAS)
+    print(f"   ✅ {len(RUTAS)} endpoints con ETag y 304")
+
+
+def test_bytes_una_vez_por_version():
+    """Los cuerpos se arman una sola vez por versión y el ETag depende del contenido"""
+    webapp, _ = _cliente()
+    parametros = webapp.obtener_calculadora().parametros
+    primera = respuestas_referencia(parametros)
+    assert respuestas_referencia(parametros) is primera
+    assert primera['/api/topes'].etag.startswith(parametros.version + '-')
+    assert primera['/api/topes'].version == parametros.version
+
+
+if __name__ == "__main__":
+    test_topes_misma_forma()
+    test_contenido_de_referencia()
+    test_etag_y_304()
+    test_bytes_una_vez_por_version()
+    print("\n🎉 REFERENCE DATA API TESTS PASSED!")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test del arranque de la app: reportlab y NumPy no se importan al cargar
+app.py, y /api/arranque reporta el costo de cada etapa
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+webapp_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+calculadoras_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'calculadoras-python'))
+for ruta in (webapp_path, calculadoras_path):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+# Se ejecuta en un intérprete limpio: los demás tests ya importaron reportlab
+SCRIPT_ARRANQUE = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import app
+reporte = app.app.test_client().get('/api/arranque').get_json()
+print(json.dumps({
+    'reportlab': 'reportlab' in sys.modules,
+    'numpy': 'numpy' in sys.modules,
+    'reporte': reporte,
+}))
+"""
+
+
+def test_arranque_sin_dependencias_pesadas():
+    """Importar la app no carga reportlab ni NumPy"""
+    print("🧪 Testing lazy imports at startup")
+    entorno = dict(os.environ, WARMUP_DELAY='-1', LOG_LEVEL='WARNING')
+    salida = subprocess.run(
+        [sys.executable, '-c', SCRIPT_ARRANQUE, webapp_path],
+        capture_output=True, text=True, env=entorno, timeout=120, check=True
+    )
+    resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+
+    assert resultado['reportlab'] is False
+    assert resultado['numpy'] is False
+    reporte = resultado['reporte']
+    assert [etapa['etapa'] for etapa in reporte['etapas']] == ['flask', 'modulos webapp', 'calculadora', 'app']
+    assert reporte['listo_en_ms'] > 0
+    assert reporte['diferidas'] == []
+    print(f"   ✅ App lista en {reporte['listo_en_ms']} ms sin reportlab ni NumPy")
+
+
+def test_preparar_proceso_una_vez():
+    """La preparación de PDF se hace una vez y su costo queda registrado"""
+    print("🧪 Testing PDF process preparation")
+    from reporte_pdf import preparar_proceso
+
+    primera = preparar_proceso()
+    assert primera > 0
+    assert preparar_proceso() == primera
+    assert 'reportlab' in sys.modules
+    print(f"   ✅ reportlab + tema en {primera * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    test_arranque_sin_dependencias_pesadas()
+    test_preparar_proceso_una_vez()
+    print("\n🎉 STARTUP TESTS PASSED!")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test del motor vectorizado (lote) contra la calculadora escalar
+Cada fila del lote debe coincidir exactamente con calcular_escenario_completo
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the calculadoras-python directory to the Python path
+calculadoras_path = os.path.join(os.path.dirname(__file__), '..', 'calculadoras-python')
+if calculadoras_path not in sys.path:
+    sys.path.insert(0, calculadoras_path)
+
+from Calculadora_Modalidad_40_CORREGIDA import CalculadoraModalidad40Corregida
+from Calculadora_Modalidad_40_Lote import (
+    calcular_escenarios_lote, ERROR_NINGUNO, ERROR_EXCEDE_TOPE, ERROR_EDAD_MAXIMA,
+    ERROR_SEMANAS_MINIMAS, ERROR_AÑO_SIN_TASA, ERROR_SIN_BENEFICIO, ERROR_EDAD_PENSION
+)
+
+
+def _clientes_aleatorios(n, semilla=2025):
+    """Generar una cartera de clientes con distribuciones realistas"""
+    rng = np.random.default_rng(semilla)
+    edad_actual = rng.integers(50, 65, n)
+    return {
+        'semanas_cotizadas_actuales': rng.integers(300, 2200, n),
+        'sdp_actual_diario': np.round(rng.uniform(150, 2500, n), 2),
+        'sbc_modalidad40_diario': np.round(rng.uniform(200, 2900, n), 2),
+        'edad_actual': edad_actual,
+        'edad_pension': np.minimum(edad_actual + rng.integers(1, 9, n), 67),
+        'tiene_esposa': rng.random(n) < 0.6,
+        'num_hijos_dependientes': rng.integers(0, 3, n),
+        'tiene_padres_dependientes': rng.random(n) < 0.2,
+        'mes_nacimiento': rng.integers(1, 13, n),
+        'año_inicio': rng.choice([2025, 2025, 2025, 2026, 2027], n),
+    }
+
+
+def _escalar(calc, clientes, i):
+    """Evaluar la fila i con la calculadora escalar"""
+    return calc.calcular_escenario_completo(
+        semanas_cotizadas_actuales=int(clientes['semanas_cotizadas_actuales'][i]),
+        sdp_actual_diario=float(clientes['sdp_actual_diario'][i]),
+        sbc_modalidad40_diario=float(clientes['sbc_modalidad40_diario'][i]),
+        edad_pension=int(clientes['edad_pension'][i]),
+        tiene_esposa=bool(clientes['tiene_esposa'][i]),
+        num_hijos_dependientes=int(clientes['num_hijos_dependientes'][i]),
+        tiene_padres_dependientes=bool(clientes['tiene_padres_dependientes'][i]),
+        año_inicio=int(clientes['año_inicio'][i]),
+        edad_actual=int(clientes['edad_actual'][i]),
+        mes_nacimiento=int(clientes['mes_nacimiento'][i]),
+    )
+
+
+def test_lote_coincide_con_escalar():
+    """Cada fila del lote reproduce exactamente el cálculo escalar (o su error)"""
+    print("🧪 Testing batch engine vs scalar calculator")
+    calc = CalculadoraModalidad40Corregida()
+    clientes = _clientes_aleatorios(3000)
+    # Una de cada 20 filas ya tiene (o rebasó) la edad de pensión
+    clientes['edad_pension'][::20] = clientes['edad_actual'][::20] - np.arange(150) % 5
+    lote = calcular_escenarios_lote(calculadora=calc, **clientes)
+
+    validos = rebasadas = 0
+    for i in range(3000):
+        codigo = lote['codigo_error'][i]
+        if clientes['edad_pension'][i] <= clientes['edad_actual'][i]:
+            # La versión escalar paga meses negativos (o lanza KeyError con
+            # menos de 500 semanas finales): el lote la marca como error
+            if clientes['sbc_modalidad40_diario'][i] > calc.tope_diario_2025:
+                assert codigo == ERROR_EXCEDE_TOPE, f"fila {i}: código {codigo}"
+            else:
+                assert codigo == ERROR_EDAD_PENSION, f"fila {i}: código {codigo}"
+            assert not lote['valido'][i] and np.isnan(lote['pension_con_mod40'][i])
+            rebasadas += 1
+            continue
+        try:
+            resultado = _escalar(calc, clientes, i)
+        except ValueError:
+            assert codigo == ERROR_AÑO_SIN_TASA, f"fila {i}: código {codigo}"
+            continue
+        except KeyError:
+            assert codigo == ERROR_SEMANAS_MINIMAS, f"fila {i}: código {codigo}"
+            continue
+        except ZeroDivisionError:
+            assert codigo == ERROR_SIN_BENEFICIO, f"fila {i}: código {codigo}"
+            continue
+
+        if 'error' in resultado:
+            assert codigo in (ERROR_EXCEDE_TOPE, ERROR_EDAD_MAXIMA), f"fila {i}: código {codigo}"
+            continue
+
+        assert codigo == ERROR_NINGUNO, f"fila {i}: código {codigo}"
+        validos += 1
+        assert lote['pension_sin_mod40'][i] == resultado['sin_modalidad40']['pension_final_mensual']
+        assert lote['pension_con_mod40'][i] == resultado['con_modalidad40']['pension_final_mensual']
+        assert lote['inversion_total'][i] == resultado['inversion']['total_años']
+        assert lote['promedio_mensual'][i] == resultado['inversion']['promedio_mensual']
+        assert lote['roi_anual_pct'][i] == resultado['analisis_roi']['roi_anual_pct']
+        assert lote['años_recuperacion'][i] == resultado['analisis_roi']['años_recuperacion']
+
+    print(f"   ✅ {validos} filas válidas idénticas, {3000 - validos} errores coincidentes "
+          f"({rebasadas} sin años hasta la pensión)")
+    assert validos > 1000 and rebasadas == 150
+
+
+def test_lote_sin_mes_nacimiento_ni_edad():
+    """Los respaldos de la versión escalar (sin edad_actual / sin mes) también coinciden"""
+    calc = CalculadoraModalidad40Corregida()
+    lote = calcular_escenarios_lote(
+        semanas_cotizadas_actuales=[758, 1100, 1500],
+        sdp_actual_diario=[222.02, 500, 900],
+        sbc_modalidad40_diario=[2828.50, 1200, 2000],
+        edad_pension=[65, 63, 60],
+        calculadora=calc,
+    )
+    for i, (s, sdp, sbc, edad) in enumerate([(758, 222.02, 2828.50, 65), (1100, 500, 1200, 63), (1500, 900, 2000, 60)]):
+        resultado = calc.calcular_escenario_completo(s, sdp, sbc, edad)
+        assert lote['pension_con_mod40'][i] == resultado['con_modalidad40']['pension_final_mensual']
+        assert lote['inversion_total'][i] == resultado['inversion']['total_años']
+
+
+def test_lote_mas_rapido_que_escalar():
+    """El lote debe ser al menos 50x más rápido por fila"""
+    calc = CalculadoraModalidad40Corregida()
+    # Cartera de escenarios válidos (los errores cortan la versión escalar antes)
+    clientes = _clientes_aleatorios(200_000, semilla=7)
+    clientes['semanas_cotizadas_actuales'] = clientes['semanas_cotizadas_actuales'] + 500
+    clientes['edad_pension'] = np.minimum(clientes['edad_pension'], 65)
+    clientes['sbc_modalidad40_diario'] = np.minimum(clientes['sbc_modalidad40_diario'], calc.tope_diario_2025)
+    calcular_escenarios_lote(calculadora=calc, **_clientes_aleatorios(1000))  # calentamiento
+
+    # Mejor de 3 mediciones intercaladas para tolerar ruido del equipo
+    muestra = 1000
+    por_fila_lote = por_fila_escalar = float('inf')
+    for _ in range(3):
+        inicio = time.perf_counter()
+        calcular_escenarios_lote(calculadora=calc, **clientes)
+        por_fila_lote = min(por_fila_lote, (time.perf_counter() - inicio) / 200_000)
+
+        inicio = time.perf_counter()
+        for i in range(muestra):
+            try:
+                _escalar(calc, clientes, i)
+            except (KeyError, ValueError, ZeroDivisionError):
+                pass
+        por_fila_escalar = min(por_fila_escalar, (time.perf_counter() - inicio) / muestra)
+
+    aceleracion = por_fila_escalar / por_fila_lote
+    print(f"   ⚡ Aceleración por fila: {aceleracion:.0f}x")
+    assert aceleracion >= 50
+
+
+if __name__ == "__main__":
+    test_lote_coincide_con_escalar()
+    test_lote_sin_mes_nacimiento_ni_edad()
+    test_lote_mas_rapido_que_escalar()
+    print("\n🎉 BATCH ENGINE TESTS PASSED!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test del endpoint /calcular-lote (arreglo JSON, CSV y archivo subido)
+Respuesta NDJSON: una línea por fila, mismos resultados que /calcular
+"""
+
+import sys
+import os
+import io
+import json
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from calculo_lote import iterar_filas_csv, iterar_filas_json
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 60, 'edad_pension': 65,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+CSV_PUNTO_Y_COMA = (
+    'id;semanas_cotizadas;sdp_actual;sbc_modalidad40;edad_actual;edad_pension;'
+    'mes_inicio_cotizacion;año_inicio_cotizacion;tiene_esposa\n'
+    'a;1000;500;2000;60;65;3;1990;no\n'
+    'b;1000;500;2000;60;65;3;1990;sí\n'
+    '\n'
+    'c;400;500;2000;60;65;3;1990;no\n'
+)
+
+
+def _cliente():
+    import app as webapp
+    return webapp.app.test_client()
+
+
+def _lineas(respuesta):
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'application/x-ndjson'
+    return [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+
+
+def test_iterar_filas_json_en_trozos():
+    """El arreglo se decodifica aunque las lecturas corten elementos a la mitad"""
+    print("🧪 Testing incremental JSON array reader")
+    filas = [dict(PERSONA, id=i) for i in range(50)] + [1.5, 'x']
+    flujo = io.BytesIO(json.dumps(filas, ensure_ascii=False).encode('utf-8'))
+    assert list(iterar_filas_json(flujo, tamaño_lectura=7)) == filas
+    assert list(iterar_filas_json(io.BytesIO(b' [ ] '))) == []
+    print("   ✅ 52 elementos leídos de 7 en 7 bytes")
+
+
+def test_lote_json_igual_a_calcular():
+    """Cada fila válida da los mismos números que /calcular"""
+    print("🧪 Testing /calcular-lote with a JSON array")
+    cliente = _cliente()
+    individual = cliente.post('/calcular', json=PERSONA).get_json()
+
+    lineas = _lineas(cliente.post('/calcular-lote', json=[
+        dict(PERSONA, id='ok'),
+        dict(PERSONA, edad_pension=70),
+        'no es un objeto',
+    ]))
+    assert [linea['fila'] for linea in lineas] == [1, 2, 3]
+
+    valida = lineas[0]
+    assert valida['ok'] and valida['id'] == 'ok'
+    assert valida['pension_con_mod40'] == individual['con_modalidad40']['pension_total']
+    assert valida['pension_sin_mod40'] == individual['sin_modalidad40']['pension_total']
+    assert valida['inversion_total'] == individual['inversion']['total_años']
+    assert valida['roi_anual'] == individual['analisis_roi']['roi_anual']
+
+    assert lineas[1] == {'fila': 2, 'ok': False,
+                         'error': 'Edad máxima legal para pensión: 65 años (límite IMSS)'}
+    assert not lineas[2]['ok']
+    print(f"   ✅ Pensión con M40: ${valida['pension_con_mod40']:,.0f} (igual que /calcular)")
+
+
+def test_lote_csv_en_cuerpo():
+    """CSV con ';', casillas 'sí'/'no' y renglones vacíos ignorados"""
+    print("🧪 Testing /calcular-lote with a CSV body")
+    filas = list(iterar_filas_csv(io.BytesIO(CSV_PUNTO_Y_COMA.encode('utf-8'))))
+    assert [fila['tiene_esposa'] for fila in filas] == [False, True, False]
+
+    cliente = _cliente()
+    con_esposa = cliente.post('/calcular', json=dict(PERSONA, tiene_esposa=True)).get_json()
+    lineas = _lineas(cliente.post(
+        '/calcular-lote', data=CSV_PUNTO_Y_COMA.encode('utf-8'), content_type='text/csv'
+    ))
+    assert [linea['id'] for linea in lineas] == ['a', 'b', 'c']
+    assert lineas[0]['ok'] and lineas[1]['ok']
+    assert lineas[1]['pension_con_mod40'] == con_esposa['con_modalidad40']['pension_total']
+    assert lineas[2]['error'] == 'Se requieren mínimo 500 semanas cotizadas para acceder a pensión'
+    print("   ✅ 3 filas, 1 rechazada por semanas")
+
+
+def test_lote_archivo_subido():
+    """Archivo CSV o JSON en el campo 'archivo' de un formulario"""
+    print("🧪 Testing /calcular-lote with an uploaded file")
+    cliente = _cliente()
+    lineas = _lineas(cliente.post('/calcular-lote', data={
+        'archivo': (io.BytesIO(CSV_PUNTO_Y_COMA.encode('utf-8')), 'personas.csv'),
+    }, content_type='multipart/form-data'))
+    assert len(lineas) == 3 and lineas[0]['ok']
+
+    lineas = _lineas(cliente.post('/calcular-lote', data={
+        'archivo': (io.BytesIO(json.dumps([PERSONA]).encode('utf-8')), 'personas.json'),
+    }, content_type='multipart/form-data'))
+    assert len(lineas) == 1 and lineas[0]['ok']
+    print("   ✅ personas.csv y personas.json")
+
+
+def test_lote_json_invalido():
+    """Un arreglo roto termina con una línea de error; otro formato es 415"""
+    print("🧪 Testing /calcular-lote with invalid input")
+    cliente = _cliente()
+    cuerpo = '[' + json.dumps(PERSONA) + ', {"semanas_cotizadas": '
+    lineas = _lineas(cliente.post('/calcular-lote', data=cuerpo, content_type='application/json'))
+    assert lineas[0]['ok']
+    assert lineas[-1] == {'fila': None, 'ok': False, 'error': 'Arreglo JSON inválido o incompleto'}
+
+    respuesta = cliente.post('/calcular-lote', data=b'<xml/>', content_type='application/xml')
+    assert respuesta.status_code == 415
+    print("   ✅ Error de formato reportado al final")
+
+
+if __name__ == "__main__":
+    test_iterar_filas_json_en_trozos()
+    test_lote_json_igual_a_calcular()
+    test_lote_csv_en_cuerpo()
+    test_lote_archivo_subido()
+    test_lote_json_invalido()
+    print("\n🎉 BATCH ENDPOINT TESTS PASSED!")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test del calendario mensual de Modalidad 40: días reales por mes, costos de
+cualquier rango de meses con sumas acumuladas, y el mismo resultado en la
+calculadora escalar, el motor de lote y /calcular
+"""
+
+import sys
+import os
+import random
+
+import numpy as np
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from Calculadora_Modalidad_40_CORREGIDA import CalendarioModalidad40, obtener_calculadora
+from Calculadora_Modalidad_40_Lote import (
+    calcular_escenarios_lote, ERROR_NINGUNO, ERROR_SEMANAS_MINIMAS, ERROR_AÑO_SIN_TASA,
+    ERROR_SIN_BENEFICIO, ERROR_SIN_MESES
+)
+
+ARGUMENTOS = dict(
+    semanas_cotizadas_actuales=1000, sdp_actual_diario=500.0, sbc_modalidad40_diario=2000.0,
+    edad_pension=65, tiene_esposa=True, num_hijos_dependientes=1, tiene_padres_dependientes=False,
+    año_inicio=2025, edad_actual=60, mes_nacimiento=3, mes_inicio_modalidad40=4,
+)
+
+
+def test_calendario_dias_reales():
+    """Cada mes cobra sus días reales y cualquier rango sale de las sumas acumuladas"""
+    print("🧪 Testing month-by-month calendar")
+    calc = obtener_calculadora()
+
+    # Febrero bisiesto
+    febrero = CalendarioModalidad40(calc, 2000, 2028, 2, 2028, 2)
+    assert len(febrero) == 1 and febrero.dias_rango() == 29
+    assert febrero.meses()[0]['costo'] == calc.calcular_costo_mensual(2000, 2028, 29)
+
+    calendario = CalendarioModalidad40(calc, 2000, 2025, 4, 2030, 3)
+    meses = calendario.meses()
+    assert len(meses) == len(calendario) == 60
+    assert (meses[0]['año'], meses[0]['mes'], meses[-1]['año'], meses[-1]['mes']) == (2025, 4, 2030, 3)
+    assert calendario.dias_rango() == sum(mes['dias'] for mes in meses) == 1826
+    assert calendario.semanas_rango() == 1826 // 7
+
+    random.seed(14)
+    for _ in range(200):
+        desde = random.randint(0, 59)
+        hasta = random.randint(desde, 60)
+        esperado = sum(mes['costo'] for mes in meses[desde:hasta])
+        assert abs(calendario.costo_rango(desde, hasta) - esperado) < 1e-6
+        assert calendario.dias_rango(desde, hasta) == sum(mes['dias'] for mes in meses[desde:hasta])
+
+    # El desglose anual suma el total y conserva el formato de calcular_inversion_total_años
+    resumen = calendario.resumen_inversion()
+    desglose = resumen['desglose_anual']
+    assert sorted(desglose) == [2025, 2026, 2027, 2028, 2029, 2030]
+    assert [desglose[año]['meses_pagados'] for año in sorted(desglose)] == [9, 12, 12, 12, 12, 3]
+    assert abs(sum(d['costo_anual'] for d in desglose.values()) - resumen['total_años']) < 1e-6
+    assert resumen['periodo'] == {'año_inicio': 2025, 'mes_inicio': 4, 'año_fin': 2030, 'mes_fin': 3,
+                                  'dias': 1826, 'semanas': 260}
+    print(f"   ✅ 60 meses, {resumen['periodo']['semanas']} semanas, ${resumen['total_años']:,.2f}")
+
+
+def test_calendario_hasta_edad_pension():
+    """El calendario termina en el mes del cumpleaños y se recorta al último año con tasa"""
+    calc = obtener_calculadora()
+
+    # Nacido en marzo, inicia en abril: el siguiente cumpleaños es el año siguiente
+    calendario = CalendarioModalidad40.hasta_edad_pension(calc, 2000, 2025, 4, 63, 65, 3)
+    periodo = calendario.resumen_inversion()['periodo']
+    assert (periodo['año_fin'], periodo['mes_fin']) == (2027, 3)
+    assert len(calendario) == 24
+
+    # Sin mes de nacimiento paga hasta diciembre
+    calendario = CalendarioModalidad40.hasta_edad_pension(calc, 2000, 2025, 4, 63, 65)
+    assert len(calendario) == 9 + 12
+
+    # Más allá de la tabla de tasas se recorta a diciembre de 2030
+    calendario = CalendarioModalidad40.hasta_edad_pension(calc, 2000, 2025, 1, 55, 65, 6)
+    periodo = calendario.resumen_inversion()['periodo']
+    assert (periodo['año_fin'], periodo['mes_fin'], len(calendario)) == (2030, 12, 72)
+
+    for argumentos in ((2000, 2031, 1, 2031, 6), (2000, 2026, 5, 2026, 4)):
+        try:
+            CalendarioModalidad40(calc, *argumentos)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{argumentos} debería lanzar ValueError")
+
+
+def test_escenario_con_calendario():
+    """El escenario y sus duraciones usan semanas y costos del calendario"""
+    print("🧪 Testing scenario with monthly calendar")
+    calc = obtener_calculadora()
+    escenario = calc.calcular_escenario_completo(calendario_mensual=True, **ARGUMENTOS)
+    calendario = CalendarioModalidad40(calc, 2000, 2025, 4, 2030, 3)
+
+    assert escenario['inputs']['calendario_mensual'] is True
+    assert escenario['inversion']['total_años'] == calendario.costo_rango()
+    assert escenario['con_modalidad40']['semanas_cotizadas'] == 1000 + calendario.semanas_rango()
+
+    # Sin la opción se conserva el cálculo anterior
+    clasico = calc.calcular_escenario_completo(**ARGUMENTOS)
+    assert clasico['inputs']['calendario_mensual'] is False
+    assert 'periodo' not in clasico['inversion']
+
+    duraciones = calc.calcular_escenarios_por_duracion(calendario_mensual=True, **ARGUMENTOS)['duraciones']
+    assert [fila['meses_pagados'] for fila in duraciones] == [9, 21, 33, 45, 57, 60]
+    for fila in duraciones:
+        assert fila['inversion_total'] == calendario.costo_rango(0, fila['meses_pagados'])
+        assert fila['semanas_modalidad40'] == calendario.semanas_rango(0, fila['meses_pagados'])
+    assert duraciones[-1]['pension_final_mensual'] == escenario['con_modalidad40']['pension_final_mensual']
+    print(f"   ✅ {len(duraciones)} duraciones desde el calendario")
+
+
+def test_lote_con_calendario_coincide_con_escalar():
+    """El motor de lote con calendario_mensual reproduce exactamente la versión escalar"""
+    print("🧪 Testing batch engine with monthly calendar")
+    calc = obtener_calculadora()
+    n = 2000
+    rng = np.random.default_rng(14)
+    edad_actual = rng.integers(50, 65, n)
+    clientes = {
+        'semanas_cotizadas_actuales': rng.integers(300, 2200, n),
+        'sdp_actual_diario': np.round(rng.uniform(150, 2500, n), 2),
+        'sbc_modalidad40_diario': np.round(rng.uniform(200, 2800, n), 2),
+        'edad_actual': edad_actual,
+        'edad_pension': np.minimum(edad_actual + rng.integers(0, 9, n), 65),
+        'tiene_esposa': rng.random(n) < 0.6,
+        'num_hijos_dependientes': rng.integers(0, 3, n),
+        'tiene_padres_dependientes': rng.random(n) < 0.2,
+        'mes_nacimiento': rng.integers(0, 13, n),
+        'año_inicio': rng.choice([2025, 2026, 2030, 2031], n),
+        'mes_inicio_modalidad40': rng.integers(1, 13, n),
+    }
+    lote = calcular_escenarios_lote(calculadora=calc, calendario_mensual=True, **clientes)
+
+    validos = 0
+    for i in range(n):
+        argumentos = {nombre: valores[i].item() for nombre, valores in clientes.items()}
+        argumentos['mes_nacimiento'] = argumentos['mes_nacimiento'] or None
+        codigo = lote['codigo_error'][i]
+        try:
+            resultado = calc.calcular_escenario_completo(calendario_mensual=True, **argumentos)
+        except ValueError:
+            assert codigo in (ERROR_AÑO_SIN_TASA, ERROR_SIN_MESES), f"fila {i}: código {codigo}"
+            continue
+        except KeyError:
+            assert codigo == ERROR_SEMANAS_MINIMAS, f"fila {i}: código {codigo}"
+            continue
+        except ZeroDivisionError:
+            assert codigo == ERROR_SIN_BENEFICIO, f"fila {i}: código {codigo}"
+            continue
+
+        assert codigo == ERROR_NINGUNO, f"fila {i}: código {codigo}"
+        validos += 1
+        assert lote['semanas_finales_con_mod40'][i] == resultado['con_modalidad40']['semanas_cotizadas']
+        assert lote['pension_con_mod40'][i] == resultado['con_modalidad40']['pension_final_mensual']
+        assert lote['inversion_total'][i] == resultado['inversion']['total_años']
+        assert lote['promedio_mensual'][i] == resultado['inversion']['promedio_mensual']
+        assert lote['roi_anual_pct'][i] == resultado['analisis_roi']['roi_anual_pct']
+
+    print(f"   ✅ {validos} filas válidas idénticas, {n - validos} errores coincidentes")
+    assert validos > 500
+
+
+def test_api_calcular_con_mes_nacimiento():
+    """/calcular paga hasta el mes de nacimiento enviado por el formulario"""
+    print("🧪 Testing /calcular with birth month")
+    import app as webapp
+    cliente = webapp.app.test_client()
+    persona = {
+        'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+        'edad_actual': 62, 'edad_pension': 65, 'mes_nacimiento': '7', 'mes_inicio_modalidad40': 4,
+        'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+    }
+
+    respuesta = cliente.post('/calcular', json=persona)
+    assert respuesta.status_code == 200
+    resultado = respuesta.get_json()
+    periodo = resultado['inversion']['periodo']
+    assert (periodo['mes_inicio'], periodo['año_fin'], periodo['mes_fin']) == (4, 2027, 7)
+    assert resultado['parametros_calculo']['mes_nacimiento'] == 7
+
+    respuesta = cliente.post('/calcular', json=dict(persona, mes_nacimiento=13))
+    assert respuesta.status_code == 400
+    assert 'mes_nacimiento' in respuesta.get_json()['error']
+    print(f"   ✅ Período {periodo['mes_inicio']:02d}/{periodo['año_inicio']} - {periodo['mes_fin']:02d}/{periodo['año_fin']}")
+
+
+if __name__ == "__main__":
+    test_calendario_dias_reales()
+    test_calendario_hasta_edad_pension()
+    test_escenario_con_calendario()
+    test_lote_con_calendario_coincide_con_escalar()
+    test_api_calcular_con_mes_nacimiento()
+    print("\n🎉 MONTHLY CALENDAR TESTS PASSED!")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test de la prueba de carga local: extracción y anonimización de payloads de
+los exports de Railway, muestra sintética cuando los logs no los traen, y
+una corrida corta contra un servidor en el mismo proceso
+"""
+
+import sys
+import os
+import csv
+import json
+import threading
+
+# Add the webapp, calculadoras-python and benchmarks directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python', 'benchmarks'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+import carga_local
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+    'email': 'ana@ejemplo.com',
+}
+REPORTE = {'nombre': 'Ana', 'apellido_paterno': 'López', 'curp': 'LOAA650412MDFPNN09',
+           'incluir_recomendaciones': True, 'resultados': {'pension': 1}}
+
+
+def _escribir_logs(carpeta):
+    """Un export JSON (app con LOG_FORMAT=json) y uno CSV (formato texto), con ruido de gunicorn"""
+    registro_json = json.dumps({'ts': '2025-12-02T03:30:00.000+00:00', 'nivel': 'INFO', 'logger': 'webapp.payloads',
+                                'mensaje': 'calcular.peticion', 'datos': PERSONA}, ensure_ascii=False)
+    with open(os.path.join(carpeta, 'logs.1.json'), 'w', encoding='utf-8') as f:
+        json.dump([
+            {'message': 'Starting Container', 'attributes': {'level': 'info'}},
+            {'message': registro_json, 'attributes': {'level': 'info'}},
+            {'message': '[2025-12-02 03:29:13 +0000] [1] [INFO] Listening at: http://0.0.0.0:8080 (1)'},
+        ], f)
+
+    linea_texto = ('2025-12-02 03:31:00,000 INFO [webapp.payloads] reporte.peticion '
+                   + json.dumps(REPORTE, ensure_ascii=False))
+    with open(os.path.join(carpeta, 'logs.2.csv'), 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['message', 'attributes', 'tags', 'timestamp'])
+        escritor.writerow(['Traceback (most recent call last):', '{}', '{}', '2025-12-02T03:34:45Z'])
+        escritor.writerow([linea_texto, '{"level":"info"}', '{}', '2025-12-02T03:31:00Z'])
+
+
+def test_extraer_formas_anonimas(tmp_path):
+    """Los payloads se extraen de JSON y CSV sin datos personales ni montos exactos"""
+    print("🧪 Testing payload extraction from Railway exports")
+    _escribir_logs(tmp_path)
+    calculos, reportes = carga_local.extraer_formas(str(tmp_path))
+
+    assert calculos == [{
+        'semanas_cotizadas': 1000, 'sdp_actual': 510.0, 'sbc_modalidad40': 2820.0,
+        'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+        'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+    }]
+    assert reportes == [{'nombre': 'XXX', 'apellido_paterno': 'XXXXX', 'curp': 'X' * 18,
+                         'incluir_recomendaciones': True}]
+    print(f"   ✅ {len(calculos)} cálculo y {len(reportes)} reporte anonimizados")
+
+
+def test_logs_sin_payloads_usan_muestra_sintetica():
+    """Los logs del repo solo tienen el arranque de gunicorn: se usa la muestra sintética"""
+    calculos, reportes = carga_local.extraer_formas()
+    assert calculos == [] and reportes == []
+
+    calculos, reportes = carga_local.formas_sinteticas(n=20)
+    assert len(calculos) == 20 and len(reportes) == 2
+    assert all(set(calculo) <= set(carga_local.CAMPOS_CALCULO) for calculo in calculos)
+
+
+def test_corrida_corta_contra_servidor_local():
+    """Percentiles, throughput y errores por endpoint contra un servidor WSGI local"""
+    print("🧪 Testing short load run")
+    from werkzeug.serving import make_server
+    import app as webapp
+
+    servidor = make_server('127.0.0.1', 0, webapp.app, threaded=True)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        url = f'http://127.0.0.1:{servidor.server_port}'
+        calculos, reportes = carga_local.formas_sinteticas(n=10)
+        calculos.append(dict(calculos[0], semanas_cotizadas=100))  # 400: menos de 500 semanas
+
+        cliente = carga_local._Cliente(url, timeout=30)
+        secuencia = carga_local.preparar_peticiones(cliente, calculos, reportes, 40, 0.1, semilla=3)
+        reporte = carga_local.ejecutar_carga(url, secuencia, concurrencia=4, tasa=200, cliente=cliente)
+    finally:
+        servidor.shutdown()
+
+    calcular = reporte['endpoints']['/calcular']
+    pdf = reporte['endpoints']['/generar-reporte-pdf']
+    assert calcular['peticiones'] + pdf['peticiones'] == 40
+    assert pdf['errores'] == 0
+    assert set(calcular['errores_por_codigo']) <= {'400'}
+    assert calcular['p50_ms'] <= calcular['p95_ms'] <= calcular['p99_ms'] <= calcular['max_ms']
+    assert calcular['throughput_rps'] > 0
+    print(f"   ✅ /calcular p50 {calcular['p50_ms']} ms, PDF p50 {pdf['p50_ms']} ms")
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as carpeta:
+        test_extraer_formas_anonimas(pathlib.Path(carpeta))
+    test_logs_sin_payloads_usan_muestra_sintetica()
+    test_corrida_corta_contra_servidor_local()
+    print("\n🎉 LOAD HARNESS TESTS PASSED!")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test del registro de datos de referencia: lectura de los CSV de Excel,
+validación, snapshot compilado y los mismos valores en todas las calculadoras
+"""
+
+import sys
+import os
+import pickle
+import shutil
+import stat
+import subprocess
+from datetime import date
+from unittest import mock
+
+# Add the calculadoras-python directory to the Python path
+calculadoras_path = os.path.join(os.path.dirname(__file__), '..', 'calculadoras-python')
+if calculadoras_path not in sys.path:
+    sys.path.insert(0, calculadoras_path)
+
+import Datos_Referencia_Modalidad40 as referencia
+from Datos_Referencia_Modalidad40 import ErrorDatosReferencia, compilar_desde_csv, cargar_versiones
+
+
+def _copiar_csv(destino):
+    for archivo in referencia.FUENTES:
+        shutil.copy(os.path.join(referencia.CARPETA_CSV, archivo), destino)
+    return str(destino)
+
+
+def test_lectura_csv():
+    """Los CSV de Excel se leen con BOM, coma decimal, $ y %, y se aplica la fe de erratas"""
+    print("🧪 Testing reference CSV parsing")
+    assert referencia._numero(' $3,439.46 ') == 3439.46
+    assert referencia._numero('14,438', coma_decimal=True) == 14.438
+    assert referencia._numero('13.3470%') == 13.347
+    assert referencia._numero(' $-   ') == 0.0
+
+    datos = compilar_desde_csv()['2025.11']
+    tasas = datos.tasas_modalidad40()
+    assert tasas[2026] == 14.438  # "2026,14,438" en el CSV
+    assert tasas[2030] == 18.800  # el CSV dice 18.000
+    assert datos.uma_mensual_2025 == 3439.46 and datos.uma_diaria_2025 == 113.14
+
+    rangos = datos.tabla_porcentajes_ley73()
+    assert len(rangos) == 22
+    assert rangos[0] == {"rango_min": 0.0, "rango_max": 1.0, "cuantia_basica": 80.0, "incremento_anual": 0.56}
+    assert rangos[-1]["rango_max"] == float('inf') and rangos[-1]["cuantia_basica"] == 13.0
+    assert datos.tabla_edad() == {60: 0.75, 61: 0.80, 62: 0.85, 63: 0.90, 64: 0.95, 65: 1.00}
+    print(f"   ✅ {len(tasas)} tasas, {len(rangos)} rangos Ley 73, UMA mensual ${datos.uma_mensual_2025}")
+
+
+def test_validacion_rechaza_datos_inconsistentes(tmp_path):
+    """Una tasa fuera de la progresión o un rango Ley 73 con hueco no pasan"""
+    print("🧪 Testing reference data validation")
+    carpeta = _copiar_csv(tmp_path)
+    ruta = os.path.join(carpeta, referencia.ARCHIVO_TASAS)
+    with open(ruta, encoding='utf-8-sig') as f:
+        original = f.read()
+
+    with open(ruta, 'w', encoding='utf-8-sig') as f:
+        f.write(original.replace('"2027,15.528"', '"2027,16.528"'))
+    try:
+        compilar_desde_csv(carpeta)
+    except ErrorDatosReferencia as e:
+        assert '2027' in str(e)
+    else:
+        raise AssertionError("Una tasa 2027 fuera de la progresión debería rechazarse")
+
+    with open(ruta, 'w', encoding='utf-8-sig') as f:
+        f.write(original + '"2031,abc"\n')
+    try:
+        compilar_desde_csv(carpeta)
+    except ErrorDatosReferencia as e:
+        assert '2031' in str(e)
+    else:
+        raise AssertionError("Un renglón ilegible debería rechazarse")
+
+    with open(ruta, 'w', encoding='utf-8-sig') as f:
+        f.write(original)
+    datos = compilar_desde_csv(carpeta)['2025.11']
+    problemas = referencia.DatosReferencia(**dict(
+        vars(datos), ley73_minimos=datos.ley73_minimos[:3] + (1.60,) + datos.ley73_minimos[4:]
+    ))
+    try:
+        referencia.validar_datos(problemas)
+    except ErrorDatosReferencia as e:
+        assert 'Rango Ley 73 4' in str(e)
+    else:
+        raise AssertionError("Un hueco entre rangos Ley 73 debería rechazarse")
+
+    try:
+        compilar_desde_csv(str(tmp_path / 'no_existe'))
+    except ErrorDatosReferencia as e:
+        assert referencia.ARCHIVO_TASAS in str(e)
+    else:
+        raise AssertionError("Sin CSV debería lanzar ErrorDatosReferencia")
+
+
+def test_snapshot_se_reutiliza_y_se_regenera(tmp_path):
+    """El snapshot evita leer los CSV; se regenera si un CSV cambia y sirve sin los CSV"""
+    print("🧪 Testing compiled reference snapshot")
+    carpeta = _copiar_csv(tmp_path)
+    snapshot = str(tmp_path / 'datos.pickle')
+
+    primera = cargar_versiones(carpeta, snapshot)
+    assert os.path.exists(snapshot)
+
+    with mock.patch.object(referencia, 'compilar_desde_csv', side_effect=AssertionError('leyó los CSV')):
+        assert cargar_versiones(carpeta, snapshot) == primera
+
+    # Un CSV modificado invalida el snapshot
+    ruta = os.path.join(carpeta, referencia.ARCHIVO_TASAS)
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    with mock.patch.object(referencia, 'compilar_desde_csv', wraps=compilar_desde_csv) as compilar:
+        assert cargar_versiones(carpeta, snapshot) == primera
+        assert compilar.call_count == 1
+    with mock.patch.object(referencia, 'compilar_desde_csv', side_effect=AssertionError('leyó los CSV')):
+        assert cargar_versiones(carpeta, snapshot) == primera
+
+    # Sin la carpeta de Excel (imagen de producción) se usa el snapshot
+    shutil.rmtree(tmp_path / 'sin_csv', ignore_errors=True)
+    assert cargar_versiones(str(tmp_path / 'sin_csv'), snapshot) == primera
+
+    # Un snapshot dañado se reemplaza
+    with open(snapshot, 'wb') as f:
+        f.write(b'no es pickle')
+    assert cargar_versiones(carpeta, snapshot) == primera
+    print("   ✅ Snapshot reutilizado, regenerado y usado sin CSV")
+
+
+def test_snapshot_del_script_se_carga(tmp_path):
+    """El snapshot de --compilar (como en el Dockerfile) se carga en otro proceso y lo puede leer cualquiera"""
+    print("🧪 Testing snapshot written by the --compilar script")
+    snapshot = str(tmp_path / 'datos.pickle')
+    subprocess.run(
+        [sys.executable, os.path.join(calculadoras_path, 'Datos_Referencia_Modalidad40.py'), '--compilar'],
+        check=True, capture_output=True, env=dict(os.environ, DATOS_REFERENCIA_SNAPSHOT=snapshot)
+    )
+    assert stat.S_IMODE(os.stat(snapshot).st_mode) == 0o644
+
+    with open(snapshot, 'rb') as f:
+        contenido = pickle.load(f)
+    assert type(contenido['versiones']['2025.11']) is referencia.DatosReferencia
+
+    # La app lo usa sin volver a leer los CSV
+    with mock.patch.object(referencia, 'compilar_desde_csv', side_effect=AssertionError('leyó los CSV')):
+        assert cargar_versiones(referencia.CARPETA_CSV, snapshot) == compilar_desde_csv()
+    print("   ✅ Snapshot del script cargado sin leer los CSV")
+
+
+def test_versiones_por_fecha():
+    """La versión vigente es la más reciente que ya entró en vigor"""
+    assert referencia.version_vigente(date(2025, 11, 1)) == '2025.11'
+    assert referencia.version_vigente(date(2030, 1, 1)) == referencia.versiones_disponibles()[-1]
+    assert referencia.version_vigente(date(2020, 1, 1)) == referencia.versiones_disponibles()[0]
+
+
+def test_calculadoras_comparten_datos():
+    """La calculadora corregida y la universal usan las mismas tasas y UMA"""
+    print("🧪 Testing shared reference data across calculators")
+    from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+    from Calculadora_Modalidad_40_Universal import CalculadoraModalidad40
+
+    corregida = obtener_calculadora()
+    universal = CalculadoraModalidad40()
+    assert dict(corregida.tasas_modalidad40) == universal.tasas_modalidad40
+    assert universal.tasas_modalidad40[2030] == 18.800
+    assert corregida.uma_diaria_2025 == universal.uma_diaria_2025 == 113.14
+    assert corregida.uma_mensual_2025 == universal.uma_mensual_2025
+    print(f"   ✅ Tasa 2030: {universal.tasas_modalidad40[2030]}% en ambas calculadoras")
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_lectura_csv()
+    with tempfile.TemporaryDirectory() as carpeta:
+        test_validacion_rechaza_datos_inconsistentes(pathlib.Path(carpeta))
+    with tempfile.TemporaryDirectory() as carpeta:
+        test_snapshot_se_reutiliza_y_se_regenera(pathlib.Path(carpeta))
+    with tempfile.TemporaryDirectory() as carpeta:
+        test_snapshot_del_script_se_carga(pathlib.Path(carpeta))
+    test_versiones_por_fecha()
+    test_calculadoras_comparten_datos()
+    print("\n🎉 REFERENCE DATA TESTS PASSED!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test de los escenarios por duración: pagar solo los primeros 1..N años del
+plan da lo mismo que calcular ese escenario completo, y el reporte PDF usa
+estos valores exactos en lugar de la estimación anterior
+"""
+
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+
+ARGUMENTOS = dict(
+    semanas_cotizadas_actuales=1000, sdp_actual_diario=500.0, sbc_modalidad40_diario=2000.0,
+    edad_pension=65, tiene_esposa=True, num_hijos_dependientes=1, tiene_padres_dependientes=False,
+    año_inicio=2025, edad_actual=60, mes_nacimiento=3, mes_inicio_modalidad40=1,
+)
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 60, 'edad_pension': 65, 'tiene_esposa': True, 'num_hijos': 1,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def test_duraciones_exactas():
+    """Cada duración coincide con el escenario completo de esa misma duración"""
+    print("🧪 Testing exact multi-duration scenarios")
+    calc = obtener_calculadora()
+    resultado = calc.calcular_escenarios_por_duracion(**ARGUMENTOS)
+    escenario = resultado['escenario']
+    duraciones = resultado['duraciones']
+
+    assert [fila['años'] for fila in duraciones] == [1, 2, 3, 4, 5]
+    # Nacido en marzo: el último año solo paga enero-marzo
+    assert [fila['meses_pagados'] for fila in duraciones] == [12, 24, 36, 48, 51]
+
+    # El plan completo es el escenario calculado
+    ultima = duraciones[-1]
+    assert ultima['inversion_total'] == escenario['inversion']['total_años']
+    assert ultima['pension_final_mensual'] == escenario['con_modalidad40']['pension_final_mensual']
+    assert ultima['roi_anual_pct'] == escenario['analisis_roi']['roi_anual_pct']
+
+    # Los años completos equivalen a cotizar de enero a diciembre hasta la edad de pensión
+    for fila in duraciones[:-1]:
+        completo = calc.calcular_escenario_completo(**dict(
+            ARGUMENTOS, edad_actual=ARGUMENTOS['edad_pension'] - fila['años'], mes_nacimiento=12
+        ))
+        assert fila['inversion_total'] == completo['inversion']['total_años']
+        assert fila['pension_final_mensual'] == completo['con_modalidad40']['pension_final_mensual']
+        assert fila['roi_anual_pct'] == completo['analisis_roi']['roi_anual_pct']
+        assert fila['años_recuperacion'] == completo['analisis_roi']['años_recuperacion']
+    print(f"   ✅ {len(duraciones)} duraciones exactas")
+
+
+def test_reporte_usa_duraciones_exactas():
+    """El PDF recalcula con los 'parametros_calculo' validados y sigue funcionando sin ellos"""
+    print("🧪 Testing PDF duration table")
+    import app as webapp
+    from reporte_pdf import calcular_duraciones, construir_reporte_pdf
+    from validacion import validar_datos_reporte
+
+    resultados = webapp.app.test_client().post('/calcular', json=PERSONA).get_json()
+    ahora = datetime(2025, 11, 20, 10, 30)
+    peticion = validar_datos_reporte({'nombre': 'Ana', 'apellido_paterno': 'López', 'resultados': resultados}, ahora)
+    duraciones = calcular_duraciones(peticion['datos_calculo'])
+    assert round(duraciones[-1]['inversion_total'], 0) == resultados['inversion']['total_años']
+    assert round(duraciones[-1]['pension_final_mensual'], 0) == resultados['con_modalidad40']['pension_total']
+
+    inicio = time.perf_counter()
+    con_tabla = construir_reporte_pdf(peticion, ahora)
+    ms = (time.perf_counter() - inicio) * 1000
+
+    # Resultados de una versión anterior, sin 'parametros_calculo'
+    anteriores = {k: v for k, v in resultados.items() if k != 'parametros_calculo'}
+    sin_parametros = validar_datos_reporte(dict(peticion, resultados=anteriores), ahora)
+    assert sin_parametros['datos_calculo'] is None
+    assert calcular_duraciones(None) is None
+    sin_tabla = construir_reporte_pdf(sin_parametros, ahora)
+    assert con_tabla.startswith(b'%PDF') and sin_tabla.startswith(b'%PDF')
+    assert len(sin_tabla) < len(con_tabla)
+    print(f"   ✅ Reporte con tabla exacta en {ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    test_duraciones_exactas()
+    test_reporte_usa_duraciones_exactas()
+    print("\n🎉 DURATION SCENARIO TESTS PASSED!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test de la capa de logging de la web app
+Formato JSON, niveles y muestreo de payloads
+"""
+
+import sys
+import os
+import io
+import json
+import logging
+
+# Add the webapp directory to the Python path
+webapp_path = os.path.join(os.path.dirname(__file__), '..', 'webapp')
+if webapp_path not in sys.path:
+    sys.path.insert(0, webapp_path)
+
+import logging_setup
+from logging_setup import configurar_logging, muestrear_payload, registrar_payload
+
+
+def _capturar(formato, nivel='INFO', tasa_muestreo=0.0):
+    """Configurar logging y redirigir su manejador a un buffer"""
+    configurar_logging(nivel=nivel, formato=formato, tasa_muestreo=tasa_muestreo)
+    buffer = io.StringIO()
+    logging_setup._manejador.setStream(buffer)
+    return buffer
+
+
+def test_formato_json():
+    """Cada registro es una línea JSON con nivel, logger y payload"""
+    print("🧪 Testing JSON log format")
+    buffer = _capturar('json', tasa_muestreo=1.0)
+    logging.getLogger('webapp.prueba').info("Cálculo de %s", "prueba")
+    registrar_payload('calcular.peticion', {'sdp_actual': 222.02})
+
+    lineas = [json.loads(linea) for linea in buffer.getvalue().splitlines()]
+    assert lineas[0]['nivel'] == 'INFO'
+    assert lineas[0]['logger'] == 'webapp.prueba'
+    assert lineas[0]['mensaje'] == 'Cálculo de prueba'
+    assert lineas[1]['logger'] == 'webapp.payloads'
+    assert lineas[1]['datos'] == {'sdp_actual': 222.02}
+    print("   ✅ JSON válido por línea")
+
+
+def test_debug_desactivado_no_formatea():
+    """Con nivel INFO los registros DEBUG no evalúan sus argumentos"""
+    buffer = _capturar('texto', nivel='INFO')
+
+    class Caro:
+        def __str__(self):
+            raise AssertionError("no debería formatearse")
+
+    logging.getLogger('webapp.prueba').debug("payload %s", Caro())
+    assert buffer.getvalue() == ''
+
+
+def test_muestreo_de_payloads():
+    """Sin LOG_SAMPLE_RATE no se muestrea; con 1.0 siempre"""
+    configurar_logging(nivel='INFO', formato='texto', tasa_muestreo=0.0)
+    assert not any(muestrear_payload() for _ in range(1000))
+    configurar_logging(nivel='INFO', formato='texto', tasa_muestreo=1.0)
+    assert all(muestrear_payload() for _ in range(1000))
+    configurar_logging(nivel='INFO', formato='texto', tasa_muestreo=0.0)
+
+
+if __name__ == "__main__":
+    test_formato_json()
+    test_debug_desactivado_no_formatea()
+    test_muestreo_de_payloads()
+    print("\n🎉 LOGGING TESTS PASSED!")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test de las métricas: histogramas por fase, formato de texto de Prometheus,
+rechazos de validación por motivo, cachés en /metrics y costo de medir
+"""
+
+import sys
+import os
+import time
+import statistics
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from metricas import CUBETAS_SEGUNDOS, RegistroMetricas, fuente_caches
+from result_cache import BackendMemoria, CacheResultados
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def _muestras(texto):
+    """Líneas de muestra (sin HELP/TYPE) -> valor"""
+    return {linea.rsplit(' ', 1)[0]: float(linea.rsplit(' ', 1)[1])
+            for linea in texto.splitlines() if linea and not linea.startswith('#')}
+
+
+def test_histograma_y_exposicion():
+    """Cubetas acumuladas, +Inf, suma/cuenta y contadores con etiquetas"""
+    print("🧪 Testing histogram exposition")
+    registro = RegistroMetricas()
+    registro.observar_fase('/calcular', 'validacion', 0.0003)
+    registro.observar_fase('/calcular', 'validacion', 0.02)
+    registro.observar_fase('/calcular', 'validacion', 60.0)
+    registro.contar('validacion_rechazos_total', endpoint='/calcular', motivo='edad')
+    registro.contar('validacion_rechazos_total', endpoint='/calcular', motivo='edad')
+
+    texto = registro.exponer()
+    assert '# TYPE modalidad40_fase_duracion_segundos histogram' in texto
+    muestras = _muestras(texto)
+    base = 'modalidad40_fase_duracion_segundos_bucket{endpoint="/calcular",fase="validacion",le="%s"}'
+    assert muestras[base % '0.0005'] == 1
+    assert muestras[base % '0.025'] == 2
+    assert muestras[base % repr(CUBETAS_SEGUNDOS[-1])] == 2
+    assert muestras[base % '+Inf'] == 3
+    assert muestras['modalidad40_fase_duracion_segundos_count{endpoint="/calcular",fase="validacion"}'] == 3
+    assert abs(muestras['modalidad40_fase_duracion_segundos_sum{endpoint="/calcular",fase="validacion"}'] - 60.0203) < 1e-9
+    assert muestras['modalidad40_validacion_rechazos_total{endpoint="/calcular",motivo="edad"}'] == 2
+
+    # Las métricas sin muestras no aparecen; limpiar() conserva las fuentes
+    assert 'peticiones_total' not in texto
+    registro.registrar_fuente(fuente_caches({'resultados': CacheResultados(BackendMemoria(4))}))
+    registro.limpiar()
+    texto = registro.exponer()
+    assert 'fase_duracion_segundos' not in texto
+    assert 'modalidad40_cache_aciertos_total{cache="resultados"} 0' in texto
+    print("   ✅ Formato de texto 0.0.4 correcto")
+
+
+def test_tramos_consecutivos():
+    """Cada marca mide desde la anterior; descontar quita lo agregado aparte"""
+    registro = RegistroMetricas()
+    tramos = registro.tramos('/x')
+    time.sleep(0.01)
+    tramos.marcar('a')
+    tramos.agregar('remoto', 0.005)
+    time.sleep(0.01)
+    tramos.marcar('b', descontar=0.005)
+    assert registro.histograma('fase_duracion_segundos', endpoint='/x', fase='a').cuenta == 0
+    registro.cerrar(tramos, 200)
+
+    assert registro.histograma('fase_duracion_segundos', endpoint='/x', fase='a').suma >= 0.01
+    assert registro.histograma('fase_duracion_segundos', endpoint='/x', fase='remoto').suma == 0.005
+    b = registro.histograma('fase_duracion_segundos', endpoint='/x', fase='b')
+    assert b.cuenta == 1 and 0.004 <= b.suma < 0.01
+    assert registro.histograma('peticion_duracion_segundos', endpoint='/x').suma >= 0.02
+    assert registro.valor('peticiones_total', endpoint='/x', estado='200') == 1
+
+
+def test_metrics_endpoint():
+    """Fases de /calcular y del PDF, rechazos por motivo y cachés en /metrics"""
+    print("🧪 Testing /metrics endpoint")
+    import app as webapp
+    cliente = webapp.app.test_client()
+    webapp.metricas.limpiar()
+    webapp.cache_resultados.limpiar()
+
+    resultados = cliente.post('/calcular', json=PERSONA).get_json()
+    assert cliente.post('/calcular', json=PERSONA).status_code == 200
+    rechazos = {
+        'semanas': dict(PERSONA, semanas_cotizadas=100),
+        'ley97': dict(PERSONA, año_inicio_cotizacion=1999),
+        'edad': dict(PERSONA, edad_pension=59),
+        'datos_faltantes': {'sdp_actual': 500},
+    }
+    for motivo, payload in rechazos.items():
+        assert cliente.post('/calcular', json=payload).status_code == 400, motivo
+    reporte = {'nombre': 'Ana', 'apellido_paterno': 'Métricas', 'resultados': resultados}
+    assert cliente.post('/generar-reporte-pdf', json=reporte).status_code == 200
+    assert cliente.post('/generar-reporte-pdf', json={'nombre': 'Ana'}).status_code == 400
+
+    respuesta = cliente.get('/metrics')
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'text/plain'
+    muestras = _muestras(respuesta.get_data(as_text=True))
+
+    fase = 'modalidad40_fase_duracion_segundos_count{endpoint="%s",fase="%s"}'
+    for nombre in ('validacion', 'calculadora', 'respuesta', 'serializacion'):
+        assert muestras[fase % ('/calcular', nombre)] == 2, nombre
+    for nombre in ('validacion', 'reportlab', 'cola', 'respuesta'):
+        assert muestras[fase % ('/generar-reporte-pdf', nombre)] == 1, nombre
+
+    rechazo = 'modalidad40_validacion_rechazos_total{endpoint="%s",motivo="%s"}'
+    for motivo in rechazos:
+        assert muestras[rechazo % ('/calcular', motivo)] == 1, motivo
+    assert muestras[rechazo % ('/generar-reporte-pdf', 'reporte')] == 1
+
+    assert muestras['modalidad40_peticiones_total{endpoint="/calcular",estado="200"}'] == 2
+    assert muestras['modalidad40_peticiones_total{endpoint="/calcular",estado="400"}'] == 4
+    assert muestras['modalidad40_peticion_duracion_segundos_count{endpoint="/calcular"}'] == 6
+    assert muestras['modalidad40_cache_aciertos_total{cache="resultados"}'] >= 1
+    assert 0 < muestras['modalidad40_cache_tasa_aciertos{cache="resultados"}'] <= 1
+    assert 'modalidad40_cola_pdf_trabajos{estado="listo"}' in muestras
+    print("   ✅ Fases, rechazos y cachés expuestos")
+
+
+def test_costo_de_medir():
+    """Medir las fases de un /calcular cuesta menos del 1% de la petición"""
+    print("🧪 Testing instrumentation overhead")
+    import app as webapp
+    cliente = webapp.app.test_client()
+
+    duraciones = []
+    for semanas in range(1000, 1020):
+        webapp.cache_resultados.limpiar()
+        inicio = time.perf_counter()
+        cliente.post('/calcular', json=dict(PERSONA, semanas_cotizadas=semanas))
+        duraciones.append(time.perf_counter() - inicio)
+
+    # Lo mismo que hace /calcular: tramos en before_request, 4 marcas, cerrar en after_request
+    registro = RegistroMetricas()
+    repeticiones = 2000
+    costos = []
+    for _ in range(5):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            tramos = registro.tramos('/calcular')
+            for fase in ('validacion', 'calculadora', 'respuesta', 'serializacion'):
+                tramos.marcar(fase)
+            registro.cerrar(tramos, 200)
+        costos.append((time.perf_counter() - inicio) / repeticiones)
+    costo = min(costos)
+
+    mediana = statistics.median(duraciones)
+    assert costo < mediana * 0.01, (costo, mediana)
+    print(f"   ✅ {costo * 1e6:.1f} µs por petición vs mediana {mediana * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    test_histograma_y_exposicion()
+    test_tramos_consecutivos()
+    test_metrics_endpoint()
+    test_costo_de_medir()
+    print("\n🎉 METRICS TESTS PASSED!")
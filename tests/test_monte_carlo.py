@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test de la simulación Monte Carlo de UMA/inflación: sin volatilidad
+reproduce la proyección fija, con semilla es reproducible y 10,000
+trayectorias caben en una petición de /calcular
+"""
+
+import sys
+import os
+import time
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+from Calculadora_Modalidad_40_Lote import simular_uma_inflacion
+
+ARGUMENTOS = dict(
+    semanas_cotizadas_actuales=1000, sdp_actual_diario=500.0, sbc_modalidad40_diario=2000.0,
+    edad_pension=65, tiene_esposa=True, num_hijos_dependientes=1, tiene_padres_dependientes=False,
+    año_inicio=2025, edad_actual=61, mes_nacimiento=8, mes_inicio_modalidad40=1, calendario_mensual=True,
+)
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 61, 'edad_pension': 65, 'mes_nacimiento': 8,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def test_sin_volatilidad_reproduce_proyeccion():
+    """Con volatilidad 0 todas las trayectorias siguen la proyección fija"""
+    print("🧪 Testing Monte Carlo without volatility")
+    calc = obtener_calculadora()
+    escenario = calc.calcular_escenario_completo(**ARGUMENTOS)
+    simulacion = simular_uma_inflacion(escenario, trayectorias=100, volatilidad_pp=0)
+
+    assert simulacion['año_pension'] == 2028
+    for clave in ('inversion_total', 'inversion_real', 'pension_con_mod40_real', 'roi_anual_pct'):
+        valores = simulacion[clave]
+        assert valores['p10'] == valores['p50'] == valores['p90'], clave
+    assert abs(simulacion['inversion_total']['p50'] - escenario['inversion']['total_años']) < 1e-6
+    assert abs(simulacion['uma_año_pension']['p50'] - calc.get_uma_para_año(2028)) < 1e-9
+
+    # El SDP promedia salarios de años anteriores: en pesos reales la pensión
+    # queda por debajo del cálculo en pesos de 2025
+    assert simulacion['inversion_real']['p50'] < simulacion['inversion_total']['p50']
+    assert simulacion['pension_con_mod40_real']['p50'] < escenario['con_modalidad40']['pension_final_mensual']
+    print(f"   ✅ Pensión real ${simulacion['pension_con_mod40_real']['p50']:,.0f} "
+          f"vs ${escenario['con_modalidad40']['pension_final_mensual']:,.0f} nominal 2025")
+
+
+def test_plan_termina_antes_de_la_pension():
+    """Con el plan recortado a 2030, la pensión usa la UMA y los precios del año del cumpleaños"""
+    print("🧪 Testing Monte Carlo when the plan ends before retirement")
+    calc = obtener_calculadora()
+    escenario = calc.calcular_escenario_completo(**dict(ARGUMENTOS, edad_actual=57))
+    assert escenario['inversion']['periodo']['año_fin'] == 2030
+
+    simulacion = simular_uma_inflacion(escenario, trayectorias=100, volatilidad_pp=0)
+    assert simulacion['año_pension'] == 2032
+    assert abs(simulacion['uma_año_pension']['p50'] - calc.get_uma_para_año(2032)) < 1e-9
+
+    # Dos años más de inflación: el SDP congelado vale menos en pesos de 2025
+    # que si la pensión empezara al terminar los pagos
+    al_terminar = simular_uma_inflacion(dict(escenario, inputs=dict(escenario['inputs'], edad_actual=None)),
+                                        trayectorias=100, volatilidad_pp=0)
+    assert al_terminar['año_pension'] == 2030
+    assert simulacion['pension_sin_mod40_real']['p50'] < al_terminar['pension_sin_mod40_real']['p50']
+    assert simulacion['inversion_total'] == al_terminar['inversion_total']
+    print(f"   ✅ Pensión en {simulacion['año_pension']}, pagos hasta 2030")
+
+
+def test_semilla_reproducible():
+    """La misma semilla da los mismos percentiles y más volatilidad los separa más"""
+    print("🧪 Testing Monte Carlo seed and spread")
+    escenario = obtener_calculadora().calcular_escenario_completo(**ARGUMENTOS)
+
+    primera = simular_uma_inflacion(escenario, semilla=15)
+    assert primera == simular_uma_inflacion(escenario, semilla=15)
+    assert primera != simular_uma_inflacion(escenario, semilla=16)
+
+    for clave in ('inversion_total', 'pension_con_mod40_real', 'roi_anual_pct', 'uma_año_pension'):
+        assert primera[clave]['p10'] < primera[clave]['p50'] < primera[clave]['p90'], clave
+
+    volatil = simular_uma_inflacion(escenario, semilla=15, volatilidad_pp=3.0)
+    rango = primera['inversion_total']['p90'] - primera['inversion_total']['p10']
+    assert volatil['inversion_total']['p90'] - volatil['inversion_total']['p10'] > 2 * rango
+
+    for argumentos in ({'trayectorias': 0}, {'volatilidad_pp': -1}):
+        try:
+            simular_uma_inflacion(escenario, **argumentos)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{argumentos} debería lanzar ValueError")
+    print(f"   ✅ ROI P10/P50/P90: {primera['roi_anual_pct']['p10']:.1f}% / "
+          f"{primera['roi_anual_pct']['p50']:.1f}% / {primera['roi_anual_pct']['p90']:.1f}%")
+
+
+def test_diez_mil_trayectorias_rapido():
+    """10,000 trayectorias en pocos milisegundos"""
+    escenario = obtener_calculadora().calcular_escenario_completo(**ARGUMENTOS)
+    simular_uma_inflacion(escenario, trayectorias=100)  # calentamiento
+
+    mejor = float('inf')
+    for _ in range(3):
+        inicio = time.perf_counter()
+        simular_uma_inflacion(escenario, trayectorias=10_000, semilla=1)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"   ⚡ 10,000 trayectorias en {mejor * 1000:.1f} ms")
+    assert mejor < 0.25
+
+
+def test_api_calcular_con_monte_carlo():
+    """/calcular agrega los percentiles solo cuando se pide la simulación"""
+    print("🧪 Testing /calcular with Monte Carlo option")
+    import app as webapp
+    cliente = webapp.app.test_client()
+
+    sin_simulacion = cliente.post('/calcular', json=PERSONA).get_json()
+    assert 'monte_carlo' not in sin_simulacion
+
+    primera = cliente.post('/calcular', json=dict(PERSONA, monte_carlo={'semilla': 7})).get_json()
+    segunda = cliente.post('/calcular', json=dict(PERSONA, monte_carlo={'semilla': 7})).get_json()
+    assert primera['monte_carlo'] == segunda['monte_carlo']
+    assert primera['monte_carlo']['trayectorias'] == 10_000
+    assert set(primera['monte_carlo']['roi_anual_pct']) == {'p10', 'p50', 'p90'}
+
+    assert 'monte_carlo' in cliente.post('/calcular', json=dict(PERSONA, monte_carlo=True)).get_json()
+
+    for opciones in ({'trayectorias': 0}, {'trayectorias': 'muchas'}, {'persistencia': 1}, 'sí'):
+        respuesta = cliente.post('/calcular', json=dict(PERSONA, monte_carlo=opciones))
+        assert respuesta.status_code == 400, opciones
+        assert 'monte_carlo' in respuesta.get_json()['error']
+    print(f"   ✅ Pensión real P50: ${primera['monte_carlo']['pension_con_mod40_real']['p50']:,.0f}")
+
+
+if __name__ == "__main__":
+    test_sin_volatilidad_reproduce_proyeccion()
+    test_plan_termina_antes_de_la_pension()
+    test_semilla_reproducible()
+    test_diez_mil_trayectorias_rapido()
+    test_api_calcular_con_monte_carlo()
+    print("\n🎉 MONTE CARLO TESTS PASSED!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test de los parámetros de referencia compartidos (solo lectura)
+y de la calculadora única por proceso
+"""
+
+import sys
+import os
+from dataclasses import FrozenInstanceError
+
+# Add the calculadoras-python directory to the Python path
+calculadoras_path = os.path.join(os.path.dirname(__file__), '..', 'calculadoras-python')
+if calculadoras_path not in sys.path:
+    sys.path.insert(0, calculadoras_path)
+
+from Calculadora_Modalidad_40_CORREGIDA import (
+    CalculadoraModalidad40Corregida, PARAMETROS_2025, VERSION_PARAMETROS, obtener_calculadora
+)
+
+
+def test_calculadora_compartida():
+    """obtener_calculadora regresa siempre la misma instancia por versión"""
+    print("🧪 Testing shared calculator")
+    calc = obtener_calculadora()
+    assert calc is obtener_calculadora()
+    assert calc is obtener_calculadora(VERSION_PARAMETROS)
+    assert calc.parametros is PARAMETROS_2025
+    print(f"   ✅ Versión de parámetros: {calc.parametros.version}")
+
+
+def test_parametros_de_solo_lectura():
+    """Ni los parámetros ni sus tablas se pueden modificar"""
+    calc = obtener_calculadora()
+    intentos = [
+        lambda: setattr(PARAMETROS_2025, 'uma_diaria_2025', 1.0),
+        lambda: calc.tasas_modalidad40.__setitem__(2025, 1.0),
+        lambda: calc.uma_proyecciones.__setitem__(2031, 1.0),
+        lambda: calc.tabla_edad.__setitem__(59, 0.5),
+        lambda: calc.tabla_porcentajes_ley73[0].__setitem__("rango_max", 2.0),
+        lambda: calc.tabla_porcentajes_ley73.append({}),
+        lambda: PARAMETROS_2025.tabla_mensual['dias'].append(31),
+    ]
+    for intento in intentos:
+        try:
+            intento()
+        except (FrozenInstanceError, TypeError, AttributeError):
+            continue
+        assert False, "Se pudo modificar un parámetro compartido"
+
+
+def test_instancias_comparten_tablas():
+    """Construir una calculadora no copia tablas y da los mismos resultados"""
+    nueva = CalculadoraModalidad40Corregida()
+    compartida = obtener_calculadora()
+    assert nueva.tabla_porcentajes_ley73 is compartida.tabla_porcentajes_ley73
+    assert nueva.tasas_modalidad40 is compartida.tasas_modalidad40
+    # La tabla mensual del calendario se arma una vez por versión de parámetros
+    assert nueva._tabla_mensual is compartida._tabla_mensual is PARAMETROS_2025.tabla_mensual
+    assert nueva.tope_diario_2025 == 113.14 * 25
+    assert nueva.minimo_garantizado_mensual == 248.93 * 30.4
+
+    argumentos = dict(semanas_cotizadas_actuales=758, sdp_actual_diario=222.02,
+                      sbc_modalidad40_diario=2828.50, edad_pension=65,
+                      edad_actual=60, mes_nacimiento=6)
+    assert nueva.calcular_escenario_completo(**argumentos) == compartida.calcular_escenario_completo(**argumentos)
+
+
+if __name__ == "__main__":
+    test_calculadora_compartida()
+    test_parametros_de_solo_lectura()
+    test_instancias_comparten_tablas()
+    print("\n🎉 SHARED PARAMETERS TESTS PASSED!")
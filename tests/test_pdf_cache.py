@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test de la caché de reportes PDF (clave por contenido, límite en bytes)
+y de las descargas repetidas en /generar-reporte-pdf (ETag / 304)
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from pdf_cache import CachePDF
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 60, 'edad_pension': 65,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def test_clave_por_contenido():
+    """El orden de las llaves no importa; los valores y la fecha sí"""
+    print("🧪 Testing PDF cache key")
+    hoy = date(2025, 11, 20)
+    campos = {'nombre': 'Ana', 'resultados': {'a': 1, 'b': 2.0}}
+    clave = CachePDF.construir_clave(campos, hoy)
+
+    assert clave == CachePDF.construir_clave({'resultados': {'b': 2.0, 'a': 1}, 'nombre': 'Ana'}, hoy)
+    assert clave != CachePDF.construir_clave({'nombre': 'Ana', 'resultados': {'a': 1, 'b': 2.5}}, hoy)
+    assert clave != CachePDF.construir_clave(campos, date(2025, 11, 21))
+    print("   ✅ Clave estable")
+
+
+def test_limite_en_bytes():
+    """Se expulsan los PDF usados hace más tiempo al pasar el límite"""
+    print("🧪 Testing PDF cache byte limit")
+    cache = CachePDF(max_bytes=25)
+    cache.guardar('a', b'x' * 10)
+    cache.guardar('b', b'x' * 10)
+    cache.obtener('a')                  # 'b' queda como el menos reciente
+    cache.guardar('c', b'x' * 10)
+
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') is not None and cache.obtener('c') is not None
+    assert cache.bytes_usados == 20
+
+    cache.guardar('grande', b'x' * 30)  # Nunca cabe: no expulsa nada
+    assert cache.obtener('grande') is None and cache.bytes_usados == 20
+    print("   ✅ 2 PDF en 25 bytes")
+
+
+def test_descarga_repetida():
+    """La segunda descarga sale de la caché; con If-None-Match responde 304"""
+    print("🧪 Testing repeated PDF downloads")
+    import app as webapp
+
+    webapp.cache_pdf.limpiar()
+    cliente = webapp.app.test_client()
+    resultados = cliente.post('/calcular', json=PERSONA).get_json()
+    peticion = {'nombre': 'Ana', 'apellido_paterno': 'López', 'resultados': resultados}
+
+    primera = cliente.post('/generar-reporte-pdf', json=peticion)
+    assert primera.status_code == 200, primera.get_data(as_text=True)
+    assert primera.mimetype == 'application/pdf'
+    assert primera.data.startswith(b'%PDF')
+    etag = primera.headers['ETag']
+
+    segunda = cliente.post('/generar-reporte-pdf', json=dict(peticion, campo_ignorado=1))
+    assert segunda.data == primera.data
+    assert segunda.headers['ETag'] == etag
+
+    condicional = cliente.post('/generar-reporte-pdf', json=peticion, headers={'If-None-Match': etag})
+    assert condicional.status_code == 304
+    assert condicional.data == b''
+
+    otra = cliente.post('/generar-reporte-pdf', json=dict(peticion, nombre='Beto'))
+    assert otra.headers['ETag'] != etag
+
+    estadisticas = cliente.get('/api/cache-pdf').get_json()
+    assert estadisticas['fallos'] == 2
+    assert estadisticas['aciertos'] == 1
+    print(f"   ✅ {len(primera.data):,} bytes generados una vez")
+
+
+def test_reporte_igual_en_el_dia():
+    """El PDF solo imprime la fecha: la misma clave del día da los mismos bytes"""
+    print("🧪 Testing PDF content within a day")
+    from reportlab import rl_config
+    import app as webapp
+    from reporte_pdf import construir_reporte_pdf
+    from validacion import validar_datos_reporte
+
+    cliente = webapp.app.test_client()
+    resultados = cliente.post('/calcular', json=PERSONA).get_json()
+    peticion = {'nombre': 'Ana', 'apellido_paterno': 'López', 'resultados': resultados}
+    mañana, tarde = datetime(2025, 3, 10, 9, 5), datetime(2025, 3, 10, 18, 47)
+    data = dict(peticion, datos_calculo=validar_datos_reporte(peticion, mañana)['datos_calculo'])
+
+    invariante = rl_config.invariant
+    rl_config.invariant = 1  # sin fecha de creación ni ID aleatorio en el PDF
+    try:
+        assert construir_reporte_pdf(data, mañana) == construir_reporte_pdf(data, tarde)
+        assert construir_reporte_pdf(data, mañana) != construir_reporte_pdf(data, datetime(2025, 3, 11, 9, 5))
+    finally:
+        rl_config.invariant = invariante
+    print("   ✅ Mismo PDF a las 09:05 y a las 18:47")
+
+
+if __name__ == "__main__":
+    test_clave_por_contenido()
+    test_limite_en_bytes()
+    test_descarga_repetida()
+    test_reporte_igual_en_el_dia()
+    print("\n🎉 PDF CACHE TESTS PASSED!")
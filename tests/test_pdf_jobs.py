@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test de la cola de reportes PDF (pool de procesos, cola acotada, expiración)
+y de su API: /api/reportes-pdf, estado, descarga y /generar-reporte-pdf
+"""
+
+import sys
+import os
+import signal
+import time
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from pdf_cache import CachePDF
+from pdf_jobs import ColaLlena, ColaTrabajosPDF, ERROR, LISTO
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 60, 'edad_pension': 65,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def _generar_lento(segundos, ahora):
+    """Generador de prueba (se ejecuta en el proceso del pool)"""
+    if segundos < 0:
+        raise ValueError('segundos negativos')
+    time.sleep(segundos)
+    return b'%PDF-prueba'
+
+
+def _esperar_estado(cliente, url):
+    for _ in range(600):
+        estado = cliente.get(url).get_json()
+        if estado['estado'] not in ('pendiente', 'procesando'):
+            return estado
+        time.sleep(0.05)
+    raise AssertionError('El trabajo no terminó')
+
+
+def test_cola_acotada_y_expiracion():
+    """Se rechaza al llenarse, se guarda en caché y los terminados expiran"""
+    print("🧪 Testing bounded PDF job queue")
+    cache = CachePDF()
+    cola = ColaTrabajosPDF(_generar_lento, cache=cache, max_workers=1, max_pendientes=1, ttl=0.2)
+    try:
+        lento = cola.enviar(0.5, None, 'clave-lenta', 'lento.pdf')
+        try:
+            cola.enviar(0, None, 'otra-clave', 'otro.pdf')
+            raise AssertionError('Se esperaba ColaLlena')
+        except ColaLlena as cl:
+            assert cl.reintentar_en >= 1
+        assert cola.estadisticas()['rechazados'] == 1
+
+        assert cola.esperar(lento, timeout=30) == b'%PDF-prueba'
+        assert lento.estado == LISTO
+        assert cache.obtener('clave-lenta') == b'%PDF-prueba'
+
+        # Ya en caché: listo de inmediato, sin usar el pool
+        repetido = cola.enviar(0.5, None, 'clave-lenta', 'lento.pdf')
+        assert repetido.estado == LISTO and repetido.futuro is None
+
+        fallido = cola.enviar(-1, None, 'clave-fallida', 'fallido.pdf')
+        try:
+            cola.esperar(fallido, timeout=30)
+            raise AssertionError('Se esperaba RuntimeError')
+        except RuntimeError as e:
+            assert 'segundos negativos' in str(e)
+        assert fallido.estado == ERROR
+
+        time.sleep(0.3)
+        assert cola.obtener(lento.id) is None
+        assert cola.obtener(fallido.id) is None
+    finally:
+        cola.cerrar()
+    print("   ✅ ColaLlena, caché y TTL")
+
+
+def test_pool_roto_se_reemplaza():
+    """Si un proceso del pool muere, el pool roto se apaga y se crea uno nuevo"""
+    cola = ColaTrabajosPDF(_generar_lento, max_workers=1, max_pendientes=4)
+    try:
+        assert cola.esperar(cola.enviar(0, None, 'antes', 'antes.pdf'), timeout=30) == b'%PDF-prueba'
+        roto = cola._pool
+        apagados = []
+        apagar = roto.shutdown
+        roto.shutdown = lambda **opciones: (apagados.append(opciones), apagar(**opciones))
+        for proceso in list(roto._processes.values()):
+            os.kill(proceso.pid, signal.SIGKILL)
+        for _ in range(200):
+            if roto._broken:
+                break
+            time.sleep(0.05)
+
+        despues = cola.enviar(0, None, 'despues', 'despues.pdf')
+        assert cola.esperar(despues, timeout=30) == b'%PDF-prueba'
+        assert cola._pool is not roto
+        assert apagados == [{'wait': False, 'cancel_futures': True}]
+    finally:
+        cola.cerrar()
+
+
+def test_api_reportes_pdf():
+    """Enviar, consultar estado y descargar; 503 con Retry-After si la cola está llena"""
+    print("🧪 Testing PDF job API")
+    import app as webapp
+
+    webapp.cache_pdf.limpiar()
+    cliente = webapp.app.test_client()
+    resultados = cliente.post('/calcular', json=PERSONA).get_json()
+    peticion = {'nombre': 'Ana', 'apellido_paterno': 'López', 'resultados': resultados}
+
+    envio = cliente.post('/api/reportes-pdf', json=peticion)
+    assert envio.status_code == 202
+    trabajo = envio.get_json()
+    assert envio.headers['Location'] == trabajo['url_estado']
+
+    estado = _esperar_estado(cliente, trabajo['url_estado'])
+    assert estado['estado'] == 'listo', estado
+    descarga = cliente.get(trabajo['url_descarga'])
+    assert descarga.status_code == 200
+    assert descarga.data.startswith(b'%PDF')
+
+    # El endpoint síncrono usa la misma cola (y la misma caché)
+    sincrono = cliente.post('/generar-reporte-pdf', json=peticion)
+    assert sincrono.status_code == 200
+    assert sincrono.data == descarga.data
+
+    assert cliente.get('/api/reportes-pdf/no-existe').status_code == 404
+    invalido = cliente.post('/api/reportes-pdf', json={'nombre': 'Ana'})
+    assert invalido.status_code == 400
+
+    max_pendientes = webapp.cola_pdf.max_pendientes
+    webapp.cola_pdf.max_pendientes = 0
+    try:
+        lleno = cliente.post('/api/reportes-pdf', json=dict(peticion, nombre='Beto'))
+    finally:
+        webapp.cola_pdf.max_pendientes = max_pendientes
+    assert lleno.status_code == 503
+    assert int(lleno.headers['Retry-After']) >= 1
+    print(f"   ✅ Trabajo {trabajo['id'][:8]}… listo, {len(descarga.data):,} bytes")
+
+
+if __name__ == "__main__":
+    test_cola_acotada_y_expiracion()
+    test_pool_roto_se_reemplaza()
+    test_api_reportes_pdf()
+    print("\n🎉 PDF JOB QUEUE TESTS PASSED!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test del perfilado opcional: selección de peticiones (cabecera, token,
+muestreo), pilas plegadas de cProfile, rotación del directorio y uso en
+/calcular
+"""
+
+import sys
+import os
+import time
+import cProfile
+import pstats
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from perfilado import Perfilador, pilas_plegadas
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def hoja():
+    time.sleep(0.02)
+
+
+def rama():
+    hoja()
+    sum(range(20000))
+
+
+def raiz():
+    rama()
+    hoja()
+
+
+def test_seleccion_de_peticiones():
+    """Apagado no perfila nada; encendido: cabecera (con token) o muestreo"""
+    print("🧪 Testing profiling selection")
+    assert not Perfilador().debe_perfilar('/calcular', '1')
+    assert not Perfilador(tasa_muestreo=1.0).debe_perfilar('/calcular', None)
+
+    perfilador = Perfilador(habilitado=True)
+    assert perfilador.debe_perfilar('/calcular', '1')
+    assert perfilador.debe_perfilar('/generar-reporte-pdf', 'si')
+    assert not perfilador.debe_perfilar('/calcular', None)
+    assert not perfilador.debe_perfilar('/info', '1')
+
+    con_token = Perfilador(habilitado=True, token='secreto')
+    assert con_token.debe_perfilar('/calcular', 'secreto')
+    assert not con_token.debe_perfilar('/calcular', '1')
+
+    muestreo = Perfilador(habilitado=True, tasa_muestreo=1.0)
+    assert muestreo.debe_perfilar('/calcular', None)
+    print("   ✅ Cabecera, token y muestreo respetados")
+
+
+def test_pilas_plegadas():
+    """Cada pila lleva el tiempo propio de su última función, repartido por llamador"""
+    print("🧪 Testing folded stacks")
+    perfil = cProfile.Profile()
+    perfil.enable()
+    raiz()
+    perfil.disable()
+
+    pilas = {}
+    for linea in pilas_plegadas(pstats.Stats(perfil)):
+        pila, microsegundos = linea.rsplit(' ', 1)
+        pilas[pila] = int(microsegundos)
+
+    dormir = [pila for pila in pilas if pila.endswith('time.sleep>')]
+    assert any('raiz' in pila and 'rama' in pila and 'hoja' in pila for pila in dormir)
+    assert any('raiz' in pila and 'rama' not in pila and 'hoja' in pila for pila in dormir)
+    # Las dos llamadas a hoja() suman ~40 ms de sleep
+    assert 35_000 <= sum(pilas[pila] for pila in dormir) <= 80_000
+    print(f"   ✅ {len(pilas)} pilas, {sum(pilas.values()) / 1000:.1f} ms")
+
+
+def test_rotacion(tmp_path):
+    """Solo se conservan los max_archivos perfiles más recientes (.folded + .prof)"""
+    perfilador = Perfilador(habilitado=True, directorio=str(tmp_path), max_archivos=2)
+    nombres = []
+    for _ in range(3):
+        perfil = perfilador.iniciar()
+        hoja()
+        nombres.append(perfilador.terminar(perfil, '/calcular', time.perf_counter() - 0.02))
+        assert perfilador.guardar_en_segundo_plano(perfil, nombres[-1]).result(timeout=10)
+
+    assert sorted(os.listdir(tmp_path)) == sorted(nombre + extension for nombre in nombres[1:]
+                                                  for extension in ('.folded', '.prof'))
+    assert '_calcular_' in nombres[0]
+    # El .prof se puede abrir con pstats
+    pstats.Stats(os.path.join(tmp_path, nombres[-1] + '.prof'))
+
+
+def test_perfil_de_calcular(tmp_path, monkeypatch):
+    """Con X-Profile la respuesta trae el nombre del perfil y el .folded incluye la calculadora"""
+    print("🧪 Testing /calcular profiling")
+    import app as webapp
+    monkeypatch.setattr(webapp, 'perfilador', Perfilador(habilitado=True, directorio=str(tmp_path)))
+    cliente = webapp.app.test_client()
+    webapp.cache_resultados.limpiar()
+
+    assert 'X-Profile' not in cliente.post('/calcular', json=PERSONA).headers
+    respuesta = cliente.post('/calcular', json=dict(PERSONA, semanas_cotizadas=1014), headers={'X-Profile': '1'})
+    assert respuesta.status_code == 200
+    nombre = respuesta.headers['X-Profile']
+
+    ruta = os.path.join(tmp_path, nombre + '.folded')
+    limite = time.monotonic() + 10
+    while not os.path.exists(ruta) and time.monotonic() < limite:
+        time.sleep(0.05)
+    with open(ruta, encoding='utf-8') as archivo:
+        contenido = archivo.read()
+    assert 'calcular_escenario_completo' in contenido
+    assert len(os.listdir(tmp_path)) == 2
+    print(f"   ✅ Perfil {nombre}")
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    import pytest
+    test_seleccion_de_peticiones()
+    test_pilas_plegadas()
+    with tempfile.TemporaryDirectory() as carpeta:
+        test_rotacion(pathlib.Path(carpeta))
+    with tempfile.TemporaryDirectory() as carpeta:
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test_perfil_de_calcular(pathlib.Path(carpeta), monkeypatch)
+    print("\n🎉 PROFILING TESTS PASSED!")
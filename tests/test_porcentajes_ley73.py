@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test del índice de rangos de tabla_porcentajes_ley73
+Rangos contiguos (sin huecos entre 1.00 y 1.01, etc.) y misma búsqueda
+en la versión escalar (bisect) y en el lote (NumPy)
+"""
+
+import sys
+import os
+from dataclasses import replace
+
+import numpy as np
+
+# Add the calculadoras-python directory to the Python path
+calculadoras_path = os.path.join(os.path.dirname(__file__), '..', 'calculadoras-python')
+if calculadoras_path not in sys.path:
+    sys.path.insert(0, calculadoras_path)
+
+from Calculadora_Modalidad_40_CORREGIDA import CalculadoraModalidad40Corregida, PARAMETROS_2025
+from Calculadora_Modalidad_40_Lote import buscar_porcentajes_lote
+
+
+def test_sin_huecos_entre_rangos():
+    """Un múltiplo entre 1.00 y 1.01 cae en el rango siguiente, no en el respaldo"""
+    print("🧪 Testing Ley 73 brackets without gaps")
+    calc = CalculadoraModalidad40Corregida()
+
+    # Con UMA = 1 el SDP es directamente el múltiplo de UMA
+    assert calc.buscar_porcentajes_por_sdp(1.00, 1.0) == (80.00 / 100, 0.56 / 100)
+    assert calc.buscar_porcentajes_por_sdp(1.005, 1.0) == (77.11 / 100, 0.81 / 100)
+    assert calc.buscar_porcentajes_por_sdp(1.25, 1.0) == (77.11 / 100, 0.81 / 100)
+    assert calc.buscar_porcentajes_por_sdp(1.255, 1.0) == (55.18 / 100, 1.18 / 100)
+    assert calc.buscar_porcentajes_por_sdp(6.005, 1.0) == (0.13, 0.0245)
+    assert calc.buscar_porcentajes_por_sdp(25, 1.0) == (0.13, 0.0245)
+    print("   ✅ 1.005 UMAs → 77.11% / 0.81%")
+
+
+def test_mismos_porcentajes_fuera_de_huecos():
+    """Fuera de los huecos el índice da lo mismo que el recorrido lineal original"""
+    calc = CalculadoraModalidad40Corregida()
+    for multiple_uma in np.round(np.arange(0, 8.01, 0.01), 2):
+        esperado = None
+        for rango in calc.tabla_porcentajes_ley73:
+            if rango["rango_min"] <= multiple_uma <= rango["rango_max"]:
+                esperado = (rango["cuantia_basica"] / 100, rango["incremento_anual"] / 100)
+                break
+        assert esperado is not None, f"{multiple_uma} quedó en un hueco"
+        assert calc.buscar_porcentajes_por_sdp(multiple_uma, 1.0) == esperado, multiple_uma
+
+
+def test_lote_coincide_con_escalar():
+    """La búsqueda vectorizada da el mismo rango que la escalar, fronteras incluidas"""
+    calc = CalculadoraModalidad40Corregida()
+    maximos = [r["rango_max"] for r in calc.tabla_porcentajes_ley73[:-1]]
+    multiples = np.concatenate([
+        np.linspace(-1, 10, 20001),
+        maximos, np.nextafter(maximos, np.inf), np.nextafter(maximos, -np.inf),
+    ])
+    sdp = multiples * calc.uma_diaria_2025
+
+    cuantia, incremento = buscar_porcentajes_lote(calc, sdp)
+    for i, s in enumerate(sdp):
+        assert (cuantia[i], incremento[i]) == calc.buscar_porcentajes_por_sdp(float(s)), multiples[i]
+
+
+def test_lote_con_tabla_no_binaria():
+    """Con máximos que no son múltiplos de 1/2^k el lote usa searchsorted"""
+    tabla = [dict(rango) for rango in PARAMETROS_2025.tabla_porcentajes_ley73]
+    tabla[0]["rango_max"] = 1.1
+    calc = CalculadoraModalidad40Corregida(replace(PARAMETROS_2025, tabla_porcentajes_ley73=tabla))
+
+    sdp = np.linspace(0, 3, 3001) * calc.uma_diaria_2025
+    cuantia, incremento = buscar_porcentajes_lote(calc, sdp)
+    for i, s in enumerate(sdp):
+        assert (cuantia[i], incremento[i]) == calc.buscar_porcentajes_por_sdp(float(s))
+    assert calc.buscar_porcentajes_por_sdp(1.05, 1.0) == (80.00 / 100, 0.56 / 100)
+
+
+if __name__ == "__main__":
+    test_sin_huecos_entre_rangos()
+    test_mismos_porcentajes_fuera_de_huecos()
+    test_lote_coincide_con_escalar()
+    test_lote_con_tabla_no_binaria()
+    print("\n🎉 LEY 73 BRACKET TESTS PASSED!")
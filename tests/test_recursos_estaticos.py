@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test de los recursos estáticos: minificación conservadora de CSS/JS,
+nombres con hash, dist precomprimido con manifest, página principal en
+memoria con ETag/304 y /assets con Cache-Control immutable
+"""
+
+import sys
+import os
+import gzip
+import re
+import shutil
+import subprocess
+import tempfile
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from recursos_estaticos import (
+    CACHE_INMUTABLE, CARPETA_FUENTES, FUENTES, MANIFEST, cargar_recursos, compilar, minificar_css, minificar_js
+)
+
+
+def _cliente():
+    import app as webapp
+    return webapp, webapp.app.test_client()
+
+
+def test_minificar_css():
+    """Comentarios y espacios fuera; cadenas, "and (" y el espacio antes de :hover se quedan"""
+    css = """/* tarjeta */
+.tabla :hover {
+    content: "a  ;  b";
+    margin: 0 auto;
+}
+@media screen and (max-width: 768px) { .a > .b , .c { color: red !important; } }
+"""
+    assert minificar_css(css) == ('.tabla :hover{content:"a  ;  b";margin:0 auto}'
+                                  '@media screen and (max-width:768px){.a>.b,.c{color:red!important}}\n')
+
+
+def test_minificar_js():
+    """Sangría y comentarios fuera; saltos que importan para el ';' automático, cadenas, plantillas y regex intactos"""
+    print("🧪 Testing JS minifier")
+    js = """
+        // Comentario
+        let total = a / b / 2;   /* división */
+        const patron = /[/"'`]+\\/\\d/g;
+        if (x) {
+            return `Hola ${nombre.trim()}
+   línea con  espacios ${ {a: 1}.a } // no es comentario`;
+        }
+        const texto = 'no // es comentario' + "ni /* esto */"
+        resultado = total
+        (function () {})()
+        i = i
+        ++j
+        return /x/.test(texto)
+    """
+    assert minificar_js(js) == (
+        "let total=a / b / 2;const patron=/[/\"'`]+\\/\\d/g;if(x){return `Hola ${nombre.trim()}\n"
+        "   línea con  espacios ${{a:1}.a} // no es comentario`;}\n"
+        "const texto='no // es comentario' + \"ni /* esto */\"\n"
+        "resultado=total\n(function(){})()\ni=i\n++j\nreturn /x/.test(texto)\n"
+    )
+    print("   ✅ Cadenas, plantillas y regex sin cambios")
+
+
+def test_app_js_minificado_es_valido():
+    """El app.js real minificado es JavaScript válido y conserva sus literales"""
+    with open(os.path.join(CARPETA_FUENTES, 'app.js'), encoding='utf-8') as f:
+        fuente = f.read()
+    minificado = minificar_js(fuente)
+    assert len(minificado) < len(fuente) * 0.8
+    assert minificar_js(minificado) == minificado
+    # Las funciones globales de los onclick del HTML siguen ahí
+    for funcion in ('setTopeMaximo', 'generarReportePDF', 'validarElegibilidad'):
+        assert f'function {funcion}(' in minificado
+    if shutil.which('node') is None:
+        print("   ⏭️ node no está instalado")
+        return
+    with tempfile.NamedTemporaryFile('w', suffix='.js', encoding='utf-8', delete=False) as f:
+        f.write(minificado)
+    try:
+        subprocess.run(['node', '--check', f.name], check=True, capture_output=True)
+    finally:
+        os.unlink(f.name)
+
+
+def test_dist_con_hash_y_manifest():
+    """Los nombres llevan el hash, dist se lee mientras las fuentes no cambien y se limpian los viejos"""
+    print("🧪 Testing dist build")
+    with tempfile.TemporaryDirectory() as carpeta:
+        fuentes, dist = os.path.join(carpeta, 'assets'), os.path.join(carpeta, 'dist')
+        shutil.copytree(CARPETA_FUENTES, fuentes, ignore=shutil.ignore_patterns('dist'))
+
+        manifest, archivos = cargar_recursos(fuentes, dist)
+        assert set(manifest) == set(FUENTES)
+        assert re.fullmatch(r'app\.[0-9a-f]{12}\.js', manifest['app.js'])
+        recurso = archivos[manifest['app.js']]
+        assert gzip.decompress(recurso.variantes['gzip']) == recurso.variantes['identity']
+        assert os.path.exists(os.path.join(dist, manifest['app.js'] + '.gz'))
+        assert os.path.exists(os.path.join(dist, MANIFEST))
+
+        # Mismas fuentes: se lee dist (mismos bytes, sin compilar)
+        assert cargar_recursos(fuentes, dist) == (manifest, archivos)
+
+        # Sin minificar es otro hash
+        assert compilar(fuentes, minificar=False)[0]['app.js'] != manifest['app.js']
+
+        with open(os.path.join(fuentes, 'app.css'), 'a', encoding='utf-8') as f:
+            f.write('.nueva { color: red; }\n')
+        nuevo, _ = cargar_recursos(fuentes, dist)
+        assert nuevo['app.css'] != manifest['app.css'] and nuevo['app.js'] == manifest['app.js']
+        assert not os.path.exists(os.path.join(dist, manifest['app.css']))
+
+        # Imagen sin las fuentes: se usa dist tal cual
+        shutil.rmtree(fuentes)
+        assert cargar_recursos(fuentes, dist)[0] == nuevo
+    print(f"   ✅ {manifest['app.js']}")
+
+
+def test_pagina_en_memoria_y_304():
+    """El HTML apunta a los archivos con hash, se renderiza una vez, va comprimido y revalida con 304"""
+    print("🧪 Testing cached page shell")
+    webapp, cliente = _cliente()
+    respuesta = cliente.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert respuesta.status_code == 200 and respuesta.mimetype == 'text/html'
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert respuesta.headers['Cache-Control'] == 'no-cache'
+    assert 'Accept-Encoding' in respuesta.headers['Vary']
+    html = gzip.decompress(respuesta.data).decode('utf-8')
+    assert '<style>' not in html and '<script>' not in html
+    for nombre in FUENTES:
+        assert f'/assets/{webapp.recursos.url_de(nombre)}' in html
+
+    pagina = webapp.recursos.pagina('index.html', lambda: 'no se vuelve a renderizar')
+    assert cliente.get('/').data == pagina.variantes['identity']
+
+    etag = respuesta.headers['ETag']
+    revalidada = cliente.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert revalidada.status_code == 304 and revalidada.data == b''
+    print(f"   ✅ {len(respuesta.data):,} B comprimido, 304 al volver")
+
+
+def test_assets_inmutables():
+    """/assets/<hash> con Cache-Control immutable, gzip según Accept-Encoding y 404 para hashes viejos"""
+    webapp, cliente = _cliente()
+    for nombre, mimetype in FUENTES.items():
+        url = f'/assets/{webapp.recursos.url_de(nombre)}'
+        plano = cliente.get(url)
+        assert plano.status_code == 200 and plano.mimetype == mimetype
+        assert plano.headers['Cache-Control'] == CACHE_INMUTABLE
+        assert 'Content-Encoding' not in plano.headers
+
+        comprimido = cliente.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert comprimido.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(comprimido.data) == plano.data
+        assert comprimido.headers['ETag'] != plano.headers['ETag']
+
+        revalidado = cliente.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': comprimido.headers['ETag']})
+        assert revalidado.status_code == 304
+    assert cliente.get('/assets/app.000000000000.js').status_code == 404
+
+
+if __name__ == "__main__":
+    test_minificar_css()
+    test_minificar_js()
+    test_app_js_minificado_es_valido()
+    test_dist_con_hash_y_manifest()
+    test_pagina_en_memoria_y_304()
+    test_assets_inmutables()
+    print("\n🎉 STATIC ASSET TESTS PASSED!")
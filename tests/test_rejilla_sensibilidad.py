@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test de la rejilla SBC × duración × edad de pensión
+Cada celda debe coincidir exactamente con calcular_escenario_completo
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+from Calculadora_Modalidad_40_Lote import calcular_rejilla_sensibilidad
+
+CLIENTE = dict(
+    semanas_cotizadas_actuales=1000, sdp_actual_diario=500.0,
+    tiene_esposa=True, num_hijos_dependientes=1, tiene_padres_dependientes=False,
+)
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'tiene_esposa': True, 'num_hijos': 1,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990, 'edad_actual': 59,
+}
+
+
+def test_rejilla_coincide_con_escalar():
+    """Las 900 celdas coinciden con la calculadora escalar mes por mes (calendario_mensual=True)"""
+    print("🧪 Testing sensitivity grid against scalar calculator")
+    calc = obtener_calculadora()
+
+    # (mes_nacimiento, mes_inicio_modalidad40): sin mes, cumpleaños después
+    # del inicio y cumpleaños antes del inicio (el último año cruza diciembre)
+    for mes_nacimiento, mes_inicio in ((None, 1), (7, 4), (2, 10)):
+        inicio = time.perf_counter()
+        rejilla = calcular_rejilla_sensibilidad(
+            mes_nacimiento=mes_nacimiento, mes_inicio_modalidad40=mes_inicio, **CLIENTE
+        )
+        ms = (time.perf_counter() - inicio) * 1000
+        assert rejilla['pension_con_mod40'].shape == (25, 6, 6)
+        assert rejilla['inversion_total'].shape == (25, 6)
+        assert rejilla['pension_sin_mod40'].shape == (6,)
+
+        celdas = 0
+        for i, nivel in enumerate(rejilla['niveles_uma']):
+            for j, duracion in enumerate(rejilla['duraciones']):
+                for k, edad in enumerate(rejilla['edades_pension']):
+                    try:
+                        escenario = calc.calcular_escenario_completo(
+                            sbc_modalidad40_diario=float(nivel) * calc.uma_diaria_2025,
+                            edad_pension=int(edad), edad_actual=int(edad - duracion),
+                            mes_nacimiento=mes_nacimiento, mes_inicio_modalidad40=mes_inicio,
+                            calendario_mensual=True, **CLIENTE
+                        )
+                    except ZeroDivisionError:
+                        # Ambas pensiones en el mínimo garantizado: ROI sin recuperación
+                        assert rejilla['diferencia_mensual'][i, j, k] == 0 or np.isnan(rejilla['inversion_total'][i, j])
+                        assert np.isnan(rejilla['años_recuperacion'][i, j, k])
+                        continue
+                    assert rejilla['pension_sin_mod40'][k] == escenario['sin_modalidad40']['pension_final_mensual']
+                    if np.isnan(rejilla['inversion_total'][i, j]):
+                        # La escalar recorta el calendario a la última tasa: ya no es esa duración
+                        periodo = escenario['inversion']['periodo']
+                        assert (periodo['año_fin'], periodo['mes_fin']) == (2030, 12)
+                        assert np.isnan(rejilla['pension_con_mod40'][i, j, k])
+                        continue
+                    assert rejilla['pension_con_mod40'][i, j, k] == escenario['con_modalidad40']['pension_final_mensual']
+                    assert rejilla['inversion_total'][i, j] == escenario['inversion']['total_años']
+                    assert rejilla['promedio_mensual'][i, j] == escenario['inversion']['promedio_mensual']
+                    assert rejilla['roi_anual_pct'][i, j, k] == escenario['analisis_roi']['roi_anual_pct']
+                    celdas += 1
+        print(f"   ✅ mes_nacimiento={mes_nacimiento}, inicio={mes_inicio}: {celdas} celdas idénticas en {ms:.1f} ms")
+
+
+def test_duraciones_fuera_de_tabla():
+    """Iniciando en 2026, 6 años llegan a 2031 (sin tasa): esas celdas quedan en NaN"""
+    rejilla = calcular_rejilla_sensibilidad(año_inicio=2026, **CLIENTE)
+    assert np.isnan(rejilla['inversion_total'][:, 5]).all()
+    assert np.isnan(rejilla['pension_con_mod40'][:, 5, :]).all()
+    assert not np.isnan(rejilla['inversion_total'][:, :5]).any()
+
+
+def test_edad_actual_recorta_rejilla():
+    """A los 63 años no hay pensión a los 60-63 ni duraciones que rebasen la edad"""
+    completa = calcular_rejilla_sensibilidad(**CLIENTE)
+    rejilla = calcular_rejilla_sensibilidad(edad_actual=63, **CLIENTE)
+    duraciones, edades = rejilla['duraciones'], rejilla['edades_pension']
+    fuera_de_plazo = 63 + duraciones[:, None] > edades[None, :]
+
+    assert np.isnan(rejilla['pension_sin_mod40'][edades <= 63]).all()
+    assert np.isnan(rejilla['pension_con_mod40'][:, fuera_de_plazo]).all()
+    assert np.isnan(rejilla['roi_anual_pct'][:, fuera_de_plazo]).all()
+    # Las celdas que caben no cambian: 1 año hasta los 64, 1-2 años hasta los 65
+    assert np.array_equal(rejilla['pension_con_mod40'][:, ~fuera_de_plazo],
+                          completa['pension_con_mod40'][:, ~fuera_de_plazo])
+    assert (~fuera_de_plazo).sum() == 3
+    # Más de 2 años no cabe en ninguna edad: sin inversión
+    assert np.isnan(rejilla['inversion_total'][:, 2:]).all()
+    assert np.array_equal(rejilla['inversion_total'][:, :2], completa['inversion_total'][:, :2])
+
+
+def test_api_rejilla():
+    """El endpoint responde por columnas, con null en las celdas inválidas"""
+    print("🧪 Testing /api/rejilla-sensibilidad")
+    import app as webapp
+
+    cliente = webapp.app.test_client()
+    respuesta = cliente.post('/api/rejilla-sensibilidad', json=PERSONA)
+    assert respuesta.status_code == 200, respuesta.get_json()
+    datos = respuesta.get_json()
+    assert datos['ejes']['duraciones'] == [1, 2, 3, 4, 5, 6]
+    assert datos['ejes']['edades_pension'] == [60, 61, 62, 63, 64, 65]
+    assert len(datos['pension_con_mod40']) == 25
+    assert len(datos['pension_con_mod40'][0]) == 6 and len(datos['pension_con_mod40'][0][0]) == 6
+
+    # Con edad y SBC de una celda, /calcular da la misma pensión
+    calculo = cliente.post('/calcular', json=dict(
+        PERSONA, sbc_modalidad40=datos['ejes']['sbc_diario'][9], edad_actual=61, edad_pension=65
+    )).get_json()
+    assert calculo['sin_modalidad40']['pension_total'] == datos['pension_sin_mod40'][5]
+
+    # Mes de nacimiento y de inicio llegan a la rejilla: 4 años hasta los 65 = edad actual 61
+    meses = dict(PERSONA, mes_nacimiento=7, mes_inicio_modalidad40=4)
+    con_meses = cliente.post('/api/rejilla-sensibilidad', json=meses).get_json()
+    calculo = cliente.post('/calcular', json=dict(
+        meses, sbc_modalidad40=con_meses['ejes']['sbc_diario'][9], edad_actual=61, edad_pension=65
+    )).get_json()
+    assert calculo['inversion']['total_años'] == con_meses['inversion_total'][9][3]
+    assert calculo['con_modalidad40']['pension_total'] == con_meses['pension_con_mod40'][9][3][5]
+
+    sin_tasa = cliente.post('/api/rejilla-sensibilidad', json=dict(PERSONA, año_inicio=2026)).get_json()
+    assert sin_tasa['inversion_total'][0][5] is None
+
+    assert cliente.post('/api/rejilla-sensibilidad', json=dict(PERSONA, semanas_cotizadas=300)).status_code == 400
+
+    # La edad actual es obligatoria y recorta la rejilla
+    sin_edad = {campo: valor for campo, valor in PERSONA.items() if campo != 'edad_actual'}
+    assert cliente.post('/api/rejilla-sensibilidad', json=sin_edad).status_code == 400
+    mayor = cliente.post('/api/rejilla-sensibilidad', json=dict(PERSONA, edad_actual=63)).get_json()
+    assert mayor['pension_sin_mod40'][:4] == [None] * 4
+    assert mayor['pension_con_mod40'][9][0][4] is not None
+    assert mayor['pension_con_mod40'][9][1][4] is None
+    assert mayor['inversion_total'][9][2] is None
+    print(f"   ✅ {len(respuesta.data):,} bytes")
+
+
+if __name__ == "__main__":
+    test_rejilla_coincide_con_escalar()
+    test_duraciones_fuera_de_tabla()
+    test_edad_actual_recorta_rejilla()
+    test_api_rejilla()
+    print("\n🎉 SENSITIVITY GRID TESTS PASSED!")
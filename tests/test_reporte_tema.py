@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test del tema del reporte PDF: estilos construidos una vez y compartidos
+entre reportes sin que reportlab los modifique
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from reportlab import rl_config
+
+import reporte_tema as tema
+from reporte_pdf import construir_reporte_pdf
+from validacion import validar_datos_reporte
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+    'edad_actual': 60, 'edad_pension': 65,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def test_estilo_tabla():
+    """La fila de TOTAL deja fuera de las filas alternas a la última fila"""
+    print("🧪 Testing table style factory")
+    estilo = tema.estilo_tabla(tema.AZUL, filas_alternas=True, fila_total=tema.VERDE)
+    comandos = {comando[0]: comando for comando in estilo.getCommands() if comando[0] != 'BACKGROUND'}
+    assert comandos['ROWBACKGROUNDS'][1:3] == ((0, 1), (-1, -2))
+    assert comandos['GRID'][1:3] == ((0, 0), (-1, -1))
+
+    sin_total = tema.estilo_tabla(tema.AZUL, filas_alternas=True)
+    filas = [c for c in sin_total.getCommands() if c[0] == 'ROWBACKGROUNDS']
+    assert filas[0][1:3] == ((0, 1), (-1, -1))
+
+    assert tema.nivel_urgencia(10) == 'urgente'
+    assert tema.nivel_urgencia(100) == 'advertencia'
+    assert tema.nivel_urgencia(400) == 'informacion'
+    print("   ✅ Rangos de filas correctos")
+
+
+def test_estilos_compartidos_entre_reportes():
+    """Dos reportes usan los mismos estilos, sin alterarlos, y salen idénticos"""
+    print("🧪 Testing shared report theme")
+    import app as webapp
+
+    resultados = webapp.app.test_client().post('/calcular', json=dict(
+        PERSONA, mes_ultima_cotizacion=6, año_ultima_cotizacion=2024
+    )).get_json()
+    ahora = datetime(2025, 11, 20, 10, 30)
+    peticion = dict(validar_datos_reporte({'nombre': 'Ana', 'apellido_paterno': 'López', 'resultados': resultados}, ahora),
+                    incluir_recomendaciones=True)
+
+    estilos = [tema.ESTILO_DATOS, tema.ESTILO_RESUMEN, tema.ESTILO_INVERSION, tema.ESTILO_CALCULO,
+               tema.ESTILO_RESUMEN_INVERSION, tema.ESTILO_CALENDARIO, tema.ESTILO_ESCENARIOS]
+    comandos_antes = [list(estilo.getCommands()) for estilo in estilos]
+
+    invariante = rl_config.invariant
+    rl_config.invariant = 1  # Sin fecha de creación ni id aleatorio en el PDF
+    try:
+        primero = construir_reporte_pdf(peticion, ahora)
+        segundo = construir_reporte_pdf(peticion, ahora)
+    finally:
+        rl_config.invariant = invariante
+
+    assert primero == segundo
+    assert [list(estilo.getCommands()) for estilo in estilos] == comandos_antes
+    print(f"   ✅ 2 reportes idénticos de {len(primero):,} bytes")
+
+
+if __name__ == "__main__":
+    test_estilo_tabla()
+    test_estilos_compartidos_entre_reportes()
+    print("\n🎉 REPORT THEME TESTS PASSED!")
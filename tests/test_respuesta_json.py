@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test de la serialización de respuestas: modo rápido (orjson) con el mismo
+JSON que el de Flask, modo compatible byte por byte, llaves enteras de
+desglose_anual, valores que orjson no maneja y tablas de redondeo
+"""
+
+import sys
+import os
+import json
+import time
+from datetime import date
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from respuesta_json import (
+    REDONDEO_PENSION, REDONDEO_PENSION_PDF, ProveedorJSONRapido, crear_proveedor_json_desde_entorno,
+    orjson, redondear
+)
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+DESGLOSE = {
+    'años_disponibles': 5, 'nivel_umas': 25.0, 'roi': 73.1, 'factible': True, 'warning': None,
+    'desglose_anual': {2025: {'tasa_pct': 13.347, 'costo_anual': 137794.76167499978},
+                       2026: {'tasa_pct': 14.438, 'costo_anual': 154762.90722499997}},
+}
+
+
+def _app(proveedor):
+    app = Flask(__name__)
+    app.json = proveedor(app)
+    return app
+
+
+def _cuerpo(app, obj):
+    with app.app_context():
+        return app.json.response(obj).get_data()
+
+
+def test_compatible_es_el_jsonify_de_flask():
+    """El modo compatible da exactamente los bytes de siempre"""
+    print("🧪 Testing compatible mode")
+    os.environ['JSON_MODE'] = 'compatible'
+    try:
+        app = Flask(__name__)
+        proveedor = crear_proveedor_json_desde_entorno(app)
+    finally:
+        del os.environ['JSON_MODE']
+    assert type(proveedor) is DefaultJSONProvider
+    app.json = proveedor
+    esperado = json.dumps(DESGLOSE, sort_keys=True, ensure_ascii=True, separators=(',', ':')) + '\n'
+    assert _cuerpo(app, DESGLOSE) == esperado.encode('ascii')
+    print("   ✅ Bytes idénticos a json.dumps de Flask")
+
+
+def test_rapido_mismo_json():
+    """Mismo JSON (llaves ordenadas, años como texto, salto de línea final) en UTF-8"""
+    print("🧪 Testing fast mode")
+    if orjson is None:
+        print("   ⏭️ orjson no está instalado")
+        return
+    rapido = _cuerpo(_app(ProveedorJSONRapido), DESGLOSE)
+    compatible = _cuerpo(_app(DefaultJSONProvider), DESGLOSE)
+    assert json.loads(rapido) == json.loads(compatible)
+    assert rapido.endswith(b'}\n')
+    assert '"años_disponibles":5'.encode('utf-8') in rapido
+    assert b'"desglose_anual":{"2025":{"costo_anual":137794.76167499978,"tasa_pct":13.347},"2026"' in rapido
+    print(f"   ✅ {len(rapido)} bytes vs {len(compatible)} en modo compatible")
+
+
+def test_rapido_tipos_de_flask():
+    """Fechas como Flask, valores que orjson no soporta con el proveedor de Flask y debug indentado"""
+    if orjson is None:
+        return
+    app = _app(ProveedorJSONRapido)
+    assert json.loads(_cuerpo(app, {'fecha': date(2025, 11, 18)})) == {'fecha': 'Tue, 18 Nov 2025 00:00:00 GMT'}
+    # Entero de más de 64 bits: orjson lo rechaza y responde el proveedor de Flask
+    assert _cuerpo(app, {'grande': 2 ** 70}) == b'{"grande":1180591620717411303424}\n'
+    app.debug = True
+    assert _cuerpo(app, {'a': 1}) == b'{\n  "a": 1\n}\n'
+
+
+def test_redondear():
+    """Las tablas redondean igual que antes y los campos del PDF faltantes van en 0"""
+    pension = {'pension_base_mensual': 40693.7, 'total_asignaciones_mensual': 6104.05,
+               'pension_final_mensual': 51945.5, 'cuantia_basica_pct': 13.0,
+               'incremento_anual_pct': 2.4512, 'multiple_uma': 24.996, 'cuantia_basica_mensual': 11184.357}
+    seccion = redondear(pension, REDONDEO_PENSION, REDONDEO_PENSION_PDF, sdp_diario=2828.5)
+    assert seccion == {
+        'pension_base': 40694.0, 'asignaciones': 6104.0, 'pension_total': 51946.0, 'cuantia_pct': 13.0,
+        'incremento_pct': 2.45, 'multiple_uma': 25.0, 'cuantia_basica_diaria': 0,
+        'cuantia_basica_mensual': 11184.36, 'porcentaje_aplicable': 0, 'sdp_diario': 2828.5,
+    }
+
+
+def test_calcular_mas_rapido():
+    """/calcular responde el mismo JSON en los dos modos y serializar cuesta menos con orjson"""
+    print("🧪 Testing /calcular serialization")
+    import app as webapp
+    original = webapp.app.json
+    cliente = webapp.app.test_client()
+    cuerpos, costos = {}, {}
+    try:
+        for nombre, proveedor in (('compatible', DefaultJSONProvider), ('rapido', ProveedorJSONRapido)):
+            if nombre == 'rapido' and orjson is None:
+                continue
+            webapp.app.json = proveedor(webapp.app)
+            respuesta = cliente.post('/calcular', json=PERSONA).get_json()
+            respuesta.pop('fecha_calculo')
+            cuerpos[nombre] = respuesta
+            with webapp.app.app_context():
+                inicio = time.perf_counter()
+                for _ in range(200):
+                    webapp.app.json.response(DESGLOSE)
+                costos[nombre] = time.perf_counter() - inicio
+    finally:
+        webapp.app.json = original
+
+    assert cuerpos['compatible']['inversion']['desglose_anual']
+    if 'rapido' in cuerpos:
+        assert cuerpos['rapido'] == cuerpos['compatible']
+        assert costos['rapido'] < costos['compatible']
+    print(f"   ✅ {', '.join(f'{n}: {c / 200 * 1e6:.1f} µs' for n, c in costos.items())}")
+
+
+if __name__ == "__main__":
+    test_compatible_es_el_jsonify_de_flask()
+    test_rapido_mismo_json()
+    test_rapido_tipos_de_flask()
+    test_redondear()
+    test_calcular_mas_rapido()
+    print("\n🎉 JSON RESPONSE TESTS PASSED!")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test de la caché de resultados (LRU/TTL, backends memoria y SQLite)
+y de su uso en /calcular
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add the webapp directory to the Python path
+webapp_path = os.path.join(os.path.dirname(__file__), '..', 'webapp')
+if webapp_path not in sys.path:
+    sys.path.insert(0, webapp_path)
+
+from result_cache import BackendMemoria, BackendSQLite, CacheResultados
+
+ARGUMENTOS = {'semanas_cotizadas_actuales': 1000, 'sdp_actual_diario': 500.0, 'edad_pension': 65}
+
+
+def test_aciertos_y_fallos():
+    """La segunda llamada con los mismos argumentos no recalcula"""
+    print("🧪 Testing result cache hits/misses")
+    cache = CacheResultados(BackendMemoria(10))
+    llamadas = []
+    calcular = lambda: llamadas.append(1) or {'pension': 1}
+
+    assert cache.obtener_o_calcular('2025.11', ARGUMENTOS, calcular) == {'pension': 1}
+    assert cache.obtener_o_calcular('2025.11', dict(reversed(list(ARGUMENTOS.items()))), calcular) == {'pension': 1}
+    assert len(llamadas) == 1
+    assert cache.estadisticas()['aciertos'] == 1
+    assert cache.estadisticas()['fallos'] == 1
+
+    # Otra versión de parámetros es otra clave
+    cache.obtener_o_calcular('2026.01', ARGUMENTOS, calcular)
+    assert len(llamadas) == 2
+    print("   ✅ 1 acierto, clave depende de la versión")
+
+
+def test_lru_y_ttl():
+    """Se expulsa la entrada menos usada y las expiradas no se regresan"""
+    backend = BackendMemoria(2)
+    backend.guardar('a', 1, ttl=60)
+    backend.guardar('b', 2, ttl=60)
+    assert backend.obtener('a') == 1
+    backend.guardar('c', 3, ttl=60)
+    assert backend.obtener('b') is None
+    assert backend.obtener('a') == 1
+
+    backend.guardar('d', 4, ttl=-1)
+    assert backend.obtener('d') is None
+
+
+def test_sqlite_compartido():
+    """Dos instancias (como dos workers) comparten el mismo archivo"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'cache.sqlite3')
+        worker_1 = CacheResultados(BackendSQLite(ruta, 2))
+        worker_2 = CacheResultados(BackendSQLite(ruta, 2))
+
+        worker_1.obtener_o_calcular('2025.11', ARGUMENTOS, lambda: {'pension': [1, 2]})
+        assert worker_2.obtener_o_calcular('2025.11', ARGUMENTOS, lambda: None) == {'pension': [1, 2]}
+        assert worker_2.aciertos == 1
+
+        for i in range(5):
+            worker_1.backend.guardar(f'clave{i}', i, ttl=60)
+            time.sleep(0.001)
+        assert len(worker_1.backend) == 2
+        assert worker_2.backend.obtener('clave4') == 4
+
+
+def test_sqlite_expulsa_en_lote():
+    """La expulsión no corre en cada escritura: cada ~10% del límite y hasta la marca baja"""
+    print("🧪 Testing SQLite batched eviction")
+    with tempfile.TemporaryDirectory() as directorio:
+        backend = BackendSQLite(os.path.join(directorio, 'cache.sqlite3'), 50)
+        sentencias = []
+        backend._conexion().set_trace_callback(sentencias.append)
+        for i in range(200):
+            backend.guardar(f'clave{i}', i, ttl=60)
+            time.sleep(0.0005)
+        revisiones = [s for s in sentencias if s.startswith('SELECT COUNT')]
+        expulsiones = [s for s in sentencias if s.startswith('DELETE')]
+        assert len(revisiones) == 200 // backend.revisar_cada
+        assert 0 < len(expulsiones) <= len(revisiones)
+        assert backend.marca_baja <= len(backend) <= backend.max_entradas + backend.revisar_cada
+        # Se quedan las más recientes
+        assert backend.obtener('clave199') == 199 and backend.obtener('clave0') is None
+    print(f"   ✅ {len(expulsiones)} expulsiones en 200 escrituras")
+
+
+def test_calcular_usa_cache():
+    """Peticiones idénticas a /calcular dan la misma respuesta y cuentan aciertos"""
+    import app as webapp
+
+    webapp.cache_resultados.limpiar()
+    cliente = webapp.app.test_client()
+    datos = {
+        'semanas_cotizadas': 1000, 'sdp_actual': 500, 'sbc_modalidad40': 2000,
+        'edad_actual': 60, 'edad_pension': 65,
+        'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+    }
+    primera = cliente.post('/calcular', json=datos).get_json()
+    segunda = cliente.post('/calcular', json=datos).get_json()
+    assert primera['con_modalidad40'] == segunda['con_modalidad40']
+
+    estadisticas = cliente.get('/api/cache-resultados').get_json()
+    assert estadisticas['aciertos'] == 1
+    assert estadisticas['fallos'] == 1
+
+
+if __name__ == "__main__":
+    test_aciertos_y_fallos()
+    test_lru_y_ttl()
+    test_sqlite_compartido()
+    test_sqlite_expulsa_en_lote()
+    test_calcular_usa_cache()
+    print("\n🎉 RESULT CACHE TESTS PASSED!")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test del SBC óptimo: el resultado coincide con un barrido de todos los
+centavos entre 1 y 25 UMAs (hecho con el motor en lote) y /api/sbc-optimo
+responde en milisegundos
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+from Calculadora_Modalidad_40_Lote import calcular_escenarios_lote
+
+ARGUMENTOS = dict(
+    semanas_cotizadas_actuales=1200, sdp_actual_diario=450.0, edad_pension=65,
+    tiene_esposa=True, num_hijos_dependientes=0, tiene_padres_dependientes=False,
+    año_inicio=2025, edad_actual=60, mes_nacimiento=3, mes_inicio_modalidad40=1,
+)
+
+PERSONA = {
+    'semanas_cotizadas': 1000, 'sdp_actual': 500,
+    'edad_actual': 60, 'edad_pension': 65,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def _barrido():
+    """Todos los centavos entre 1 y 25 UMAs, evaluados con el motor en lote"""
+    calc = obtener_calculadora()
+    centavos = np.arange(round(calc.uma_diaria_2025 * 100), round(calc.tope_diario_2025 * 100) + 1)
+    sbc = centavos / 100
+    return sbc, calcular_escenarios_lote(sbc_modalidad40_diario=sbc, **ARGUMENTOS)
+
+
+def _primer_centavo(cumple):
+    """SBC mínimo (al centavo) que cumple según el barrido"""
+    sbc, lote = _barrido()
+    indices = np.flatnonzero(cumple(lote) & lote['valido'])
+    return float(sbc[indices[0]]) if len(indices) else None
+
+
+def test_coincide_con_barrido():
+    """Pensión objetivo, ROI mínimo y presupuesto dan el mismo SBC que el barrido"""
+    print("🧪 Testing optimal SBC against a full sweep")
+    calc = obtener_calculadora()
+
+    for pension_objetivo in (12000, 25000, 40000):
+        resultado = calc.calcular_sbc_optimo(pension_objetivo_mensual=pension_objetivo, **ARGUMENTOS)
+        esperado = _primer_centavo(lambda l: (l['pension_con_mod40'] >= pension_objetivo)
+                                   & (l['diferencia_mensual'] > 0))
+        assert resultado['sbc_optimo_diario'] == esperado, (pension_objetivo, resultado, esperado)
+        print(f"   ✅ Pensión ${pension_objetivo:,} → SBC ${esperado:,.2f} "
+              f"({resultado['evaluaciones']} evaluaciones)")
+
+    for roi_minimo in (5.0, 12.0):
+        resultado = calc.calcular_sbc_optimo(roi_minimo_pct=roi_minimo, **ARGUMENTOS)
+        esperado = _primer_centavo(lambda l: (l['roi_anual_pct'] >= roi_minimo) & (l['diferencia_mensual'] > 0))
+        assert resultado.get('sbc_optimo_diario') == esperado, (roi_minimo, resultado, esperado)
+        print(f"   ✅ ROI {roi_minimo}% → SBC {esperado}")
+
+    # Solo presupuesto: la mejor pensión que cabe y el SBC mínimo que la alcanza
+    presupuesto = 150000
+    resultado = calc.calcular_sbc_optimo(inversion_maxima=presupuesto, **ARGUMENTOS)
+    escenario = resultado['escenario']
+    assert escenario['inversion']['total_años'] <= presupuesto
+    _, lote = _barrido()
+    en_presupuesto = lote['inversion_total'] <= presupuesto
+    assert escenario['con_modalidad40']['pension_final_mensual'] == lote['pension_con_mod40'][en_presupuesto].max()
+    print(f"   ✅ Presupuesto ${presupuesto:,} → SBC ${resultado['sbc_optimo_diario']:,.2f}")
+
+    imposible = calc.calcular_sbc_optimo(pension_objetivo_mensual=10_000_000, **ARGUMENTOS)
+    assert 'error' in imposible
+
+
+def test_api_sbc_optimo():
+    """El endpoint valida como /calcular y responde en milisegundos"""
+    print("🧪 Testing /api/sbc-optimo")
+    import app as webapp
+
+    cliente = webapp.app.test_client()
+    inicio = time.perf_counter()
+    respuesta = cliente.post('/api/sbc-optimo', json=dict(PERSONA, pension_objetivo=30000))
+    ms = (time.perf_counter() - inicio) * 1000
+    assert respuesta.status_code == 200, respuesta.get_json()
+    datos = respuesta.get_json()
+    assert datos['pension_con_modalidad40'] >= 30000
+
+    # Con ese SBC, /calcular da la misma pensión
+    calculo = cliente.post('/calcular', json=dict(PERSONA, sbc_modalidad40=datos['sbc_optimo'])).get_json()
+    assert calculo['con_modalidad40']['pension_total'] == datos['pension_con_modalidad40']
+
+    assert cliente.post('/api/sbc-optimo', json=PERSONA).status_code == 400
+    assert cliente.post('/api/sbc-optimo', json=dict(PERSONA, roi_minimo='alto')).status_code == 400
+    assert cliente.post('/api/sbc-optimo', json=dict(PERSONA, pension_objetivo=10_000_000)).status_code == 422
+    assert ms < 250
+    print(f"   ✅ SBC ${datos['sbc_optimo']:,.2f} en {ms:.1f} ms")
+
+
+def test_criterios_validados_por_esquema():
+    """Criterios negativos, NaN o infinitos dan 400 con la forma de errores de siempre"""
+    import app as webapp
+
+    cliente = webapp.app.test_client()
+    for valor in ('-5', 0, 'nan', 'inf', '-inf'):
+        respuesta = cliente.post('/api/sbc-optimo', json=dict(PERSONA, pension_objetivo=valor))
+        assert respuesta.status_code == 400, (valor, respuesta.get_json())
+        errores = respuesta.get_json()['errores']
+        assert [(e['campo'], e['motivo']) for e in errores] == [('pension_objetivo', 'criterio')], valor
+
+    # Todas las violaciones juntas: datos de la persona y criterios
+    respuesta = cliente.post('/api/sbc-optimo', json=dict(PERSONA, edad_pension=70, roi_minimo='alto',
+                                                           inversion_maxima=-1))
+    assert {e['campo'] for e in respuesta.get_json()['errores']} == {'edad_pension', 'roi_minimo', 'inversion_maxima'}
+
+    faltante = cliente.post('/api/sbc-optimo', json=PERSONA).get_json()
+    assert faltante['error'] == 'Indica pension_objetivo, inversion_maxima o roi_minimo'
+    assert faltante['errores'][0]['motivo'] == 'datos_faltantes'
+
+
+if __name__ == "__main__":
+    test_coincide_con_barrido()
+    test_api_sbc_optimo()
+    test_criterios_validados_por_esquema()
+    print("\n🎉 OPTIMAL SBC TESTS PASSED!")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test del vuelo único: peticiones idénticas simultáneas comparten un solo
+cálculo o un solo PDF, las excepciones llegan a todas y hay contadores
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from single_flight import VueloUnico
+from result_cache import CacheResultados
+from pdf_jobs import ColaTrabajosPDF
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def _generar_lento(segundos, ahora):
+    """Generador de prueba (se ejecuta en el proceso del pool)"""
+    time.sleep(segundos)
+    return b'%PDF-prueba'
+
+
+def _esperar(condicion, segundos=10):
+    limite = time.monotonic() + segundos
+    while not condicion():
+        assert time.monotonic() < limite, 'la condición no se cumplió a tiempo'
+        time.sleep(0.005)
+
+
+def _en_paralelo(n, funcion):
+    """Correr funcion() en n hilos y regresar sus resultados (o excepciones)"""
+    resultados = [None] * n
+
+    def correr(i):
+        try:
+            resultados[i] = funcion()
+        except Exception as e:
+            resultados[i] = e
+
+    hilos = [threading.Thread(target=correr, args=(i,)) for i in range(n)]
+    return hilos, resultados
+
+
+def test_duplicados_comparten_el_resultado():
+    """La primera llamada calcula; las que llegan mientras tanto esperan su resultado"""
+    print("🧪 Testing single-flight coalescing")
+    vuelo = VueloUnico()
+    liberar = threading.Event()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        liberar.wait(10)
+        return {'pension': 51946.0}
+
+    hilos, resultados = _en_paralelo(8, lambda: vuelo.ejecutar('clave', calcular))
+    hilos[0].start()
+    _esperar(lambda: llamadas)
+    for hilo in hilos[1:]:
+        hilo.start()
+    _esperar(lambda: vuelo.compartidos == 7)
+    # Otra clave no espera a la primera
+    assert vuelo.ejecutar('otra', lambda: 'otra') == 'otra'
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(10)
+
+    assert len(llamadas) == 1
+    assert all(resultado is resultados[0] for resultado in resultados)
+    assert vuelo.estadisticas() == {'ejecutados': 2, 'compartidos': 7, 'en_curso': 0}
+
+    # Ya terminado: la siguiente llamada vuelve a ejecutar
+    vuelo.ejecutar('clave', calcular)
+    assert len(llamadas) == 2
+    print("   ✅ 8 llamadas, 1 cálculo")
+
+
+def test_excepcion_compartida():
+    """Si la primera falla, las duplicadas reciben la misma excepción y la clave se libera"""
+    vuelo = VueloUnico()
+    liberar = threading.Event()
+
+    def fallar():
+        liberar.wait(10)
+        raise ValueError('sin tasa para el año')
+
+    hilos, resultados = _en_paralelo(3, lambda: vuelo.ejecutar('clave', fallar))
+    hilos[0].start()
+    _esperar(lambda: vuelo.estadisticas()['en_curso'] == 1)
+    for hilo in hilos[1:]:
+        hilo.start()
+    _esperar(lambda: vuelo.compartidos == 2)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(10)
+
+    assert all(isinstance(resultado, ValueError) for resultado in resultados)
+    assert vuelo.ejecutar('clave', lambda: 'ok') == 'ok'
+
+
+def test_cache_de_resultados_sin_backend():
+    """Con la caché apagada los cálculos idénticos simultáneos también se juntan"""
+    cache = CacheResultados(backend=None)
+    liberar = threading.Event()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        liberar.wait(10)
+        return {'ok': True}
+
+    hilos, resultados = _en_paralelo(4, lambda: cache.obtener_o_calcular('v1', {'edad': 60}, calcular))
+    hilos[0].start()
+    _esperar(lambda: llamadas)
+    for hilo in hilos[1:]:
+        hilo.start()
+    _esperar(lambda: cache.vuelo.compartidos == 3)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(10)
+    assert len(llamadas) == 1 and resultados == [{'ok': True}] * 4
+    assert cache.estadisticas()['calculos_compartidos'] == 3
+
+
+def test_pdf_identico_comparte_el_trabajo():
+    """El mismo reporte en curso regresa el mismo trabajo y no ocupa lugar en la cola"""
+    print("🧪 Testing PDF coalescing")
+    cola = ColaTrabajosPDF(_generar_lento, max_workers=1, max_pendientes=1)
+    try:
+        primero = cola.enviar(0.5, None, 'clave-reporte', 'Reporte.pdf')
+        segundo = cola.enviar(0.5, None, 'clave-reporte', 'Reporte.pdf')
+        assert segundo is primero
+        assert cola.esperar(segundo, timeout=30) == b'%PDF-prueba'
+        estadisticas = cola.estadisticas()
+        assert estadisticas['compartidos'] == 1
+        assert estadisticas['trabajos']['listo'] == 1
+        assert cola.vuelo.estadisticas()['en_curso'] == 0
+
+        # Terminado (y sin caché): uno nuevo se genera aparte
+        tercero = cola.enviar(0, None, 'clave-reporte', 'Reporte.pdf')
+        assert tercero is not primero
+        cola.esperar(tercero, timeout=30)
+    finally:
+        cola.cerrar()
+    print("   ✅ 2 peticiones, 1 PDF")
+
+
+def test_sbc_optimo_duplicado_se_calcula_una_vez():
+    """/api/sbc-optimo idénticos y simultáneos comparten una sola búsqueda"""
+    print("🧪 Testing /api/sbc-optimo coalescing")
+    import app as webapp
+    calc = webapp.obtener_calculadora()
+    webapp.cache_resultados.limpiar()
+    compartidos = webapp.cache_resultados.vuelo.compartidos
+    original = calc.calcular_sbc_optimo
+    liberar = threading.Event()
+    llamadas = []
+
+    def buscar_lento(**argumentos):
+        llamadas.append(1)
+        liberar.wait(10)
+        return original(**argumentos)
+
+    peticion = dict(PERSONA, sbc_modalidad40=None, pension_objetivo=30000)
+    calc.calcular_sbc_optimo = buscar_lento
+    try:
+        hilos, respuestas = _en_paralelo(
+            4, lambda: webapp.app.test_client().post('/api/sbc-optimo', json=peticion).get_json()
+        )
+        hilos[0].start()
+        _esperar(lambda: llamadas)
+        for hilo in hilos[1:]:
+            hilo.start()
+        _esperar(lambda: webapp.cache_resultados.vuelo.compartidos == compartidos + 3)
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(10)
+        # Otra vez la misma petición: sale de la caché
+        repetida = webapp.app.test_client().post('/api/sbc-optimo', json=peticion).get_json()
+    finally:
+        del calc.calcular_sbc_optimo
+
+    assert len(llamadas) == 1
+    assert all(respuesta == respuestas[0] for respuesta in respuestas) and respuestas[0]['success']
+    assert repetida == respuestas[0]
+    print("   ✅ 4 peticiones, 1 búsqueda")
+
+
+def test_contadores_en_metrics():
+    """/metrics expone ejecutados, compartidos y en curso de cálculos y PDF"""
+    import app as webapp
+    cliente = webapp.app.test_client()
+    webapp.cache_resultados.limpiar()
+    assert cliente.post('/calcular', json=PERSONA).status_code == 200
+
+    texto = cliente.get('/metrics').get_data(as_text=True)
+    assert 'modalidad40_vuelo_unico_ejecutados_total{vuelo="calculos"} 1' in texto
+    assert 'modalidad40_vuelo_unico_compartidos_total{vuelo="pdf"} ' in texto
+    assert '# TYPE modalidad40_vuelo_unico_en_curso gauge' in texto
+
+
+if __name__ == "__main__":
+    test_duplicados_comparten_el_resultado()
+    test_excepcion_compartida()
+    test_cache_de_resultados_sin_backend()
+    test_pdf_identico_comparte_el_trabajo()
+    test_sbc_optimo_duplicado_se_calcula_una_vez()
+    test_contadores_en_metrics()
+    print("\n🎉 SINGLE-FLIGHT TESTS PASSED!")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test de la validación con esquema: todas las violaciones en una respuesta,
+motivos, datos normalizados (DatosCalculo) y el mismo validador en
+/calcular, /calcular-lote y el reporte PDF
+"""
+
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add the webapp and calculadoras-python directories to the Python path
+for carpeta in ('webapp', 'calculadoras-python'):
+    ruta = os.path.join(os.path.dirname(__file__), '..', carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from validacion import (
+    ErrorValidacion, DatosCalculo, ESQUEMA_CALCULO, validar_datos_calculo,
+    validar_peticion_calculo, validar_datos_reporte
+)
+
+HOY = datetime(2025, 11, 18)
+
+PERSONA = {
+    'semanas_cotizadas': 1013, 'sdp_actual': 517.35, 'sbc_modalidad40': 2828.5,
+    'edad_actual': 60, 'edad_pension': 65, 'mes_nacimiento': 4,
+    'mes_inicio_cotizacion': 3, 'año_inicio_cotizacion': 1990,
+}
+
+
+def _error(funcion, *args):
+    try:
+        funcion(*args)
+    except ErrorValidacion as ev:
+        return ev
+    raise AssertionError('se esperaba ErrorValidacion')
+
+
+def test_datos_normalizados():
+    """Los textos del formulario se convierten y los opcionales toman su valor por omisión"""
+    print("🧪 Testing normalized input")
+    datos = validar_datos_calculo(dict(PERSONA, semanas_cotizadas='1013.0', edad_actual='60',
+                                       mes_ultima_cotizacion=3, año_ultima_cotizacion=2024), HOY)
+    assert isinstance(datos, DatosCalculo)
+    assert datos.semanas_cotizadas == 1013 and datos.edad_actual == 60
+    assert datos.num_hijos == 0 and datos.tiene_esposa is False and datos.año_inicio == 2025
+    assert datos.años_disponibles == 5
+    assert datos.fecha_limite_inscripcion == datetime(2029, 3, 1)
+    assert datos.dias_restantes_deadline == (datetime(2029, 3, 1) - HOY).days
+
+    argumentos = datos.argumentos()
+    assert argumentos['semanas_cotizadas_actuales'] == 1013
+    assert argumentos['calendario_mensual'] is True
+    # Un diccionario nuevo en cada llamada
+    argumentos['edad_pension'] = 60
+    assert datos.argumentos()['edad_pension'] == 65
+
+    # El esquema se compila a una sola función, sin ciclos
+    assert 'for ' not in ESQUEMA_CALCULO.codigo
+    print("   ✅ DatosCalculo con tipos y valores por omisión")
+
+
+def test_todas_las_violaciones():
+    """Un solo 400 con todos los campos inválidos; 'error' sigue siendo el primero"""
+    print("🧪 Testing single-pass error collection")
+    ev = _error(validar_datos_calculo, dict(PERSONA, semanas_cotizadas=100, edad_actual=49,
+                                            edad_pension=66, sdp_actual='abc'), HOY)
+    campos = [violacion.campo for violacion in ev.errores]
+    assert campos == ['sdp_actual', 'semanas_cotizadas', 'edad_actual', 'edad_pension']
+    assert [violacion.motivo for violacion in ev.errores] == ['formato', 'semanas', 'edad', 'edad']
+    assert ev.motivo == 'formato' and ev.mensaje == ev.errores[0].mensaje
+
+    cuerpo = ev.respuesta()
+    assert cuerpo['error'] == ev.mensaje
+    assert cuerpo['errores'][1] == {'campo': 'semanas_cotizadas', 'motivo': 'semanas',
+                                    'mensaje': 'Se requieren mínimo 500 semanas cotizadas para acceder a pensión'}
+
+    # Un dato mal escrito no genera errores en cascada (edad_pension > edad_actual)
+    ev = _error(validar_datos_calculo, dict(PERSONA, edad_actual='sesenta'), HOY)
+    assert [violacion.campo for violacion in ev.errores] == ['edad_actual']
+
+    # Los faltantes se reportan todos, con el mensaje de siempre
+    ev = _error(validar_datos_calculo, {'sdp_actual': 500}, HOY)
+    assert ev.mensaje == 'Campo requerido para cálculo: semanas_cotizadas. Valor recibido: no proporcionado'
+    assert {violacion.motivo for violacion in ev.errores} == {'datos_faltantes'}
+    assert len(ev.errores) == 5  # 4 campos numéricos + fecha de inicio (un mismo mensaje)
+    print(f"   ✅ {len(cuerpo['errores'])} violaciones en una respuesta")
+
+
+def test_reglas_de_elegibilidad():
+    """Ley 97 y deadline de 5 años, con un solo mensaje cuando hay un solo problema"""
+    ev = _error(validar_datos_calculo, dict(PERSONA, año_inicio_cotizacion=1999), HOY)
+    assert ev.motivo == 'ley97' and len(ev.errores) == 1
+    assert ev.mensaje.startswith('No elegible para Modalidad 40. Iniciaste cotización el 3/1999')
+
+    ev = _error(validar_datos_calculo, dict(PERSONA, mes_ultima_cotizacion=6, año_ultima_cotizacion=2019), HOY)
+    assert ev.motivo == 'deadline_vencida'
+    assert 'Límite: 6/2024' in ev.mensaje
+
+    # Una fecha de última cotización imposible no tiene deadline
+    datos = validar_datos_calculo(dict(PERSONA, mes_ultima_cotizacion=13, año_ultima_cotizacion=2024), HOY)
+    assert datos.dias_restantes_deadline is None
+
+
+def test_monte_carlo_junto_con_los_datos():
+    """Las opciones Monte Carlo se validan en la misma pasada que los datos"""
+    datos, opciones = validar_peticion_calculo(dict(PERSONA, monte_carlo=True), HOY)
+    assert datos.edad_pension == 65 and opciones['trayectorias'] == 10_000
+
+    ev = _error(validar_peticion_calculo, dict(PERSONA, edad_actual=49,
+                                               monte_carlo={'trayectorias': 0, 'persistencia': 1}), HOY)
+    assert [violacion.campo for violacion in ev.errores] == ['edad_actual', 'trayectorias', 'persistencia']
+    assert [violacion.motivo for violacion in ev.errores] == ['edad', 'monte_carlo', 'monte_carlo']
+
+
+def test_reporte():
+    """Nombre y apellido sin espacios de más; todos los faltantes juntos"""
+    reporte = validar_datos_reporte({'nombre': ' Ana ', 'apellido_paterno': 'Pérez', 'resultados': {}}, HOY)
+    assert reporte['nombre'] == 'Ana'
+    assert reporte['datos_calculo'] is None
+
+    ev = _error(validar_datos_reporte, {'nombre': '   '}, HOY)
+    assert [violacion.campo for violacion in ev.errores] == ['nombre', 'apellido_paterno', 'resultados']
+    assert ev.mensaje == 'Campo personal requerido para PDF: nombre'
+    assert {violacion.motivo for violacion in ev.errores} == {'reporte'}
+
+
+def test_reporte_valida_parametros_calculo():
+    """Los parametros_calculo de los resultados pasan por las reglas de /calcular"""
+    datos = validar_datos_calculo(PERSONA, HOY)
+    peticion = {'nombre': 'Ana', 'apellido_paterno': 'Pérez', 'resultados': {'parametros_calculo': datos.campos()}}
+    reporte = validar_datos_reporte(peticion, HOY)
+    assert reporte['datos_calculo'] == datos
+    assert reporte['datos_calculo'].argumentos() == datos.argumentos()
+
+    alterados = dict(datos.campos(), edad_pension=70, semanas_cotizadas='mil')
+    ev = _error(validar_datos_reporte, dict(peticion, nombre='', resultados={'parametros_calculo': alterados}), HOY)
+    assert [violacion.campo for violacion in ev.errores] == [
+        'nombre', 'parametros_calculo.semanas_cotizadas', 'parametros_calculo.edad_pension'
+    ]
+
+    ev = _error(validar_datos_reporte, dict(peticion, resultados={'parametros_calculo': [1, 2]}), HOY)
+    assert ev.errores[0].campo == 'parametros_calculo'
+
+
+def test_endpoints():
+    """/calcular, el PDF y /calcular-lote regresan las mismas violaciones"""
+    print("🧪 Testing endpoints")
+    import app as webapp
+    cliente = webapp.app.test_client()
+    invalida = dict(PERSONA, semanas_cotizadas=100, edad_pension=66)
+
+    respuesta = cliente.post('/calcular', json=invalida)
+    assert respuesta.status_code == 400
+    cuerpo = respuesta.get_json()
+    assert cuerpo['error'] == 'Se requieren mínimo 500 semanas cotizadas para acceder a pensión'
+    assert [error['campo'] for error in cuerpo['errores']] == ['semanas_cotizadas', 'edad_pension']
+
+    respuesta = cliente.post('/generar-reporte-pdf', json={'resultados': {}})
+    assert respuesta.status_code == 400
+    assert len(respuesta.get_json()['errores']) == 2
+
+    resultados = cliente.post('/calcular', json=PERSONA).get_json()
+    resultados['parametros_calculo']['edad_pension'] = 70
+    respuesta = cliente.post('/generar-reporte-pdf', json={'nombre': 'Ana', 'apellido_paterno': 'Pérez',
+                                                           'resultados': resultados})
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['errores'][0]['campo'] == 'parametros_calculo.edad_pension'
+
+    lineas = [json.loads(linea) for linea in
+              cliente.post('/calcular-lote', json=[invalida, dict(PERSONA, edad_pension=70)]).get_data(as_text=True).splitlines()]
+    assert lineas[0]['error'] == cuerpo['error']
+    assert lineas[0]['errores'] == cuerpo['errores']
+    # Con una sola violación la fila queda como antes
+    assert 'errores' not in lineas[1]
+    print("   ✅ Mismas violaciones en /calcular y /calcular-lote")
+
+
+if __name__ == "__main__":
+    test_datos_normalizados()
+    test_todas_las_violaciones()
+    test_reglas_de_elegibilidad()
+    test_monte_carlo_junto_con_los_datos()
+    test_reporte()
+    test_reporte_valida_parametros_calculo()
+    test_endpoints()
+    print("\n🎉 VALIDATION TESTS PASSED!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API DE DATOS DE REFERENCIA - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Respuestas de /api/topes, /api/uma, /api/tasas-modalidad40,
+/api/tramos-ley73 y /api/factores-edad. Son datos fijos de cada versión de
+los parámetros, así que los bytes de cada respuesta se arman una sola vez
+por versión (en la primera petición) y se reutilizan.
+
+Cada respuesta lleva un ETag fuerte (versión + hash del cuerpo) y
+Cache-Control público de larga duración: el navegador o la CDN la guardan,
+y al revalidar con If-None-Match reciben un 304 sin cuerpo. Una versión
+nueva de los datos cambia el ETag.
+
+El JSON se escribe igual que el jsonify de Flask (llaves ordenadas, ASCII,
+compacto, salto de línea final), sin importar JSON_MODE: el ETag no cambia
+con la configuración.
+
+Variables de entorno:
+    REFERENCE_MAX_AGE  Segundos de Cache-Control max-age. Default: 86400
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, NamedTuple
+
+MAX_AGE = int(os.environ.get('REFERENCE_MAX_AGE', 86400))
+
+
+class RespuestaPrecalculada(NamedTuple):
+    """Cuerpo JSON ya serializado de una versión, con su ETag (sin comillas)"""
+    cuerpo: bytes
+    etag: str
+    version: str
+
+
+def _contenidos(parametros) -> Dict[str, Dict[str, Any]]:
+    """Ruta -> contenido de cada endpoint (ParametrosModalidad40 de una versión)"""
+    return {
+        # Misma forma de siempre (la usan clientes existentes)
+        '/api/topes': {
+            'uma_diaria_2025': parametros.uma_diaria_2025,
+            'uma_mensual_2025': parametros.uma_mensual_2025,
+            'tope_diario_maximo': parametros.tope_diario_2025,
+            'tope_mensual_maximo': parametros.tope_diario_2025 * 30.4,
+            'minimo_garantizado_diario': parametros.minimo_garantizado_diario,
+            'minimo_garantizado_mensual': parametros.minimo_garantizado_mensual,
+            'tasas_modalidad40': dict(parametros.tasas_modalidad40),
+        },
+        '/api/uma': {
+            'version': parametros.version,
+            'uma_diaria': dict(parametros.uma_proyecciones),
+            'uma_mensual_2025': parametros.uma_mensual_2025,
+            'inflacion_proyectada_pct': dict(parametros.inflacion_proyectada),
+        },
+        '/api/tasas-modalidad40': {
+            'version': parametros.version,
+            'tasas_pct': dict(parametros.tasas_modalidad40),
+        },
+        '/api/tramos-ley73': {
+            'version': parametros.version,
+            'tramos': [dict(rango) for rango in parametros.tabla_porcentajes_ley73],
+        },
+        '/api/factores-edad': {
+            'version': parametros.version,
+            'factores': dict(parametros.tabla_edad),
+            'incremento_vejez_pct': parametros.incremento_vejez_pct * 100,
+        },
+    }
+
+
+def precalcular(contenido: Dict[str, Any], version: str) -> RespuestaPrecalculada:
+    """Serializar un contenido como lo hace jsonify y calcular su ETag"""
+    cuerpo = (json.dumps(contenido, sort_keys=True, ensure_ascii=True, separators=(',', ':')) + '\n').encode('ascii')
+    return RespuestaPrecalculada(cuerpo, f'{version}-{hashlib.sha256(cuerpo).hexdigest()[:20]}', version)
+
+
+_por_version: Dict[str, Dict[str, RespuestaPrecalculada]] = {}
+_lock = threading.Lock()
+
+
+def respuestas_referencia(parametros) -> Dict[str, RespuestaPrecalculada]:
+    """
+    Respuestas precalculadas de todos los endpoints para una versión
+
+    Args:
+        parametros: ParametrosModalidad40 (calc.parametros)
+
+    Returns:
+        Ruta -> RespuestaPrecalculada (la misma instancia en cada llamada)
+    """
+    respuestas = _por_version.get(parametros.version)
+    if respuestas is None:
+        with _lock:
+            respuestas = _por_version.get(parametros.version)
+            if respuestas is None:
+                respuestas = _por_version[parametros.version] = {
+                    ruta: precalcular(contenido, parametros.version)
+                    for ruta, contenido in _contenidos(parametros).items()
+                }
+    return respuestas
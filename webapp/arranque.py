@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARRANQUE - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Registro del costo de arranque: cuánto tarda cada etapa de importación de
+la app y, cuando se cargan después en segundo plano, las dependencias
+pesadas (reportlab, NumPy). Se consulta en /api/arranque.
+
+Debe importarse antes que todo lo demás en app.py para que el reloj
+empiece con el proceso de la app.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+_inicio = time.perf_counter()
+_ultima_marca = _inicio
+_etapas: List[Dict[str, Any]] = []
+_diferidas: List[Dict[str, Any]] = []
+_listo_en = None
+_lock = threading.Lock()
+
+
+def marcar(etapa: str) -> None:
+    """Registrar el tiempo transcurrido desde la marca anterior como una etapa"""
+    global _ultima_marca
+    ahora = time.perf_counter()
+    with _lock:
+        _etapas.append({'etapa': etapa, 'ms': round((ahora - _ultima_marca) * 1000, 1)})
+        _ultima_marca = ahora
+
+
+def marcar_listo() -> None:
+    """La app ya puede atender peticiones"""
+    global _listo_en
+    marcar('app')
+    _listo_en = time.perf_counter()
+
+
+def registrar_diferida(etapa: str, segundos: float) -> None:
+    """Registrar una carga hecha después del arranque (primer uso o calentamiento)"""
+    with _lock:
+        _diferidas.append({'etapa': etapa, 'ms': round(segundos * 1000, 1)})
+
+
+@contextmanager
+def medir_diferida(etapa: str):
+    """Medir un bloque de carga diferida y registrarlo con registrar_diferida()"""
+    inicio = time.perf_counter()
+    yield
+    registrar_diferida(etapa, time.perf_counter() - inicio)
+
+
+def reporte() -> Dict[str, Any]:
+    """Etapas de arranque, cargas diferidas y módulos importados hasta ahora"""
+    with _lock:
+        return {
+            'listo_en_ms': round((_listo_en - _inicio) * 1000, 1) if _listo_en is not None else None,
+            'etapas': list(_etapas),
+            'diferidas': list(_diferidas),
+            'modulos_cargados': len(sys.modules),
+            'reportlab_cargado': 'reportlab' in sys.modules,
+            'numpy_cargado': 'numpy' in sys.modules,
+        }
@@ -0,0 +1,1553 @@
+// Global variable to store calculation results for PDF functions
+let resultadosCalculados = null;
+
+// Función para validar elegibilidad Modalidad 40 (Ley 97)
+function validarElegibilidad() {
+    const mes = document.getElementById('mes_inicio_cotizacion').value;
+    const año = document.getElementById('año_inicio_cotizacion').value;
+    const resultadoDiv = document.getElementById('elegibilidad-resultado');
+    const datosImssCard = document.getElementById('datos-imss-card');
+
+    if (!mes || !año) {
+        resultadoDiv.style.display = 'none';
+        datosImssCard.style.display = 'none';
+        return;
+    }
+
+    const fechaInicio = new Date(parseInt(año), parseInt(mes) - 1, 1);
+    const fechaLimite = new Date(1997, 6, 1); // 1 de julio de 1997
+
+    console.log(`🔍 Validando elegibilidad: ${mes}/${año} vs julio 1997`);
+
+    resultadoDiv.style.display = 'block';
+
+    if (fechaInicio < fechaLimite) {
+        // ELEGIBLE - Ley 73
+        resultadoDiv.innerHTML = `
+                    <div class="alert alert-success" role="alert">
+                        <i class="fas fa-check-circle me-2"></i>
+                        <strong>¡ELEGIBLE PARA MODALIDAD 40!</strong><br>
+                        <small>Empezaste a cotizar en <strong>${obtenerNombreMes(mes)} ${año}</strong>, que es anterior al 1 de julio de 1997. 
+                        Tienes derecho a la Modalidad 40 bajo la Ley 73 del IMSS.</small>
+                    </div>
+                    <div class="alert alert-warning" role="alert">
+                        <i class="fas fa-exclamation-triangle me-2"></i>
+                        <strong>Requisitos adicionales:</strong><br>
+                        <small>• Debes haber estado dado de baja del IMSS<br>
+                        • No haber dejado de cotizar por más de 5 años consecutivos<br>
+                        • Tener al menos 500 semanas cotizadas</small>
+                    </div>
+                `;
+        datosImssCard.style.display = 'block';
+        console.log('✅ Usuario elegible para Modalidad 40');
+    } else {
+        // NO ELEGIBLE - Ley 97
+        resultadoDiv.innerHTML = `
+                    <div class="alert alert-danger" role="alert">
+                        <i class="fas fa-times-circle me-2"></i>
+                        <strong>NO ELEGIBLE PARA MODALIDAD 40</strong><br>
+                        <small>Empezaste a cotizar en <strong>${obtenerNombreMes(mes)} ${año}</strong>, que es posterior al 1 de julio de 1997. 
+                        Estás bajo la Ley 97 del IMSS (sistema de Afores) y NO puedes acceder a la Modalidad 40.</small>
+                    </div>
+                    <div class="alert alert-info" role="alert">
+                        <i class="fas fa-info-circle me-2"></i>
+                        <strong>Alternativas para tu situación:</strong><br>
+                        <small>• Tu pensión se basa en el ahorro acumulado en tu cuenta individual de Afore<br>
+                        • Puedes ser beneficiario de la Pensión Mínima Garantizada<br>
+                        • Considera hacer aportaciones voluntarias a tu Afore</small>
+                    </div>
+                `;
+        datosImssCard.style.display = 'none';
+        console.log('❌ Usuario NO elegible para Modalidad 40');
+    }
+}
+
+// Función CRÍTICA para calcular fecha límite de inscripción Modalidad 40
+function calcularFechaLimite() {
+    const mes = document.getElementById('mes_ultima_cotizacion').value;
+    const año = document.getElementById('año_ultima_cotizacion').value;
+    const alertaDiv = document.getElementById('fecha-limite-alerta');
+
+    if (!mes || !año) {
+        alertaDiv.style.display = 'none';
+        return;
+    }
+
+    const fechaUltimaCotizacion = new Date(parseInt(año), parseInt(mes) - 1, 1);
+    const fechaLimite = new Date(parseInt(año) + 5, parseInt(mes) - 1, 1); // 5 años después
+    const hoy = new Date();
+
+    // Calcular días hasta la fecha límite
+    const diasRestantes = Math.floor((fechaLimite - hoy) / (1000 * 60 * 60 * 24));
+    const mesesRestantes = Math.floor(diasRestantes / 30);
+
+    console.log(`📅 Última cotización: ${obtenerNombreMes(mes)} ${año}`);
+    console.log(`⏰ Fecha límite: ${obtenerNombreMes(mes)} ${parseInt(año) + 5}`);
+    console.log(`⏳ Días restantes: ${diasRestantes}`);
+
+    alertaDiv.style.display = 'block';
+
+    if (diasRestantes < 0) {
+        // YA PASÓ EL LÍMITE - Perdió el derecho
+        alertaDiv.innerHTML = `
+                    <div class="alert alert-danger">
+                        <h6><i class="fas fa-times-circle me-2"></i>FECHA LÍMITE VENCIDA</h6>
+                        <p class="mb-2">
+                            Tu última cotización fue en <strong>${obtenerNombreMes(mes)} ${año}</strong>.<br>
+                            La fecha límite para inscribirte era <strong>${obtenerNombreMes(mes)} ${parseInt(año) + 5}</strong>.
+                        </p>
+                        <p class="mb-0 fw-bold text-danger">
+                            ❌ Has perdido el derecho a Modalidad 40 de forma PERMANENTE.
+                        </p>
+                        <small class="text-muted">No hay forma de recuperar este derecho una vez vencido el plazo de 5 años.</small>
+                    </div>
+                `;
+    } else if (diasRestantes < 60) {
+        // MENOS DE 2 MESES - URGENTE
+        alertaDiv.innerHTML = `
+                    <div class="alert alert-danger">
+                        <h6><i class="fas fa-exclamation-triangle me-2"></i>¡URGENTE! TIEMPO CRÍTICO</h6>
+                        <p class="mb-2">
+                            Tu última cotización fue en <strong>${obtenerNombreMes(mes)} ${año}</strong>.<br>
+                            Fecha límite para inscribirte: <strong>${obtenerNombreMes(mes)} ${parseInt(año) + 5}</strong>
+                        </p>
+                        <p class="mb-0 fw-bold text-danger">
+                            ⚠️ Solo te quedan ${diasRestantes} días (${mesesRestantes} ${mesesRestantes === 1 ? 'mes' : 'meses'})
+                        </p>
+                        <small class="fw-bold">DEBES INSCRIBIRTE INMEDIATAMENTE o perderás el derecho para siempre.</small>
+                    </div>
+                `;
+    } else if (diasRestantes < 180) {
+        // MENOS DE 6 MESES - ALERTA
+        alertaDiv.innerHTML = `
+                    <div class="alert alert-warning">
+                        <h6><i class="fas fa-clock me-2"></i>TIEMPO LIMITADO</h6>
+                        <p class="mb-2">
+                            Tu última cotización fue en <strong>${obtenerNombreMes(mes)} ${año}</strong>.<br>
+                            Fecha límite para inscribirte: <strong>${obtenerNombreMes(mes)} ${parseInt(año) + 5}</strong>
+                        </p>
+                        <p class="mb-0 fw-bold text-warning">
+                            ⚠️ Te quedan ${Math.floor(diasRestantes / 30)} meses (${diasRestantes} días)
+                        </p>
+                        <small>Recomendación: Planifica tu inscripción pronto para evitar imprevistos.</small>
+                    </div>
+                `;
+    } else {
+        // MÁS DE 6 MESES - OK
+        const añosRestantes = Math.floor(diasRestantes / 365);
+        const mesesExtra = Math.floor((diasRestantes % 365) / 30);
+        alertaDiv.innerHTML = `
+                    <div class="alert alert-success">
+                        <h6><i class="fas fa-check-circle me-2"></i>Aún tienes tiempo</h6>
+                        <p class="mb-2">
+                            Tu última cotización fue en <strong>${obtenerNombreMes(mes)} ${año}</strong>.<br>
+                            Fecha límite para inscribirte: <strong>${obtenerNombreMes(mes)} ${parseInt(año) + 5}</strong>
+                        </p>
+                        <p class="mb-0 fw-bold text-success">
+                            ✅ Te quedan ${añosRestantes} años y ${mesesExtra} meses
+                        </p>
+                        <small>Puedes planificar con calma, pero no dejes pasar el tiempo.</small>
+                    </div>
+                `;
+    }
+}
+
+// Función auxiliar para obtener nombre del mes
+function obtenerNombreMes(numeroMes) {
+    const meses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+                  'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+    return meses[parseInt(numeroMes) - 1];
+}
+
+// Validar elegibilidad considerando deadline de inscripción
+function validarElegibilidadConDeadline() {
+    const mesUltima = document.getElementById('mes_ultima_cotizacion')?.value;
+    const añoUltima = document.getElementById('año_ultima_cotizacion')?.value;
+
+    if (!mesUltima || !añoUltima) {
+        return true; // No validar si no están ambos campos
+    }
+
+    // Calcular deadline (5 años después de última cotización)
+    const fechaUltima = new Date(parseInt(añoUltima), parseInt(mesUltima) - 1, 1);
+    const fechaLimite = new Date(parseInt(añoUltima) + 5, parseInt(mesUltima) - 1, 1);
+    const hoy = new Date();
+
+    // Verificar si ya pasó el deadline
+    if (hoy > fechaLimite) {
+        alert('⛔ FECHA LÍMITE VENCIDA\\n\\nTu fecha límite para inscribirte a Modalidad 40 venció en ' + obtenerNombreMes(mesUltima) + ' ' + (parseInt(añoUltima) + 5) + '.\\n\\nHas perdido el derecho PERMANENTE a Modalidad 40.\\n\\nYa NO puedes inscribirte ni mejorar tu pensión mediante este programa.');
+        return false;
+    }
+
+    return true;
+}
+
+// Validar elegibilidad considerando deadline de inscripción
+function validarElegibilidadConDeadline() {
+    const mesUltima = document.getElementById('mes_ultima_cotizacion')?.value;
+    const añoUltima = document.getElementById('año_ultima_cotizacion')?.value;
+
+    if (!mesUltima || !añoUltima) {
+        return true; // No validar si no están ambos campos
+    }
+
+    // Calcular deadline (5 años después de última cotización)
+    const fechaUltima = new Date(parseInt(añoUltima), parseInt(mesUltima) - 1, 1);
+    const fechaLimite = new Date(parseInt(añoUltima) + 5, parseInt(mesUltima) - 1, 1);
+    const hoy = new Date();
+
+    // Verificar si ya pasó el deadline
+    if (hoy > fechaLimite) {
+        alert('⛔ FECHA LÍMITE VENCIDA\n\nTu fecha límite para inscribirte a Modalidad 40 venció en ' + obtenerNombreMes(mesUltima) + ' ' + (parseInt(añoUltima) + 5) + '.\n\nHas perdido el derecho PERMANENTE a Modalidad 40.\n\nYa NO puedes inscribirte ni mejorar tu pensión mediante este programa.');
+        return false;
+    }
+
+    return true;
+}
+
+// Función para establecer tope máximo
+function setTopeMaximo() {
+    document.getElementById('sbc_modalidad40').value = '2464.58';
+    calcularPagoEstimado();
+}
+
+// Mostrar penalización por edad
+function mostrarPenalizacion() {
+    const edadPension = parseInt(document.getElementById('edad_pension').value);
+    const penalizacionDiv = document.getElementById('penalizacion-warning');
+    const vejezDiv = document.getElementById('vejez-bonus');
+    const penalizacionTexto = document.getElementById('penalizacion-texto');
+
+    if (edadPension && edadPension < 65) {
+        const porcentajes = {
+            60: 75,
+            61: 80,
+            62: 85,
+            63: 90,
+            64: 95
+        };
+
+        const porcentaje = porcentajes[edadPension];
+        penalizacionTexto.textContent = `Solo recibirás el ${porcentaje}% de tu pensión calculada.`;
+        penalizacionDiv.style.display = 'block';
+        vejezDiv.style.display = 'none';
+    } else if (edadPension === 65) {
+        penalizacionDiv.style.display = 'none';
+        vejezDiv.style.display = 'block';
+    } else {
+        penalizacionDiv.style.display = 'none';
+        vejezDiv.style.display = 'none';
+    }
+}
+
+// Calcular edad actual automáticamente
+function calcularEdadActual() {
+    const dia = parseInt(document.getElementById('dia_nacimiento').value);
+    const mes = parseInt(document.getElementById('mes_nacimiento').value);
+    const año = parseInt(document.getElementById('año_nacimiento').value);
+
+    if (dia && mes && año) {
+        const hoy = new Date();
+        const fechaNacimiento = new Date(año, mes - 1, dia); // mes - 1 porque Date usa 0-indexado
+
+        let edad = hoy.getFullYear() - fechaNacimiento.getFullYear();
+        const diferenciaMes = hoy.getMonth() - fechaNacimiento.getMonth();
+
+        if (diferenciaMes < 0 || (diferenciaMes === 0 && hoy.getDate() < fechaNacimiento.getDate())) {
+            edad--;
+        }
+
+        // Actualizar ambos campos de edad actual
+        document.getElementById('edad_actual').value = edad;
+        document.getElementById('edad_actual_display').value = edad;
+
+        // Auto-sugerir edad de jubilación recomendada
+        const edadJubilacion = document.getElementById('edad_jubilacion');
+        const edadJubilacionUser = document.getElementById('edad_jubilacion_user');
+
+        if (!edadJubilacion.value && edad > 0) {
+            if (edad >= 65) {
+                edadJubilacion.value = 65;
+                edadJubilacionUser.value = 65;
+            } else if (edad >= 60) {
+                edadJubilacion.value = 65; // Siempre recomendar 65
+                edadJubilacionUser.value = 65;
+            }
+        }
+
+        calcularTiempoDisponibleUser();
+    }
+}
+
+// Formatear RFC y CURP en mayúsculas
+function formatearRFC() {
+    const rfc = document.getElementById('rfc');
+    rfc.value = rfc.value.toUpperCase();
+}
+
+function formatearCURP() {
+    const curp = document.getElementById('curp');
+    curp.value = curp.value.toUpperCase();
+}
+
+// Calcular tiempo disponible para Modalidad 40 (Nueva función)
+function calcularTiempoDisponibleUser() {
+    const edadActual = parseInt(document.getElementById('edad_actual_display').value);
+    const edadJubilacion = parseInt(document.getElementById('edad_jubilacion_user').value);
+
+    const alertDiv = document.getElementById('tiempo-disponible-alert');
+    const textoSpan = document.getElementById('tiempo-disponible-texto');
+
+    if (edadActual && edadJubilacion) {
+        const añosDisponibles = edadJubilacion - edadActual;
+
+        // Sincronizar con el campo oculto para el backend
+        document.getElementById('edad_jubilacion').value = edadJubilacion;
+
+        if (edadJubilacion > 65) {
+            alertDiv.className = 'alert alert-warning';
+            textoSpan.innerHTML = '<strong>⚖️ LÍMITE LEGAL:</strong> La edad máxima para pensión IMSS es 65 años. Después de los 65, la pensión se otorga automáticamente por vejez.';
+            alertDiv.style.display = 'block';
+        } else if (añosDisponibles <= 0) {
+            alertDiv.className = 'alert alert-info';
+            textoSpan.innerHTML = '<strong>🎂 Ya tienes 65 años.</strong> Puedes solicitar tu pensión por vejez directamente con el IMSS.';
+            alertDiv.style.display = 'block';
+        } else if (añosDisponibles === 1) {
+            alertDiv.className = 'alert alert-danger';
+            textoSpan.innerHTML = `<strong>⚡ ÚLTIMO AÑO!</strong> Solo tienes 1 año hasta los 65 años (límite legal). Modalidad 40 de 1 año puede <strong>mejorar significativamente tu pensión</strong>. ¡ACTÚA INMEDIATAMENTE!`;
+            alertDiv.style.display = 'block';
+        } else if (añosDisponibles === 2) {
+            alertDiv.className = 'alert alert-warning';
+            textoSpan.innerHTML = `<strong>🚀 ¡OPORTUNIDAD EXCEPCIONAL!</strong> Solo 2 años hasta los 65 años (límite legal). Modalidad 40 de 2 años puede <strong>duplicar tu pensión</strong> con ROI superior al 200%. ¡Calcúlalo ahora!`;
+            alertDiv.style.display = 'block';
+        } else if (añosDisponibles <= 5) {
+            alertDiv.className = 'alert alert-warning';
+            textoSpan.innerHTML = `<strong>⚠️ ¡URGENTE! Solo ${añosDisponibles} años hasta los 65 años (límite legal).</strong> Debes iniciar Modalidad 40 pronto para maximizar beneficios.`;
+            alertDiv.style.display = 'block';
+        } else {
+            alertDiv.className = 'alert alert-success';
+            textoSpan.innerHTML = `<strong>✅ Excelente! Tienes ${añosDisponibles} años hasta los 65 años.</strong> Puedes planear tu estrategia con calma.`;
+            alertDiv.style.display = 'block';
+        }
+    } else {
+        alertDiv.style.display = 'none';
+    }
+}
+
+// Función legacy para compatibilidad
+function calcularTiempoDisponible() {
+    calcularTiempoDisponibleUser();
+}
+
+function mostrarAlerta(mensaje, tipo) {
+    // Función de compatibilidad
+    console.log(`${tipo.toUpperCase()}: ${mensaje}`);
+}
+
+// Calcular tiempo disponible para Modalidad 40 (función original)
+function calcularTiempoRestante() {
+    const edadActual = parseInt(document.getElementById('edad_actual_display').value);
+    const edadPension = parseInt(document.getElementById('edad_jubilacion_user').value);
+    const tiempoDiv = document.getElementById('tiempo-disponible');
+    const tiempoTexto = document.getElementById('tiempo-texto');
+
+    if (edadActual && edadPension) {
+        const añosDisponibles = edadPension - edadActual;
+
+        if (edadPension > 65) {
+            tiempoTexto.innerHTML = '⚖️ LÍMITE LEGAL: La edad máxima para pensión IMSS es 65 años. Después de los 65 años, la pensión se otorga automáticamente por vejez.';
+            tiempoDiv.className = 'alert alert-warning mt-2';
+        } else if (añosDisponibles > 5) {
+            tiempoTexto.innerHTML = `Tienes ${añosDisponibles} años hasta pensionarte. Modalidad 40 dura 5 años, así que puedes empezar en ${5-añosDisponibles} años más.`;
+            tiempoDiv.className = 'alert alert-info mt-2';
+        } else if (añosDisponibles === 1) {
+            tiempoTexto.innerHTML = `⚡ ÚLTIMO AÑO: Solo tienes 1 año hasta los 65 años (límite legal). Modalidad 40 de 1 año puede mejorar significativamente tu pensión. ¡ACTÚA YA!`;
+            tiempoDiv.className = 'alert alert-danger mt-2';
+        } else if (añosDisponibles >= 2 && añosDisponibles < 5) {
+            tiempoTexto.innerHTML = `⚠️ ¡URGENTE! Solo tienes ${añosDisponibles} años hasta los 65 años (límite legal). Debes empezar Modalidad 40 YA.`;
+            tiempoDiv.className = 'alert alert-danger mt-2';
+        } else if (añosDisponibles === 5) {
+            tiempoTexto.innerHTML = `✅ PERFECTO: Tienes exactamente 5 años hasta los 65 años. Tiempo ideal para Modalidad 40 completa.`;
+            tiempoDiv.className = 'alert alert-success mt-2';
+        } else if (añosDisponibles === 0) {
+            tiempoTexto.innerHTML = '🎂 Ya tienes 65 años. Puedes solicitar tu pensión por vejez directamente con el IMSS.';
+            tiempoDiv.className = 'alert alert-info mt-2';
+        } else {
+            tiempoTexto.innerHTML = '⚠️ Ya pasaste la edad de pensión legal. Consulta el IMSS.';
+            tiempoDiv.className = 'alert alert-danger mt-2';
+        }
+
+        tiempoDiv.style.display = 'block';
+    } else {
+        tiempoDiv.style.display = 'none';
+    }
+}
+
+// Calcular pago estimado en tiempo real
+function validarLimiteUMA(input) {
+    const LIMITE_DIARIO_UMA = 2828.50; // 25 UMAs máximo legal
+    const valor = parseFloat(input.value);
+
+    if (valor > LIMITE_DIARIO_UMA) {
+        input.value = LIMITE_DIARIO_UMA;
+        mostrarAlerta(`💰 LÍMITE APLICADO: El salario se ajustó automáticamente a $${LIMITE_DIARIO_UMA.toLocaleString('es-MX')} diarios (tope máximo legal de 25 UMAs)`, 'warning');
+        calcularPagoEstimado(); // Recalcular con el nuevo valor
+    }
+}
+
+function calcularPagoEstimado() {
+    const sbc = parseFloat(document.getElementById('sbc_modalidad40').value);
+    const pagoEstimadoDiv = document.getElementById('pago-estimado');
+    const pagoEstimadoValor = document.getElementById('pago-estimado-valor');
+
+    if (sbc && sbc > 0) {
+        // Calcular con tasa 2025 (13.347%)
+        const sbcMensual = sbc * 30.4; // Días promedio por mes
+        const pagoMensual = sbcMensual * 0.13347; // Tasa 2025
+
+        pagoEstimadoValor.textContent = '$' + formatearNumero(Math.round(pagoMensual));
+        pagoEstimadoDiv.style.display = 'block';
+
+        // Agregar contexto según el monto
+        let contexto = '';
+        if (pagoMensual > 15000) {
+            pagoEstimadoDiv.className = 'alert alert-warning mt-2';
+            pagoEstimadoValor.className = 'text-warning fw-bold fs-5';
+            contexto = ' (Alto - considera si puedes pagarlo 5 años)';
+        } else if (pagoMensual > 8000) {
+            pagoEstimadoDiv.className = 'alert alert-success mt-2';
+            pagoEstimadoValor.className = 'text-success fw-bold fs-5';
+            contexto = ' (Recomendado - buen balance costo/beneficio)';
+        } else {
+            pagoEstimadoDiv.className = 'alert alert-light mt-2';
+            pagoEstimadoValor.className = 'text-primary fw-bold fs-5';
+            contexto = ' (Accesible - considera si puedes subir un poco)';
+        }
+
+        // Agregar el contexto después del valor
+        const valorElement = document.getElementById('pago-estimado-valor');
+        valorElement.innerHTML = '$' + formatearNumero(Math.round(pagoMensual)) + 
+            '<small class="fw-normal">' + contexto + '</small>';
+
+    } else {
+        pagoEstimadoDiv.style.display = 'none';
+    }
+}
+
+// Formatear números con comas - versión robusta
+function formatearNumero(numero) {
+    // Debug: verificar el valor recibido
+    console.log('formatearNumero recibió:', numero, 'tipo:', typeof numero);
+
+    if (numero === undefined || numero === null || isNaN(numero)) {
+        console.warn('formatearNumero: valor inválido', numero);
+        return '0';
+    }
+
+    const num = parseFloat(numero);
+    if (isNaN(num)) {
+        console.warn('formatearNumero: no se pudo convertir a número', numero);
+        return '0';
+    }
+
+    return num.toLocaleString('es-MX', {
+        minimumFractionDigits: 0,
+        maximumFractionDigits: 0
+    });
+}
+
+// Manejar envío del formulario
+document.getElementById('calculadoraForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    // VALIDACIÓN CRÍTICA: Verificar elegibilidad Modalidad 40 (Ley 97)
+    const mesInicio = document.getElementById('mes_inicio_cotizacion').value;
+    const añoInicio = document.getElementById('año_inicio_cotizacion').value;
+
+    if (!mesInicio || !añoInicio) {
+        alert('⚠️ Debes completar la fecha de inicio de cotización al IMSS para continuar.');
+        return;
+    }
+
+    const fechaInicio = new Date(parseInt(añoInicio), parseInt(mesInicio) - 1, 1);
+    const fechaLimite = new Date(1997, 6, 1); // 1 de julio de 1997
+
+    if (fechaInicio >= fechaLimite) {
+        alert('❌ No puedes usar esta calculadora.\n\nEmpezaste a cotizar después del 1 de julio de 1997, por lo que estás bajo la Ley 97 (sistema de Afores) y NO tienes derecho a la Modalidad 40.\n\nTu pensión se basa en tu cuenta individual de Afore.');
+        return;
+    }
+
+    console.log('✅ Usuario elegible confirmado, procediendo con cálculo...');
+
+    // Validar deadline de inscripción antes de continuar
+    if (!validarElegibilidadConDeadline()) {
+        return;
+    }
+
+    // Mostrar loading
+    document.querySelector('.loading').style.display = 'block';
+    document.querySelector('button[type="submit"]').style.display = 'none';
+
+    // Recopilar datos personales
+    const formData = {
+        // Datos personales
+        nombre: document.getElementById('nombre').value,
+        apellido_paterno: document.getElementById('apellido_paterno').value,
+        apellido_materno: document.getElementById('apellido_materno').value,
+        rfc: document.getElementById('rfc').value,
+        curp: document.getElementById('curp').value,
+        nss: document.getElementById('nss').value,
+        dia_nacimiento: document.getElementById('dia_nacimiento').value,
+        mes_nacimiento: document.getElementById('mes_nacimiento').value,
+        año_nacimiento: document.getElementById('año_nacimiento').value,
+
+        // Elegibilidad Modalidad 40 (Ley 97)
+        mes_inicio_cotizacion: document.getElementById('mes_inicio_cotizacion').value,
+        año_inicio_cotizacion: document.getElementById('año_inicio_cotizacion').value,
+
+        // Última cotización (para deadline de inscripción)
+        mes_ultima_cotizacion: document.getElementById('mes_ultima_cotizacion')?.value || '',
+        año_ultima_cotizacion: document.getElementById('año_ultima_cotizacion')?.value || '',
+
+        // Datos IMSS y cálculo
+        semanas_cotizadas: document.getElementById('semanas_cotizadas').value,
+        sdp_actual: document.getElementById('sdp_actual').value,
+        sbc_modalidad40: document.getElementById('sbc_modalidad40').value,
+        edad_actual: document.getElementById('edad_actual').value,
+        edad_pension: document.getElementById('edad_jubilacion').value,
+
+        // Situación familiar
+        tiene_esposa: document.getElementById('tiene_esposa').checked,
+        num_hijos: document.getElementById('num_hijos').value,
+        tiene_padres: document.getElementById('tiene_padres').checked,
+        año_inicio: 2025
+    };
+
+    // Debug: Verificar datos antes de enviar
+    console.log('Datos a enviar:', formData);
+
+    // Validar deadline de inscripción
+    if (!validarElegibilidadConDeadline()) {
+        document.querySelector('.loading').style.display = 'none';
+        document.querySelector('button[type="submit"]').style.display = 'block';
+        return;
+    }
+
+    // Validación extra para edad_pension
+    if (!formData.edad_pension) {
+        alert('Por favor selecciona la edad a la que te quieres jubilar.');
+        document.querySelector('.loading').style.display = 'none';
+        document.querySelector('button[type="submit"]').style.display = 'block';
+        return;
+    }
+
+    // Validate SBC is within UMA limits (25 UMAs = $2,828.50 daily = $84,855 monthly)
+    const sbcModalidad40 = parseFloat(formData.sbc_modalidad40);
+    const LIMITE_DIARIO_UMA = 2828.50; // 25 UMAs máximo legal diario
+    const topeMaximoMensual = 84855; // 25 UMAs × $113.14 × 30 days
+
+    if (sbcModalidad40 > LIMITE_DIARIO_UMA) {
+        const continuar = confirm(`💰 LÍMITE DE UMA EXCEDIDO\n\nEl salario deseado de $${formatearNumero(sbcModalidad40)} diarios excede el tope máximo legal de $${formatearNumero(LIMITE_DIARIO_UMA)} diarios (25 UMAs).\n\n¿Quieres ajustarlo automáticamente al tope máximo y continuar?`);
+
+        if (continuar) {
+            // Auto-adjust to maximum allowed
+            formData.sbc_modalidad40 = LIMITE_DIARIO_UMA;
+            document.getElementById('sbc_modalidad40').value = LIMITE_DIARIO_UMA;
+            mostrarAlerta(`✅ Salario ajustado automáticamente a $${formatearNumero(LIMITE_DIARIO_UMA)} diarios (tope máximo legal)`, 'warning');
+            calcularPagoEstimado(); // Recalcular con el nuevo valor
+        } else {
+            document.querySelector('.loading').style.display = 'none';
+            document.querySelector('button[type="submit"]').style.display = 'block';
+            return;
+        }
+    }
+
+    const edadPension = parseInt(formData.edad_pension);
+    if (edadPension > 65) {
+        alert('⚖️ LÍMITE LEGAL: La edad máxima para pensión IMSS es 65 años.\n\nDespués de los 65 años, la pensión se otorga automáticamente por vejez.');
+        document.querySelector('.loading').style.display = 'none';
+        document.querySelector('button[type="submit"]').style.display = 'block';
+        return;
+    }
+
+    try {
+        // Enviar petición con fallback handling
+        console.log('🚀 Enviando petición a /calcular...');
+        console.log('🌐 Current URL:', window.location.href);
+        console.log('📡 Target endpoint:', window.location.origin + '/calcular');
+
+        const response = await fetch('/calcular', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        console.log('📡 Respuesta HTTP recibida:');
+        console.log('  - Status:', response.status);
+        console.log('  - Status Text:', response.statusText);
+        console.log('  - OK:', response.ok);
+        console.log('  - Headers:', Object.fromEntries(response.headers.entries()));
+
+        // Intentar parsear la respuesta JSON
+        let resultado;
+        try {
+            resultado = await response.json();
+            console.log('✅ JSON parseado exitosamente:', resultado);
+            console.log('🔍 DEBUGGING - Propiedades del resultado:', Object.keys(resultado));
+            console.log('🔍 DEBUGGING - resultado.success:', resultado.success);
+            console.log('🔍 DEBUGGING - resultado.error:', resultado.error);
+            console.log('🔍 DEBUGGING - Resultado completo:', JSON.stringify(resultado, null, 2));
+        } catch (parseError) {
+            console.error('❌ Error parseando JSON:', parseError);
+            const responseText = await response.text();
+            console.error('📄 Contenido de respuesta cruda:', responseText);
+            alert('Error: El servidor no devolvió un JSON válido. Ver consola para detalles.');
+            return;
+        }
+
+        // ENHANCED ERROR DETECTION AND DEBUGGING
+        console.group('🔍 DETAILED RESPONSE ANALYSIS');
+        console.log('HTTP Status:', response.status, response.statusText);
+        console.log('Response OK:', response.ok);
+        console.log('Response Headers:', Object.fromEntries(response.headers.entries()));
+        console.log('Response Type:', typeof resultado);
+        console.log('Response Keys:', resultado && typeof resultado === 'object' ? Object.keys(resultado) : 'Not an object');
+        console.log('Full Response:', resultado);
+        console.groupEnd();
+
+        // Check for Railway-specific error responses
+        if (resultado && resultado.status === 'error' && resultado.code === 404) {
+            console.error('🚨 RAILWAY DEPLOYMENT ERROR: Application not found');
+            alert(`🚨 DEPLOYMENT ERROR: The application is not accessible on Railway.\n\nError: ${resultado.message}\nRequest ID: ${resultado.request_id}\n\nThis is a deployment issue, not a calculation problem. The development team has been notified.`);
+            return;
+        }
+
+        // Check for explicit error in response
+        if (resultado && resultado.error) {
+            console.error('💥 Server Error:', resultado.error);
+            alert('Error en el cálculo: ' + resultado.error);
+            return;
+        }
+
+        // Check for successful response patterns
+        if (response.ok && resultado && (resultado.success === true || resultado.sin_modalidad40)) {
+            console.log('🎉 Calculation successful, showing results...');
+            mostrarResultados(resultado);
+            return;
+        }
+
+        // Handle warnings with partial calculations (like limited years)
+        if (response.ok && resultado && resultado.warning && resultado.sin_modalidad40) {
+            console.log('⚠️ Calculation successful with warnings, showing results...');
+            mostrarResultados(resultado);
+            return;
+        }
+
+        // Enhanced error reporting for failed responses
+        console.group('🚨 COMPREHENSIVE ERROR ANALYSIS');
+        console.log('❌ Response Details:');
+        console.log('  - Status Code:', response.status);
+        console.log('  - Status Text:', response.statusText || 'No status text');
+        console.log('  - Response OK:', response.ok);
+        console.log('  - Content Type:', response.headers.get('content-type'));
+        console.log('❌ Response Content:');
+        console.log('  - Type:', typeof resultado);
+        console.log('  - Is Object:', resultado && typeof resultado === 'object');
+        console.log('  - Has Error:', resultado?.error ? 'YES' : 'NO');
+        console.log('  - Has Success:', resultado?.success ? 'YES' : 'NO');
+        console.log('  - Has Calculation Data:', resultado?.sin_modalidad40 ? 'YES' : 'NO');
+        console.log('  - Full Content:', resultado);
+        console.groupEnd();
+
+        // Provide detailed error message to user
+        let errorMsg = 'Error desconocido en el cálculo';
+
+        if (!response.ok) {
+            errorMsg = `Error de conexión HTTP ${response.status}: ${response.statusText || 'Sin descripción'}`;
+        } else if (resultado?.error) {
+            errorMsg = resultado.error;
+
+            // Handle UMA limit error specifically
+            if (errorMsg.includes('excede tope máximo')) {
+                const topeMatch = errorMsg.match(/\$([0-9,]+\.?\d*)/g);
+                if (topeMatch && topeMatch.length >= 2) {
+                    const topeMaximoDiario = topeMatch[1].replace(/[$,]/g, '');
+                    const topeMaximoMensual = Math.floor(parseFloat(topeMaximoDiario) * 30);
+
+                    const confirmar = confirm(`💰 LÍMITE UMA EXCEDIDO\n\n${errorMsg}\n\n💡 Solución: El salario máximo permitido es $${formatearNumero(topeMaximoMensual)} mensuales.\n\n¿Quieres ajustarlo automáticamente al tope máximo y recalcular?`);
+
+                    if (confirmar) {
+                        document.getElementById('salario_deseado').value = topeMaximoMensual;
+                        mostrarAlerta(`✅ Salario ajustado automáticamente a $${formatearNumero(topeMaximoMensual)} (tope máximo legal)`, 'warning');
+                        // Trigger recalculation
+                        setTimeout(() => {
+                            document.getElementById('calculadoraForm').dispatchEvent(new Event('submit'));
+                        }, 1000);
+                        return;
+                    }
+                }
+            }
+        } else if (!resultado || typeof resultado !== 'object') {
+            errorMsg = `Error: El servidor devolvió una respuesta inválida (${typeof resultado})`;
+        } else {
+            errorMsg = `Error: El servidor devolvió datos incompletos. Estado HTTP ${response.status}`;
+        }
+
+        console.error('💥 Final Error Message:', errorMsg);
+        alert(`Error en el cálculo: ${errorMsg}\n\nDetalles técnicos disponibles en la consola del navegador (F12).`)
+    } catch (error) {
+        console.error('🔥 Error de conexión/red:', error);
+        console.error('Stack trace:', error.stack);
+        alert('Error de conexión: ' + error.message);
+    } finally {
+        // Ocultar loading
+        document.querySelector('.loading').style.display = 'none';
+        document.querySelector('button[type="submit"]').style.display = 'block';
+    }
+});
+
+function mostrarResultados(resultado) {
+    // Debug: verificar que tenemos los datos correctos
+    console.log('Mostrando resultados:', resultado);
+
+    // Store results globally for PDF functions
+    resultadosCalculados = resultado;
+    console.log('✅ Resultados almacenados globalmente para PDF');
+
+    // FIXED: Call payment display function first
+    updatePaymentDisplay(resultado);
+
+    // Verificar que el resultado tiene la estructura esperada
+    if (!resultado || typeof resultado !== 'object') {
+        console.error('Resultado inválido:', resultado);
+        alert('Error: Los datos de respuesta no son válidos');
+        return;
+    }
+
+    // Verificar propiedades críticas
+    if (!resultado.sin_modalidad40 || !resultado.con_modalidad40 || !resultado.inversion || !resultado.analisis_roi) {
+        console.error('Estructura de resultado incompleta:', resultado);
+        alert('Error: Los datos de respuesta están incompletos');
+        return;
+    }
+
+    // Show warning if present
+    if (resultado.warning && resultado.warning.mostrar) {
+        const warningHtml = `
+                    <div class="alert alert-warning mb-4" role="alert">
+                        <i class="fas fa-exclamation-triangle me-2"></i>
+                        <strong>Aviso Importante:</strong> ${resultado.warning.mensaje}
+                        <br><small class="text-muted">${resultado.warning.detalles}</small>
+                    </div>
+                `;
+        // Insert warning at the top of results
+        const resultadosDiv = document.getElementById('resultados');
+        resultadosDiv.insertAdjacentHTML('afterbegin', warningHtml);
+    }
+
+    // Verificar que los elementos existen antes de usarlos
+    const mensajeInicial = document.getElementById('mensaje-inicial');
+    const resultadosDiv = document.getElementById('resultados');
+
+    if (!mensajeInicial || !resultadosDiv) {
+        console.error('Elementos del DOM no encontrados');
+        return;
+    }
+
+    // Ocultar mensaje inicial y mostrar resultados
+    mensajeInicial.style.display = 'none';
+    resultadosDiv.style.display = 'block';
+
+    // Información de edad
+    if (resultado.edad_info) {
+        document.getElementById('info-edad').style.display = 'block';
+        document.getElementById('edad-actual-display').textContent = resultado.edad_info.edad_actual + ' años';
+        document.getElementById('edad-pension-display').textContent = resultado.edad_info.edad_pension + ' años';
+        document.getElementById('tiempo-disponible-display').textContent = resultado.edad_info.años_disponibles + ' años';
+
+        const factorInfo = document.getElementById('factor-edad-info');
+        if (resultado.edad_info.penalizacion_pct > 0) {
+            factorInfo.innerHTML = `
+                        <div class="alert alert-warning">
+                            <i class="fas fa-exclamation-triangle me-1"></i>
+                            <strong>Penalización por edad:</strong> Recibirás solo el ${100 - resultado.edad_info.penalizacion_pct}% 
+                            de tu pensión por jubilarte antes de los 65 años.
+                        </div>
+                    `;
+            factorInfo.style.display = 'block';
+        } else if (resultado.edad_info.tiene_incremento_vejez) {
+            factorInfo.innerHTML = `
+                        <div class="alert alert-success">
+                            <i class="fas fa-star me-1"></i>
+                            <strong>Bonus por vejez:</strong> Recibirás 11% adicional por pensionarte a los 65 años o más.
+                        </div>
+                    `;
+            factorInfo.style.display = 'block';
+        } else {
+            factorInfo.style.display = 'none';
+        }
+    }
+
+    // Pensiones principales
+    document.getElementById('pension-sin').textContent = '$' + formatearNumero(resultado.sin_modalidad40.pension_total);
+    document.getElementById('pension-con').textContent = '$' + formatearNumero(resultado.con_modalidad40.pension_total);
+    document.getElementById('diferencia-mensual').textContent = '$' + formatearNumero(resultado.analisis_roi.diferencia_mensual);
+
+    // Monthly payments are now handled by the dynamic payment system above
+    // (Old hardcoded payment elements have been removed)            
+    // Análisis de inversión
+    document.getElementById('inversion-total').textContent = '$' + formatearNumero(resultado.inversion.total_años);
+    document.getElementById('incremento-anual').textContent = '$' + formatearNumero(resultado.analisis_roi.diferencia_anual);
+    document.getElementById('roi-anual').textContent = resultado.analisis_roi.roi_anual + '%';
+    document.getElementById('recuperacion').textContent = resultado.analisis_roi.años_recuperacion + ' años';
+
+    // Detalles técnicos
+    document.getElementById('sdp-sin').textContent = formatearNumero(resultado.sin_modalidad40.pension_total / 12 * resultado.sin_modalidad40.cuantia_pct / 100 / 365 * 12);
+    document.getElementById('uma-sin').textContent = resultado.sin_modalidad40.multiple_uma;
+    document.getElementById('cuantia-sin').textContent = resultado.sin_modalidad40.cuantia_pct + '%';
+    document.getElementById('incremento-sin').textContent = resultado.sin_modalidad40.incremento_pct + '%';
+
+    document.getElementById('sdp-con').textContent = formatearNumero(resultado.con_modalidad40.pension_total / 12 * resultado.con_modalidad40.cuantia_pct / 100 / 365 * 12);
+    document.getElementById('uma-con').textContent = resultado.con_modalidad40.multiple_uma;
+    document.getElementById('cuantia-con').textContent = resultado.con_modalidad40.cuantia_pct + '%';
+    document.getElementById('incremento-con').textContent = resultado.con_modalidad40.incremento_pct + '%';
+
+    // Llenar tabla de pagos anuales
+    const tablaPagos = document.getElementById('tabla-pagos-anuales');
+    tablaPagos.innerHTML = '';
+
+    let totalInversion = 0;
+    let totalMeses = 0;
+    let añosCotizados = 0;
+
+    if (resultado.inversion.desglose_anual) {
+        añosCotizados = Object.keys(resultado.inversion.desglose_anual).length;
+
+        Object.keys(resultado.inversion.desglose_anual).forEach(año => {
+            const datos = resultado.inversion.desglose_anual[año];
+            totalInversion += datos.costo_anual;
+            totalMeses += (datos.meses_pagados || 12);
+
+            const fila = tablaPagos.insertRow();
+
+            fila.innerHTML = `
+                        <td><strong>${año}</strong></td>
+                        <td>${datos.tasa_pct}%</td>
+                        <td class="text-success"><strong>$${formatearNumero(datos.costo_mensual)}</strong></td>
+                        <td>$${formatearNumero(datos.costo_anual)}</td>
+                    `;
+        });
+    }
+
+    // ✅ ACTUALIZAR EL TOTAL EN GRANDE
+    document.getElementById('total-inversion-modalidad40').textContent = '$' + formatearNumero(totalInversion);
+    const periodo = resultado.inversion.periodo;
+    document.getElementById('periodo-total').textContent = periodo
+        ? `${String(periodo.mes_inicio).padStart(2, '0')}/${periodo.año_inicio} - ${String(periodo.mes_fin).padStart(2, '0')}/${periodo.año_fin}`
+        : añosCotizados + ' años';
+    document.getElementById('meses-total').textContent = totalMeses + ' meses';
+    document.getElementById('promedio-mensual-total').textContent = '$' + formatearNumero(resultado.inversion.promedio_mensual);
+
+    // Scroll a resultados
+    document.getElementById('resultados').scrollIntoView({ behavior: 'smooth' });
+}
+
+// Manejar checkbox de escenario alternativo
+document.getElementById('incluir_alternativo').addEventListener('change', function() {
+    const escenarioDiv = document.getElementById('escenario-alternativo');
+    escenarioDiv.style.display = this.checked ? 'block' : 'none';
+});
+
+// Duplicate function removed to fix null reference errors
+// Original function mostrarResultados remains above
+
+// Función para auto-poblar campos del modal PDF con datos del formulario principal
+// FIXED: Function to display year-specific payments with UMA awareness
+function updatePaymentDisplay(resultado) {
+    console.log('🎯 Updating year-specific payment display with UMA impact...');
+
+    // Calculate monthly payment timeline based on user's actual retirement date
+    let payments = [];
+
+    if (resultado.inversion.desglose_anual && resultado.edad_info) {
+        const currentDate = new Date();
+        const currentYear = currentDate.getFullYear(); // 2025
+        const currentMonth = currentDate.getMonth() + 1; // JavaScript months are 0-based
+
+        const edadActual = resultado.edad_info.edad_actual;
+        const edadPension = resultado.edad_info.edad_pension || 65;
+
+        // Calculate birth year: current year - current age
+        const birthYear = currentYear - edadActual;
+
+        // Calculate retirement year: birth year + pension age 
+        const retirementYear = birthYear + edadPension;
+
+        const añosHasta65 = edadPension - edadActual;
+        const mesesHasta65 = Math.round(añosHasta65 * 12);
+
+        console.log(`📅 Usuario actual: ${edadActual} años (nacido en ${birthYear})`);
+        console.log(`📅 Edad de pensión planeada: ${edadPension} años`);
+        console.log(`📅 Año de retiro calculado: ${retirementYear}`);
+        console.log(`📅 Meses disponibles hasta pensión: ${mesesHasta65} meses`);
+
+        // Validate scenario and log examples
+        console.log(`🎯 ESCENARIO DETECTADO:`);
+        if (birthYear === 1970 && edadPension === 65) {
+            console.log(`   → Nacido 1970, retiro a los 65 = año ${retirementYear} ✅`);
+        } else if (birthYear === 1968 && edadPension === 61) {
+            console.log(`   → Nacido 1968, retiro a los 61 = año ${retirementYear} ✅`);
+        } else if (birthYear === 1964 && edadPension === 65) {
+            console.log(`   → Nacido 1964, retiro a los 65 = año ${retirementYear} ✅`);
+        } else if (birthYear === 1960 && edadPension === 62) {
+            console.log(`   → Nacido 1960, retiro a los 62 = año ${retirementYear} ✅`);
+        } else {
+            console.log(`   → Nacido ${birthYear}, retiro a los ${edadPension} = año ${retirementYear} (escenario dinámico) ✅`);
+        }
+
+        // Generate monthly payment cards
+        const monthlyPaymentsRow = document.getElementById('monthly-payments-row');
+        monthlyPaymentsRow.innerHTML = ''; // Clear existing content
+
+        // Calculate monthly payments by year - generate complete timeline through retirement year
+        const availableYears = Object.keys(resultado.inversion.desglose_anual).sort();
+        const maxYear = Math.min(2030, retirementYear);
+
+        console.log(`🎯 Available payment years: ${availableYears.join(', ')}`);
+        console.log(`🎯 Max year to show: ${maxYear} (retirement year: ${retirementYear})`);
+
+        // UMA and tasa progression for extending beyond backend data
+        // Covers scenarios from 1960-1975 birth years with various retirement ages
+        const umaProgression = {
+            2025: {uma: 113.14, tasa: 13.347},
+            2026: {uma: 117.47, tasa: 14.438}, 
+            2027: {uma: 121.82, tasa: 15.528},
+            2028: {uma: 126.20, tasa: 16.619},
+            2029: {uma: 130.62, tasa: 17.710}, // Extrapolated +1.091% progression
+            2030: {uma: 135.08, tasa: 18.801}, // Extrapolated +1.091% progression
+            2031: {uma: 139.68, tasa: 19.892}, // For younger users (born 1970→retire 2031)
+            2032: {uma: 144.42, tasa: 20.983}, // For younger users (born 1972→retire 2032)
+            2033: {uma: 149.30, tasa: 22.074}, // For younger users (born 1973→retire 2033)
+            2034: {uma: 154.32, tasa: 23.165}, // For younger users (born 1974→retire 2034)
+            2035: {uma: 159.47, tasa: 24.256}, // For younger users (born 1975→retire 2035)
+            // Covers birth years 1960-1975 with retirement ages 60-65
+        };
+
+        // Validate retirement year is reasonable
+        if (retirementYear < currentYear) {
+            console.error(`❌ Error: Año de retiro ${retirementYear} es anterior al año actual ${currentYear}`);
+            return;
+        }
+        if (retirementYear > 2035) {
+            console.warn(`⚠️ Advertencia: Año de retiro ${retirementYear} está muy lejano, limitando cálculos a 2035`);
+        }
+
+        console.log(`💰 Generando pagos mensuales hasta año de retiro ${retirementYear}:`);
+
+        // Generate payments for all years through retirement
+        for (let year = currentYear; year <= maxYear; year++) {
+            let yearData;
+            let monthlyPayment;
+            let tasa_pct;
+
+            // Use backend data if available, otherwise calculate from UMA progression
+            if (resultado.inversion.desglose_anual[year.toString()]) {
+                yearData = resultado.inversion.desglose_anual[year.toString()];
+                monthlyPayment = yearData.costo_mensual;
+                tasa_pct = yearData.tasa_pct;
+            } else if (umaProgression[year]) {
+                // Calculate monthly payment from SBC and UMA rate
+                const sbcInput = document.getElementById('sbc_modalidad40');
+                const sbc = sbcInput ? parseFloat(sbcInput.value) || 2500 : 2500; // Get from form or fallback
+                const umaData = umaProgression[year];
+                tasa_pct = umaData.tasa;
+                monthlyPayment = (sbc * 30.4) * (tasa_pct / 100); // SBC × días/mes × tasa
+                console.log(`🔄 Calculando año ${year}: SBC $${sbc} × 30.4 días × ${tasa_pct}% = $${Math.round(monthlyPayment)}/mes`);
+            } else {
+                console.log(`⚠️ No hay datos para año ${year}, omitiendo...`);
+                continue;
+            }
+
+            payments.push(monthlyPayment);
+
+            // Determine color based on rate
+            let colorClass = 'text-primary';
+            if (tasa_pct >= 17) colorClass = 'text-danger';
+            else if (tasa_pct >= 15) colorClass = 'text-warning';
+
+            // Calculate months available in this year (until user reaches pension age)
+            let monthsInYear = 12;
+            let totalPaymentYear = monthlyPayment * 12; // Full year payment
+
+            // If this is the final year, calculate partial year payments
+            if (year === retirementYear) {
+                // More sophisticated partial year calculation
+                // Assume birthday is roughly mid-year unless we have more specific info
+                const birthMonth = 6; // Default to June (mid-year) if no specific data
+                monthsInYear = birthMonth; // Pay until birthday month
+                totalPaymentYear = monthlyPayment * monthsInYear; // Partial year payment
+                console.log(`📅 Año final ${year}: pagando hasta cumpleaños (mes ${birthMonth}) = ${monthsInYear} meses`);
+            }
+
+            const cardHtml = `
+                        <div class="col-2">
+                            <div class="border rounded p-2">
+                                <small class="text-muted">${year}</small>
+                                <h5 class="${colorClass} mb-0">$${formatearNumero(Math.round(monthlyPayment))}</h5>
+                                <small class="text-muted">Tasa: ${tasa_pct.toFixed(3)}%</small>
+                                <div><small class="text-success">${monthsInYear} meses</small></div>
+                                <div><small class="text-info">Total: $${formatearNumero(Math.round(totalPaymentYear))}</small></div>
+                            </div>
+                        </div>
+                    `;
+
+            monthlyPaymentsRow.innerHTML += cardHtml;
+            console.log(`✅ ${year}: $${formatearNumero(Math.round(monthlyPayment))}/mes × ${monthsInYear} meses = $${formatearNumero(Math.round(totalPaymentYear))} total`);
+            console.log(`   📅 Tasa UMA fija todo el año (actualizada en febrero ${year} por Banxico)`);
+        }
+
+        // Update UMA impact information
+        const sbc = parseFloat(document.getElementById('sbc_modalidad40').value) || 0;
+        const umaMultiple = sbc / 113.14; // 2025 UMA base
+
+        // Always update UMA multiple
+        const umaMultipleEl = document.getElementById('uma-multiple');
+        if (umaMultipleEl) {
+            if (umaMultiple > 0) {
+                umaMultipleEl.textContent = umaMultiple.toFixed(1) + ' UMAs';
+            } else {
+                umaMultipleEl.textContent = '0 UMAs';
+            }
+        }
+
+        // Calculate increment if we have multiple payments
+        const umaImpactEl = document.getElementById('uma-impact');
+        if (umaImpactEl) {
+            if (payments.length >= 2) {
+                const firstPayment = payments[0];
+                const lastPayment = payments[payments.length - 1];
+                const umaIncrease = ((lastPayment / firstPayment) - 1) * 100;
+
+                if (umaIncrease > 0) {
+                    umaImpactEl.textContent = '+' + umaIncrease.toFixed(1) + '%';
+                    umaImpactEl.className = umaIncrease > 30 ? 'text-warning' : 'text-success';
+                } else {
+                    umaImpactEl.textContent = '+0%';
+                    umaImpactEl.className = 'text-muted';
+                }
+            } else {
+                // Single year or no payment data
+                umaImpactEl.textContent = '+0%';
+                umaImpactEl.className = 'text-muted';
+            }
+        }
+    }
+}
+
+function autoPopulateModalFields() {
+    console.log('🔄 Auto-poblando campos del modal PDF...');
+
+    // Mapear campos del formulario principal al modal
+    const fieldMappings = [
+        { main: 'nombre', modal: 'modal_nombre' },
+        { main: 'apellido_paterno', modal: 'modal_apellido_paterno' }, 
+        { main: 'apellido_materno', modal: 'modal_apellido_materno' },
+        { main: 'rfc', modal: 'modal_rfc' },
+        { main: 'curp', modal: 'modal_curp' },
+        { main: 'nss', modal: 'modal_nss' }
+    ];
+
+    let fieldsPopulated = 0;
+
+    fieldMappings.forEach(mapping => {
+        const mainField = document.getElementById(mapping.main);
+        const modalField = document.getElementById(mapping.modal);
+
+        if (mainField && modalField && mainField.value.trim()) {
+            modalField.value = mainField.value.trim();
+            console.log(`✅ Campo ${mapping.main} auto-poblado: ${mainField.value.trim()}`);
+            fieldsPopulated++;
+        }
+    });
+
+    // Mostrar mensaje de confirmación
+    const nombre = document.getElementById('nombre').value.trim();
+    if (fieldsPopulated > 0) {
+        console.log(`🎉 ${fieldsPopulated} campos auto-poblados para: ${nombre || 'Usuario'}`);
+
+        // Mostrar notificación visual
+        setTimeout(() => {
+            const alertDiv = document.createElement('div');
+            alertDiv.className = 'alert alert-success alert-dismissible fade show';
+            alertDiv.innerHTML = `
+                        <i class="fas fa-magic me-2"></i>
+                        <strong>¡Campos auto-poblados!</strong> 
+                        ${fieldsPopulated} datos personales copiados automáticamente.
+                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                    `;
+
+            const modalBody = document.querySelector('#modalReporte .modal-body');
+            if (modalBody) {
+                modalBody.insertBefore(alertDiv, modalBody.firstChild);
+
+                // Auto-hide after 3 seconds
+                setTimeout(() => {
+                    if (alertDiv.parentNode) {
+                        alertDiv.remove();
+                    }
+                }, 3000);
+            }
+        }, 100);
+    }
+}
+
+// Función para generar reporte PDF con múltiples opciones de salida
+async function generarReportePDF(outputMode = 'download') {
+    console.log(`🎯 Iniciando generación de PDF - Modo: ${outputMode}`);
+
+    if (!resultadosCalculados) {
+        console.error('❌ No hay resultados calculados disponibles');
+        alert('Primero calcula tu pensión antes de generar el reporte.');
+        return;
+    }
+
+    console.log(`✅ Resultados disponibles:`, resultadosCalculados);
+
+    // Validar datos requeridos (usar campos del modal si están disponibles, sino los principales)
+    const nombre = document.getElementById('modal_nombre')?.value.trim() || document.getElementById('nombre')?.value.trim();
+    const apellidoPaterno = document.getElementById('modal_apellido_paterno')?.value.trim() || document.getElementById('apellido_paterno')?.value.trim();
+
+    console.log(`📝 Datos personales: nombre="${nombre}", apellido="${apellidoPaterno}"`);
+
+    if (!nombre || !apellidoPaterno) {
+        console.error('❌ Faltan datos personales requeridos');
+        alert('Por favor completa al menos el nombre y apellido paterno en el modal.');
+        return;
+    }
+
+    // Mostrar loading específico del modo
+    const loadingElements = {
+        'download': document.getElementById('loading-pdf-download'),
+        'print': document.getElementById('loading-pdf-download'), // Usa el mismo por ahora
+        'preview': document.getElementById('loading-pdf-download'),
+        'email': document.getElementById('loading-pdf-download')
+    };
+
+    const loadingPdf = loadingElements[outputMode] || document.getElementById('loading-pdf-download');
+    if (loadingPdf) loadingPdf.style.display = 'inline-block';
+
+    try {
+        // Recopilar datos del formulario (priorizar campos del modal)
+        const datosReporte = {
+            // Datos personales
+            nombre: nombre,
+            apellido_paterno: apellidoPaterno,
+            apellido_materno: document.getElementById('modal_apellido_materno')?.value.trim() || document.getElementById('apellido_materno')?.value.trim(),
+            rfc: document.getElementById('modal_rfc')?.value.trim() || document.getElementById('rfc')?.value.trim(),
+            curp: document.getElementById('modal_curp')?.value.trim() || document.getElementById('curp')?.value.trim(),
+            nss: document.getElementById('modal_nss')?.value.trim() || document.getElementById('nss')?.value.trim(),
+
+            // Opciones del reporte
+            incluir_alternativo: document.getElementById('incluir_alternativo').checked,
+            incluir_edades: document.getElementById('incluir_edades').checked,
+            incluir_calendario: document.getElementById('incluir_calendario').checked,
+            incluir_recomendaciones: document.getElementById('incluir_recomendaciones').checked,
+
+            // Escenario alternativo si está seleccionado
+            sbc_alternativo: document.getElementById('sbc_alternativo').value,
+            años_alternativo: document.getElementById('años_alternativo').value,
+
+            // Datos calculados
+            resultados: resultadosCalculados
+        };
+
+        console.log(`📤 Enviando datos al backend:`, datosReporte);
+
+        // Enviar a backend para generar PDF
+        const response = await fetch('/generar-reporte-pdf', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(datosReporte)
+        });
+
+        console.log(`📡 Respuesta del servidor: ${response.status} ${response.statusText}`);
+
+        if (response.ok) {
+            const blob = await response.blob();
+            const url = window.URL.createObjectURL(blob);
+            const filename = `Reporte_Modalidad40_${nombre}_${apellidoPaterno}.pdf`;
+
+            // Manejar diferentes modos de salida
+            switch(outputMode) {
+                case 'download':
+                    // Descargar PDF
+                    const a = document.createElement('a');
+                    a.href = url;
+                    a.download = filename;
+                    document.body.appendChild(a);
+                    a.click();
+                    document.body.removeChild(a);
+                    break;
+
+                case 'print':
+                    // Imprimir directamente
+                    const printWindow = window.open(url, '_blank');
+                    if (printWindow) {
+                        printWindow.onload = function() {
+                            // Esperar un poco para que cargue completamente
+                            setTimeout(() => {
+                                printWindow.print();
+                                // Opcional: cerrar la ventana después de imprimir
+                                setTimeout(() => {
+                                    if (!printWindow.closed) {
+                                        const cerrarVentana = confirm('¿Cerrar la ventana del PDF después de imprimir?');
+                                        if (cerrarVentana) {
+                                            printWindow.close();
+                                        }
+                                    }
+                                }, 3000);
+                            }, 1000);
+                        };
+                    } else {
+                        alert('❌ No se pudo abrir la ventana de impresión.\\n\\n💡 Intenta con "Vista Previa" y luego imprime desde ahí.');
+                    }
+                    break;
+
+                case 'preview':
+                    // Vista previa en nueva ventana
+                    window.open(url, '_blank');
+                    break;
+
+                case 'email':
+                    // Preparar para envío por email
+                    const emailSubject = `Reporte de Modalidad 40 IMSS - ${nombre} ${apellidoPaterno}`;
+                    const emailBody = `Hola,
+
+Adjunto mi análisis personalizado de Modalidad 40 IMSS generado el ${new Date().toLocaleDateString('es-MX')}.
+
+Este reporte incluye:
+• Análisis completo de mi situación actual
+• Proyección de pensión con y sin Modalidad 40  
+• Calendario de pagos mensuales
+• Recomendaciones personalizadas
+
+Generado con: Calculadora Modalidad 40 IMSS
+Fecha: ${new Date().toLocaleDateString('es-MX')}
+
+Saludos,
+${nombre} ${apellidoPaterno}`;
+
+                    // Descargar primero y mostrar instrucciones de email
+                    const emailLink = document.createElement('a');
+                    emailLink.href = url;
+                    emailLink.download = filename;
+                    document.body.appendChild(emailLink);
+                    emailLink.click();
+                    document.body.removeChild(emailLink);
+
+                    // Esperar un momento y mostrar opciones de email
+                    setTimeout(() => {
+                        const emailChoice = confirm(`📧 ¡PDF descargado exitosamente!
+
+¿Cómo quieres enviarlo por email?
+
+✅ OK = Abrir tu cliente de email (Outlook, Gmail app, etc.)
+❌ Cancelar = Abrir Gmail web manualmente
+
+El PDF está en tu carpeta de Descargas listo para adjuntar.`);
+
+                        if (emailChoice) {
+                            // Abrir cliente de email nativo
+                            const mailtoLink = `mailto:?subject=${encodeURIComponent(emailSubject)}&body=${encodeURIComponent(emailBody)}`;
+                            window.location.href = mailtoLink;
+                        } else {
+                            // Abrir Gmail web
+                            window.open('https://mail.google.com/mail/u/0/#inbox?compose=new', '_blank');
+                            alert(`📧 Se ha abierto Gmail en una nueva pestaña.
+
+📋 Instrucciones:
+1. Haz clic en "Redactar" 
+2. Adjunta el PDF descargado
+3. Copia y pega este asunto: "${emailSubject}"
+
+💡 El PDF está en tu carpeta de Descargas.`);
+                        }
+                    }, 1000);
+                    break;
+
+                default:
+                    // Default: descargar
+                    const defaultA = document.createElement('a');
+                    defaultA.href = url;
+                    defaultA.download = filename;
+                    document.body.appendChild(defaultA);
+                    defaultA.click();
+                    document.body.removeChild(defaultA);
+            }
+
+            window.URL.revokeObjectURL(url);
+
+            // Cerrar modal
+            const modal = bootstrap.Modal.getInstance(document.getElementById('modalReporte'));
+            if (modal) modal.hide();
+
+            // Mensaje personalizado según el modo
+            const successMessages = {
+                'download': '✅ ¡PDF descargado exitosamente!\\n\\n📁 Revisa tu carpeta de Descargas para encontrar:\\n"' + filename + '"',
+                'print': '🖨️ ¡PDF abierto para impresión!\\n\\nℹ️ Se abrió una nueva ventana con tu reporte listo para imprimir.',
+                'preview': '👀 ¡Vista previa abierta!\\n\\n💡 Puedes imprimir desde la ventana nueva si te gusta el resultado.',
+                'email': '📧 ¡Preparado para envío por email!\\n\\n📎 El PDF se descargó y las instrucciones de envío están listas.'
+            };
+
+            // Solo mostrar mensaje para download y preview (los otros tienen sus propias notificaciones)
+            if (outputMode === 'download' || outputMode === 'preview') {
+                alert(successMessages[outputMode] || '¡Reporte PDF procesado exitosamente!');
+            }
+        } else {
+            console.error(`❌ Error del servidor: ${response.status}`);
+            const errorText = await response.text();
+            console.error(`❌ Detalles del error:`, errorText);
+
+            let errorMessage = 'Error al generar el reporte';
+            try {
+                const errorData = JSON.parse(errorText);
+                errorMessage = errorData.error || errorMessage;
+            } catch (e) {
+                errorMessage += ` (Status: ${response.status})`;
+            }
+
+            throw new Error(errorMessage);
+        }
+
+    } catch (error) {
+        console.error('❌ Error completo:', error);
+        alert(`Error al generar el reporte: ${error.message}\\n\\nRevisa la consola (F12) para más detalles.`);
+    } finally {
+        // Asegurar que el loading se oculte siempre
+        if (loadingPdf) {
+            loadingPdf.style.display = 'none';
+            console.log('🔄 Loading spinner ocultado');
+        }
+    }
+}
+
+// Función para mostrar modal de opciones de nube
+function mostrarOpcionesNube() {
+    const modalNube = new bootstrap.Modal(document.getElementById('modalNube'));
+    modalNube.show();
+}
+
+// Función para probar PDF con datos de ejemplo (debugging)
+function testPDF() {
+    console.log('🧪 Iniciando test de PDF con datos de ejemplo...');
+
+    // Llenar datos de ejemplo en el modal
+    document.getElementById('modal_nombre').value = 'Juan';
+    document.getElementById('modal_apellido_paterno').value = 'Pérez';
+    document.getElementById('modal_apellido_materno').value = 'López';
+
+    // Si no hay resultados calculados, crear datos de ejemplo
+    if (!resultadosCalculados) {
+        console.log('⚠️ No hay resultados calculados, creando datos de ejemplo...');
+        resultadosCalculados = {
+            sin_modalidad40: {
+                pension_total: 5000,
+                pension_mensual: 5000,
+                sdp: 1500,
+                pension_cuantia_basica: 3500
+            },
+            con_modalidad40: {
+                pension_total: 8500,
+                pension_mensual: 8500,
+                sbc: 2500,
+                pension_cuantia_basica: 7000
+            },
+            inversion: {
+                total_años: 180000,
+                años_cotizados: 4,
+                promedio_mensual: 3000,
+                desglose_anual: {
+                    "2025": {"tasa_pct": 13.347, "costo_mensual": 9738, "costo_anual": 116856},
+                    "2026": {"tasa_pct": 14.438, "costo_mensual": 10937, "costo_anual": 131245}
+                },
+                costo_oportunidad: 15000,
+                roi_anual: 12.5
+            },
+            analisis_roi: {
+                años_recuperacion: 4.2,
+                roi_anual: 12.5,
+                beneficio_neto_10_anos: 450000
+            },
+            datos_entrada: {
+                edad_actual: 61,
+                edad_pension: 65,
+                sbc_modalidad40: 2500,
+                semanas_cotizadas: 500,
+                sdp_actual: 1500
+            }
+        };
+        console.log('✅ Datos de ejemplo creados para testing');
+    }
+
+    console.log('✅ Datos disponibles, intentando generar PDF...');
+    generarReportePDF('download');
+}
+
+// Función para guardar en servicios de nube
+async function guardarEnNube(servicio) {
+    if (!resultadosCalculados) {
+        alert('Primero calcula tu pensión antes de guardar en la nube.');
+        return;
+    }
+
+    const servicios = {
+        'google-drive': {
+            nombre: 'Google Drive',
+            url: 'https://drive.google.com/drive/my-drive',
+            icono: 'fab fa-google-drive text-success'
+        },
+        'onedrive': {
+            nombre: 'Microsoft OneDrive',
+            url: 'https://onedrive.live.com/',
+            icono: 'fab fa-microsoft text-primary'
+        },
+        'dropbox': {
+            nombre: 'Dropbox',
+            url: 'https://www.dropbox.com/home',
+            icono: 'fab fa-dropbox text-info'
+        }
+    };
+
+    const servicioSeleccionado = servicios[servicio];
+    if (!servicioSeleccionado) {
+        alert('Servicio no reconocido');
+        return;
+    }
+
+    try {
+        // Primero generar y descargar el PDF
+        await generarReportePDF('download');
+
+        // Esperar un momento para que el download termine
+        setTimeout(() => {
+            // Abrir el servicio de nube en nueva pestaña
+            window.open(servicioSeleccionado.url, '_blank');
+
+            // Mostrar instrucciones
+            const mensaje = `
+📱 ¡PDF descargado exitosamente!
+
+🔗 Se ha abierto ${servicioSeleccionado.nombre} en una nueva pestaña.
+
+📋 Pasos siguientes:
+1. Ve a la pestaña de ${servicioSeleccionado.nombre}
+2. Busca el botón "Subir archivo" o "Upload"  
+3. Selecciona el PDF descargado de tu carpeta de Descargas
+4. ¡Listo! Tu reporte estará guardado en la nube
+
+💡 Tip: Crea una carpeta específica para tus reportes de IMSS para mantenerlos organizados.
+                    `;
+
+            alert(mensaje);
+        }, 1500);
+
+    } catch (error) {
+        alert('Error al procesar el archivo para la nube: ' + error.message);
+    }
+
+    // Cerrar modal de nube
+    const modalNube = bootstrap.Modal.getInstance(document.getElementById('modalNube'));
+    if (modalNube) modalNube.hide();
+}
+
+// Check system status on page load
+async function checkSystemStatus() {
+    try {
+        console.log('🔍 Checking system status...');
+        const response = await fetch('/test', { method: 'GET', timeout: 10000 });
+
+        if (response.ok) {
+            const data = await response.json();
+            console.log('✅ System is online:', data);
+            // Hide the deployment warning if system is working
+            document.getElementById('deployment-status').style.display = 'none';
+        } else {
+            throw new Error(`HTTP ${response.status}`);
+        }
+    } catch (error) {
+        console.warn('⚠️ System status check failed:', error);
+        // Show deployment warning
+        const statusDiv = document.getElementById('deployment-status');
+        const messageSpan = document.getElementById('status-message');
+
+        statusDiv.style.display = 'block';
+        statusDiv.className = 'alert alert-warning';
+        messageSpan.textContent = 'Sistema en mantenimiento. Los cálculos pueden fallar. El equipo técnico está trabajando en una solución.';
+    }
+}
+
+// Event listeners for new personal data fields
+document.addEventListener('DOMContentLoaded', function() {
+    // Check system status immediately
+    checkSystemStatus();
+
+    // RFC and CURP auto-formatting
+    document.getElementById('rfc').addEventListener('input', formatearRFC);
+    document.getElementById('curp').addEventListener('input', formatearCURP);
+
+    // Age calculation triggers
+    document.getElementById('dia_nacimiento').addEventListener('change', calcularEdadActual);
+    document.getElementById('mes_nacimiento').addEventListener('change', calcularEdadActual);
+    document.getElementById('año_nacimiento').addEventListener('input', calcularEdadActual);
+
+    // Retirement age change triggers
+    document.getElementById('edad_jubilacion').addEventListener('change', calcularTiempoDisponibleUser);
+    document.getElementById('edad_jubilacion_user').addEventListener('input', calcularTiempoDisponibleUser);
+
+    // NSS formatting (only numbers)
+    document.getElementById('nss').addEventListener('input', function(e) {
+        e.target.value = e.target.value.replace(/\D/g, '');
+    });
+
+    // Form validation enhancement
+    const form = document.getElementById('calculadoraForm');
+    form.addEventListener('submit', function(e) {
+        // Validate required personal fields
+        const requiredFields = ['nombre', 'apellido_paterno', 'dia_nacimiento', 'mes_nacimiento', 'año_nacimiento', 'edad_jubilacion_user'];
+
+        for (let field of requiredFields) {
+            const element = document.getElementById(field);
+            if (!element.value) {
+                e.preventDefault();
+                element.focus();
+                alert(`Por favor completa el campo: ${element.labels[0] ? element.labels[0].textContent : 'requerido'}`);
+                return;
+            }
+        }
+
+        // Validate age makes sense
+        const edadActual = parseInt(document.getElementById('edad_actual_display').value);
+        const edadJubilacion = parseInt(document.getElementById('edad_jubilacion_user').value);
+
+        // Sync the hidden field for backend
+        document.getElementById('edad_jubilacion').value = edadJubilacion;
+
+        if (edadJubilacion <= edadActual) {
+            e.preventDefault();
+            alert('La edad de jubilación debe ser mayor a tu edad actual.');
+            document.getElementById('edad_jubilacion').focus();
+            return;
+        }
+
+        if (edadActual < 18 || edadActual > 80) {
+            e.preventDefault();
+            alert('La edad actual debe estar entre 18 y 80 años.');
+            return;
+        }
+    });
+});
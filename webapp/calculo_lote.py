@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CÁLCULO EN LOTE - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Lectura incremental de filas (arreglo JSON o CSV) y cálculo por trozos
+con el motor vectorizado. Todo son generadores: se lee, valida, calcula y
+responde un trozo a la vez, así que la memoria no crece con el archivo.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator
+
+from validacion import ErrorValidacion, validar_datos_calculo
+
+logger = logging.getLogger('webapp.calculo_lote')
+
+# Filas por trozo enviado al motor vectorizado
+TAMAÑO_TROZO = 512
+
+# Bytes leídos del cuerpo de la petición por iteración
+TAMAÑO_LECTURA = 64 * 1024
+
+# Archivos subidos más grandes que esto se copian a disco, no a memoria
+TAMAÑO_COPIA_EN_MEMORIA = 1024 * 1024
+
+# Columnas CSV que son casillas (sí/no)
+CAMPOS_BOOLEANOS = ('tiene_esposa', 'tiene_padres')
+_VALORES_VERDADEROS = {'1', 'true', 'verdadero', 'si', 'sí', 's', 'x', 'yes'}
+
+
+def iterar_filas_json(flujo, tamaño_lectura: int = TAMAÑO_LECTURA) -> Iterator[Any]:
+    """
+    Recorrer un arreglo JSON elemento por elemento sin cargarlo completo
+
+    Args:
+        flujo: Flujo binario (cuerpo de la petición o archivo subido)
+        tamaño_lectura: Bytes por lectura
+
+    Raises:
+        ErrorValidacion: si el cuerpo no es un arreglo JSON válido
+    """
+    decodificador_json = json.JSONDecoder()
+    decodificador_utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    texto, pos, agotado = '', 0, False
+
+    def leer() -> bool:
+        nonlocal texto, pos, agotado
+        bloque = flujo.read(tamaño_lectura)
+        agotado = not bloque
+        texto = texto[pos:] + decodificador_utf8.decode(bloque or b'', final=agotado)
+        pos = 0
+        return not agotado
+
+    def siguiente_caracter() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(texto) and texto[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(texto):
+                return texto[pos]
+            if not leer():
+                return ''
+
+    if siguiente_caracter() != '[':
+        raise ErrorValidacion('Se esperaba un arreglo JSON de personas')
+    pos += 1
+
+    primero = True
+    while True:
+        caracter = siguiente_caracter()
+        if caracter == ']':
+            return
+        if not primero:
+            if caracter != ',':
+                raise ErrorValidacion('Arreglo JSON inválido: falta una coma entre filas')
+            pos += 1
+            siguiente_caracter()
+        primero = False
+
+        # Decodificar el siguiente elemento; si el texto se corta a la
+        # mitad, leer más y reintentar. Un elemento solo es completo si ya se
+        # ve la ',' o ']' que lo cierra (un número cortado como '1.' también
+        # se decodifica, pero como 1)
+        while True:
+            try:
+                elemento, fin = decodificador_json.raw_decode(texto, pos)
+            except json.JSONDecodeError:
+                if leer():
+                    continue
+                raise ErrorValidacion('Arreglo JSON inválido o incompleto')
+            resto = texto[fin:].lstrip(' \t\r\n')
+            if not agotado and (not resto or resto[0] not in ',]'):
+                leer()
+                continue
+            break
+        pos = fin
+        yield elemento
+
+
+def iterar_filas_csv(flujo) -> Iterator[Dict[str, Any]]:
+    """
+    Recorrer un CSV (con encabezados) fila por fila
+
+    Acepta ',' o ';' como separador (Excel en español usa ';') y convierte
+    las casillas de CAMPOS_BOOLEANOS ('sí', '1', 'x'...) a bool.
+
+    Args:
+        flujo: Flujo binario con el CSV en UTF-8
+    """
+    texto = io.TextIOWrapper(flujo, encoding='utf-8-sig', newline='')
+    encabezado = texto.readline()
+    separador = ';' if encabezado.count(';') > encabezado.count(',') else ','
+    campos = [campo.strip() for campo in next(csv.reader([encabezado], delimiter=separador), [])]
+
+    for valores in csv.reader(texto, delimiter=separador):
+        if not any(valor.strip() for valor in valores):
+            continue
+        fila = {campo: valor.strip() for campo, valor in zip(campos, valores)}
+        for campo in CAMPOS_BOOLEANOS:
+            if campo in fila:
+                fila[campo] = fila[campo].lower() in _VALORES_VERDADEROS
+        yield fila
+
+
+def procesar_filas(filas: Iterable[Any], calc, hoy: datetime,
+                   tamaño_trozo: int = TAMAÑO_TROZO) -> Iterator[Dict[str, Any]]:
+    """
+    Validar y calcular filas por trozos, en el orden recibido
+
+    Args:
+        filas: Iterable de diccionarios (mismos campos que /calcular)
+        calc: Calculadora (parámetros de referencia)
+        hoy: Fecha actual sin zona horaria (deadline de inscripción)
+        tamaño_trozo: Filas por llamada al motor vectorizado
+
+    Yields:
+        Un diccionario por fila: {'fila', 'ok', ...resultados} o {'fila', 'ok': False, 'error'}
+        (más 'errores' si la fila tiene varios datos inválidos)
+    """
+    numeradas = enumerate(filas, start=1)
+    while True:
+        # Si el archivo se rompe a media lectura, se responden primero las
+        # filas ya leídas y después se propaga el error
+        trozo = []
+        error_lectura = None
+        try:
+            trozo.extend(islice(numeradas, tamaño_trozo))
+        except ErrorValidacion as ev:
+            error_lectura = ev
+        if not trozo and error_lectura is None:
+            return
+
+        salida = []
+        validos = []
+        for numero, data in trozo:
+            renglon = {'fila': numero}
+            if isinstance(data, dict) and 'id' in data:
+                renglon['id'] = data['id']
+            salida.append(renglon)
+
+            if not isinstance(data, dict):
+                renglon.update(ok=False, error='Cada fila debe ser un objeto con los campos del formulario')
+                continue
+            try:
+                validos.append((renglon, validar_datos_calculo(data, hoy)))
+            except ErrorValidacion as ev:
+                renglon.update(ok=False, error=ev.mensaje)
+                if len(ev.errores) > 1:
+                    renglon['errores'] = ev.respuesta()['errores']
+
+        if validos:
+            _calcular_validos(calc, validos)
+        yield from salida
+        if error_lectura is not None:
+            raise error_lectura
+
+
+def _calcular_validos(calc, validos) -> None:
+    """Calcular con el motor vectorizado y completar cada renglón"""
+    # NumPy se carga con el primer lote, no al arrancar la app
+    from Calculadora_Modalidad_40_Lote import DESCRIPCION_ERRORES, calcular_escenarios_lote
+
+    argumentos = [datos.argumentos() for _, datos in validos]
+    columnas = {nombre: [a[nombre] for a in argumentos] for nombre in argumentos[0] if nombre != 'calendario_mensual'}
+    columnas['mes_nacimiento'] = [mes or 0 for mes in columnas['mes_nacimiento']]  # 0 = desconocido
+    resultado = calcular_escenarios_lote(
+        calculadora=calc, calendario_mensual=argumentos[0]['calendario_mensual'], **columnas
+    )
+
+    for i, (renglon, datos) in enumerate(validos):
+        codigo = int(resultado['codigo_error'][i])
+        if codigo:
+            renglon.update(ok=False, error=DESCRIPCION_ERRORES[codigo])
+            continue
+        # Mismo redondeo que /calcular
+        renglon.update(
+            ok=True,
+            años_disponibles=datos.años_disponibles,
+            pension_sin_mod40=round(float(resultado['pension_sin_mod40'][i]), 0),
+            pension_con_mod40=round(float(resultado['pension_con_mod40'][i]), 0),
+            diferencia_mensual=round(float(resultado['diferencia_mensual'][i]), 0),
+            pago_mensual_imss=round(float(resultado['promedio_mensual'][i]), 0),
+            inversion_total=round(float(resultado['inversion_total'][i]), 0),
+            roi_anual=round(float(resultado['roi_anual_pct'][i]), 1),
+            años_recuperacion=round(float(resultado['años_recuperacion'][i]), 1),
+            dias_restantes_deadline=datos.dias_restantes_deadline,
+        )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LOGGING - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Configuración única de logging para la web app: loggers por módulo,
+niveles y salida en texto o JSON (una línea por registro).
+
+Variables de entorno:
+    LOG_LEVEL        Nivel mínimo (DEBUG, INFO, WARNING...). Default: INFO
+    LOG_FORMAT       'texto' o 'json'. Default: texto
+    LOG_SAMPLE_RATE  Fracción (0-1) de peticiones cuyo payload completo se
+                     registra en el logger 'webapp.payloads'. Default: 0
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+# Logger de volcados de payload (solo se escribe con muestreo activo)
+logger_payloads = logging.getLogger('webapp.payloads')
+
+_tasa_muestreo = 0.0
+_manejador = None
+
+
+class FormateadorJSON(logging.Formatter):
+    """Formatear cada registro como un objeto JSON en una sola línea"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        datos = getattr(record, 'datos', None)
+        if datos is not None:
+            registro['datos'] = datos
+        if record.exc_info:
+            registro['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+class FormateadorTexto(logging.Formatter):
+    """Formato de texto legible; agrega el payload muestreado al final de la línea"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        datos = getattr(record, 'datos', None)
+        if datos is not None:
+            texto += ' ' + json.dumps(datos, ensure_ascii=False, default=str)
+        return texto
+
+
+def configurar_logging(nivel: str = None, formato: str = None, tasa_muestreo: float = None) -> None:
+    """
+    Configurar el logger raíz (idempotente: reemplaza solo su propio manejador)
+
+    Args:
+        nivel: Nivel mínimo (default: LOG_LEVEL o INFO)
+        formato: 'texto' o 'json' (default: LOG_FORMAT o texto)
+        tasa_muestreo: Fracción de payloads a registrar (default: LOG_SAMPLE_RATE o 0)
+    """
+    global _tasa_muestreo, _manejador
+
+    nivel = (nivel or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    formato = (formato or os.environ.get('LOG_FORMAT', 'texto')).lower()
+    if tasa_muestreo is None:
+        try:
+            tasa_muestreo = float(os.environ.get('LOG_SAMPLE_RATE', 0))
+        except ValueError:
+            tasa_muestreo = 0.0
+    _tasa_muestreo = min(max(tasa_muestreo, 0.0), 1.0)
+
+    manejador = logging.StreamHandler(sys.stdout)
+    if formato == 'json':
+        manejador.setFormatter(FormateadorJSON())
+    else:
+        manejador.setFormatter(FormateadorTexto())
+
+    raiz = logging.getLogger()
+    if _manejador is not None:
+        raiz.removeHandler(_manejador)
+    raiz.addHandler(manejador)
+    raiz.setLevel(getattr(logging, nivel, logging.INFO))
+    _manejador = manejador
+
+
+def muestrear_payload() -> bool:
+    """Decidir si esta petición registra su payload completo"""
+    return _tasa_muestreo > 0 and random.random() < _tasa_muestreo
+
+
+def registrar_payload(etiqueta: str, datos) -> None:
+    """
+    Registrar un payload de petición/respuesta en 'webapp.payloads'
+
+    Llamar solo cuando muestrear_payload() fue verdadero para la petición.
+    """
+    logger_payloads.info('%s', etiqueta, extra={'datos': datos})
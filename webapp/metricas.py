@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MÉTRICAS - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Tiempos por petición y por fase (validación, calculadora, serialización,
+reportlab...), contadores de rechazos de validación por motivo y el estado
+de las cachés, expuestos en /metrics en el formato de texto de Prometheus.
+
+Las fases se miden con marcas consecutivas (como arranque.marcar): cada
+marca registra el tiempo desde la anterior, así que medir una petición
+cuesta unos pocos microsegundos. Los valores son de este proceso; con
+varios workers de gunicorn cada uno expone los suyos.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Límites superiores (segundos) de las cubetas de los histogramas
+CUBETAS_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIJO = 'modalidad40'
+
+# Nombre -> (tipo, ayuda) de las métricas propias del registro
+METRICAS = {
+    'peticion_duracion_segundos': ('histogram', 'Duración total de la petición por endpoint'),
+    'fase_duracion_segundos': ('histogram', 'Duración de cada fase de la petición'),
+    'peticiones_total': ('counter', 'Peticiones atendidas por endpoint y código HTTP'),
+    'validacion_rechazos_total': ('counter', 'Peticiones rechazadas por la validación, por motivo'),
+}
+
+# (etiquetas ordenadas, valor) de una muestra
+Muestra = Tuple[Tuple[Tuple[str, str], ...], float]
+# Fuente externa: lista de (nombre, tipo, ayuda, muestras) leída al exponer
+Fuente = Callable[[], Iterable[Tuple[str, str, str, List[Muestra]]]]
+
+
+class Histograma:
+    """Conteos por cubeta (no acumulados), suma y cuenta"""
+    __slots__ = ('cubetas', 'suma', 'cuenta')
+
+    def __init__(self):
+        self.cubetas = [0] * (len(CUBETAS_SEGUNDOS) + 1)  # la última es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, segundos: float) -> None:
+        self.cubetas[bisect_left(CUBETAS_SEGUNDOS, segundos)] += 1
+        self.suma += segundos
+        self.cuenta += 1
+
+
+class Tramos:
+    """
+    Fases de una petición: cada marcar() cierra la fase que empezó en la marca
+    anterior. Las fases se guardan aquí y se registran juntas en cerrar()
+    """
+    __slots__ = ('endpoint', 'inicio', 'fases', '_marca')
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.inicio = self._marca = time.perf_counter()
+        self.fases: List[Tuple[str, float]] = []
+
+    def marcar(self, fase: str, descontar: float = 0.0) -> None:
+        """
+        Registrar el tiempo desde la marca anterior como la fase indicada
+
+        descontar: segundos ya registrados con agregar() dentro de este tramo
+        """
+        ahora = time.perf_counter()
+        segundos = ahora - self._marca
+        if descontar:
+            segundos = max(segundos - descontar, 0.0)
+        self.fases.append((fase, segundos))
+        self._marca = ahora
+
+    def agregar(self, fase: str, segundos: float) -> None:
+        """Registrar una fase medida en otro lado (p. ej. en el proceso de PDF)"""
+        self.fases.append((fase, segundos))
+
+
+def _etiquetas(etiquetas: Tuple[Tuple[str, str], ...]) -> str:
+    if not etiquetas:
+        return ''
+    escapar = lambda valor: str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{nombre}="{escapar(valor)}"' for nombre, valor in etiquetas) + '}'
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class RegistroMetricas:
+    """Histogramas y contadores del proceso, con fuentes externas (cachés) leídas al exponer"""
+
+    def __init__(self, prefijo: str = PREFIJO):
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self._histogramas: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histograma] = {}
+        self._contadores: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        # Atajos para no armar etiquetas en cada petición: (endpoint, fase) -> histograma
+        # de la fase y (endpoint, estado) -> (histograma de duración, clave del contador)
+        self._fases: Dict[Tuple[str, str], Histograma] = {}
+        self._peticiones: Dict[Tuple[str, int], Tuple[Histograma, tuple]] = {}
+        self._fuentes: List[Fuente] = []
+
+    def tramos(self, endpoint: str) -> Tramos:
+        """Empezar a medir las fases de una petición (se registran con cerrar())"""
+        return Tramos(endpoint)
+
+    def _histograma(self, nombre: str, etiquetas: Tuple[Tuple[str, str], ...]) -> Histograma:
+        """Histograma de la serie, creado si no existe (llamar con el lock tomado)"""
+        clave = (nombre, etiquetas)
+        histograma = self._histogramas.get(clave)
+        if histograma is None:
+            histograma = self._histogramas[clave] = Histograma()
+        return histograma
+
+    def _histograma_fase(self, endpoint: str, fase: str) -> Histograma:
+        histograma = self._fases.get((endpoint, fase))
+        if histograma is None:
+            etiquetas = (('endpoint', endpoint), ('fase', fase))
+            histograma = self._fases[(endpoint, fase)] = self._histograma('fase_duracion_segundos', etiquetas)
+        return histograma
+
+    def observar_fase(self, endpoint: str, fase: str, segundos: float) -> None:
+        with self._lock:
+            self._histograma_fase(endpoint, fase).observar(segundos)
+
+    def _serie_peticion(self, endpoint: str, estado: int) -> Tuple[Histograma, tuple]:
+        serie = self._peticiones.get((endpoint, estado))
+        if serie is None:
+            histograma = self._histograma('peticion_duracion_segundos', (('endpoint', endpoint),))
+            clave = ('peticiones_total', (('endpoint', endpoint), ('estado', str(estado))))
+            serie = self._peticiones[(endpoint, estado)] = (histograma, clave)
+        return serie
+
+    def cerrar(self, tramos: Tramos, estado: int) -> None:
+        """Registrar las fases, la duración total y el código HTTP de una petición"""
+        total = time.perf_counter() - tramos.inicio
+        endpoint = tramos.endpoint
+        with self._lock:
+            for fase, segundos in tramos.fases:
+                self._histograma_fase(endpoint, fase).observar(segundos)
+            histograma, clave = self._serie_peticion(endpoint, estado)
+            histograma.observar(total)
+            self._contadores[clave] = self._contadores.get(clave, 0) + 1
+
+    def contar(self, nombre: str, incremento: float = 1, **etiquetas: str) -> None:
+        """Incrementar un contador declarado en METRICAS"""
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + incremento
+
+    def valor(self, nombre: str, **etiquetas: str) -> float:
+        """Valor actual de un contador (0 si no existe)"""
+        with self._lock:
+            return self._contadores.get((nombre, tuple(sorted(etiquetas.items()))), 0)
+
+    def histograma(self, nombre: str, **etiquetas: str) -> Histograma:
+        """Copia de un histograma (vacío si no existe)"""
+        copia = Histograma()
+        with self._lock:
+            original = self._histogramas.get((nombre, tuple(sorted(etiquetas.items()))))
+            if original is not None:
+                copia.cubetas, copia.suma, copia.cuenta = list(original.cubetas), original.suma, original.cuenta
+        return copia
+
+    def registrar_fuente(self, fuente: Fuente) -> None:
+        """Agregar métricas que se leen al exponer (p. ej. contadores de una caché)"""
+        self._fuentes.append(fuente)
+
+    def exponer(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)"""
+        with self._lock:
+            histogramas = {clave: (list(h.cubetas), h.suma, h.cuenta) for clave, h in self._histogramas.items()}
+            contadores = dict(self._contadores)
+
+        lineas = []
+        for nombre, (tipo, ayuda) in METRICAS.items():
+            completo = f'{self.prefijo}_{nombre}'
+            if tipo == 'histogram':
+                series = sorted((etiquetas, datos) for (n, etiquetas), datos in histogramas.items() if n == nombre)
+            else:
+                series = sorted((etiquetas, valor) for (n, etiquetas), valor in contadores.items() if n == nombre)
+            if not series:
+                continue
+            lineas += [f'# HELP {completo} {ayuda}', f'# TYPE {completo} {tipo}']
+            for etiquetas, datos in series:
+                if tipo != 'histogram':
+                    lineas.append(f'{completo}{_etiquetas(etiquetas)} {_numero(datos)}')
+                    continue
+                cubetas, suma, cuenta = datos
+                acumulado = 0
+                for limite, conteo in zip(CUBETAS_SEGUNDOS + ('+Inf',), cubetas):
+                    acumulado += conteo
+                    le = limite if limite == '+Inf' else repr(limite)
+                    lineas.append(f'{completo}_bucket{_etiquetas(etiquetas + (("le", le),))} {acumulado}')
+                lineas.append(f'{completo}_sum{_etiquetas(etiquetas)} {_numero(suma)}')
+                lineas.append(f'{completo}_count{_etiquetas(etiquetas)} {cuenta}')
+
+        for fuente in self._fuentes:
+            for nombre, tipo, ayuda, muestras in fuente():
+                completo = f'{self.prefijo}_{nombre}'
+                lineas += [f'# HELP {completo} {ayuda}', f'# TYPE {completo} {tipo}']
+                lineas += [f'{completo}{_etiquetas(etiquetas)} {_numero(valor)}' for etiquetas, valor in muestras]
+        return '\n'.join(lineas) + '\n'
+
+    def limpiar(self) -> None:
+        """Reiniciar histogramas y contadores (las fuentes se conservan)"""
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+            self._fases.clear()
+            self._peticiones.clear()
+
+
+def fuente_caches(caches: Dict[str, object]) -> Fuente:
+    """
+    Fuente con aciertos, fallos, tasa de aciertos y entradas de varias cachés
+
+    Args:
+        caches: nombre -> objeto con estadisticas() (CacheResultados, CachePDF)
+    """
+    def leer():
+        estadisticas = {nombre: cache.estadisticas() for nombre, cache in caches.items()}
+        serie = lambda campo: [((('cache', nombre),), datos[campo]) for nombre, datos in estadisticas.items()]
+        return [
+            ('cache_aciertos_total', 'counter', 'Aciertos de la caché', serie('aciertos')),
+            ('cache_fallos_total', 'counter', 'Fallos de la caché', serie('fallos')),
+            ('cache_tasa_aciertos', 'gauge', 'Aciertos / consultas de la caché', serie('tasa_aciertos')),
+            ('cache_entradas', 'gauge', 'Entradas guardadas en la caché', serie('entradas')),
+        ]
+    return leer
+
+
+def fuente_cola_pdf(cola) -> Fuente:
+    """Fuente con los trabajos de la cola de PDF por estado y los rechazados (ColaTrabajosPDF)"""
+    def leer():
+        estadisticas = cola.estadisticas()
+        return [
+            ('cola_pdf_trabajos', 'gauge', 'Trabajos de PDF en la cola por estado',
+             [((('estado', estado),), cuenta) for estado, cuenta in estadisticas['trabajos'].items()]),
+            ('cola_pdf_rechazados_total', 'counter', 'Reportes rechazados con la cola llena',
+             [((), estadisticas['rechazados'])]),
+        ]
+    return leer
+
+
+def fuente_vuelos(vuelos: Dict[str, object]) -> Fuente:
+    """
+    Fuente con los trabajos ejecutados, los compartidos por peticiones
+    idénticas simultáneas y los que están en curso
+
+    Args:
+        vuelos: nombre -> VueloUnico (cálculos, pdf)
+    """
+    def leer():
+        estadisticas = {nombre: vuelo.estadisticas() for nombre, vuelo in vuelos.items()}
+        serie = lambda campo: [((('vuelo', nombre),), datos[campo]) for nombre, datos in estadisticas.items()]
+        return [
+            ('vuelo_unico_ejecutados_total', 'counter', 'Trabajos ejecutados por la primera petición', serie('ejecutados')),
+            ('vuelo_unico_compartidos_total', 'counter', 'Peticiones que esperaron el trabajo de una idéntica',
+             serie('compartidos')),
+            ('vuelo_unico_en_curso', 'gauge', 'Trabajos en curso que se pueden compartir', serie('en_curso')),
+        ]
+    return leer
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHÉ DE REPORTES PDF - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Caché direccionada por contenido de los PDF ya generados. La clave es un
+hash de los campos que aparecen en el reporte (resultados, datos personales
+y opciones) más la fecha impresa, así que dos peticiones con la clave igual
+producirían el mismo documento y repetir la descarga no reconstruye nada.
+La misma clave se usa como ETag para responder 304 a If-None-Match.
+
+El tamaño total se limita en bytes; se expulsan primero los PDF usados
+hace más tiempo (LRU).
+
+Variables de entorno:
+    PDF_CACHE_MAX_MB  Megabytes de PDF en memoria por proceso (0 = sin caché). Default: 64
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('webapp.pdf_cache')
+
+
+class CachePDF:
+    """Caché LRU de PDF acotada por tamaño total (segura entre hilos)"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Suma máxima del tamaño de los PDF guardados (0 = desactivada)
+        """
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def construir_clave(campos: Dict[str, Any], fecha: date) -> str:
+        """
+        Clave de contenido de un reporte
+
+        Args:
+            campos: Campos de la petición que aparecen en el PDF
+            fecha: Fecha impresa en el reporte
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        normalizado = json.dumps(
+            {'campos': campos, 'fecha': fecha.isoformat()},
+            sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str
+        )
+        return hashlib.sha256(normalizado.encode('utf-8')).hexdigest()
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        """PDF guardado con esta clave, o None (cuenta acierto/fallo)"""
+        with self._lock:
+            contenido = self._datos.get(clave)
+            if contenido is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            self._datos.move_to_end(clave)
+            return contenido
+
+    def guardar(self, clave: str, contenido: bytes) -> None:
+        """Guardar un PDF y expulsar los menos usados si se excede el límite"""
+        if len(contenido) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= len(anterior)
+            self._datos[clave] = contenido
+            self.bytes_usados += len(contenido)
+            while self.bytes_usados > self.max_bytes:
+                _, expulsado = self._datos.popitem(last=False)
+                self.bytes_usados -= len(expulsado)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores de este proceso y ocupación actual"""
+        total = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / total, 4) if total else 0.0,
+            'entradas': len(self._datos),
+            'bytes_usados': self.bytes_usados,
+            'max_bytes': self.max_bytes,
+            'pid': os.getpid(),
+        }
+
+    def limpiar(self) -> None:
+        """Vaciar la caché y reiniciar los contadores"""
+        with self._lock:
+            self._datos.clear()
+            self.bytes_usados = 0
+            self.aciertos = 0
+            self.fallos = 0
+
+
+def crear_cache_pdf_desde_entorno() -> CachePDF:
+    """Construir la caché según PDF_CACHE_MAX_MB (ver docstring del módulo)"""
+    max_mb = float(os.environ.get('PDF_CACHE_MAX_MB', 64))
+    max_bytes = max(int(max_mb * 1024 * 1024), 0)
+    logger.info("Caché de PDF: %s", f"{max_mb:g} MB" if max_bytes else 'off')
+    return CachePDF(max_bytes)
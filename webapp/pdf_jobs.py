@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COLA DE REPORTES PDF - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Genera los PDF en un pool acotado de procesos en lugar del hilo de la
+petición, para que un doc.build lento no detenga /calcular (el despliegue
+usa un solo worker de gunicorn).
+
+Flujo: enviar() regresa un trabajo con id; se consulta su estado y, cuando
+está 'listo', se descarga el PDF. Si ya hay demasiados trabajos sin
+terminar se rechaza el envío (ColaLlena -> 503 con Retry-After). Los
+trabajos terminados se olvidan después de su TTL.
+
+Un reporte idéntico (misma clave de contenido) que se pide mientras otro
+sigue en curso no se vuelve a generar: recibe el mismo trabajo (mismo id)
+y no ocupa lugar en la cola (VueloUnico, ver single_flight.py).
+
+Variables de entorno:
+    PDF_WORKERS       Procesos que generan PDF. Default: 1
+    PDF_QUEUE_SIZE    Trabajos sin terminar admitidos a la vez. Default: 8
+    PDF_JOB_TTL       Segundos que se conserva un trabajo terminado. Default: 600
+    PDF_SYNC_TIMEOUT  Segundos que espera /generar-reporte-pdf. Default: 60
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from single_flight import VueloUnico
+
+logger = logging.getLogger('webapp.pdf_jobs')
+
+# Estados de un trabajo
+PENDIENTE = 'pendiente'
+PROCESANDO = 'procesando'
+LISTO = 'listo'
+ERROR = 'error'
+
+
+class ColaLlena(RuntimeError):
+    """Hay demasiados trabajos sin terminar; reintentar después"""
+
+    def __init__(self, reintentar_en: int):
+        super().__init__('Cola de reportes PDF llena')
+        self.reintentar_en = reintentar_en
+
+
+@dataclass
+class TrabajoPDF:
+    """Un reporte pedido a la cola"""
+    id: str
+    clave: str
+    nombre_archivo: str
+    creado: float = field(default_factory=time.time)
+    terminado: Optional[float] = None
+    segundos_generacion: Optional[float] = None  # doc.build en el proceso del pool
+    contenido: Optional[bytes] = None
+    error: Optional[str] = None
+    futuro: Optional[Future] = field(default=None, repr=False)
+    evento: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def estado(self) -> str:
+        if self.contenido is not None:
+            return LISTO
+        if self.error is not None:
+            return ERROR
+        if self.futuro is not None and self.futuro.running():
+            return PROCESANDO
+        return PENDIENTE
+
+    def resumen(self) -> Dict[str, Any]:
+        """Estado público del trabajo (sin el contenido)"""
+        return {
+            'id': self.id,
+            'estado': self.estado,
+            'creado': self.creado,
+            'terminado': self.terminado,
+            'bytes': len(self.contenido) if self.contenido is not None else None,
+            'error': self.error,
+        }
+
+
+class ColaTrabajosPDF:
+    """Pool de procesos con cola acotada y trabajos que expiran"""
+
+    def __init__(self, generar: Callable[..., bytes], cache=None,
+                 inicializar: Optional[Callable[[], None]] = None,
+                 max_workers: int = 1, max_pendientes: int = 8, ttl: float = 600):
+        """
+        Args:
+            generar: Función de nivel de módulo (se ejecuta en otro proceso)
+                     que recibe (campos, ahora) y regresa el PDF
+            cache: CachePDF donde se guardan los PDF terminados (opcional)
+            inicializar: Función que corre una vez en cada proceso del pool
+            max_workers: Procesos del pool
+            max_pendientes: Trabajos sin terminar admitidos a la vez
+            ttl: Segundos que se conserva un trabajo terminado
+        """
+        self.generar = generar
+        self.cache = cache
+        self.inicializar = inicializar
+        self.max_workers = max_workers
+        self.max_pendientes = max_pendientes
+        self.ttl = ttl
+        self.rechazados = 0
+        self.vuelo = VueloUnico()
+        self._trabajos: Dict[str, TrabajoPDF] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _obtener_pool(self) -> ProcessPoolExecutor:
+        # Se crea en el primer uso, ya dentro del worker de gunicorn; 'spawn'
+        # evita heredar por fork los hilos y locks del proceso web
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=self.inicializar,
+            )
+        return self._pool
+
+    def _purgar(self, ahora: float) -> None:
+        vencidos = [
+            id_trabajo for id_trabajo, trabajo in self._trabajos.items()
+            if trabajo.terminado is not None and trabajo.terminado + self.ttl < ahora
+        ]
+        for id_trabajo in vencidos:
+            del self._trabajos[id_trabajo]
+
+    def _sin_terminar(self) -> int:
+        return sum(1 for trabajo in self._trabajos.values() if trabajo.terminado is None)
+
+    def enviar(self, campos: Dict[str, Any], ahora, clave: str, nombre_archivo: str) -> TrabajoPDF:
+        """
+        Encolar un reporte (o entregarlo de inmediato si ya está en caché,
+        o unirse al trabajo en curso con la misma clave)
+
+        Args:
+            campos: Campos del reporte (ver reporte_pdf.CAMPOS_REPORTE)
+            ahora: Fecha/hora que se imprime en el reporte
+            clave: Clave de contenido (CachePDF.construir_clave)
+            nombre_archivo: Nombre de descarga del PDF
+
+        Returns:
+            TrabajoPDF (compartido con las peticiones idénticas en curso)
+
+        Raises:
+            ColaLlena: si hay max_pendientes trabajos sin terminar
+        """
+        trabajo = TrabajoPDF(id=uuid.uuid4().hex, clave=clave, nombre_archivo=nombre_archivo)
+
+        contenido = self.cache.obtener(clave) if self.cache is not None else None
+        if contenido is not None:
+            trabajo.contenido = contenido
+            trabajo.terminado = time.time()
+            trabajo.evento.set()
+            with self._lock:
+                self._purgar(trabajo.terminado)
+                self._trabajos[trabajo.id] = trabajo
+            return trabajo
+
+        en_curso, compartido = self.vuelo.iniciar_o_unirse(clave, lambda: self._encolar(trabajo, campos, ahora))
+        if compartido:
+            logger.debug("Reporte %s ya en curso: trabajo %s compartido", clave[:12], en_curso.id)
+            return en_curso
+
+        trabajo.futuro.add_done_callback(lambda futuro: self._terminar(trabajo, futuro))
+        logger.debug("Trabajo PDF %s encolado", trabajo.id)
+        return trabajo
+
+    def _encolar(self, trabajo: TrabajoPDF, campos: Dict[str, Any], ahora) -> TrabajoPDF:
+        with self._lock:
+            self._purgar(time.time())
+            if self._sin_terminar() >= self.max_pendientes:
+                self.rechazados += 1
+                raise ColaLlena(self._estimar_espera())
+            try:
+                trabajo.futuro = self._obtener_pool().submit(_generar_y_medir, self.generar, campos, ahora)
+            except BrokenProcessPool:
+                # Un proceso del pool murió: se reemplaza el pool completo,
+                # liberando antes los procesos y pipes del roto
+                logger.warning("Pool de PDF roto, se crea uno nuevo")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                trabajo.futuro = self._obtener_pool().submit(_generar_y_medir, self.generar, campos, ahora)
+            self._trabajos[trabajo.id] = trabajo
+        return trabajo
+
+    def calentar(self) -> Future:
+        """
+        Arrancar el pool y preparar un proceso sin esperar a la primera petición
+
+        Returns:
+            Futuro con lo que regrese inicializar (p. ej. segundos de preparación)
+        """
+        with self._lock:
+            return self._obtener_pool().submit(self.inicializar or _sin_preparacion)
+
+    def _terminar(self, trabajo: TrabajoPDF, futuro: Future) -> None:
+        try:
+            contenido, trabajo.segundos_generacion = futuro.result()
+        except Exception as e:
+            logger.error("Error generando PDF del trabajo %s: %s", trabajo.id, e)
+            trabajo.error = str(e) or e.__class__.__name__
+        else:
+            trabajo.contenido = contenido
+            if self.cache is not None:
+                self.cache.guardar(trabajo.clave, contenido)
+        trabajo.terminado = time.time()
+        self.vuelo.terminar(trabajo.clave)
+        trabajo.evento.set()
+
+    def _estimar_espera(self) -> int:
+        # Segundos sugeridos en Retry-After: una ronda del pool por cada
+        # max_workers trabajos en fila, a ~2 s por reporte
+        return max(1, 2 * self._sin_terminar() // max(self.max_workers, 1))
+
+    def obtener(self, id_trabajo: str) -> Optional[TrabajoPDF]:
+        """Trabajo con ese id, o None si no existe o ya expiró"""
+        with self._lock:
+            self._purgar(time.time())
+            return self._trabajos.get(id_trabajo)
+
+    def esperar(self, trabajo: TrabajoPDF, timeout: Optional[float] = None) -> bytes:
+        """
+        Esperar a que termine un trabajo y regresar su PDF
+
+        Raises:
+            TimeoutError: si no termina a tiempo
+            RuntimeError: si la generación falló
+        """
+        if not trabajo.evento.wait(timeout):
+            raise TimeoutError(f'El reporte {trabajo.id} no terminó en {timeout} s')
+        if trabajo.error is not None:
+            raise RuntimeError(trabajo.error)
+        return trabajo.contenido
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Ocupación de la cola de este proceso"""
+        with self._lock:
+            self._purgar(time.time())
+            estados = [trabajo.estado for trabajo in self._trabajos.values()]
+        return {
+            'workers': self.max_workers,
+            'max_pendientes': self.max_pendientes,
+            'ttl_segundos': self.ttl,
+            'trabajos': {estado: estados.count(estado) for estado in (PENDIENTE, PROCESANDO, LISTO, ERROR)},
+            'rechazados': self.rechazados,
+            'compartidos': self.vuelo.compartidos,
+            'pid': os.getpid(),
+        }
+
+    def cerrar(self) -> None:
+        """Detener el pool (los trabajos en curso terminan)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def _sin_preparacion() -> float:
+    return 0.0
+
+
+def _generar_y_medir(generar: Callable[..., bytes], campos: Dict[str, Any], ahora) -> Tuple[bytes, float]:
+    """Generar el PDF en el proceso del pool y regresar también cuánto tardó"""
+    inicio = time.perf_counter()
+    contenido = generar(campos, ahora)
+    return contenido, time.perf_counter() - inicio
+
+
+def crear_cola_desde_entorno(generar: Callable[..., bytes], cache=None,
+                             inicializar: Optional[Callable[[], None]] = None) -> ColaTrabajosPDF:
+    """Construir la cola según PDF_WORKERS / PDF_QUEUE_SIZE / PDF_JOB_TTL"""
+    cola = ColaTrabajosPDF(
+        generar, cache=cache, inicializar=inicializar,
+        max_workers=max(int(os.environ.get('PDF_WORKERS', 1)), 1),
+        max_pendientes=max(int(os.environ.get('PDF_QUEUE_SIZE', 8)), 1),
+        ttl=float(os.environ.get('PDF_JOB_TTL', 600)),
+    )
+    logger.info("Cola de PDF: %s procesos, máx %s trabajos sin terminar",
+                cola.max_workers, cola.max_pendientes)
+    return cola
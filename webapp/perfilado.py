@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PERFILADO DE PETICIONES - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Perfilado opcional con cProfile de peticiones seleccionadas de /calcular y
+/generar-reporte-pdf. Cada perfil se guarda como:
+
+- <nombre>.folded: pilas plegadas ("a;b;c microsegundos" por línea), que
+  leen flamegraph.pl, speedscope e inferno
+- <nombre>.prof: el volcado de pstats (snakeviz, python -m pstats)
+
+cProfile guarda llamadas entre pares de funciones, no pilas completas: las
+pilas plegadas reparten el tiempo de cada función entre quienes la llaman en
+proporción a lo que cada uno gastó en ella (como flameprof). El armado del
+PDF corre en el proceso del pool; en el perfil aparece como espera.
+
+Una petición se perfila si el perfilado está activo y trae la cabecera
+X-Profile (igual a PROFILE_TOKEN si está definido) o cae en el muestreo.
+Con el perfilado apagado, cada petición solo revisa un atributo.
+
+Los archivos se escriben en un hilo aparte (la respuesta no los espera) y
+el directorio se rota: se conservan los PROFILE_MAX_FILES perfiles más
+recientes. La respuesta lleva el nombre del perfil en X-Profile.
+
+Variables de entorno:
+    PROFILE_ENABLED      1 para permitir perfilar. Default: 0
+    PROFILE_SAMPLE_RATE  Fracción (0-1) de peticiones perfiladas sin cabecera. Default: 0
+    PROFILE_TOKEN        Valor que debe traer X-Profile. Default: cualquiera
+    PROFILE_DIR          Directorio de los perfiles. Default: <tmp>/modalidad40-perfiles
+    PROFILE_MAX_FILES    Perfiles que se conservan. Default: 50
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('webapp.perfilado')
+
+CABECERA = 'X-Profile'
+ENDPOINTS = ('/calcular', '/generar-reporte-pdf')
+
+# (archivo, línea, función) de pstats
+Funcion = Tuple[str, int, str]
+
+
+def _nombre_funcion(funcion: Funcion) -> str:
+    archivo, linea, nombre = funcion
+    if archivo == '~':  # funciones integradas: "<built-in method time.sleep>"
+        return nombre
+    return f'{nombre} ({os.path.basename(archivo)}:{linea})'.replace(';', ',')
+
+
+def pilas_plegadas(estadisticas: pstats.Stats) -> List[str]:
+    """
+    Convertir un perfil de cProfile a pilas plegadas (flamegraph)
+
+    Args:
+        estadisticas: Perfil cargado en pstats
+
+    Returns:
+        Líneas "raiz;...;funcion microsegundos" con el tiempo propio de cada pila
+    """
+    datos = estadisticas.stats
+    llamados: Dict[Funcion, List[Tuple[Funcion, float]]] = {}
+    for funcion, (_, _, _, _, llamadores) in datos.items():
+        for llamador, (_, _, _, acumulado) in llamadores.items():
+            llamados.setdefault(llamador, []).append((funcion, acumulado))
+
+    pilas: Dict[str, float] = {}
+
+    def recorrer(funcion: Funcion, pila: Tuple[str, ...], fraccion: float, visitadas: frozenset):
+        _, _, propio, acumulado, _ = datos[funcion]
+        pila = pila + (_nombre_funcion(funcion),)
+        clave = ';'.join(pila)
+        pilas[clave] = pilas.get(clave, 0.0) + propio * fraccion
+        if not acumulado:
+            return
+        for llamado, tiempo in llamados.get(funcion, ()):
+            # Recursión: el tiempo ya está contado en la primera aparición
+            if llamado in visitadas or llamado not in datos:
+                continue
+            recorrer(llamado, pila, fraccion * min(tiempo / acumulado, 1.0), visitadas | {llamado})
+
+    raices = [funcion for funcion, (_, _, _, _, llamadores) in datos.items() if not llamadores]
+    for raiz in raices:
+        recorrer(raiz, (), 1.0, frozenset({raiz}))
+
+    return [f'{pila} {round(segundos * 1e6)}' for pila, segundos in pilas.items() if round(segundos * 1e6) > 0]
+
+
+class Perfilador:
+    """Decide qué peticiones perfilar y guarda sus perfiles en un directorio rotativo"""
+
+    def __init__(self, habilitado: bool = False, tasa_muestreo: float = 0.0, token: Optional[str] = None,
+                 directorio: Optional[str] = None, max_archivos: int = 50,
+                 endpoints: Iterable[str] = ENDPOINTS):
+        """
+        Args:
+            habilitado: Permitir perfilar (con False no se perfila nada)
+            tasa_muestreo: Fracción de peticiones perfiladas sin cabecera
+            token: Valor requerido en X-Profile (None = cualquier valor)
+            directorio: Dónde escribir los perfiles
+            max_archivos: Perfiles que se conservan al rotar
+            endpoints: Reglas de ruta que se pueden perfilar
+        """
+        self.habilitado = habilitado
+        self.tasa_muestreo = tasa_muestreo
+        self.token = token
+        self.directorio = directorio or os.path.join(tempfile.gettempdir(), 'modalidad40-perfiles')
+        self.max_archivos = max(int(max_archivos), 1)
+        self.endpoints = frozenset(endpoints)
+        self._lock = threading.Lock()
+        self._secuencia = 0
+        self._escritor: Optional[ThreadPoolExecutor] = None
+
+    def debe_perfilar(self, endpoint: Optional[str], cabecera: Optional[str]) -> bool:
+        """
+        Decidir si la petición se perfila
+
+        Args:
+            endpoint: Regla de la ruta (request.url_rule.rule)
+            cabecera: Valor de X-Profile (None si no viene)
+        """
+        if not self.habilitado or endpoint not in self.endpoints:
+            return False
+        if cabecera is not None and (self.token is None or cabecera == self.token):
+            return True
+        return self.tasa_muestreo > 0 and random.random() < self.tasa_muestreo
+
+    def iniciar(self) -> cProfile.Profile:
+        """Empezar a perfilar el hilo actual"""
+        perfil = cProfile.Profile()
+        perfil.enable()
+        return perfil
+
+    def nombre_perfil(self, endpoint: str, segundos: float) -> str:
+        """Nombre único y ordenable por fecha: 20251202T033000123_calcular_12ms_41-3"""
+        with self._lock:
+            self._secuencia += 1
+            secuencia = self._secuencia
+        fecha = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3]
+        ruta = re.sub(r'[^a-z0-9]+', '-', endpoint.lower()).strip('-')
+        return f'{fecha}_{ruta}_{round(segundos * 1000)}ms_{os.getpid()}-{secuencia}'
+
+    def guardar(self, perfil: cProfile.Profile, nombre: str) -> str:
+        """
+        Escribir <nombre>.folded y <nombre>.prof y rotar el directorio
+
+        Returns:
+            Ruta del archivo .folded
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        base = os.path.join(self.directorio, nombre)
+        estadisticas = pstats.Stats(perfil)
+        estadisticas.dump_stats(base + '.prof')
+        lineas = pilas_plegadas(estadisticas)
+        # Escritura atómica: quien lea el directorio nunca ve un .folded a medias
+        with open(base + '.folded.tmp', 'w', encoding='utf-8') as archivo:
+            archivo.write('\n'.join(lineas) + '\n')
+        os.replace(base + '.folded.tmp', base + '.folded')
+        self.rotar()
+        return base + '.folded'
+
+    def rotar(self) -> None:
+        """Borrar los perfiles más viejos que excedan max_archivos"""
+        with self._lock:
+            nombres = sorted({os.path.splitext(archivo)[0] for archivo in os.listdir(self.directorio)
+                              if archivo.endswith(('.folded', '.prof'))})
+            for nombre in nombres[:-self.max_archivos]:
+                for extension in ('.folded', '.prof'):
+                    try:
+                        os.remove(os.path.join(self.directorio, nombre + extension))
+                    except FileNotFoundError:  # otro worker ya lo borró
+                        pass
+
+    def terminar(self, perfil: cProfile.Profile, endpoint: str, inicio: float) -> str:
+        """
+        Detener el perfil y reservar el nombre con el que se guardará
+
+        Args:
+            perfil: Perfil devuelto por iniciar()
+            endpoint: Regla de la ruta
+            inicio: time.perf_counter() al empezar la petición
+        """
+        perfil.disable()
+        return self.nombre_perfil(endpoint, time.perf_counter() - inicio)
+
+    def guardar_en_segundo_plano(self, perfil: cProfile.Profile, nombre: str) -> Future:
+        """guardar() en el hilo escritor; un error solo se registra"""
+        with self._lock:
+            if self._escritor is None:
+                self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='perfilado')
+        return self._escritor.submit(self._guardar_sin_fallar, perfil, nombre)
+
+    def _guardar_sin_fallar(self, perfil: cProfile.Profile, nombre: str) -> Optional[str]:
+        try:
+            ruta = self.guardar(perfil, nombre)
+            logger.info("Perfil guardado: %s", ruta)
+            return ruta
+        except Exception:
+            logger.exception("Error guardando el perfil %s", nombre)
+            return None
+
+
+def crear_perfilador_desde_entorno() -> Perfilador:
+    """Construir el perfilador según PROFILE_* (ver docstring del módulo)"""
+    habilitado = os.environ.get('PROFILE_ENABLED', '0').lower() in ('1', 'true', 'si', 'sí')
+    try:
+        tasa_muestreo = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    except ValueError:
+        tasa_muestreo = 0.0
+    perfilador = Perfilador(
+        habilitado=habilitado,
+        tasa_muestreo=min(max(tasa_muestreo, 0.0), 1.0),
+        token=os.environ.get('PROFILE_TOKEN') or None,
+        directorio=os.environ.get('PROFILE_DIR') or None,
+        max_archivos=int(os.environ.get('PROFILE_MAX_FILES', 50)),
+    )
+    if habilitado:
+        logger.info("Perfilado activo: muestreo %g, cabecera %s, directorio %s",
+                    perfilador.tasa_muestreo, CABECERA, perfilador.directorio)
+    return perfilador
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RECURSOS ESTÁTICOS - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+El CSS y el JS de la página principal viven en webapp/assets (app.css y
+app.js) y no dentro de index.html. Al construir la imagen se minifican, se
+les pone el hash del contenido en el nombre (app.1f3c9a7e02bd.js) y se
+precomprimen con gzip, y con brotli si está instalado, en webapp/assets/dist
+junto con un manifest.json:
+
+    python webapp/recursos_estaticos.py --compilar
+
+Se sirven desde memoria en /assets/<nombre con hash> con Cache-Control
+immutable de un año: un cambio en el contenido cambia el nombre, así que el
+navegador nunca usa una versión vieja. Se manda .br o .gz según
+Accept-Encoding.
+
+Si dist no existe o las fuentes cambiaron (tamaño o fecha de modificación)
+se compila al arrancar el proceso, igual que el snapshot de los datos de
+referencia.
+
+La página principal se renderiza una vez por proceso y se guarda en memoria
+ya comprimida, con ETag: al volver a entrar el navegador revalida y recibe
+un 304 sin cuerpo.
+
+Los minificadores son conservadores: quitan comentarios y espacios, y en el
+JS conservan los saltos de línea donde la inserción automática de ";" podría
+depender de ellos. Cadenas, plantillas `...` y expresiones regulares no se
+tocan. El JS sigue siendo un script clásico (los onclick del HTML llaman a
+sus funciones globales).
+
+Variables de entorno:
+    ASSETS_DIST     Carpeta de los archivos compilados. Default: webapp/assets/dist
+    ASSETS_MINIFY   0 = compilar sin minificar (para depurar el JS). Default: 1
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+CARPETA_FUENTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+CARPETA_DIST = os.environ.get('ASSETS_DIST', os.path.join(CARPETA_FUENTES, 'dist'))
+MINIFICAR = os.environ.get('ASSETS_MINIFY', '1') != '0'
+
+# Nombre lógico -> tipo MIME
+FUENTES = {
+    'app.css': 'text/css',
+    'app.js': 'text/javascript',
+}
+# Cambia cuando cambian los minificadores o el formato del manifest
+FORMATO_MANIFEST = 1
+MANIFEST = 'manifest.json'
+
+# Extensión del archivo precomprimido de cada Content-Encoding, en orden de preferencia
+EXTENSIONES = (('br', '.br'), ('gzip', '.gz'))
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class Recurso(NamedTuple):
+    """Bytes de un archivo por Content-Encoding ('identity', 'gzip', 'br'), con su ETag"""
+    variantes: Dict[str, bytes]
+    mimetype: str
+    etag: str
+
+
+# ==================== MINIFICACIÓN ====================
+
+def _copiar_cadena(texto: str, i: int, salida: list) -> int:
+    """Copiar tal cual la cadena '...' o "..." que empieza en i; regresa el índice siguiente"""
+    comilla = texto[i]
+    j = i + 1
+    while j < len(texto) and texto[j] != comilla:
+        j += 2 if texto[j] == '\\' else 1
+    salida.append(texto[i:j + 1])
+    return j + 1
+
+
+def minificar_css(texto: str) -> str:
+    """Quitar comentarios, espacios repetidos y el ';' antes de '}' (las cadenas no se tocan)"""
+    salida = []
+    espacio = False
+    i, n = 0, len(texto)
+    while i < n:
+        c = texto[i]
+        if c.isspace():
+            espacio = True
+            i += 1
+            continue
+        if texto.startswith('/*', i):
+            fin = texto.find('*/', i + 2)
+            espacio = True
+            i = n if fin < 0 else fin + 2
+            continue
+        # El espacio de antes de '(' o ':' sí importa ("and (" en @media, ".tabla :hover")
+        if espacio and salida and salida[-1][-1] not in '{};,>:' and c not in '{};,>!':
+            salida.append(' ')
+        espacio = False
+        if c in '"\'':
+            i = _copiar_cadena(texto, i, salida)
+            continue
+        if c == '}' and salida and salida[-1] == ';':
+            salida.pop()
+        salida.append(c)
+        i += 1
+    return ''.join(salida) + '\n'
+
+
+# Después de estas palabras una '/' empieza una expresión regular, no una división
+_ANTES_DE_REGEX = frozenset(('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                             'throw', 'case', 'do', 'else', 'yield', 'await'))
+# Junto a estos caracteres el espacio nunca separa dos tokens
+_SIN_ESPACIO = frozenset('{}()[];,:=?')
+
+
+def _es_identificador(c: str) -> bool:
+    return c.isalnum() or c in '_$'
+
+
+def _empieza_regex(salida: list) -> bool:
+    """¿Una '/' en este punto empieza una expresión regular? (según el token anterior)"""
+    anterior = ''.join(salida[-3:]).rstrip()
+    if not anterior:
+        return True
+    c = anterior[-1]
+    if _es_identificador(c):
+        texto = ''.join(salida).rstrip()
+        inicio = len(texto)
+        while inicio > 0 and _es_identificador(texto[inicio - 1]):
+            inicio -= 1
+        return texto[inicio:] in _ANTES_DE_REGEX
+    return c not in ')]}\'"`'
+
+
+def _copiar_regex(texto: str, i: int, salida: list) -> int:
+    """Copiar tal cual la expresión regular /.../ que empieza en i (sin las banderas)"""
+    j, clase = i + 1, False
+    while j < len(texto) and texto[j] != '\n':
+        c = texto[j]
+        if c == '\\':
+            j += 1
+        elif c == '[':
+            clase = True
+        elif c == ']':
+            clase = False
+        elif c == '/' and not clase:
+            break
+        j += 1
+    salida.append(texto[i:j + 1])
+    return j + 1
+
+
+def minificar_js(texto: str) -> str:
+    """
+    Quitar comentarios, sangría y espacios que no separan tokens
+
+    Un salto de línea se conserva salvo que el anterior o el siguiente
+    carácter haga imposible la inserción automática de ';' ({ ; , ( [ antes,
+    ) ] } , ; después). Cadenas, plantillas y expresiones regulares se
+    copian sin cambios.
+    """
+    salida = []
+    # Una entrada por cada '{' abierta en el código: True si es el '${' de una plantilla
+    llaves = []
+    i, n = 0, len(texto)
+    en_plantilla = False
+    while i < n:
+        c = texto[i]
+        if en_plantilla:
+            j = i
+            while j < n and texto[j] != '`' and not texto.startswith('${', j):
+                j += 2 if texto[j] == '\\' else 1
+            if j >= n:
+                salida.append(texto[i:])
+                break
+            if texto[j] == '`':
+                salida.append(texto[i:j + 1])
+                en_plantilla = False
+                i = j + 1
+            else:
+                salida.append(texto[i:j + 2])
+                llaves.append(True)
+                en_plantilla = False
+                i = j + 2
+        elif c in '"\'':
+            i = _copiar_cadena(texto, i, salida)
+        elif c == '`':
+            en_plantilla = True
+            salida.append(c)
+            i += 1
+        elif c.isspace() or texto.startswith('//', i) or texto.startswith('/*', i):
+            # Espacios y comentarios seguidos cuentan como un solo separador
+            salto = False
+            while i < n:
+                if texto[i].isspace():
+                    salto = salto or texto[i] == '\n'
+                    i += 1
+                elif texto.startswith('//', i):
+                    fin = texto.find('\n', i)
+                    i = n if fin < 0 else fin
+                elif texto.startswith('/*', i):
+                    fin = texto.find('*/', i + 2)
+                    salto = salto or '\n' in texto[i:fin]
+                    i = n if fin < 0 else fin + 2
+                else:
+                    break
+            if not salida or i >= n:
+                continue
+            anterior, siguiente = salida[-1][-1], texto[i]
+            if salto:
+                if anterior not in '{;,([' and siguiente not in ')]},;':
+                    salida.append('\n')
+            elif anterior not in _SIN_ESPACIO and siguiente not in _SIN_ESPACIO:
+                salida.append(' ')
+        elif c == '/' and _empieza_regex(salida):
+            i = _copiar_regex(texto, i, salida)
+        else:
+            if c == '{':
+                llaves.append(False)
+            elif c == '}' and llaves and llaves.pop():
+                en_plantilla = True
+            salida.append(c)
+            i += 1
+    return ''.join(salida).strip() + '\n'
+
+
+MINIFICADORES = {'text/css': minificar_css, 'text/javascript': minificar_js}
+
+
+# ==================== COMPILACIÓN Y MANIFEST ====================
+
+def comprimir(cuerpo: bytes) -> Dict[str, bytes]:
+    """Variantes del cuerpo: sin comprimir, gzip y (si está instalado) brotli"""
+    variantes = {'identity': cuerpo, 'gzip': gzip.compress(cuerpo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['br'] = brotli.compress(cuerpo, quality=11)
+    return variantes
+
+
+def recurso_de(cuerpo: bytes, mimetype: str) -> Recurso:
+    """Comprimir un cuerpo y calcular su ETag (hash del contenido)"""
+    return Recurso(comprimir(cuerpo), mimetype, hashlib.sha256(cuerpo).hexdigest()[:12])
+
+
+def _con_hash(nombre: str, etag: str) -> str:
+    base, extension = os.path.splitext(nombre)
+    return f'{base}.{etag}{extension}'
+
+
+def compilar(carpeta: str = CARPETA_FUENTES, minificar: bool = MINIFICAR) -> Tuple[Dict[str, str], Dict[str, Recurso]]:
+    """
+    Minificar y comprimir las fuentes
+
+    Args:
+        carpeta: Carpeta con app.css y app.js
+        minificar: False para servir las fuentes tal cual
+
+    Returns:
+        (manifest, archivos): nombre lógico -> nombre con hash, y nombre con hash -> Recurso
+    """
+    manifest, archivos = {}, {}
+    for nombre, mimetype in FUENTES.items():
+        with open(os.path.join(carpeta, nombre), encoding='utf-8') as f:
+            texto = f.read()
+        if minificar:
+            texto = MINIFICADORES[mimetype](texto)
+        recurso = recurso_de(texto.encode('utf-8'), mimetype)
+        manifest[nombre] = _con_hash(nombre, recurso.etag)
+        archivos[manifest[nombre]] = recurso
+    return manifest, archivos
+
+
+def _firma_fuentes(carpeta: str, minificar: bool) -> Optional[list]:
+    """Tamaño y fecha de modificación de cada fuente (None si falta alguna)"""
+    try:
+        return [[nombre, os.stat(os.path.join(carpeta, nombre)).st_size,
+                 os.stat(os.path.join(carpeta, nombre)).st_mtime_ns] for nombre in FUENTES] + [minificar]
+    except OSError:
+        return None
+
+
+def _escribir(ruta: str, contenido: bytes) -> None:
+    """Escribir de forma atómica (otro proceso nunca lee un archivo a medias)"""
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(contenido)
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def guardar_dist(manifest: Dict[str, str], archivos: Dict[str, Recurso], carpeta: str = CARPETA_FUENTES,
+                 dist: str = CARPETA_DIST, minificar: bool = MINIFICAR) -> None:
+    """Escribir los archivos con hash, sus .gz/.br y al final el manifest (borra los de versiones anteriores)"""
+    os.makedirs(dist, exist_ok=True)
+    escritos = {MANIFEST}
+    for nombre, recurso in archivos.items():
+        for codificacion, extension in (('identity', ''),) + EXTENSIONES:
+            if codificacion in recurso.variantes:
+                _escribir(os.path.join(dist, nombre + extension), recurso.variantes[codificacion])
+                escritos.add(nombre + extension)
+    contenido = {'formato': FORMATO_MANIFEST, 'fuentes': _firma_fuentes(carpeta, minificar), 'archivos': manifest}
+    _escribir(os.path.join(dist, MANIFEST), json.dumps(contenido, indent=2).encode('utf-8'))
+    for anterior in set(os.listdir(dist)) - escritos:
+        if anterior.startswith(tuple(os.path.splitext(nombre)[0] + '.' for nombre in FUENTES)):
+            os.unlink(os.path.join(dist, anterior))
+
+
+def _leer_dist(dist: str, firma: Optional[list]) -> Optional[Tuple[Dict[str, str], Dict[str, Recurso]]]:
+    """Manifest y archivos de dist, o None si no existe, está incompleto o las fuentes cambiaron"""
+    try:
+        with open(os.path.join(dist, MANIFEST), encoding='utf-8') as f:
+            contenido = json.load(f)
+        if contenido['formato'] != FORMATO_MANIFEST or (firma is not None and contenido['fuentes'] != firma):
+            return None
+        archivos = {}
+        for nombre, con_hash in contenido['archivos'].items():
+            variantes = {}
+            for codificacion, extension in (('identity', ''),) + EXTENSIONES:
+                ruta = os.path.join(dist, con_hash + extension)
+                if codificacion == 'identity' or os.path.exists(ruta):
+                    with open(ruta, 'rb') as f:
+                        variantes[codificacion] = f.read()
+            archivos[con_hash] = Recurso(variantes, FUENTES[nombre], con_hash.split('.')[-2])
+        return contenido['archivos'], archivos
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def cargar_recursos(carpeta: str = CARPETA_FUENTES, dist: str = CARPETA_DIST,
+                    minificar: bool = MINIFICAR) -> Tuple[Dict[str, str], Dict[str, Recurso]]:
+    """
+    Manifest y archivos: de dist si está al día, si no se compilan
+
+    Si faltan las fuentes (imagen sin webapp/assets) se usa dist tal cual.
+    Si no se puede escribir dist se sigue sin él.
+    """
+    firma = _firma_fuentes(carpeta, minificar)
+    compilados = _leer_dist(dist, firma)
+    if compilados is not None:
+        return compilados
+
+    manifest, archivos = compilar(carpeta, minificar)
+    try:
+        guardar_dist(manifest, archivos, carpeta, dist, minificar)
+    except OSError:
+        pass  # Sistema de archivos de solo lectura: cada proceso compila en memoria
+    return manifest, archivos
+
+
+# ==================== SERVIR ====================
+
+def elegir_codificacion(recurso: Recurso, accept_encodings) -> str:
+    """
+    Content-Encoding a mandar: br, gzip o identity
+
+    Args:
+        recurso: Recurso con sus variantes
+        accept_encodings: request.accept_encodings de werkzeug
+    """
+    for codificacion, _ in EXTENSIONES:
+        if codificacion in recurso.variantes and accept_encodings[codificacion]:
+            return codificacion
+    return 'identity'
+
+
+class RecursosEstaticos:
+    """Archivos compilados y páginas renderizadas de este proceso, en memoria"""
+
+    def __init__(self, carpeta: str = CARPETA_FUENTES, dist: str = CARPETA_DIST, minificar: bool = MINIFICAR):
+        self.carpeta = carpeta
+        self.dist = dist
+        self.minificar = minificar
+        self._firma = None
+        self._manifest: Dict[str, str] = {}
+        self._archivos: Dict[str, Recurso] = {}
+        self._paginas: Dict[str, Recurso] = {}
+        self._lock = threading.Lock()
+
+    def _vigentes(self, revisar: bool = False) -> Dict[str, str]:
+        """Cargar la primera vez (o si revisar y las fuentes cambiaron) y regresar el manifest"""
+        if self._firma is not None and not revisar:
+            return self._manifest
+        firma = _firma_fuentes(self.carpeta, self.minificar) or []
+        with self._lock:
+            if self._firma != firma:
+                self._manifest, self._archivos = cargar_recursos(self.carpeta, self.dist, self.minificar)
+                self._paginas = {}
+                self._firma = firma
+        return self._manifest
+
+    def url_de(self, nombre: str, revisar: bool = False) -> str:
+        """
+        Nombre con hash de un archivo (lo que va en /assets/<nombre>)
+
+        Raises:
+            KeyError: si el nombre no está en FUENTES
+        """
+        return self._vigentes(revisar)[nombre]
+
+    def obtener(self, nombre_con_hash: str) -> Optional[Recurso]:
+        """Recurso de un nombre con hash (None si no existe o es de una versión anterior)"""
+        self._vigentes()
+        return self._archivos.get(nombre_con_hash)
+
+    def pagina(self, nombre: str, renderizar: Callable[[], str], revisar: bool = False) -> Recurso:
+        """
+        Página HTML renderizada una sola vez y guardada comprimida
+
+        Args:
+            nombre: Llave de la página (p. ej. la plantilla)
+            renderizar: Regresa el HTML (se llama una vez por proceso)
+            revisar: True para renderizar siempre (debug: la plantilla puede cambiar)
+        """
+        self._vigentes(revisar)
+        recurso = None if revisar else self._paginas.get(nombre)
+        if recurso is None:
+            recurso = recurso_de(renderizar().encode('utf-8'), 'text/html')
+            with self._lock:
+                self._paginas[nombre] = recurso
+        return recurso
+
+    def estadisticas(self) -> Dict[str, Dict[str, int]]:
+        """Bytes de cada archivo y página por codificación"""
+        archivos = dict(self._archivos, **self._paginas)
+        return {nombre: {codificacion: len(cuerpo) for codificacion, cuerpo in recurso.variantes.items()}
+                for nombre, recurso in archivos.items()}
+
+
+if __name__ == "__main__":
+    if '--compilar' in sys.argv:
+        manifest, archivos = compilar()
+        guardar_dist(manifest, archivos)
+        print(f"✅ Recursos en {CARPETA_DIST}{'' if brotli else ' (sin brotli)'}:")
+    else:
+        manifest, archivos = cargar_recursos()
+    for nombre, con_hash in manifest.items():
+        tamaños = ', '.join(f'{codificacion} {len(cuerpo):,} B'
+                            for codificacion, cuerpo in archivos[con_hash].variantes.items())
+        print(f"   {nombre} -> {con_hash}: {tamaños}")
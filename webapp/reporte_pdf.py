@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+REPORTE PDF - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Construcción del reporte personalizado en PDF (reportlab) a partir de los
+resultados de /calcular y los datos personales del beneficiario.
+
+reportlab y el tema del reporte se importan en el primer uso (o al
+calentar el pool de PDF), no al importar este módulo: la app arranca sin
+pagar su costo.
+"""
+
+import io
+import locale
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from validacion import DatosCalculo
+
+# Campos de la petición que aparecen en el reporte; cualquier otro campo
+# no cambia el PDF (y no forma parte de su clave en la caché)
+CAMPOS_REPORTE = (
+    'nombre', 'apellido_paterno', 'apellido_materno', 'rfc', 'curp', 'nss',
+    'incluir_recomendaciones', 'resultados'
+)
+
+
+def configurar_locale() -> None:
+    """Usar nombres de meses en español en las fechas del reporte, si el sistema los tiene"""
+    for nombre in ('es_ES.UTF-8', 'es_MX.UTF-8'):
+        try:
+            locale.setlocale(locale.LC_TIME, nombre)
+            return
+        except locale.Error:
+            continue  # Si no está disponible, usará el default
+
+
+_segundos_preparacion = None
+_lock_preparacion = threading.Lock()
+
+
+def preparar_proceso() -> float:
+    """
+    Importar reportlab y el tema del reporte y configurar el locale
+
+    Se hace una sola vez por proceso; es el inicializador del pool de PDF.
+
+    Returns:
+        Segundos que tomó la preparación (la primera vez que se hizo)
+    """
+    global _segundos_preparacion
+    with _lock_preparacion:
+        if _segundos_preparacion is None:
+            inicio = time.perf_counter()
+            configurar_locale()
+            import reportlab.platypus  # noqa: F401
+            import reporte_tema  # noqa: F401
+            _segundos_preparacion = time.perf_counter() - inicio
+    return _segundos_preparacion
+
+
+def calcular_duraciones(datos: Optional[DatosCalculo]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Resultado exacto de pagar 1, 2, ... N años del plan de Modalidad 40
+
+    Args:
+        datos: 'parametros_calculo' de los resultados ya validados
+            (validar_datos_reporte), o None si no venían
+
+    Returns:
+        Filas de calcular_escenarios_por_duracion, o None si no hay datos
+        o el plan no se puede recalcular
+    """
+    if datos is None:
+        return None
+    from Calculadora_Modalidad_40_CORREGIDA import obtener_calculadora
+    try:
+        resultado = obtener_calculadora().calcular_escenarios_por_duracion(**datos.argumentos())
+    except (ValueError, ZeroDivisionError):
+        return None
+    return resultado.get('duraciones')
+
+
+def _etiqueta_duracion(escenario: Dict[str, Any]) -> str:
+    años, meses = escenario['años'], escenario['meses_pagados']
+    if meses != años * 12:
+        return f"{meses} meses"
+    return f"{años} año{'s' if años > 1 else ''}"
+
+
+def construir_reporte_pdf(data: Dict[str, Any], ahora: datetime) -> bytes:
+    """
+    Construir el reporte PDF completo
+
+    Args:
+        data: Petición de /generar-reporte-pdf ya validada: datos personales,
+            'resultados' y 'datos_calculo' (validar_datos_reporte)
+        ahora: Fecha/hora de México que se imprime en el reporte
+
+    Returns:
+        Contenido del PDF
+    """
+    preparar_proceso()
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    import reporte_tema as tema
+    
+    # Crear buffer para PDF
+    buffer = io.BytesIO()
+    
+    # Crear documento
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18
+    )
+    
+    # Contenido del PDF
+    story = []
+    
+    # Título
+    story.append(Paragraph("ANÁLISIS MODALIDAD 40 IMSS", tema.TITULO))
+    story.append(Paragraph("Reporte Técnico Personalizado de Pensión - Ley 73", tema.NORMAL))
+    story.append(Paragraph(f"Fecha: {ahora.strftime('%d de %B de %Y')}", tema.NORMAL))
+    story.append(Spacer(1, 12))
+    
+    # ALERTA DE FECHA LÍMITE (si aplica)
+    resultados = data['resultados']
+    deadline_info = resultados.get('deadline_info', {})
+    
+    if deadline_info.get('tiene_deadline') and deadline_info.get('dias_restantes') is not None:
+        dias_restantes = deadline_info['dias_restantes']
+        fecha_limite = deadline_info['fecha_limite']
+        
+        # Determinar urgencia
+        deadline_style, urgencia_texto = tema.ALERTAS_DEADLINE[tema.nivel_urgencia(dias_restantes)]
+        
+        meses_restantes = dias_restantes // 30
+        años_restantes = meses_restantes // 12
+        meses_extra = meses_restantes % 12
+        
+        deadline_texto = f"""
+        <b>{urgencia_texto}</b><br/>
+        FECHA LÍMITE DE INSCRIPCIÓN: {fecha_limite}<br/>
+        Tiempo restante: {años_restantes} años y {meses_extra} meses ({dias_restantes} días)<br/>
+        Última cotización: {deadline_info.get('mes_ultima')}/{deadline_info.get('año_ultima')}<br/>
+        <b>Después de esta fecha perderás el derecho PERMANENTE a Modalidad 40</b>
+        """
+        
+        story.append(Paragraph(deadline_texto, deadline_style))
+        story.append(Spacer(1, 12))
+    
+    story.append(Spacer(1, 8))
+    
+    # Base Normativa
+    story.append(Paragraph("BASE NORMATIVA Y METODOLOGÍA", tema.SUBTITULO))
+    
+    base_normativa = """
+    <b>Marco Legal:</b> Ley del Seguro Social (LSS), Artículos 154, 162, 167 y 171<br/>
+    <b>Modalidad 40:</b> Continuación Voluntaria en el Régimen Obligatorio<br/>
+    <b>Régimen Aplicable:</b> Ley 73 (para trabajadores que iniciaron cotizaciones antes del 1° julio 1997)<br/>
+    <b>Fórmula de Cálculo:</b> Tablas variables según múltiplo SDP/UMA (22 rangos diferentes)<br/>
+    <b>UMA 2025:</b> $113.14 diarios / $3,439.46 mensuales<br/>
+    <b>Tasa Modalidad 40 2025:</b> 13.347% (incrementa anualmente hasta 18% en 2030)<br/>
+    """
+    
+    story.append(Paragraph(base_normativa, tema.NORMAL))
+    story.append(Spacer(1, 15))
+    
+    # Datos personales y situación actual
+    nombre_completo = f"{data['nombre']} {data['apellido_paterno']} {data.get('apellido_materno', '')}".strip()
+    story.append(Paragraph("DATOS DEL BENEFICIARIO Y SITUACIÓN ACTUAL", tema.SUBTITULO))
+    
+    # Extraer datos técnicos de los resultados
+    resultados = data['resultados']
+    sin_mod40 = resultados['sin_modalidad40']
+    con_mod40 = resultados['con_modalidad40']
+    edad_info = resultados.get('edad_info', {})
+    
+    datos_personales = [
+        ['Nombre Completo:', nombre_completo],
+        ['RFC:', data.get('rfc', 'No proporcionado')],
+        ['CURP:', data.get('curp', 'No proporcionado')],
+        ['NSS:', data.get('nss', 'No proporcionado')],
+        ['', ''],
+        ['SITUACIÓN PENSIONARIA ACTUAL:', ''],
+        ['Semanas Cotizadas:', f"{resultados.get('semanas_cotizadas', 'N/A')} semanas"],
+        ['SDP Actual:', f"${sin_mod40.get('sdp_diario', 0):,.2f} diarios ({sin_mod40.get('multiple_uma', 0):.2f} UMAs)"],
+        ['Edad Actual:', f"{edad_info.get('edad_actual', 'N/A')} años"],
+        ['Edad Pensión Planeada:', f"{edad_info.get('edad_pension', 'N/A')} años"],
+        ['Tiempo Disponible:', f"{edad_info.get('años_disponibles', 'N/A')} años"],
+        ['Factor por Edad:', f"{edad_info.get('factor_edad', 1):.0%} de la pensión"]
+    ]
+    
+    tabla_datos = tema.crear_tabla(datos_personales, [2, 4], tema.ESTILO_DATOS)
+    
+    story.append(tabla_datos)
+    story.append(Spacer(1, 20))
+    
+    # Resumen Ejecutivo
+    resultados = data['resultados']
+    story.append(Paragraph("RESUMEN EJECUTIVO DE ANÁLISIS MODALIDAD 40", tema.SUBTITULO))
+    
+    # Calcular métricas adicionales
+    diferencia_mensual = resultados['analisis_roi']['diferencia_mensual']
+    inversion_mensual = resultados['con_modalidad40']['pago_mensual_imss']
+    roi_anual = resultados['analisis_roi']['roi_anual']
+    
+    resumen_data = [
+        ['CONCEPTO', 'ESCENARIO ACTUAL', 'CON MODALIDAD 40', 'IMPACTO'],
+        [
+            'Pensión Mensual',
+            f"${resultados['sin_modalidad40']['pension_total']:,.0f}",
+            f"${resultados['con_modalidad40']['pension_total']:,.0f}",
+            f"+${diferencia_mensual:,.0f}"
+        ],
+        [
+            'Pensión Anual',
+            f"${resultados['sin_modalidad40']['pension_total']*12:,.0f}",
+            f"${resultados['con_modalidad40']['pension_total']*12:,.0f}",
+            f"+${resultados['analisis_roi']['diferencia_anual']:,.0f}"
+        ],
+        [
+            'Pago Mensual IMSS',
+            '---',
+            f"${inversion_mensual:,.0f}",
+            'Inversión requerida'
+        ],
+        [
+            'ROI Anual del Programa',
+            '---',
+            f"{roi_anual:.1f}%",
+            f"Rendimiento: {roi_anual:.1f}%"
+        ]
+    ]
+    
+    tabla_resumen = tema.crear_tabla(resumen_data, [2, 1.3, 1.3, 1.4], tema.ESTILO_RESUMEN)
+    
+    story.append(tabla_resumen)
+    story.append(Spacer(1, 20))
+    
+    # Análisis de Inversión
+    story.append(Paragraph("ANÁLISIS DE INVERSIÓN", tema.SUBTITULO))
+    
+    inversion_data = [
+        ['Concepto', 'Valor'],
+        ['Inversión Total (5 años)', f"${resultados['inversion']['total_años']:,.0f}"],
+        ['Pago Mensual Promedio', f"${resultados['inversion']['promedio_mensual']:,.0f}"],
+        ['ROI Anual', f"{resultados['analisis_roi']['roi_anual']:.1f}%"],
+        ['Período de Recuperación', f"{resultados['analisis_roi']['años_recuperacion']:.1f} años"]
+    ]
+    
+    tabla_inversion = tema.crear_tabla(inversion_data, [3, 2], tema.ESTILO_INVERSION)
+    
+    story.append(tabla_inversion)
+    story.append(Spacer(1, 20))
+    
+    # Desglose técnico de cálculos
+    story.append(Paragraph("DESGLOSE TÉCNICO DE CÁLCULOS", tema.SUBTITULO))
+    
+    # Mostrar el cálculo paso a paso
+    sin_mod40_data = resultados['sin_modalidad40']
+    con_mod40_data = resultados['con_modalidad40']
+    
+    calculo_data = [
+        ['COMPONENTE DEL CÁLCULO', 'ESCENARIO ACTUAL', 'CON MODALIDAD 40'],
+        ['Salario Diario Promedio (SDP)', f"${sin_mod40_data['sdp_diario']:,.2f}", f"${con_mod40_data['sdp_diario']:,.2f}"],
+        ['Múltiple de UMA', f"{sin_mod40_data.get('multiple_uma', 0):.2f} UMAs", f"{con_mod40_data.get('multiple_uma', 0):.2f} UMAs"],
+        ['Porcentaje Aplicable Ley 73', f"{sin_mod40_data.get('porcentaje_aplicable', 0):.2f}%", f"{con_mod40_data.get('porcentaje_aplicable', 0):.2f}%"],
+        ['Cuantía Básica Diaria', f"${sin_mod40_data.get('cuantia_basica_diaria', 0):,.2f}", f"${con_mod40_data.get('cuantia_basica_diaria', 0):,.2f}"],
+        ['Cuantía Básica Mensual (x30.4)', f"${sin_mod40_data.get('cuantia_basica_mensual', 0):,.2f}", f"${con_mod40_data.get('cuantia_basica_mensual', 0):,.2f}"],
+        ['Factor por Edad', f"{resultados.get('edad_info', {}).get('factor_edad', 1):.0%}", f"{resultados.get('edad_info', {}).get('factor_edad', 1):.0%}"],
+        ['Pensión Final Mensual', f"${sin_mod40_data['pension_total']:,.0f}", f"${con_mod40_data['pension_total']:,.0f}"]
+    ]
+    
+    tabla_calculo = tema.crear_tabla(calculo_data, [2.5, 1.5, 1.5], tema.ESTILO_CALCULO)
+    
+    story.append(tabla_calculo)
+    story.append(Spacer(1, 20))
+    
+    # Información de Edad si está disponible
+    if 'edad_info' in resultados:
+        edad_info = resultados['edad_info']
+        story.append(Paragraph("INFORMACIÓN DE EDAD Y PENSIÓN", tema.SUBTITULO))
+        
+        edad_text = f"""
+        <b>Edad Actual:</b> {edad_info['edad_actual']} años<br/>
+        <b>Edad de Pensión:</b> {edad_info['edad_pension']} años<br/>
+        <b>Tiempo Disponible:</b> {edad_info['años_disponibles']} años<br/>
+        """
+        
+        if edad_info['penalizacion_pct'] > 0:
+            edad_text += f"<b>Penalización por Edad:</b> {edad_info['penalizacion_pct']:.0f}% (recibirás {100-edad_info['penalizacion_pct']:.0f}% de la pensión)<br/>"
+        
+        if edad_info['tiene_incremento_vejez']:
+            edad_text += "<b>Bonus por Vejez:</b> +11% adicional por pensionarte a los 65 años o más<br/>"
+        
+        story.append(Paragraph(edad_text, tema.NORMAL))
+        story.append(Spacer(1, 15))
+    
+    # ==================== CALENDARIO DE PAGOS DETALLADO ====================
+    story.append(Paragraph("INVERSIÓN TOTAL MODALIDAD 40", tema.SUBTITULO))
+    
+    # Calcular totales REALES del desglose
+    total_inversion_real = 0
+    total_meses_real = 0
+    
+    if 'desglose_anual' in resultados.get('inversion', {}):
+        for año, datos in resultados['inversion']['desglose_anual'].items():
+            total_inversion_real += datos.get('costo_anual', 0)
+            total_meses_real += datos.get('meses_pagados', 12)
+    
+    # PANEL DESTACADO - TOTAL EN GRANDE
+    story.append(Paragraph("TOTAL A PAGAR DURANTE TODO EL PERÍODO", tema.NORMAL))
+    story.append(Paragraph(f"${total_inversion_real:,.2f}", tema.PANEL_TOTAL))
+    story.append(Spacer(1, 10))
+    
+    # Tabla resumen pequeña (el calendario mensual trae el mes de inicio y de fin)
+    periodo = resultados.get('inversion', {}).get('periodo')
+    if periodo:
+        texto_periodo = (f"{periodo['mes_inicio']:02d}/{periodo['año_inicio']} - "
+                         f"{periodo['mes_fin']:02d}/{periodo['año_fin']}")
+    else:
+        texto_periodo = f"{len(resultados.get('inversion', {}).get('desglose_anual', {}))} años"
+    resumen_inversion = [
+        ['Período', 'Total Meses', 'Promedio Mensual'],
+        [
+            texto_periodo,
+            f"{total_meses_real} meses",
+            f"${resultados.get('inversion', {}).get('promedio_mensual', 0):,.2f}"
+        ]
+    ]
+    
+    tabla_resumen_inv = tema.crear_tabla(resumen_inversion, [2, 2, 2], tema.ESTILO_RESUMEN_INVERSION)
+    
+    story.append(tabla_resumen_inv)
+    story.append(Spacer(1, 15))
+    
+    # DESGLOSE DETALLADO POR AÑO - SIEMPRE INCLUIR
+    story.append(Paragraph("Desglose de Pagos por Año", tema.SUBTITULO))
+    
+    if 'desglose_anual' in resultados.get('inversion', {}):
+        calendario_data = [['Año', 'Tasa IMSS', 'Meses', 'Pago Mensual', 'Total Año']]
+        
+        for año in sorted(resultados['inversion']['desglose_anual'].keys()):
+            datos = resultados['inversion']['desglose_anual'][año]
+            meses_pagados = datos.get('meses_pagados', 12)
+            calendario_data.append([
+                str(año),
+                f"{datos['tasa_pct']:.3f}%",
+                str(meses_pagados),
+                f"${datos['costo_mensual']:,.2f}",
+                f"${datos['costo_anual']:,.2f}"
+            ])
+        
+        # Fila de TOTAL
+        calendario_data.append([
+            'TOTAL',
+            '',
+            str(total_meses_real),
+            f"${resultados['inversion']['promedio_mensual']:,.2f}",
+            f"${total_inversion_real:,.2f}"
+        ])
+        
+        tabla_calendario = tema.crear_tabla(calendario_data, [0.8, 1, 0.8, 1.4, 1.4], tema.ESTILO_CALENDARIO)
+        
+        story.append(tabla_calendario)
+        story.append(Spacer(1, 15))
+    
+    # Información práctica sobre pagos
+    info_pagos = f"""
+    <b>Información Importante de Pagos:</b><br/>
+    • <b>Fechas de Pago:</b> Del 1 al 15 de cada mes (pago por adelantado)<br/>
+    • <b>Modalidad:</b> Ventanilla bancaria, transferencia o domiciliación automática<br/>
+    • <b>Beneficio Mensual Adicional:</b> ${diferencia_mensual:,.0f} pesos<br/>
+    • <b>Recuperación de Inversión:</b> {total_inversion_real / (diferencia_mensual * 12):.1f} años<br/><br/>
+    
+    <b>IMPORTANTE:</b> Los pagos se detienen exactamente cuando cumples {edad_info.get('edad_pension', 65)} años.
+    El último año solo pagarás los meses necesarios hasta tu cumpleaños (ver columna "Meses" en tabla).
+    """
+    
+    story.append(Paragraph(info_pagos, tema.NORMAL))
+    story.append(Spacer(1, 20))
+    
+    # SECCIÓN: ANÁLISIS COMPARATIVO DE ESCENARIOS
+    # Sin 'parametros_calculo' (resultados de una versión anterior) no se puede recalcular
+    duraciones = calcular_duraciones(data.get('datos_calculo'))
+    if duraciones:
+        story.append(Paragraph("ANÁLISIS COMPARATIVO: DIFERENTES DURACIONES DE MODALIDAD 40", tema.SUBTITULO))
+        
+        story.append(Paragraph("""
+        <b>¿Qué pasa si pagas solo 1, 2 o 3 años de Modalidad 40?</b><br/>
+        La tabla muestra cómo varían los beneficios según la duración de tu inversión:
+        """, tema.NORMAL))
+        story.append(Spacer(1, 10))
+        
+        # Escenarios exactos para cada duración del plan (mismas tasas por año)
+        escenarios_data = [['Años', 'Inversión Total', 'Pensión Mensual', 'Ganancia vs Sin Mod40', 'ROI Anual', 'Años Breakeven']]
+        
+        for escenario in duraciones:
+            ganancia = escenario['diferencia_mensual']
+            breakeven = escenario['años_recuperacion']
+            
+            escenarios_data.append([
+                _etiqueta_duracion(escenario),
+                f"${escenario['inversion_total']:,.0f}",
+                f"${escenario['pension_final_mensual']:,.0f}",
+                f"{'+' if ganancia >= 0 else '-'}${abs(ganancia):,.0f}",
+                f"{escenario['roi_anual_pct']:.1f}%",
+                f"{breakeven:.1f} años" if breakeven is not None else "Sin ganancia"
+            ])
+        
+        tabla_escenarios = tema.crear_tabla(escenarios_data, [0.8, 1.2, 1.2, 1.2, 0.9, 1.1], tema.ESTILO_ESCENARIOS)
+        
+        story.append(tabla_escenarios)
+        story.append(Spacer(1, 10))
+        
+        mejor_roi = max(duraciones, key=lambda escenario: escenario['roi_anual_pct'])
+        story.append(Paragraph(f"""
+        <b>Conclusión de Escenarios:</b><br/>
+        • Incluso con 1 año de Modalidad 40 obtienes beneficios permanentes<br/>
+        • A mayor duración, mayor es el incremento en tu pensión<br/>
+        • El mayor ROI anual ({mejor_roi['roi_anual_pct']:.1f}%) se obtiene con {_etiqueta_duracion(mejor_roi)}<br/>
+        • No existe duración mínima - puedes cotizar el tiempo que desees/puedas
+        """, tema.NORMAL))
+        story.append(Spacer(1, 20))
+        
+    # Recomendaciones si están seleccionadas
+    if data.get('incluir_recomendaciones', False):
+        story.append(Paragraph("RECOMENDACIONES PERSONALIZADAS", tema.SUBTITULO))
+        
+        roi = resultados['analisis_roi']['roi_anual']
+        
+        if roi > 40:
+            recomendacion = "EXCELENTE OPORTUNIDAD - Su ROI es excepcional y supera cualquier instrumento financiero convencional."
+        elif roi > 25:
+            recomendacion = "MUY BUENA INVERSIÓN - El retorno justifica ampliamente la inversión en Modalidad 40."
+        elif roi > 15:
+            recomendacion = "BUENA OPCIÓN - La Modalidad 40 ofrece un retorno competitivo para su perfil."
+        else:
+            recomendacion = "EVALUAR CUIDADOSAMENTE - Considere si puede optimizar el nivel de cotización."
+        
+        story.append(Paragraph(f"<b>Recomendación Principal:</b> {recomendacion}", tema.NORMAL))
+        story.append(Spacer(1, 10))
+        
+        if edad_info and edad_info['años_disponibles'] < 5:
+            story.append(Paragraph("<b>URGENTE:</b> Tiene menos de 5 años hasta su pensión. Es crítico iniciar Modalidad 40 inmediatamente.", tema.NORMAL))
+            story.append(Spacer(1, 10))
+        
+        story.append(Paragraph("<b>Próximos Pasos Recomendados:</b>", tema.NORMAL))
+        story.append(Paragraph("1. Acudir al IMSS para iniciar trámite de Modalidad 40", tema.NORMAL))
+        story.append(Paragraph("2. Verificar vigencia de derechos (máximo 5 años desde baja)", tema.NORMAL))
+        story.append(Paragraph("3. Programar pagos mensuales en banco autorizado", tema.NORMAL))
+        story.append(Paragraph("4. Consultar con especialista en seguridad social", tema.NORMAL))
+    
+    # Footer
+    story.append(Spacer(1, 30))
+    footer_text = """
+    <i>Este reporte es generado automáticamente basado en la normativa IMSS vigente y tiene fines informativos. 
+    Se recomienda verificar con especialistas antes de tomar decisiones financieras importantes.</i>
+    """
+    story.append(Paragraph(footer_text, tema.NORMAL))
+    
+    # Conclusiones y Recomendaciones
+    story.append(Paragraph("CONCLUSIONES Y RECOMENDACIONES", tema.SUBTITULO))
+    
+    # Análisis del ROI
+    roi_anual = resultados['analisis_roi']['roi_anual']
+    tiempo_recuperacion = resultados['analisis_roi']['años_recuperacion']
+    
+    conclusiones_text = f"""
+    <b>ANÁLISIS FINANCIERO:</b><br/>
+    • El programa Modalidad 40 ofrece un ROI anual de <b>{roi_anual:.1f}%</b><br/>
+    • Su pensión aumentaría <b>${diferencia_mensual:,.0f} pesos mensuales</b><br/>
+    • La inversión se recupera en aproximadamente <b>{tiempo_recuperacion:.1f} años</b><br/>
+    • Beneficio total a lo largo de la vida: <b>Significativo</b><br/><br/>
+    
+    <b>RECOMENDACIONES:</b><br/>
+    • {'✅ RECOMENDABLE' if roi_anual > 15 else '⚠️ EVALUAR CUIDADOSAMENTE' if roi_anual > 5 else '❌ NO RECOMENDABLE'}: {
+        'Excelente rendimiento, superior a muchas inversiones tradicionales' if roi_anual > 15 else
+        'Rendimiento moderado, considere otras opciones de inversión' if roi_anual > 5 else
+        'Rendimiento bajo, posiblemente mejor invertir de forma privada'
+    }<br/>
+    • Consulte con un asesor especializado en seguridad social<br/>
+    • Considere su situación particular de salud y esperanza de vida<br/>
+    • Evalúe la estabilidad de sus ingresos para mantener los pagos<br/><br/>
+    
+    <b>PRÓXIMOS PASOS:</b><br/>
+    1. Acudir a la subdelegación IMSS más cercana<br/>
+    2. Presentar la documentación requerida<br/>
+    3. Iniciar trámite dentro de los 5 años posteriores a la baja laboral<br/>
+    4. Configurar forma de pago (recomendamos domiciliación automática)<br/><br/>
+    
+    <b>IMPORTANTE:</b> Este análisis es orientativo. Los cálculos están basados en la normativa vigente
+    y pueden cambiar por modificaciones legislativas. Consulte siempre con personal autorizado del IMSS.
+    """
+    
+    story.append(Paragraph(conclusiones_text, tema.NORMAL))
+    story.append(Spacer(1, 20))
+    
+    # Disclaimer Legal Completo
+    story.append(Paragraph("DISCLAIMER Y LIMITACIÓN DE RESPONSABILIDAD", tema.SUBTITULO))
+    
+    disclaimer_text = """
+    <b>IMPORTANTE - LÉASE CUIDADOSAMENTE:</b><br/><br/>
+    
+    Este reporte contiene <b>sugerencias y análisis basados en las mejores prácticas de análisis actuarial</b> 
+    con fundamento en la Ley del Seguro Social vigente y sus disposiciones reglamentarias. Sin embargo, 
+    <b>NO CONSTITUYE INFORMACIÓN OFICIAL</b> del Instituto Mexicano del Seguro Social (IMSS).<br/><br/>
+    
+    <b>Los datos oficiales, cálculos definitivos y resoluciones pensionarias ÚNICAMENTE serán proporcionados 
+    por el Instituto Mexicano del Seguro Social (IMSS)</b> a través de sus canales oficiales y personal autorizado.<br/><br/>
+    
+    <b>LIMITACIONES DE ESTE ANÁLISIS:</b><br/>
+    • Las proyecciones se basan en la normativa vigente al momento de la consulta<br/>
+    • Los cálculos pueden variar por cambios legislativos o reglamentarios<br/>
+    • Cada caso particular puede tener circunstancias especiales no contempladas<br/>
+    • Las fechas límite y requisitos deben confirmarse directamente con el IMSS<br/><br/>
+    
+    <b>RECOMENDACIÓN FORMAL:</b> Antes de tomar cualquier decisión financiera o iniciar trámites, 
+    consulte directamente con las oficinas del IMSS o personal autorizado para obtener información 
+    oficial y actualizada sobre su caso específico.<br/><br/>
+    
+    Este documento es una herramienta de análisis preliminar y educativa, no un dictamen oficial.
+    """
+    
+    story.append(Paragraph(disclaimer_text, tema.NORMAL))
+    story.append(Spacer(1, 15))
+    
+    # Pie de página informativo (solo la fecha: la caché de PDF es por día)
+    footer_text = f"""
+    <b>Documento generado el:</b> {ahora.strftime('%d de %B de %Y')}<br/>
+    <b>Calculadora:</b> Sistema de Análisis Modalidad 40 IMSS - Ley del Seguro Social 1973<br/>
+    <b>Versión:</b> 2.0 (Fórmulas Variables Validadas con Base Actuarial)<br/>
+    <b>Fuente Legal:</b> Ley del Seguro Social, Arts. 154, 162, 167, 171 y disposiciones vigentes<br/>
+    <b>Desarrollo:</b> Análisis Actuarial Independiente - No Oficial IMSS
+    """
+    
+    story.append(Paragraph(footer_text, tema.NORMAL))
+    
+    # Construir PDF
+    doc.build(story)
+    
+    return buffer.getvalue()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TEMA DEL REPORTE PDF - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Estilos de párrafo y de tabla del reporte, construidos una sola vez al
+importar el módulo y compartidos por todas las peticiones (reportlab solo
+los lee al construir el documento). Cada reporte solo arma sus datos.
+"""
+
+from typing import Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Table, TableStyle
+
+# Colores de la interfaz web (Bootstrap)
+AZUL = colors.HexColor('#0d6efd')
+VERDE = colors.HexColor('#28a745')
+MORADO = colors.HexColor('#6f42c1')
+
+# ==================== ESTILOS DE PÁRRAFO ====================
+
+_ESTILOS_BASE = getSampleStyleSheet()
+
+NORMAL = _ESTILOS_BASE['Normal']
+
+TITULO = ParagraphStyle(
+    'CustomTitle',
+    parent=_ESTILOS_BASE['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    textColor=colors.darkblue
+)
+
+SUBTITULO = ParagraphStyle(
+    'CustomSubtitle',
+    parent=_ESTILOS_BASE['Heading2'],
+    fontSize=14,
+    spaceAfter=12,
+    textColor=colors.darkblue
+)
+
+# Total a pagar en grande
+PANEL_TOTAL = ParagraphStyle(
+    'PanelTotal',
+    parent=NORMAL,
+    fontSize=32,
+    textColor=AZUL,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold',
+    spaceAfter=10
+)
+
+
+def _estilo_deadline(fondo) -> ParagraphStyle:
+    return ParagraphStyle(
+        'DeadlineStyle',
+        parent=NORMAL,
+        fontSize=10,
+        textColor=colors.white,
+        backColor=fondo,
+        leftIndent=10,
+        rightIndent=10,
+        spaceAfter=10,
+        spaceBefore=10,
+        alignment=1  # center
+    )
+
+
+# Alerta de fecha límite por nivel de urgencia: (estilo, encabezado)
+ALERTAS_DEADLINE = {
+    'urgente': (_estilo_deadline(colors.red), "🚨 URGENTE - ACCIÓN INMEDIATA REQUERIDA"),
+    'advertencia': (_estilo_deadline(colors.orange), "⚠️ ADVERTENCIA - TIEMPO LIMITADO"),
+    'informacion': (_estilo_deadline(colors.green), "✓ INFORMACIÓN - PLAZO DISPONIBLE"),
+}
+
+
+def nivel_urgencia(dias_restantes: int) -> str:
+    """Nivel de ALERTAS_DEADLINE según los días que faltan para la fecha límite"""
+    if dias_restantes < 60:
+        return 'urgente'
+    if dias_restantes < 180:
+        return 'advertencia'
+    return 'informacion'
+
+
+# ==================== ESTILOS DE TABLA ====================
+
+def estilo_tabla(encabezado, texto_encabezado=colors.whitesmoke, fondo=None,
+                 filas_alternas: bool = False, fila_total=None,
+                 alineacion: str = 'CENTER', fuente: str = 'Helvetica',
+                 fuente_encabezado: Optional[str] = None, tamaño: int = 10,
+                 tamaño_encabezado: Optional[int] = None, relleno: int = 12,
+                 relleno_superior: Optional[int] = None) -> TableStyle:
+    """
+    Estilo de tabla con encabezado de color y rejilla negra
+
+    Args:
+        encabezado: Color de fondo de la primera fila
+        texto_encabezado: Color del texto de la primera fila
+        fondo: Color de fondo de las filas de datos (None = sin fondo)
+        filas_alternas: Alternar blanco y gris claro en las filas de datos
+        fila_total: Color de la última fila como fila de TOTAL (None = no hay)
+        alineacion: Alineación de todas las celdas
+        fuente: Fuente de todas las celdas
+        fuente_encabezado: Fuente de la primera fila, si es distinta
+        tamaño: Tamaño de letra de las filas de datos
+        tamaño_encabezado: Tamaño de letra de la primera fila, si es distinto
+        relleno: Relleno inferior de las celdas
+        relleno_superior: Relleno superior de las celdas (None = el default)
+
+    Returns:
+        TableStyle reutilizable entre tablas y peticiones
+    """
+    ultima_fila_datos = -2 if fila_total is not None else -1
+
+    comandos = [
+        ('BACKGROUND', (0, 0), (-1, 0), encabezado),
+        ('TEXTCOLOR', (0, 0), (-1, 0), texto_encabezado),
+        ('ALIGN', (0, 0), (-1, -1), alineacion),
+        ('FONTNAME', (0, 0), (-1, -1), fuente),
+    ]
+    if fuente_encabezado is not None:
+        comandos.append(('FONTNAME', (0, 0), (-1, 0), fuente_encabezado))
+    comandos.append(('FONTSIZE', (0, 0), (-1, -1), tamaño))
+    if tamaño_encabezado is not None:
+        comandos.append(('FONTSIZE', (0, 0), (-1, 0), tamaño_encabezado))
+    comandos.append(('BOTTOMPADDING', (0, 0), (-1, -1), relleno))
+    if relleno_superior is not None:
+        comandos.append(('TOPPADDING', (0, 0), (-1, -1), relleno_superior))
+    if fondo is not None:
+        comandos.append(('BACKGROUND', (0, 1), (-1, ultima_fila_datos), fondo))
+    if filas_alternas:
+        comandos.append(('ROWBACKGROUNDS', (0, 1), (-1, ultima_fila_datos), [colors.white, colors.lightgrey]))
+    if fila_total is not None:
+        comandos += [
+            ('BACKGROUND', (0, -1), (-1, -1), fila_total),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.white),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, -1), (-1, -1), 11),
+        ]
+    comandos.append(('GRID', (0, 0), (-1, -1), 1, colors.black))
+    return TableStyle(comandos)
+
+
+# Datos del beneficiario: etiquetas en gris, sin rejilla
+ESTILO_DATOS = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('BACKGROUND', (1, 0), (1, -1), colors.white),
+])
+
+ESTILO_RESUMEN = estilo_tabla(colors.darkblue, fondo=colors.beige, fuente='Helvetica-Bold')
+
+ESTILO_INVERSION = estilo_tabla(colors.darkgreen, fondo=colors.lightgreen, alineacion='LEFT')
+
+ESTILO_CALCULO = estilo_tabla(colors.darkblue, fondo=colors.beige, tamaño=9, relleno=8)
+
+ESTILO_RESUMEN_INVERSION = estilo_tabla(
+    AZUL, texto_encabezado=colors.white, fuente='Helvetica-Bold', relleno=10, relleno_superior=10
+)
+
+ESTILO_CALENDARIO = estilo_tabla(
+    AZUL, texto_encabezado=colors.white, fuente_encabezado='Helvetica-Bold', tamaño=9,
+    relleno=10, relleno_superior=10, filas_alternas=True, fila_total=VERDE
+)
+
+ESTILO_ESCENARIOS = estilo_tabla(
+    MORADO, texto_encabezado=colors.white, fuente_encabezado='Helvetica-Bold',
+    tamaño=8, tamaño_encabezado=9, relleno=8, relleno_superior=8, filas_alternas=True
+)
+
+
+def crear_tabla(filas: Sequence[Sequence], anchos_pulgadas: Sequence[float], estilo: TableStyle) -> Table:
+    """
+    Tabla del reporte con un estilo ya construido
+
+    Args:
+        filas: Celdas, incluida la fila de encabezado
+        anchos_pulgadas: Ancho de cada columna en pulgadas
+        estilo: Uno de los ESTILO_* de este módulo
+
+    Returns:
+        Table lista para agregar al documento
+    """
+    tabla = Table(filas, colWidths=[ancho * inch for ancho in anchos_pulgadas])
+    tabla.setStyle(estilo)
+    return tabla
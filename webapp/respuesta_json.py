@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RESPUESTAS JSON - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Serialización de las respuestas de jsonify() y redondeo de los resultados
+de la calculadora.
+
+Modos (JSON_MODE):
+
+- rapido: orjson escribe los bytes de la respuesta directamente (sin pasar
+  por un str), con las llaves ordenadas y las llaves enteras de
+  desglose_anual convertidas a texto. Los caracteres no ASCII van en UTF-8
+  y un NaN/infinito sale como null (JSON válido para JSON.parse)
+- compatible: el proveedor de Flask sin cambios; bytes idénticos a los de
+  siempre (ensure_ascii, separadores compactos, salto de línea final)
+
+Sin orjson instalado, rapido usa el modo compatible. Con debug (o compact
+en False) las respuestas se indentan como siempre.
+
+El redondeo de /calcular se declara una sola vez en tablas
+(campo de la respuesta, campo del resultado, decimales).
+
+Variables de entorno:
+    JSON_MODE   rapido o compatible. Default: rapido
+"""
+
+import logging
+import os
+from typing import Any, Dict, Tuple
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+logger = logging.getLogger('webapp.respuesta_json')
+
+MODOS = ('rapido', 'compatible')
+
+# Fechas y dataclasses se pasan a default() para escribirlas como Flask
+if orjson is not None:
+    OPCIONES_ORJSON = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+                       | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+class ProveedorJSONRapido(DefaultJSONProvider):
+    """
+    Proveedor de Flask que serializa jsonify() con orjson
+
+    dumps()/loads() (filtro tojson, request.get_json) quedan como en Flask;
+    si orjson no puede con un valor (p. ej. un entero de más de 64 bits) la
+    respuesta se arma con el proveedor de Flask.
+    """
+
+    def response(self, *args: Any, **kwargs: Any):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            cuerpo = orjson.dumps(obj, default=self.default, option=OPCIONES_ORJSON)
+        except TypeError:
+            cuerpo = f"{self.dumps(obj, separators=(',', ':'))}\n"
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+
+def crear_proveedor_json_desde_entorno(app) -> DefaultJSONProvider:
+    """
+    Proveedor JSON de la app según JSON_MODE (ver docstring del módulo)
+
+    Args:
+        app: Aplicación Flask
+    """
+    modo = os.environ.get('JSON_MODE', 'rapido').lower()
+    if modo not in MODOS:
+        logger.warning("JSON_MODE desconocido (%s), se usa rapido", modo)
+        modo = 'rapido'
+    if modo == 'rapido' and orjson is None:
+        logger.info("orjson no está instalado: respuestas JSON en modo compatible")
+        modo = 'compatible'
+    logger.info("Respuestas JSON: %s", modo)
+    return ProveedorJSONRapido(app) if modo == 'rapido' else DefaultJSONProvider(app)
+
+
+# ============================================================================
+# REDONDEO DE /calcular
+# ============================================================================
+
+# (campo de la respuesta, campo del resultado, decimales)
+Redondeo = Tuple[Tuple[str, str, int], ...]
+
+REDONDEO_PENSION: Redondeo = (
+    ('pension_base', 'pension_base_mensual', 0),
+    ('asignaciones', 'total_asignaciones_mensual', 0),
+    ('pension_total', 'pension_final_mensual', 0),
+    ('cuantia_pct', 'cuantia_basica_pct', 2),
+    ('incremento_pct', 'incremento_anual_pct', 2),
+    ('multiple_uma', 'multiple_uma', 2),
+)
+
+# Campos para el PDF; si el resultado no los trae van en 0
+REDONDEO_PENSION_PDF: Redondeo = (
+    ('cuantia_basica_diaria', 'cuantia_basica_diaria', 2),
+    ('cuantia_basica_mensual', 'cuantia_basica_mensual', 2),
+    ('porcentaje_aplicable', 'porcentaje_aplicable', 2),
+)
+
+REDONDEO_INVERSION: Redondeo = (
+    ('total_años', 'total_años', 0),
+    ('promedio_mensual', 'promedio_mensual', 0),
+)
+
+REDONDEO_ROI: Redondeo = (
+    ('diferencia_mensual', 'diferencia_mensual', 0),
+    ('diferencia_anual', 'diferencia_anual', 0),
+    ('roi_anual', 'roi_anual_pct', 1),
+    ('años_recuperacion', 'años_recuperacion', 1),
+    ('nivel_umas', 'nivel_umas', 1),
+)
+
+
+def redondear(origen: Dict[str, Any], reglas: Redondeo, opcionales: Redondeo = (),
+              **adicionales: Any) -> Dict[str, Any]:
+    """
+    Sección de la respuesta con los campos redondeados de un resultado
+
+    Args:
+        origen: Sección del resultado de la calculadora
+        reglas: Campos que deben venir en origen
+        opcionales: Campos que valen 0 si no vienen
+        **adicionales: Campos que se agregan tal cual
+
+    Returns:
+        Diccionario de la sección
+    """
+    seccion = {campo: round(origen[clave], decimales) for campo, clave, decimales in reglas}
+    for campo, clave, decimales in opcionales:
+        seccion[campo] = round(origen.get(clave, 0), decimales)
+    seccion.update(adicionales)
+    return seccion
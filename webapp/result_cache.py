@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHÉ DE RESULTADOS - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Caché LRU/TTL delante de calcular_escenario_completo. La clave es el
+conjunto de argumentos ya validados y normalizados más la versión de los
+parámetros de referencia, así que un cambio de tablas nunca reutiliza
+resultados viejos.
+
+Solo se guarda el resultado de la calculadora, que no depende de la fecha.
+Los campos que sí dependen del día (deadline de inscripción, fecha de
+cálculo) se recalculan en cada petición y nunca salen de la caché.
+
+En un fallo, las peticiones idénticas simultáneas se juntan en un solo
+cálculo (VueloUnico, ver single_flight.py), también con la caché apagada.
+
+Backends:
+    memoria  Diccionario LRU por proceso (default)
+    sqlite   Archivo compartido entre workers de gunicorn
+    off      Sin caché
+
+Variables de entorno:
+    RESULT_CACHE_BACKEND  memoria | sqlite | off. Default: memoria
+    RESULT_CACHE_PATH     Archivo SQLite. Default: <tmp>/modalidad40_resultados.sqlite3
+    RESULT_CACHE_SIZE     Máximo de entradas. Default: 1024
+    RESULT_CACHE_TTL      Segundos de vida de cada entrada. Default: 3600
+"""
+
+import hashlib
+import itertools
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from single_flight import VueloUnico
+
+logger = logging.getLogger('webapp.result_cache')
+
+
+class BackendMemoria:
+    """Almacén LRU en memoria del proceso (seguro entre hilos)"""
+
+    nombre = 'memoria'
+
+    def __init__(self, max_entradas: int = 1024):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.time():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> None:
+        with self._lock:
+            self._datos[clave] = (time.time() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class BackendSQLite:
+    """
+    Almacén LRU en un archivo SQLite compartido entre procesos
+
+    Los valores se serializan con pickle; cada hilo usa su propia conexión.
+    El límite se revisa cada ~10% de max_entradas escrituras (por proceso) y
+    se recorta en lote hasta la marca baja (90%), así que una escritura no
+    recorre la tabla y el archivo puede pasar el límite por poco entre
+    revisiones.
+    """
+
+    nombre = 'sqlite'
+
+    def __init__(self, ruta: str, max_entradas: int = 1024):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.revisar_cada = max(1, max_entradas // 10)
+        self.marca_baja = max_entradas - max_entradas // 10
+        self._escrituras = itertools.count(1)
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS resultados ('
+                ' clave TEXT PRIMARY KEY, valor BLOB NOT NULL,'
+                ' expira REAL NOT NULL, usado REAL NOT NULL)'
+            )
+            conexion.execute('CREATE INDEX IF NOT EXISTS idx_resultados_usado ON resultados(usado)')
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        conexion = self._conexion()
+        fila = conexion.execute(
+            'SELECT valor, expira FROM resultados WHERE clave = ?', (clave,)
+        ).fetchone()
+        if fila is None:
+            return None
+        ahora = time.time()
+        if fila[1] < ahora:
+            conexion.execute('DELETE FROM resultados WHERE clave = ?', (clave,))
+            return None
+        conexion.execute('UPDATE resultados SET usado = ? WHERE clave = ?', (ahora, clave))
+        return pickle.loads(fila[0])
+
+    def guardar(self, clave: str, valor: Any, ttl: float) -> None:
+        conexion = self._conexion()
+        ahora = time.time()
+        conexion.execute(
+            'INSERT OR REPLACE INTO resultados (clave, valor, expira, usado) VALUES (?, ?, ?, ?)',
+            (clave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), ahora + ttl, ahora)
+        )
+        if next(self._escrituras) % self.revisar_cada == 0:
+            self._expulsar(conexion)
+
+    def _expulsar(self, conexion: sqlite3.Connection) -> None:
+        """Pasado el límite, borrar las menos usadas recientemente hasta la marca baja"""
+        sobrantes = conexion.execute('SELECT COUNT(*) FROM resultados').fetchone()[0] - self.max_entradas
+        if sobrantes > 0:
+            conexion.execute(
+                'DELETE FROM resultados WHERE clave IN ('
+                ' SELECT clave FROM resultados ORDER BY usado LIMIT ?)',
+                (sobrantes + self.max_entradas - self.marca_baja,)
+            )
+
+    def limpiar(self) -> None:
+        self._conexion().execute('DELETE FROM resultados')
+
+    def __len__(self) -> int:
+        return self._conexion().execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+
+
+class CacheResultados:
+    """Caché de resultados de la calculadora con contadores de aciertos/fallos"""
+
+    def __init__(self, backend=None, ttl: float = 3600, vuelo: Optional[VueloUnico] = None):
+        """
+        Args:
+            backend: BackendMemoria, BackendSQLite o None (caché desactivada)
+            ttl: Segundos de vida de cada entrada
+            vuelo: Junta los cálculos idénticos en curso (uno nuevo si no se da)
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.vuelo = vuelo or VueloUnico()
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def construir_clave(version: str, argumentos: Dict[str, Any]) -> str:
+        """
+        Clave estable para un conjunto de argumentos normalizados
+
+        Args:
+            version: Versión de los parámetros de referencia
+            argumentos: Argumentos de calcular_escenario_completo
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        normalizados = tuple(sorted(argumentos.items()))
+        return hashlib.sha256(repr((version, normalizados)).encode('utf-8')).hexdigest()
+
+    def obtener_o_calcular(self, version: str, argumentos: Dict[str, Any],
+                           calcular: Callable[[], Any]) -> Any:
+        """
+        Regresar el resultado en caché o calcularlo y guardarlo
+
+        Los resultados con 'error' también se guardan (son deterministas).
+        El valor regresado puede ser compartido: no debe modificarse. Si la
+        misma clave ya se está calculando, se espera ese cálculo.
+
+        Args:
+            version: Versión de los parámetros de referencia
+            argumentos: Argumentos normalizados (forman la clave)
+            calcular: Función sin argumentos que produce el resultado
+
+        Returns:
+            Resultado del cálculo
+        """
+        clave = self.construir_clave(version, argumentos)
+        if self.backend is None:
+            return self.vuelo.ejecutar(clave, calcular)
+
+        try:
+            resultado = self.backend.obtener(clave)
+        except Exception:
+            logger.exception("Error leyendo la caché de resultados")
+            resultado = None
+
+        if resultado is not None:
+            with self._lock:
+                self.aciertos += 1
+            return resultado
+
+        with self._lock:
+            self.fallos += 1
+        return self.vuelo.ejecutar(clave, lambda: self._calcular_y_guardar(clave, calcular))
+
+    def _calcular_y_guardar(self, clave: str, calcular: Callable[[], Any]) -> Any:
+        resultado = calcular()
+        try:
+            self.backend.guardar(clave, resultado, self.ttl)
+        except Exception:
+            logger.exception("Error guardando en la caché de resultados")
+        return resultado
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores de este proceso y tamaño actual del almacén"""
+        total = self.aciertos + self.fallos
+        return {
+            'backend': self.backend.nombre if self.backend is not None else 'off',
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / total, 4) if total else 0.0,
+            'entradas': len(self.backend) if self.backend is not None else 0,
+            'max_entradas': self.backend.max_entradas if self.backend is not None else 0,
+            'ttl_segundos': self.ttl,
+            'calculos_compartidos': self.vuelo.compartidos,
+            'pid': os.getpid(),
+        }
+
+    def limpiar(self) -> None:
+        """Vaciar el almacén y reiniciar los contadores"""
+        if self.backend is not None:
+            self.backend.limpiar()
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+        self.vuelo.limpiar()
+
+
+def crear_cache_desde_entorno() -> CacheResultados:
+    """Construir la caché según RESULT_CACHE_* (ver docstring del módulo)"""
+    tipo = os.environ.get('RESULT_CACHE_BACKEND', 'memoria').lower()
+    max_entradas = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+    ttl = float(os.environ.get('RESULT_CACHE_TTL', 3600))
+
+    if tipo == 'off' or max_entradas <= 0:
+        backend = None
+    elif tipo == 'sqlite':
+        ruta = os.environ.get(
+            'RESULT_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'modalidad40_resultados.sqlite3')
+        )
+        backend = BackendSQLite(ruta, max_entradas)
+    else:
+        backend = BackendMemoria(max_entradas)
+
+    logger.info("Caché de resultados: %s (máx %s entradas, TTL %ss)",
+                backend.nombre if backend is not None else 'off', max_entradas, ttl)
+    return CacheResultados(backend, ttl)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VUELO ÚNICO (SINGLE-FLIGHT) - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Junta las peticiones idénticas que llegan mientras la primera sigue en
+curso (un escenario promocionado que muchos abren a la vez, un doble clic):
+la primera hace el trabajo y las duplicadas esperan y comparten su
+resultado, o su excepción.
+
+La clave es la de la petición ya normalizada (la misma de la caché de
+resultados o de la caché de PDF), así que dos formularios que solo difieren
+en formato cuentan como la misma petición. Al terminar, la clave se libera:
+lo que llegue después va a la caché o vuelve a calcular.
+
+Es por proceso: con varios workers de gunicorn cada uno junta las suyas.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class VueloUnico:
+    """Trabajos en curso por clave, con contadores de ejecutados y compartidos"""
+
+    def __init__(self):
+        self.ejecutados = 0
+        self.compartidos = 0
+        self._en_curso: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def iniciar_o_unirse(self, clave: Hashable, iniciar: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Regresar el trabajo en curso de la clave o iniciar uno nuevo
+
+        iniciar() corre con el lock tomado: debe solo arrancar el trabajo
+        (p. ej. encolarlo), no esperarlo. Si lanza una excepción no queda
+        nada registrado. Quien inicia debe llamar terminar(clave) al acabar.
+
+        Args:
+            clave: Clave de la petición normalizada
+            iniciar: Arranca el trabajo y regresa el objeto que se comparte
+
+        Returns:
+            (trabajo, compartido): compartido es True si ya estaba en curso
+        """
+        with self._lock:
+            trabajo = self._en_curso.get(clave)
+            if trabajo is not None:
+                self.compartidos += 1
+                return trabajo, True
+            trabajo = self._en_curso[clave] = iniciar()
+            self.ejecutados += 1
+            return trabajo, False
+
+    def terminar(self, clave: Hashable) -> None:
+        """Liberar la clave (las peticiones siguientes ya no se juntan con esta)"""
+        with self._lock:
+            self._en_curso.pop(clave, None)
+
+    def ejecutar(self, clave: Hashable, funcion: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Ejecutar funcion() una sola vez por clave entre las llamadas simultáneas
+
+        Args:
+            clave: Clave de la petición normalizada
+            funcion: Función sin argumentos que produce el resultado
+            timeout: Segundos que espera una llamada duplicada (None = sin límite)
+
+        Returns:
+            El resultado de funcion(), propio o compartido (no debe modificarse)
+
+        Raises:
+            La excepción de funcion(), también en las llamadas que esperaban;
+            TimeoutError si una duplicada no recibe el resultado a tiempo
+        """
+        futuro, compartido = self.iniciar_o_unirse(clave, Future)
+        if compartido:
+            return futuro.result(timeout)
+        try:
+            resultado = funcion()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            self.terminar(clave)
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Trabajos ejecutados, peticiones que compartieron uno y claves en curso"""
+        with self._lock:
+            return {
+                'ejecutados': self.ejecutados,
+                'compartidos': self.compartidos,
+                'en_curso': len(self._en_curso),
+            }
+
+    def limpiar(self) -> None:
+        """Reiniciar los contadores (los trabajos en curso no se tocan)"""
+        with self._lock:
+            self.ejecutados = 0
+            self.compartidos = 0
@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VALIDACIÓN DE ENTRADAS - CALCULADORA MODALIDAD 40 IMSS
+Versión: 1.0 - Noviembre 2025
+
+Reglas de validación y normalización de los datos del formulario,
+compartidas por /calcular, /calcular-lote y los reportes PDF.
+
+Cada petición se describe con un esquema declarativo:
+
+- Campo: conversión de un valor del formulario (tipo, si es requerido,
+  valor por omisión y qué hacer si no se puede convertir)
+- Derivado: valor calculado a partir de otros (p. ej. la fecha límite de
+  inscripción a partir de la última cotización)
+- Regla: condición sobre uno o más valores (rangos, Ley 97, deadline)
+
+El esquema se compila una vez a una función de Python en línea recta (el
+código generado queda en Esquema.codigo) que revisa la petición en una
+sola pasada, juntando todas las violaciones: la respuesta trae la primera
+en 'error' (el mensaje de siempre) y todas en 'errores'. Una regla solo se
+evalúa si sus campos se pudieron convertir, así que un dato mal escrito no
+produce errores en cascada.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger('webapp.validacion')
+
+# Inicio de la Ley 97: quien cotizó desde esta fecha no tiene Modalidad 40
+FECHA_LIMITE_LEY97 = datetime(1997, 7, 1)
+
+# Simulación Monte Carlo en /calcular: trayectorias por omisión y máximo
+TRAYECTORIAS_MONTE_CARLO = 10_000
+MAXIMO_TRAYECTORIAS_MONTE_CARLO = 100_000
+
+
+class Violacion(NamedTuple):
+    """Un dato inválido: campo (None si es de la petición completa), mensaje y motivo"""
+    campo: Optional[str]
+    mensaje: str
+    motivo: str
+
+
+class ErrorValidacion(ValueError):
+    """
+    Datos de entrada inválidos; el mensaje se muestra tal cual al usuario
+
+    'motivo' agrupa los rechazos para las métricas: datos_faltantes, formato,
+    deadline_vencida, ley97, semanas, edad, monte_carlo, reporte.
+    'errores' tiene todas las violaciones encontradas (la primera es la del
+    mensaje).
+    """
+
+    def __init__(self, mensaje: str, status: int = 400, motivo: str = 'otro',
+                 errores: Optional[List[Violacion]] = None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status = status
+        self.motivo = motivo
+        self.errores = errores or [Violacion(None, mensaje, motivo)]
+
+    @classmethod
+    def de_violaciones(cls, violaciones: List[Violacion]) -> 'ErrorValidacion':
+        """Error con la primera violación como mensaje y todas en 'errores'"""
+        return cls(violaciones[0].mensaje, motivo=violaciones[0].motivo, errores=violaciones)
+
+    def respuesta(self) -> Dict[str, Any]:
+        """Cuerpo JSON del 400: 'error' (primera violación) y 'errores' (todas)"""
+        return {'error': self.mensaje, 'errores': [violacion._asdict() for violacion in self.errores]}
+
+
+# ============================================================================
+# ESQUEMAS
+# ============================================================================
+
+# Valores que cuentan como "no viene" en los campos del formulario
+VACIOS = ('', None)
+# Para las fechas de cotización también 0 (los selects vacíos mandan 0)
+VACIOS_FECHA = ('', None, 0)
+
+MENSAJE_FORMATO = 'Error en formato de datos numéricos en {campo}: {error}'
+
+# Marca de "la llave no viene" (distinto de null)
+_FALTA = object()
+
+
+@dataclass(frozen=True)
+class Campo:
+    """
+    Un valor de la petición
+
+    tipo convierte el valor crudo; si falla se reporta mensaje_formato, o se
+    usa 'omision' sin error con si_invalido='omision'. Si el campo no viene
+    (o su valor está en 'vacios'), se reporta 'requerido' si lo tiene o se
+    usa 'omision'. Los mensajes se formatean con {campo}, {valor} y {error}.
+    """
+    nombre: str
+    tipo: Callable[[Any], Any]
+    requerido: Optional[str] = None
+    motivo_requerido: str = 'datos_faltantes'
+    omision: Any = None
+    vacios: Tuple = VACIOS
+    si_invalido: str = 'formato'
+    mensaje_formato: str = MENSAJE_FORMATO
+    motivo_formato: str = 'formato'
+
+
+@dataclass(frozen=True)
+class Derivado:
+    """
+    Valor calculado con otros (funcion recibe el diccionario de valores)
+
+    Se omite (None) si falta alguno de sus campos. Si la función lanza
+    ValueError se reporta 'error' (mensaje, motivo) o, sin él, queda None.
+    """
+    nombre: str
+    campos: Tuple[str, ...]
+    funcion: Callable[[Dict[str, Any]], Any]
+    error: Optional[Tuple[str, str]] = None
+
+
+@dataclass(frozen=True)
+class Regla:
+    """
+    Condición que deben cumplir los valores (prueba regresa True si es válido)
+
+    Se evalúa solo si todos sus campos tienen valor. El mensaje es un texto
+    que se formatea con los valores (y {valor}, el crudo del primer campo)
+    o una función de los valores.
+    """
+    motivo: str
+    campos: Tuple[str, ...]
+    prueba: Callable[[Dict[str, Any]], bool]
+    mensaje: Union[str, Callable[[Dict[str, Any]], str]]
+
+
+def rango(campo: str, motivo: str, mensaje: str, minimo: float = None, maximo: float = None,
+          incluir_maximo: bool = True) -> Regla:
+    """Regla de límites de un solo campo (inclusivos, salvo el máximo con incluir_maximo=False)"""
+    if incluir_maximo:
+        prueba = lambda v: (minimo is None or v[campo] >= minimo) and (maximo is None or v[campo] <= maximo)
+    else:
+        prueba = lambda v: (minimo is None or v[campo] >= minimo) and (maximo is None or v[campo] < maximo)
+    return Regla(motivo, (campo,), prueba, mensaje)
+
+
+class Esquema:
+    """
+    Validador compilado: el esquema se traduce una vez a una función en
+    línea recta (sin ciclos sobre los campos ni búsquedas de atributos),
+    que recorre campos, derivados y reglas en una sola pasada
+
+    Args:
+        campos: Campos de la petición
+        derivados: Valores calculados, en orden de dependencia
+        reglas: Condiciones, en el orden en que se reportan
+        construir: Arma el objeto de salida con el diccionario de valores
+    """
+
+    def __init__(self, campos: Tuple[Campo, ...], derivados: Tuple[Derivado, ...] = (),
+                 reglas: Tuple[Regla, ...] = (), construir: Callable[[Dict[str, Any]], Any] = dict):
+        self.campos = campos
+        self.derivados = derivados
+        self.reglas = reglas
+        self.construir = construir
+        self._revisar, self.codigo = self._compilar()
+
+    def _compilar(self) -> Tuple[Callable, str]:
+        """Generar el código de revisar(data, valores) -> violaciones"""
+        globales = {'Violacion': Violacion, '_FALTA': _FALTA, '_ERRORES': (ValueError, TypeError, OverflowError),
+                    '_faltante': _faltante, '_mal_formado': _mal_formado, '_incumplida': _incumplida}
+        lineas = ['def revisar(data, valores):', '    violaciones = []']
+
+        for i, campo in enumerate(self.campos):
+            globales.update({f'campo{i}': campo, f'tipo{i}': campo.tipo, f'vacios{i}': campo.vacios,
+                             f'omision{i}': campo.omision})
+            nombre = repr(campo.nombre)
+            lineas += [f'    crudo = data.get({nombre}, _FALTA)',
+                       f'    if crudo is _FALTA or crudo in vacios{i}:']
+            if campo.requerido is None:
+                lineas += [f'        valores[{nombre}] = omision{i}']
+            else:
+                lineas += [f'        violaciones.append(_faltante(campo{i}, data))',
+                           f'        valores[{nombre}] = None']
+            lineas += ['    else:',
+                       '        try:',
+                       f'            valores[{nombre}] = tipo{i}(crudo)',
+                       '        except _ERRORES as e:']
+            if campo.si_invalido == 'omision':
+                lineas += [f'            valores[{nombre}] = omision{i}']
+            else:
+                lineas += [f'            violaciones.append(_mal_formado(campo{i}, crudo, e))',
+                           f'            valores[{nombre}] = None']
+
+        for i, derivado in enumerate(self.derivados):
+            globales[f'funcion{i}'] = derivado.funcion
+            nombre = repr(derivado.nombre)
+            condicion = ' and '.join(f'valores[{campo!r}] is not None' for campo in derivado.campos)
+            lineas += [f'    valores[{nombre}] = None',
+                       f'    if {condicion}:',
+                       '        try:',
+                       f'            valores[{nombre}] = funcion{i}(valores)',
+                       '        except _ERRORES:']
+            if derivado.error is None:
+                lineas += ['            pass']
+            else:
+                mensaje, motivo = derivado.error
+                lineas += [f'            violaciones.append(Violacion({derivado.campos[0]!r}, {mensaje!r}, {motivo!r}))']
+
+        for i, regla in enumerate(self.reglas):
+            globales.update({f'regla{i}': regla, f'prueba{i}': regla.prueba})
+            condicion = ' and '.join(f'valores[{campo!r}] is not None' for campo in regla.campos)
+            lineas += [f'    if {condicion} and not prueba{i}(valores):',
+                       f'        violaciones.append(_incumplida(regla{i}, data, valores))']
+
+        lineas += ['    return violaciones']
+        codigo = '\n'.join(lineas) + '\n'
+        exec(compile(codigo, f'<esquema {", ".join(c.nombre for c in self.campos[:2])}...>', 'exec'), globales)
+        return globales['revisar'], codigo
+
+    def validar(self, data: Dict[str, Any], **contexto) -> Any:
+        """
+        Validar y normalizar una petición
+
+        Args:
+            data: Diccionario recibido
+            **contexto: Valores externos disponibles para derivados y reglas (p. ej. hoy)
+
+        Returns:
+            Lo que regrese construir() con los valores normalizados
+
+        Raises:
+            ErrorValidacion: con todas las violaciones
+        """
+        valores, violaciones = self.revisar(data, contexto)
+        if violaciones:
+            raise ErrorValidacion.de_violaciones(violaciones)
+        return self.construir(valores)
+
+    def revisar(self, data: Dict[str, Any], contexto: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Violacion]]:
+        """Valores normalizados y todas las violaciones de la petición (sin lanzar)"""
+        valores = dict(contexto)
+        violaciones = self._revisar(data, valores)
+        # Un mismo mensaje puede salir de dos campos (p. ej. mes y año de inicio)
+        if violaciones:
+            vistos = set()
+            violaciones = [v for v in violaciones if not (v.mensaje in vistos or vistos.add(v.mensaje))]
+            logger.info("Petición rechazada: %s", ', '.join(f'{v.campo}={v.motivo}' for v in violaciones))
+        return valores, violaciones
+
+
+# Mensajes de las violaciones (solo se arman cuando hay error)
+
+def _faltante(campo: Campo, data: Dict[str, Any]) -> Violacion:
+    mensaje = campo.requerido.format(campo=campo.nombre, valor=data.get(campo.nombre, 'no proporcionado'))
+    return Violacion(campo.nombre, mensaje, campo.motivo_requerido)
+
+
+def _mal_formado(campo: Campo, crudo: Any, error: Exception) -> Violacion:
+    mensaje = campo.mensaje_formato.format(campo=campo.nombre, valor=crudo, error=error)
+    return Violacion(campo.nombre, mensaje, campo.motivo_formato)
+
+
+def _incumplida(regla: Regla, data: Dict[str, Any], valores: Dict[str, Any]) -> Violacion:
+    primero = regla.campos[0]
+    if callable(regla.mensaje):
+        mensaje = regla.mensaje(valores)
+    else:
+        mensaje = regla.mensaje.format(valor=data.get(primero, valores[primero]), **valores)
+    return Violacion(primero, mensaje, regla.motivo)
+
+
+def _entero(valor: Any) -> int:
+    """Entero que acepta decimales ('1013.0', 59.6 -> 59)"""
+    return int(float(valor))
+
+
+def _mes_o_cero(valor: Any) -> int:
+    """Mes como entero; un valor no numérico cuenta como fuera de rango"""
+    try:
+        return int(float(valor))
+    except (ValueError, TypeError):
+        return 0
+
+
+# ============================================================================
+# DATOS DE UNA PERSONA (/calcular, /calcular-lote, SBC óptimo, rejilla)
+# ============================================================================
+
+class DatosCalculo(NamedTuple):
+    """Datos de una persona ya validados y normalizados"""
+    semanas_cotizadas: int
+    sdp_actual: float
+    sbc_modalidad40: float
+    edad_actual: int
+    edad_pension: int
+    tiene_esposa: bool
+    num_hijos: int
+    tiene_padres: bool
+    año_inicio: int
+    mes_nacimiento: Optional[int]
+    mes_inicio_modalidad40: int
+    mes_inicio_cotizacion: int
+    año_inicio_cotizacion: int
+    mes_ultima: Optional[int]
+    año_ultima: Optional[int]
+    fecha_limite_inscripcion: Optional[datetime]
+    dias_restantes_deadline: Optional[int]
+
+    @property
+    def años_disponibles(self) -> int:
+        """Años para cotizar en Modalidad 40 antes de pensionarse"""
+        return self.edad_pension - self.edad_actual
+
+    def argumentos(self) -> Dict[str, Any]:
+        """Argumentos de calcular_escenario_completo (un diccionario nuevo en cada llamada)"""
+        return dict(
+            semanas_cotizadas_actuales=self.semanas_cotizadas,
+            sdp_actual_diario=self.sdp_actual,
+            sbc_modalidad40_diario=self.sbc_modalidad40,
+            edad_pension=self.edad_pension,
+            tiene_esposa=self.tiene_esposa,
+            num_hijos_dependientes=self.num_hijos,
+            tiene_padres_dependientes=self.tiene_padres,
+            año_inicio=self.año_inicio,
+            edad_actual=self.edad_actual,
+            mes_nacimiento=self.mes_nacimiento,  # ✅ CRÍTICO: mes de nacimiento para calcular meses exactos
+            mes_inicio_modalidad40=self.mes_inicio_modalidad40,
+            calendario_mensual=True  # Mes por mes con días reales (CalendarioModalidad40)
+        )
+
+    def campos(self) -> Dict[str, Any]:
+        """Campos del formulario ya normalizados (ESQUEMA_CALCULO los vuelve a aceptar tal cual)"""
+        return dict(
+            semanas_cotizadas=self.semanas_cotizadas,
+            sdp_actual=self.sdp_actual,
+            sbc_modalidad40=self.sbc_modalidad40,
+            edad_actual=self.edad_actual,
+            edad_pension=self.edad_pension,
+            tiene_esposa=self.tiene_esposa,
+            num_hijos=self.num_hijos,
+            tiene_padres=self.tiene_padres,
+            año_inicio=self.año_inicio,
+            mes_nacimiento=self.mes_nacimiento,
+            mes_inicio_modalidad40=self.mes_inicio_modalidad40,
+            mes_inicio_cotizacion=self.mes_inicio_cotizacion,
+            año_inicio_cotizacion=self.año_inicio_cotizacion,
+            mes_ultima_cotizacion=self.mes_ultima,
+            año_ultima_cotizacion=self.año_ultima,
+        )
+
+
+_REQUERIDO_CALCULO = 'Campo requerido para cálculo: {campo}. Valor recibido: {valor}'
+_REQUERIDA_FECHA_INICIO = 'Fecha de inicio de cotización requerida para validar elegibilidad Modalidad 40'
+_MENSAJE_MES = '{campo} debe ser un mes entre 1 y 12. Valor recibido: {valor}'
+_FORMATO_ULTIMA = 'Error en formato de números: {error}'
+
+
+def _fecha_limite_inscripcion(v: Dict[str, Any]) -> datetime:
+    # Deadline es 5 años después de última cotización
+    return datetime(v['año_ultima_cotizacion'] + 5, v['mes_ultima_cotizacion'], 1)
+
+
+def _mensaje_deadline(v: Dict[str, Any]) -> str:
+    mes, año = v['mes_ultima_cotizacion'], v['año_ultima_cotizacion']
+    return (f'Fecha límite de inscripción vencida. Última cotización: {mes}/{año}. Límite: {mes}/{año + 5}. '
+            'Has perdido el derecho permanente a Modalidad 40.')
+
+
+def _mensaje_ley97(v: Dict[str, Any]) -> str:
+    return (f'No elegible para Modalidad 40. Iniciaste cotización el {v["mes_inicio_cotizacion"]}/{v["año_inicio_cotizacion"]}, '
+            'posterior al 1/jul/1997 (Ley 97). Tu pensión se basa en el sistema de Afores.')
+
+
+ESQUEMA_CALCULO = Esquema(
+    campos=(
+        Campo('semanas_cotizadas', _entero, requerido=_REQUERIDO_CALCULO),  # Permite decimales que se redondean
+        Campo('sdp_actual', float, requerido=_REQUERIDO_CALCULO),
+        Campo('sbc_modalidad40', float, requerido=_REQUERIDO_CALCULO),
+        Campo('edad_actual', _entero, requerido=_REQUERIDO_CALCULO),
+        Campo('edad_pension', _entero, requerido=_REQUERIDO_CALCULO),
+        # Opciones familiares
+        Campo('tiene_esposa', bool, omision=False),
+        Campo('num_hijos', _entero, omision=0, si_invalido='omision'),
+        Campo('tiene_padres', bool, omision=False),
+        # VALIDACIÓN CRÍTICA: Elegibilidad Modalidad 40 (Ley 97)
+        Campo('mes_inicio_cotizacion', int, requerido=_REQUERIDA_FECHA_INICIO, vacios=VACIOS_FECHA,
+              mensaje_formato='Fecha de inicio de cotización inválida'),
+        Campo('año_inicio_cotizacion', int, requerido=_REQUERIDA_FECHA_INICIO, vacios=VACIOS_FECHA,
+              mensaje_formato='Fecha de inicio de cotización inválida'),
+        # Última cotización: para el deadline de inscripción (opcional)
+        Campo('mes_ultima_cotizacion', int, vacios=VACIOS_FECHA, mensaje_formato=_FORMATO_ULTIMA),
+        Campo('año_ultima_cotizacion', int, vacios=VACIOS_FECHA, mensaje_formato=_FORMATO_ULTIMA),
+        Campo('año_inicio', _entero, omision=2025, si_invalido='omision'),
+        # Meses del calendario de pagos: hasta el mes del cumpleaños de pensión
+        # (sin mes de nacimiento se paga hasta diciembre)
+        Campo('mes_nacimiento', _mes_o_cero),
+        Campo('mes_inicio_modalidad40', _mes_o_cero, omision=1),
+    ),
+    derivados=(
+        # Una fecha de última cotización imposible (mes 13) no tiene deadline
+        Derivado('fecha_limite_inscripcion', ('mes_ultima_cotizacion', 'año_ultima_cotizacion'),
+                 _fecha_limite_inscripcion),
+        Derivado('dias_restantes_deadline', ('fecha_limite_inscripcion',),
+                 lambda v: (v['fecha_limite_inscripcion'] - v['hoy']).days),
+        Derivado('fecha_inicio_cotizacion', ('mes_inicio_cotizacion', 'año_inicio_cotizacion'),
+                 lambda v: datetime(v['año_inicio_cotizacion'], v['mes_inicio_cotizacion'], 1),
+                 error=('Fecha de inicio de cotización inválida', 'formato')),
+    ),
+    reglas=(
+        Regla('deadline_vencida', ('dias_restantes_deadline',), lambda v: v['dias_restantes_deadline'] >= 0,
+              _mensaje_deadline),
+        Regla('ley97', ('fecha_inicio_cotizacion',), lambda v: v['fecha_inicio_cotizacion'] < FECHA_LIMITE_LEY97,
+              _mensaje_ley97),
+        rango('mes_nacimiento', 'formato', _MENSAJE_MES.replace('{campo}', 'mes_nacimiento'), 1, 12),
+        rango('mes_inicio_modalidad40', 'formato', _MENSAJE_MES.replace('{campo}', 'mes_inicio_modalidad40'), 1, 12),
+        # Validaciones básicas
+        rango('semanas_cotizadas', 'semanas', 'Se requieren mínimo 500 semanas cotizadas para acceder a pensión',
+              minimo=500),
+        rango('edad_actual', 'edad', 'Edad actual debe estar entre 50 y 70 años', 50, 70),
+        rango('edad_pension', 'edad', 'Edad mínima para pensión: 60 años', minimo=60),
+        rango('edad_pension', 'edad', 'Edad máxima legal para pensión: 65 años (límite IMSS)', maximo=65),
+        Regla('edad', ('edad_pension', 'edad_actual'), lambda v: v['edad_pension'] > v['edad_actual'],
+              'La edad de pensión debe ser mayor a tu edad actual'),
+    ),
+    construir=lambda v: DatosCalculo(
+        semanas_cotizadas=v['semanas_cotizadas'],
+        sdp_actual=v['sdp_actual'],
+        sbc_modalidad40=v['sbc_modalidad40'],
+        edad_actual=v['edad_actual'],
+        edad_pension=v['edad_pension'],
+        tiene_esposa=v['tiene_esposa'],
+        num_hijos=v['num_hijos'],
+        tiene_padres=v['tiene_padres'],
+        año_inicio=v['año_inicio'],
+        mes_nacimiento=v['mes_nacimiento'],
+        mes_inicio_modalidad40=v['mes_inicio_modalidad40'],
+        mes_inicio_cotizacion=v['mes_inicio_cotizacion'],
+        año_inicio_cotizacion=v['año_inicio_cotizacion'],
+        mes_ultima=v['mes_ultima_cotizacion'],
+        año_ultima=v['año_ultima_cotizacion'],
+        fecha_limite_inscripcion=v['fecha_limite_inscripcion'],
+        dias_restantes_deadline=v['dias_restantes_deadline'],
+    ),
+)
+
+# Campos numéricos obligatorios para el cálculo
+CAMPOS_REQUERIDOS_CALCULO = tuple(campo.nombre for campo in ESQUEMA_CALCULO.campos
+                                  if campo.requerido == _REQUERIDO_CALCULO)
+
+
+def _no_es_objeto(data: Any) -> Optional[Violacion]:
+    if not data or not isinstance(data, dict):
+        return Violacion(None, 'No se recibieron datos JSON válidos', 'datos_faltantes')
+    return None
+
+
+def validar_datos_calculo(data: Dict[str, Any], hoy: datetime) -> DatosCalculo:
+    """
+    Validar y normalizar los datos de una persona
+
+    Args:
+        data: Diccionario recibido del formulario (o una fila del lote)
+        hoy: Fecha actual sin zona horaria (para el deadline de inscripción)
+
+    Returns:
+        DatosCalculo (argumentos() da los de calcular_escenario_completo)
+
+    Raises:
+        ErrorValidacion: con todas las violaciones; el mensaje es el de la primera
+    """
+    invalido = _no_es_objeto(data)
+    if invalido:
+        raise ErrorValidacion.de_violaciones([invalido])
+    return ESQUEMA_CALCULO.validar(data, hoy=hoy)
+
+
+# ============================================================================
+# OPCIONES MONTE CARLO (/calcular)
+# ============================================================================
+
+_FORMATO_MONTE_CARLO = 'Valor inválido en monte_carlo: {error}'
+
+ESQUEMA_MONTE_CARLO = Esquema(
+    campos=(
+        Campo('trayectorias', int, omision=TRAYECTORIAS_MONTE_CARLO,
+              mensaje_formato=_FORMATO_MONTE_CARLO, motivo_formato='monte_carlo'),
+        Campo('semilla', int, mensaje_formato=_FORMATO_MONTE_CARLO, motivo_formato='monte_carlo'),
+        Campo('volatilidad_pp', float, omision=1.0, mensaje_formato=_FORMATO_MONTE_CARLO, motivo_formato='monte_carlo'),
+        Campo('persistencia', float, omision=0.6, mensaje_formato=_FORMATO_MONTE_CARLO, motivo_formato='monte_carlo'),
+    ),
+    reglas=(
+        rango('trayectorias', 'monte_carlo',
+              f'monte_carlo.trayectorias debe estar entre 1 y {MAXIMO_TRAYECTORIAS_MONTE_CARLO:,}',
+              1, MAXIMO_TRAYECTORIAS_MONTE_CARLO),
+        rango('semilla', 'monte_carlo', 'monte_carlo.semilla no puede ser negativa', minimo=0),
+        rango('volatilidad_pp', 'monte_carlo', 'monte_carlo.volatilidad_pp debe estar entre 0 y 10 puntos', 0, 10),
+        rango('persistencia', 'monte_carlo', 'monte_carlo.persistencia debe estar entre 0 y 1', 0, 1,
+              incluir_maximo=False),
+    ),
+    construir=lambda v: {campo: v[campo] for campo in ('trayectorias', 'semilla', 'volatilidad_pp', 'persistencia')},
+)
+
+
+def _revisar_monte_carlo(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[Violacion]]:
+    opciones = data.get('monte_carlo')
+    if not opciones:
+        return None, []
+    if opciones is True:
+        opciones = {}
+    if not isinstance(opciones, dict):
+        return None, [Violacion('monte_carlo', 'monte_carlo debe ser true o un objeto con trayectorias, semilla, '
+                                               'volatilidad_pp y persistencia', 'monte_carlo')]
+    valores, violaciones = ESQUEMA_MONTE_CARLO.revisar(opciones, {})
+    return (None if violaciones else ESQUEMA_MONTE_CARLO.construir(valores)), violaciones
+
+
+def validar_opciones_monte_carlo(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Validar la opción 'monte_carlo' de /calcular
+
+    Acepta true (valores por omisión) o un objeto con 'trayectorias',
+    'semilla', 'volatilidad_pp' y 'persistencia', todos opcionales.
+
+    Args:
+        data: Diccionario recibido del formulario
+
+    Returns:
+        Argumentos para simular_uma_inflacion, o None si no se pidió la simulación
+
+    Raises:
+        ErrorValidacion: si algún valor no es válido
+    """
+    opciones, violaciones = _revisar_monte_carlo(data)
+    if violaciones:
+        raise ErrorValidacion.de_violaciones(violaciones)
+    return opciones
+
+
+def validar_peticion_calculo(data: Dict[str, Any], hoy: datetime) -> Tuple[DatosCalculo, Optional[Dict[str, Any]]]:
+    """
+    Validar una petición de /calcular: datos de la persona y opciones Monte Carlo
+
+    Returns:
+        (DatosCalculo, opciones de simular_uma_inflacion o None)
+
+    Raises:
+        ErrorValidacion: con las violaciones de ambas partes juntas
+    """
+    invalido = _no_es_objeto(data)
+    if invalido:
+        raise ErrorValidacion.de_violaciones([invalido])
+    valores, violaciones = ESQUEMA_CALCULO.revisar(data, {'hoy': hoy})
+    opciones, violaciones_monte_carlo = _revisar_monte_carlo(data)
+    violaciones += violaciones_monte_carlo
+    if violaciones:
+        raise ErrorValidacion.de_violaciones(violaciones)
+    return ESQUEMA_CALCULO.construir(valores), opciones
+
+
+# ============================================================================
+# CRITERIOS DEL SBC ÓPTIMO (/api/sbc-optimo)
+# ============================================================================
+
+# Campo de la petición -> argumento de calcular_sbc_optimo
+CRITERIOS_SBC_OPTIMO = (
+    ('pension_objetivo', 'pension_objetivo_mensual'),
+    ('inversion_maxima', 'inversion_maxima'),
+    ('roi_minimo', 'roi_minimo_pct'),
+)
+
+
+def _positivo_finito(campo: str) -> Regla:
+    """El valor debe ser mayor a 0 y finito (NaN no cumple ninguna comparación)"""
+    return Regla('criterio', (campo,), lambda v: 0 < v[campo] < math.inf,
+                 f'{campo} debe ser un número positivo. Valor recibido: {{valor}}')
+
+
+ESQUEMA_SBC_OPTIMO = Esquema(
+    campos=tuple(Campo(campo, float, mensaje_formato='Valor numérico inválido en {campo}: {valor}')
+                 for campo, _ in CRITERIOS_SBC_OPTIMO),
+    reglas=tuple(_positivo_finito(campo) for campo, _ in CRITERIOS_SBC_OPTIMO),
+    construir=lambda v: {argumento: v[campo] for campo, argumento in CRITERIOS_SBC_OPTIMO if v[campo] is not None},
+)
+
+
+def validar_peticion_sbc_optimo(data: Dict[str, Any], hoy: datetime) -> Tuple[DatosCalculo, Dict[str, float]]:
+    """
+    Validar una petición de /api/sbc-optimo: datos de la persona y criterios
+
+    Args:
+        data: Diccionario recibido (con sbc_modalidad40 ya puesto)
+        hoy: Fecha actual sin zona horaria (para el deadline de inscripción)
+
+    Returns:
+        (DatosCalculo, criterios): criterios son los argumentos de
+        calcular_sbc_optimo que vinieron (al menos uno)
+
+    Raises:
+        ErrorValidacion: con las violaciones de ambas partes juntas
+    """
+    invalido = _no_es_objeto(data)
+    if invalido:
+        raise ErrorValidacion.de_violaciones([invalido])
+    valores, violaciones = ESQUEMA_CALCULO.revisar(data, {'hoy': hoy})
+    valores_criterios, violaciones_criterios = ESQUEMA_SBC_OPTIMO.revisar(data, {})
+    criterios = ESQUEMA_SBC_OPTIMO.construir(valores_criterios)
+    if not violaciones_criterios and not criterios:
+        violaciones_criterios = [Violacion(None, 'Indica pension_objetivo, inversion_maxima o roi_minimo',
+                                           'datos_faltantes')]
+    violaciones += violaciones_criterios
+    if violaciones:
+        raise ErrorValidacion.de_violaciones(violaciones)
+    return ESQUEMA_CALCULO.construir(valores), criterios
+
+
+# ============================================================================
+# REPORTES PDF (/generar-reporte-pdf, /api/reportes-pdf)
+# ============================================================================
+
+def _texto_no_vacio(valor: Any) -> str:
+    texto = str(valor).strip()
+    if not texto:
+        raise ValueError('vacío')
+    return texto
+
+
+_REQUERIDO_REPORTE = 'Campo personal requerido para PDF: {campo}'
+
+ESQUEMA_REPORTE = Esquema(
+    campos=(
+        Campo('nombre', _texto_no_vacio, requerido=_REQUERIDO_REPORTE, motivo_requerido='reporte',
+              mensaje_formato=_REQUERIDO_REPORTE, motivo_formato='reporte'),
+        Campo('apellido_paterno', _texto_no_vacio, requerido=_REQUERIDO_REPORTE, motivo_requerido='reporte',
+              mensaje_formato=_REQUERIDO_REPORTE, motivo_formato='reporte'),
+        # Validar que tenemos los resultados del cálculo (basta con que venga la llave)
+        Campo('resultados', lambda valor: valor, vacios=(), motivo_requerido='reporte',
+              requerido='Se requieren los resultados del cálculo para generar el PDF'),
+    ),
+)
+
+_PARAMETROS_CALCULO = 'parametros_calculo'
+
+
+def _revisar_parametros_calculo(resultados: Any, hoy: datetime) -> Tuple[Optional[DatosCalculo], List[Violacion]]:
+    """Los 'parametros_calculo' de los resultados pasan por ESQUEMA_CALCULO (None si no vienen)"""
+    if not isinstance(resultados, dict) or _PARAMETROS_CALCULO not in resultados:
+        return None, []  # Resultados de una versión anterior: el PDF sale sin recalcular
+    parametros = resultados[_PARAMETROS_CALCULO]
+    if not isinstance(parametros, dict):
+        return None, [Violacion(_PARAMETROS_CALCULO, 'parametros_calculo debe ser un objeto', 'reporte')]
+    valores, violaciones = ESQUEMA_CALCULO.revisar(parametros, {'hoy': hoy})
+    if violaciones:
+        return None, [v._replace(campo=f'{_PARAMETROS_CALCULO}.{v.campo}') for v in violaciones]
+    return ESQUEMA_CALCULO.construir(valores), []
+
+
+def validar_datos_reporte(data: Dict[str, Any], hoy: datetime) -> Dict[str, Any]:
+    """
+    Validar una petición de reporte PDF
+
+    Los 'parametros_calculo' de los resultados (con los que el reporte
+    recalcula otras duraciones) se validan con las mismas reglas que /calcular.
+
+    Args:
+        data: Datos personales más los 'resultados' de /calcular
+        hoy: Fecha actual sin zona horaria (para el deadline de inscripción)
+
+    Returns:
+        Diccionario con 'nombre' y 'apellido_paterno' sin espacios de más,
+        'resultados' y 'datos_calculo' (DatosCalculo, o None si los
+        resultados no traen parámetros)
+
+    Raises:
+        ErrorValidacion: con todas las violaciones; el mensaje es el de la primera
+    """
+    if not isinstance(data, dict):
+        raise ErrorValidacion.de_violaciones([_no_es_objeto(data)])
+    valores, violaciones = ESQUEMA_REPORTE.revisar(data, {})
+    datos, violaciones_calculo = _revisar_parametros_calculo(valores['resultados'], hoy)
+    violaciones += violaciones_calculo
+    if violaciones:
+        raise ErrorValidacion.de_violaciones(violaciones)
+    return dict(ESQUEMA_REPORTE.construir(valores), datos_calculo=datos)